@@ -0,0 +1,195 @@
+import hashlib
+import os
+import tempfile
+import threading
+import weakref
+from collections import OrderedDict
+from typing import Optional
+
+from app.domain.ports.out_port.IChartRenderer import IChartRenderer
+from app.infrastructure.dto.chart_schema import BarChartDTO
+from app.utils.logger import log
+from app.utils.metrics import cache_result
+
+
+def chart_key(chart: BarChartDTO, backend: str = "") -> str:
+    """
+    Content hash of everything that ends up in the image: chart type,
+    titles, series, colors and size, plus the rendering backend.
+    """
+    payload = backend.encode() + b"\0" + chart.model_dump_json().encode()
+    return hashlib.sha256(payload).hexdigest()
+
+
+# Report jobs fork from a threaded worker; the child must not inherit a lock
+# that another thread was holding at fork time. One hook for every renderer,
+# held weakly so discarded renderers are not kept alive.
+_instances: "weakref.WeakSet[CachedChartRenderer]" = weakref.WeakSet()
+
+
+def _reset_locks_after_fork():
+    for renderer in list(_instances):
+        renderer._reset_lock()
+
+
+os.register_at_fork(after_in_child=_reset_locks_after_fork)
+
+
+class CachedChartRenderer(IChartRenderer):
+    """
+    Wraps a renderer with a content-addressed PNG cache.
+
+    Memory tier: LRU bounded by total bytes. Disk tier (optional): one
+    <hash>.png file per chart, shared by every worker on the host and capped
+    at `disk_max_bytes`; files are evicted by mtime, which a disk hit
+    refreshes, down to 90% of the cap so the directory is not rescanned on
+    every write.
+    Monthly/incident reports and the ES/EN variants of the same account and
+    period produce identical chart specs, so only the first one renders.
+    """
+
+    def __init__(
+        self,
+        renderer: IChartRenderer,
+        max_bytes: int = 32 * 1024 * 1024,
+        disk_dir: Optional[str] = None,
+        disk_max_bytes: int = 512 * 1024 * 1024,
+    ):
+        self.renderer = renderer
+        self.backend = type(renderer).__name__
+        self.max_bytes = max_bytes
+        self.disk_dir = disk_dir
+        self.disk_max_bytes = disk_max_bytes
+        self._disk_size: Optional[int] = None  # estimado de este proceso; se corrige al desalojar
+        self._entries: "OrderedDict[str, bytes]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self._evict_lock = threading.Lock()
+        _instances.add(self)
+        self.hits = 0
+        self.misses = 0
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    def render(self, chart: BarChartDTO) -> bytes:
+        key = chart_key(chart, self.backend)
+        png = self._get(key)
+        if png is None:
+            png = self._read_disk(key)
+            if png is None:
+                self._count(False)
+                png = self.renderer.render(chart)
+                self._write_disk(key, png)
+            else:
+                self._count(True)
+            self._put(key, png)
+        else:
+            self._count(True)
+        return png
+
+    def _count(self, hit: bool):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+        cache_result("chart", hit)
+
+    def _reset_lock(self):
+        self._lock = threading.Lock()
+        self._evict_lock = threading.Lock()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def _get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            png = self._entries.get(key)
+            if png is not None:
+                self._entries.move_to_end(key)
+            return png
+
+    def _put(self, key: str, png: bytes):
+        if len(png) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._size -= len(old)
+            self._entries[key] = png
+            self._size += len(png)
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, f"{key}.png")
+
+    def _read_disk(self, key: str) -> Optional[bytes]:
+        if not self.disk_dir:
+            return None
+        path = self._disk_path(key)
+        try:
+            with open(path, "rb") as f:
+                png = f.read()
+            os.utime(path)  # orden LRU para el desalojo
+            return png
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            log(f"Chart cache: no se pudo leer {key}: {e}")
+            return None
+
+    def _write_disk(self, key: str, png: bytes):
+        if not self.disk_dir:
+            return
+        try:
+            # Write-then-rename so concurrent workers never read a partial file.
+            fd, tmp_path = tempfile.mkstemp(dir=self.disk_dir, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(png)
+            os.replace(tmp_path, self._disk_path(key))
+        except OSError as e:
+            log(f"Chart cache: no se pudo escribir {key}: {e}")
+            return
+        with self._lock:
+            if self._disk_size is not None:
+                self._disk_size += len(png)
+            over = self._disk_size is None or self._disk_size > self.disk_max_bytes
+        if over:
+            self._evict_disk()
+
+    def _evict_disk(self):
+        if not self._evict_lock.acquire(blocking=False):
+            return  # otro hilo ya esta desalojando
+        try:
+            entries = []
+            for entry in os.scandir(self.disk_dir):
+                if not entry.name.endswith(".png"):
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+            total = sum(size for _, size, _ in entries)
+            if total > self.disk_max_bytes:
+                target = self.disk_max_bytes * 0.9
+                entries.sort()
+                removed = 0
+                for _, size, path in entries:
+                    if total <= target:
+                        break
+                    try:
+                        os.remove(path)
+                    except FileNotFoundError:
+                        pass
+                    total -= size
+                    removed += 1
+                log(f"Chart cache: {removed} PNG desalojados, quedan {total} bytes en disco")
+            with self._lock:
+                self._disk_size = total
+        finally:
+            self._evict_lock.release()
@@ -0,0 +1,196 @@
+import math
+from functools import lru_cache
+from io import BytesIO
+from typing import Dict, List, Tuple
+
+from PIL import Image, ImageDraw, ImageFont
+
+from app.domain.ports.out_port.IChartRenderer import IChartRenderer
+from app.infrastructure.dto.chart_schema import BarChartDTO
+
+BACKGROUND = "#ffffff"
+TEXT_COLOR = "#242424"
+AXIS_COLOR = "#242424"
+
+TITLE_SIZE = 17
+AXIS_TITLE_SIZE = 14
+TICK_SIZE = 12
+
+MARGIN_TOP = 100
+MARGIN_BOTTOM = 80
+MARGIN_SIDE = 80
+TICK_LEN = 5
+BAR_GAP = 0.2
+
+
+# Fuentes del sistema con tildes y eñes; la fuente embebida de Pillow no las trae.
+FONT_CANDIDATES = ("DejaVuSans.ttf", "LiberationSans-Regular.ttf", "Arial.ttf")
+
+
+@lru_cache(maxsize=8)
+def _font(size: int) -> ImageFont.ImageFont:
+    for name in FONT_CANDIDATES:
+        try:
+            return ImageFont.truetype(name, size)
+        except OSError:
+            continue
+    try:
+        return ImageFont.load_default(size=size)
+    except TypeError:
+        # Pillow < 10.1 only ships the fixed-size bitmap font.
+        return ImageFont.load_default()
+
+
+def _text_size(draw: ImageDraw.ImageDraw, text: str, font) -> Tuple[int, int]:
+    left, top, right, bottom = draw.textbbox((0, 0), text, font=font)
+    return right - left, bottom - top
+
+
+def _draw_text(draw: ImageDraw.ImageDraw, x: float, y: float, text: str, font, align: str = "center"):
+    """Draws text vertically centered on y; x is the left, center or right edge."""
+    left, top, right, bottom = draw.textbbox((0, 0), text, font=font)
+    width, height = right - left, bottom - top
+    if align == "center":
+        x -= width / 2
+    elif align == "right":
+        x -= width
+    draw.text((x - left, y - height / 2 - top), text, font=font, fill=TEXT_COLOR)
+
+
+def _draw_vertical_text(image: Image.Image, x: float, y: float, text: str, font):
+    """Draws text rotated 90 degrees, centered on (x, y)."""
+    probe = ImageDraw.Draw(image)
+    left, top, right, bottom = probe.textbbox((0, 0), text, font=font)
+    mask = Image.new("L", (right - left + 2, bottom - top + 2), 0)
+    ImageDraw.Draw(mask).text((1 - left, 1 - top), text, font=font, fill=255)
+    mask = mask.rotate(90, expand=True)
+    ink = Image.new("RGB", mask.size, TEXT_COLOR)
+    image.paste(ink, (int(x - mask.width / 2), int(y - mask.height / 2)), mask)
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else f"{value:g}"
+
+
+def _value_ticks(max_value: float) -> Tuple[float, List[float]]:
+    """Axis upper bound and tick positions; one tick per unit while that stays readable."""
+    max_value = max(max_value, 1)
+    step = 1.0
+    if max_value > 10:
+        raw = max_value / 8
+        magnitude = 10 ** math.floor(math.log10(raw))
+        step = next(m * magnitude for m in (1, 2, 5, 10) if m * magnitude >= raw)
+    # Headroom for the value labels drawn outside the bars.
+    upper = math.ceil(max_value * 1.12 / step) * step
+    if upper <= max_value:
+        upper += step
+    ticks = [i * step for i in range(int(round(upper / step)) + 1)]
+    return upper, ticks
+
+
+class NativeChartRenderer(IChartRenderer):
+    """
+    Renders the report bar charts with Pillow, in-process.
+    Keeps the plotly simple_white look (titles, axis titles, value labels
+    outside the bars, legend on the right) without a headless browser.
+    """
+
+    def render(self, chart: BarChartDTO) -> bytes:
+        image = Image.new("RGB", (chart.width, chart.height), BACKGROUND)
+        draw = ImageDraw.Draw(image)
+        title_font = _font(TITLE_SIZE)
+        axis_font = _font(AXIS_TITLE_SIZE)
+        tick_font = _font(TICK_SIZE)
+
+        values: List[Dict[str, float]] = [
+            {c: v for c, v in zip(s.categories, s.values) if v is not None}
+            for s in chart.series
+        ]
+        max_value = max((v for vals in values for v in vals.values()), default=0)
+        upper, ticks = _value_ticks(max_value)
+
+        legend_width = 0
+        if chart.show_legend and chart.series:
+            entries = [s.name for s in chart.series] + [chart.legend_title or ""]
+            legend_width = max(_text_size(draw, e, tick_font)[0] for e in entries) + 40
+
+        if chart.orientation == "h":
+            label_width = max((_text_size(draw, c, tick_font)[0] for c in chart.categories), default=0)
+            left = max(MARGIN_SIDE, label_width + TICK_LEN + 40)
+        else:
+            tick_width = max(_text_size(draw, _format_value(t), tick_font)[0] for t in ticks)
+            left = max(MARGIN_SIDE, tick_width + TICK_LEN + 40)
+        plot = (left, MARGIN_TOP, chart.width - MARGIN_SIDE - legend_width, chart.height - MARGIN_BOTTOM)
+        x0, y0, x1, y1 = plot
+
+        _draw_text(draw, chart.width * 0.05, MARGIN_TOP / 2, chart.title, title_font, align="left")
+
+        if chart.orientation == "h":
+            self._draw_horizontal(draw, chart, values, plot, upper, ticks, tick_font)
+        else:
+            self._draw_vertical(draw, chart, values, plot, upper, ticks, tick_font)
+
+        draw.line([(x0, y0), (x0, y1), (x1, y1)], fill=AXIS_COLOR, width=1)
+        _draw_text(draw, (x0 + x1) / 2, y1 + 50, chart.x_title, axis_font)
+        _draw_vertical_text(image, x0 - (left - 20), (y0 + y1) / 2, chart.y_title, axis_font)
+
+        if legend_width:
+            self._draw_legend(draw, chart, x1 + 20, y0, tick_font)
+
+        out = BytesIO()
+        image.save(out, format="PNG", compress_level=1)
+        return out.getvalue()
+
+    def _draw_vertical(self, draw, chart, values, plot, upper, ticks, font):
+        x0, y0, x1, y1 = plot
+        scale = (y1 - y0) / upper
+        for t in ticks:
+            y = y1 - t * scale
+            draw.line([(x0 - TICK_LEN, y), (x0, y)], fill=AXIS_COLOR)
+            _draw_text(draw, x0 - TICK_LEN - 4, y, _format_value(t), font, align="right")
+        slot = (x1 - x0) / max(len(chart.categories), 1)
+        for i, category in enumerate(chart.categories):
+            start = x0 + slot * i + slot * BAR_GAP / 2
+            present = [(s, vals[category]) for s, vals in zip(chart.series, values) if category in vals]
+            if present:
+                width = slot * (1 - BAR_GAP) / len(present)
+                for j, (s, value) in enumerate(present):
+                    left = start + j * width
+                    top = y1 - value * scale
+                    draw.rectangle([left, top, left + width - 1, y1], fill=s.color)
+                    _draw_text(draw, left + width / 2, top - 9, _format_value(value), font)
+            center = x0 + slot * (i + 0.5)
+            draw.line([(center, y1), (center, y1 + TICK_LEN)], fill=AXIS_COLOR)
+            _draw_text(draw, center, y1 + TICK_LEN + 12, category, font)
+
+    def _draw_horizontal(self, draw, chart, values, plot, upper, ticks, font):
+        x0, y0, x1, y1 = plot
+        scale = (x1 - x0) / upper
+        for t in ticks:
+            x = x0 + t * scale
+            draw.line([(x, y1), (x, y1 + TICK_LEN)], fill=AXIS_COLOR)
+            _draw_text(draw, x, y1 + TICK_LEN + 12, _format_value(t), font)
+        slot = (y1 - y0) / max(len(chart.categories), 1)
+        for i, category in enumerate(chart.categories):
+            # First category at the bottom, as plotly draws category axes.
+            bottom = y1 - slot * i - slot * BAR_GAP / 2
+            present = [(s, vals[category]) for s, vals in zip(chart.series, values) if category in vals]
+            if present:
+                height = slot * (1 - BAR_GAP) / len(present)
+                for j, (s, value) in enumerate(present):
+                    top = bottom - (j + 1) * height
+                    right = x0 + value * scale
+                    draw.rectangle([x0, top, right, top + height - 1], fill=s.color)
+                    _draw_text(draw, right + 6, top + height / 2, _format_value(value), font, align="left")
+            center = y1 - slot * (i + 0.5)
+            draw.line([(x0 - TICK_LEN, center), (x0, center)], fill=AXIS_COLOR)
+            _draw_text(draw, x0 - TICK_LEN - 4, center, category, font, align="right")
+
+    def _draw_legend(self, draw, chart, x, y, font):
+        if chart.legend_title:
+            _draw_text(draw, x, y + 8, chart.legend_title, font, align="left")
+            y += 22
+        for s in chart.series:
+            draw.rectangle([x, y + 2, x + 12, y + 14], fill=s.color)
+            _draw_text(draw, x + 20, y + 8, s.name, font, align="left")
+            y += 22
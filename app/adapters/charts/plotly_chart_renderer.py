@@ -0,0 +1,49 @@
+from app.domain.ports.out_port.IChartRenderer import IChartRenderer
+from app.infrastructure.dto.chart_schema import BarChartDTO
+
+
+class PlotlyChartRenderer(IChartRenderer):
+    """
+    Renders the charts with plotly + kaleido (headless Chromium).
+    Optional backend: plotly and kaleido are only imported when it is selected.
+    """
+
+    def __init__(self):
+        import plotly.graph_objects as go
+        self.go = go
+
+    def render(self, chart: BarChartDTO) -> bytes:
+        go = self.go
+        horizontal = chart.orientation == "h"
+        bars = []
+        for s in chart.series:
+            points = [(c, v) for c, v in zip(s.categories, s.values) if v is not None]
+            cats = [c for c, _ in points]
+            vals = [v for _, v in points]
+            bars.append(go.Bar(
+                x=vals if horizontal else cats,
+                y=cats if horizontal else vals,
+                orientation=chart.orientation,
+                name=s.name,
+                marker_color=s.color,
+                text=vals,
+                texttemplate="%{text}",
+                textposition="outside",
+            ))
+        fig = go.Figure(data=bars)
+        fig.update_layout(
+            title=chart.title,
+            xaxis_title=chart.x_title,
+            yaxis_title=chart.y_title,
+            legend_title=chart.legend_title,
+            showlegend=chart.show_legend,
+            template="simple_white",
+            barmode="group",
+            width=chart.width,
+            height=chart.height,
+        )
+        category_axis = fig.update_yaxes if horizontal else fig.update_xaxes
+        value_axis = fig.update_xaxes if horizontal else fig.update_yaxes
+        category_axis(categoryorder="array", categoryarray=chart.categories)
+        value_axis(dtick=1)
+        return fig.to_image(format="png")
@@ -2,6 +2,7 @@ from sqlalchemy.engine import Engine
 from sqlalchemy.orm import scoped_session, sessionmaker
 from sqlmodel import Session, create_engine
 from app.utils.logger import log
+from app.utils.metrics import instrument_engine
 
 from app.conf.config import get_app_settings
 
@@ -15,6 +16,7 @@ TM_ENGINE = create_engine(
     max_overflow=60,
     pool_timeout=5              #  fail after 5s if no connection available
 )
+instrument_engine(TM_ENGINE, "toolmaster")
 
 TM_SM_FACTORY: sessionmaker = sessionmaker(
     autocommit=False, autoflush=False, bind=TM_ENGINE
@@ -0,0 +1,133 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from datetime import datetime
+from typing import BinaryIO, Dict, NamedTuple, Optional
+
+from app.utils.logger import log
+
+
+class StoredArtifact(NamedTuple):
+    path: str
+    filename: str
+    media_type: str
+    size: int
+    etag: str
+
+
+def artifact_key(
+    report_type: str,
+    sf_account_id: str,
+    start_date: datetime,
+    end_date: datetime,
+    language: str,
+    data_version: str,
+    renderer_version: str,
+) -> str:
+    """
+    Llave de un reporte generado: mismo tipo, cuenta, rango, idioma y datos,
+    y el mismo codigo y plantillas (renderer_version) que lo generaron.
+    """
+    raw = "|".join([
+        report_type,
+        sf_account_id,
+        start_date.isoformat(),
+        end_date.isoformat(),
+        language.lower(),
+        data_version,
+        renderer_version,
+    ])
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+class ReportArtifactStore:
+    """
+    Reportes ya generados (.docx/.xlsx) en disco, compartidos por los workers.
+
+    Cada entrada es <key>.bin con el archivo y <key>.json con su metadata.
+    La llave incluye la version de los datos, la del codigo que arma los
+    reportes y un hash de las plantillas, asi que nunca se invalida una
+    entrada: simplemente deja de pedirse y sale por el limite de tamaño, que
+    desaloja primero lo usado hace mas tiempo (mtime del .json, que se toca
+    en cada hit).
+    """
+
+    def __init__(self, root: str, max_bytes: int = 2 * 1024 ** 3):
+        self.root = root
+        self.max_bytes = max_bytes
+        self._evict_lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+
+    def _path(self, key: str, suffix: str) -> str:
+        return os.path.join(self.root, f"{key}.{suffix}")
+
+    def get(self, key: str) -> Optional[StoredArtifact]:
+        meta_path = self._path(key, "json")
+        try:
+            with open(meta_path, "r") as f:
+                meta = json.load(f)
+            os.utime(meta_path)
+        except (FileNotFoundError, ValueError):
+            return None
+        path = self._path(key, "bin")
+        if not os.path.exists(path):
+            return None
+        return StoredArtifact(path, meta["filename"], meta["media_type"], meta["size"], meta["etag"])
+
+    def put(self, key: str, stream: BinaryIO, filename: str, media_type: str) -> StoredArtifact:
+        """Guarda el archivo (desde la posicion actual del stream) y lo deja en su posicion original."""
+        start = stream.tell()
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            while chunk := stream.read(1024 * 1024):
+                f.write(chunk)
+            size = f.tell()
+        stream.seek(start)
+        os.replace(tmp_path, self._path(key, "bin"))
+        artifact = StoredArtifact(self._path(key, "bin"), filename, media_type, size, f'"{key[:32]}"')
+        meta = {
+            "filename": filename,
+            "media_type": media_type,
+            "size": size,
+            "etag": artifact.etag,
+            "created_at": datetime.utcnow().isoformat(),
+        }
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, self._path(key, "json"))
+        self._evict()
+        return artifact
+
+    def _evict(self):
+        with self._evict_lock:
+            entries: Dict[str, float] = {}
+            sizes: Dict[str, int] = {}
+            for name in os.listdir(self.root):
+                key, _, suffix = name.partition(".")
+                if len(key) != 64:
+                    # Solo entradas del store (<sha256>.bin/.json), no locks ni estado.
+                    continue
+                path = os.path.join(self.root, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                sizes[key] = sizes.get(key, 0) + stat.st_size
+                if suffix == "json":
+                    entries[key] = stat.st_mtime
+            total = sum(sizes.values())
+            if total <= self.max_bytes:
+                return
+            for key in sorted(entries, key=entries.get):
+                if total <= self.max_bytes:
+                    break
+                for suffix in ("json", "bin"):
+                    try:
+                        os.remove(self._path(key, suffix))
+                    except FileNotFoundError:
+                        pass
+                total -= sizes.get(key, 0)
+            log(f"Report cache: desalojo hasta {total} bytes")
@@ -2,12 +2,14 @@
 from typing import Type, List, Dict, Any
 from app.infrastructure.dto.ticket_schema import TicketBaseDTO
 from app.utils.variable_types import ENTITY_MODEL
-from app.utils.logger import log
+from app.utils.logger import current_correlation_id, log
 import requests
 import json
+import time
 import uuid
 from urllib3.exceptions import InsecureRequestWarning
 from app.utils.errors import DatabaseError, ErrorType, AppError
+from app.utils.metrics import observe_esb
 
 from app.conf.config import get_app_settings
 app_settings = get_app_settings()
@@ -28,10 +30,25 @@ class EsbRepository(requests.Session):
         self.headers.update( {
             "client_id" : f"{self.id}",
             "client_secret" : f"{self.secret}",
-            "X-Correlation-ID" : f'{self.generate_uuid()}:{self.environment}',
+            # El id del request de la API, para cruzar logs.log con el ESB.
+            "X-Correlation-ID" : f'{current_correlation_id() or self.generate_uuid()}:{self.environment}',
             'Content-Type': "application/json"
             })
     
+    def _esb_request(self, operation: str, method: str, url: str, **kwargs) -> requests.Response:
+        """requests.request con metricas: status (o excepcion) y latencia por operacion."""
+        started = time.perf_counter()
+        status = "error"
+        try:
+            response = requests.request(method, url, **kwargs)
+            status = str(response.status_code)
+            return response
+        except requests.RequestException as e:
+            status = type(e).__name__
+            raise
+        finally:
+            observe_esb(operation, status, time.perf_counter() - started)
+
     def generate_uuid(self):
         generated_uuid = str(uuid.uuid4())
         return generated_uuid
@@ -121,7 +138,7 @@ class EsbRepository(requests.Session):
     def create_ticket(self, bussinesId, payload):
         url = self.base_url + f"/{bussinesId}/troubleTicket"
         headers = self.headers
-        response = requests.request("POST", url, headers=headers, data=payload)
+        response = self._esb_request("create", "POST", url, headers=headers, data=payload)
 
         if response.status_code == 400:
             raise AppError(error_type=ErrorType.BAD_REQUEST,message=response.text)
@@ -135,7 +152,7 @@ class EsbRepository(requests.Session):
     def update_ticket(self, bussinesId,externalId, payload):
         url = self.base_url + f"/{bussinesId}/troubleTicket/{externalId}"
         headers = self.headers
-        response = requests.request("PATCH", url, headers=headers, data=payload)
+        response = self._esb_request("update", "PATCH", url, headers=headers, data=payload)
         # log(f"payload at update step: {payload}")
         # log(f"Update Response at the esb repo level, Status code: {response.status_code}, Response message: {response.text}")
 
@@ -152,7 +169,7 @@ class EsbRepository(requests.Session):
         url = self.base_url + f"/{bussinesId}/troubleTicket/{externalId}"
         headers = self.headers
 
-        response = requests.request("PATCH", url, headers=headers, data=payload)
+        response = self._esb_request("close", "PATCH", url, headers=headers, data=payload)
         log(f"response at close ticket method in esb repo: {response}")
 
         if response.status_code == 400:
@@ -169,13 +186,13 @@ class EsbRepository(requests.Session):
         url = self.base_url + f"/{bussinesId}/troubleTicket?@type=ToolMasterTicket&@baseType=TroubleTicket&relatedEntity.name=Toolmaster&relatedEntity.id={circuit_id}&relatedEntity.role=Service"
         headers = self.headers
         #log(f"url: {url}")
-        response = requests.request("GET", url, headers=headers)
+        response = self._esb_request("search", "GET", url, headers=headers)
         return response.text
 
     def get_incident_details_by_sf_id(self, bussinesId, sf_incident_id):
         url = self.base_url + f"/{bussinesId}/troubleTicket/{sf_incident_id}?@type=ToolMasterTicket&@baseType=TroubleTicket"
         headers = self.headers
-        response = requests.request("GET", url, headers=headers)
+        response = self._esb_request("details", "GET", url, headers=headers)
 
         data = response.json()
         log("incident details:")
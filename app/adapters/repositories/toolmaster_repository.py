@@ -1,9 +1,17 @@
-from typing import Any, Dict, Optional, Set, Type, List
-from datetime import datetime
+import hashlib
+from typing import Any, Dict, Iterator, Mapping, Optional, Set, Tuple, Type, List
+from datetime import datetime, timedelta
 
-from sqlalchemy import RowMapping
+from sqlalchemy import RowMapping, bindparam
 from sqlmodel import Session, select, text, Column
 
+from app.adapters.ticket_snapshot_store import (
+    SnapshotUnavailableError,
+    TicketSnapshotStore,
+    configured_snapshot_store,
+    month_segments,
+    month_start,
+)
 from app.domain.ports.out_port.IToolmasterRepository import IToolmasterRepository
 from app.utils.errors import handle_database_error
 from app.utils.variable_types import ENTITY_MODEL
@@ -21,9 +29,26 @@ from app.infrastructure.dto.reports_schema import (
 )
 
 
+def _ticket_asset(r: RowMapping) -> AssetDTO:
+    return AssetDTO(
+        asset_id=r["asset_id"],
+        sf_asset_id=r["asset_sfid"],
+        circuit_id=r["circuit_id"],
+        product_family=r["product_family"],
+        product_category=r["product_category"],
+        location=r["location"],
+    )
+
+
+def _row_accounts(r: RowMapping, requested: Set[int]) -> Set[int]:
+    """Cuentas pedidas a las que pertenece una fila (por asset o por ticket_accounts)."""
+    return {a for a in (r["asset_account_id"], r["ticket_account_id"]) if a in requested}
+
+
 class ToolmasterRepository(IToolmasterRepository):
-    def __init__(self, session: Session):
+    def __init__(self, session: Session, snapshots: Optional[TicketSnapshotStore] = None):
         super().__init__(session)
+        self.snapshots = snapshots or configured_snapshot_store()
 
     @handle_database_error
     def get_incident(
@@ -371,68 +396,64 @@ class ToolmasterRepository(IToolmasterRepository):
 
     @handle_database_error
     def get_customer_info(self, sf_account_id: str, start_date: datetime, end_date: datetime) -> Optional[CustomerDTO]:
-        q_acc = text(
-            "SELECT a.account_id, a.sf_account_id, a.name, "
-            "       a.sccd_id, COALESCE(a.sf_category, a.category) AS category, "
-            "       c.name AS country_name "
+        return self.get_customers_info([sf_account_id], start_date, end_date).get(sf_account_id)
+
+    @handle_database_error
+    def get_sf_account_ids_by_country(self, country: str) -> List[str]:
+        q = text(
+            "SELECT a.sf_account_id "
             "FROM   csctoolmaster.app_accounts a "
-            "LEFT   JOIN csctoolmaster.app_countries c ON c.country_id = a.country_id "
-            "WHERE  a.sf_account_id = :sfid "
-            "LIMIT  1"
+            "JOIN   csctoolmaster.app_countries c ON c.country_id = a.country_id "
+            "WHERE  c.name = :country AND a.sf_account_id IS NOT NULL "
+            "ORDER  BY a.name"
         )
-        acc_row = self.session.execute(q_acc, {"sfid": sf_account_id}).fetchone()
-        if not acc_row:
-            return None
-        account_id, sfid, name, sccd_id, category, country_name = acc_row
+        return [r[0] for r in self.session.execute(q, {"country": country}).fetchall()]
 
-        q_assets = text(
-            "SELECT asset_id, sf_asset_id, circuit_id, product_family, product_category, "
-            "       product_name, status, location "
-            "FROM   csctoolmaster.app_assets "
-            "WHERE  account_id = :acct"
+    def _active_accounts(self, start_date: datetime, end_date: datetime) -> List[Tuple[int, str]]:
+        q = text(
+            "SELECT acc.account_id, acc.sf_account_id "
+            "FROM   csctoolmaster.app_accounts acc "
+            "WHERE  acc.sf_account_id IS NOT NULL "
+            "  AND  acc.account_id IN ( "
+            "         SELECT a.account_id "
+            "         FROM   csctoolmaster.app_ticket t "
+            "         JOIN   csctoolmaster.app_ticket_assets ta ON t.ticket_id = ta.ticket_id "
+            "         JOIN   csctoolmaster.app_assets a ON ta.assets_id = a.asset_id "
+            "         WHERE  t.created_at >= :startd AND t.created_at <= :endd "
+            "         UNION "
+            "         SELECT tacc.accounts_id "
+            "         FROM   csctoolmaster.app_ticket t "
+            "         JOIN   csctoolmaster.app_ticket_accounts tacc ON t.ticket_id = tacc.ticket_id "
+            "         WHERE  t.created_at >= :startd AND t.created_at <= :endd "
+            "       ) "
+            "ORDER  BY acc.name"
         )
-        assets = [
-            AssetDTO(
-                asset_id=r[0],
-                sf_asset_id=r[1],
-                circuit_id=r[2],
-                product_family=r[3],
-                product_category=r[4],
-                product_name=r[5],
-                status=r[6],
-                location=r[7],
-            )
-            for r in self.session.execute(q_assets, {"acct": account_id}).fetchall()
-        ]
+        return [tuple(r) for r in self.session.execute(q, {"startd": start_date, "endd": end_date}).fetchall()]
 
-        q_contacts = text(
-            "SELECT contact_id, sf_contact_id, name, contact_type, email, phone, mobile_phone, "
-            "       account_id "
-            "FROM   csctoolmaster.app_contact "
-            "WHERE  account_id = :acct"
-        )
-        contacts = [
-            ContactDTO(
-                contact_id=r[0],
-                sf_contact_id=r[1],
-                name=r[2],
-                contact_type=r[3],
-                email=r[4],
-                phone=r[5],
-                account_id=r[7],
-            )
-            for r in self.session.execute(q_contacts, {"acct": account_id}).fetchall()
-        ]
+    @handle_database_error
+    def get_active_sf_account_ids(self, start_date: datetime, end_date: datetime) -> List[str]:
+        """Cuentas con al menos un ticket creado en el rango (por activo o por cuenta)."""
+        return list(dict.fromkeys(sfid for _, sfid in self._active_accounts(start_date, end_date)))
 
-        q_inc = text(
+    @handle_database_error
+    def get_active_account_ids(self, start_date: datetime, end_date: datetime) -> List[int]:
+        """Como get_active_sf_account_ids, pero con el account_id interno."""
+        return [account_id for account_id, _ in self._active_accounts(start_date, end_date)]
+
+    # Filas de tickets de get_customers_info (una por ticket x activo); las
+    # mismas que guarda el TicketSnapshotStore por cuenta y mes.
+    _TICKET_ROW_QUERIES = {
+        "incidents": text(
             "SELECT i.incident_id, i.sf_incident_id, i.incident_number, i.source_incident, "
             "       i.reported_at, i.affected_at, i.resolution_at, i.status, i.priority, "
             "       i.created_at AS incident_created, i.updated_at AS incident_updated, "
             "       i.start_at_dw, i.end_at_dw, i.downtime, i.is_major AS inc_is_major, "
             "       i.symptom, i.cause, i.resolution_summary, i.description, i.subject, "
             "       i.attributed_to, i.reason, i.type_incident, i.stop_dw, "
-            "       t.ticket_id, a.asset_id, a.sf_asset_id AS asset_sfid, a.circuit_id, "
-            "       a.product_family, a.product_category, a.location "
+            "       t.ticket_id, t.created_at AS ticket_created, "
+            "       a.asset_id, a.sf_asset_id AS asset_sfid, a.circuit_id, "
+            "       a.product_family, a.product_category, a.location, "
+            "       a.account_id AS asset_account_id, tacc.accounts_id AS ticket_account_id "
             "FROM   csctoolmaster.app_ticket t "
             "LEFT   JOIN csctoolmaster.app_ticket_assets ta ON t.ticket_id = ta.ticket_id "
             "LEFT   JOIN csctoolmaster.app_assets a ON ta.assets_id = a.asset_id "
@@ -440,63 +461,17 @@ class ToolmasterRepository(IToolmasterRepository):
             "LEFT   JOIN csctoolmaster.app_incident i ON i.ticket_id = t.ticket_id "
             "WHERE  t.case_type_name = 'incident' "
             "  AND  t.created_at >= :startd AND t.created_at <= :endd "
-            "  AND  (a.account_id = :acct OR tacc.accounts_id = :acct)"
-        )
-        inc_rows = self.session.execute(
-            q_inc, {"acct": account_id, "startd": start_date, "endd": end_date}
-        ).mappings().all()
-        inc_map: Dict[int, IncidentDTO] = {}
-        for r in inc_rows:
-            iid = r["incident_id"]
-            if not iid:
-                continue
-            if iid not in inc_map:
-                inc_map[iid] = IncidentDTO(
-                    incident_id=r["incident_id"],
-                    ticket_id=r["ticket_id"],
-                    sf_incident_id=r["sf_incident_id"],
-                    incident_number=r["incident_number"],
-                    subject=r["subject"],
-                    source_incident=r["source_incident"],
-                    reported_at=r["reported_at"],
-                    affected_at=r["affected_at"],
-                    resolution_at=r["resolution_at"],
-                    status=r["status"],
-                    priority=r["priority"],
-                    created_at=r["incident_created"],
-                    updated_at=r["incident_updated"],
-                    start_at_dw=r["start_at_dw"],
-                    end_at_dw=r["end_at_dw"],
-                    downtime=r["downtime"],
-                    is_major=r["inc_is_major"],
-                    symptom=r["symptom"],
-                    cause=r["cause"],
-                    resolution_summary=r["resolution_summary"],
-                    description=r["description"],
-                    attributed_to=r["attributed_to"],
-                    reason=r["reason"],
-                    type_incident=r["type_incident"],
-                    stop_dw=r["stop_dw"],
-                    assets=[],
-                )
-            if r["asset_id"]:
-                inc_map[iid].assets.append(
-                    AssetDTO(
-                        asset_id=r["asset_id"],
-                        sf_asset_id=r["asset_sfid"],
-                        circuit_id=r["circuit_id"],
-                        product_family=r["product_family"],
-                        product_category=r["product_category"],
-                        location=r["location"],
-                    )
-                )
-        q_sr = text(
+            "  AND  (a.account_id IN :accts OR tacc.accounts_id IN :accts)"
+        ).bindparams(bindparam("accts", expanding=True)),
+        "service_requests": text(
             "SELECT sr.sr_id, sr.sf_sr_id, sr.sr_number, sr.status, sr.priority, "
             "       sr.sr_type, sr.source, sr.symptom, sr.resolution_summary AS solution, "
             "       sr.created_at AS sr_created, sr.updated_at AS sr_updated, "
             "       sr.resolved_at, sr.closed_at, sr.sr_category, sr.sr_type_actions, "
-            "       t.ticket_id, a.asset_id, a.sf_asset_id AS asset_sfid, a.circuit_id, "
-            "       a.product_family, a.product_category, a.location "
+            "       t.ticket_id, t.created_at AS ticket_created, "
+            "       a.asset_id, a.sf_asset_id AS asset_sfid, a.circuit_id, "
+            "       a.product_family, a.product_category, a.location, "
+            "       a.account_id AS asset_account_id, tacc.accounts_id AS ticket_account_id "
             "FROM   csctoolmaster.app_ticket t "
             "LEFT   JOIN csctoolmaster.app_ticket_assets ta ON t.ticket_id = ta.ticket_id "
             "LEFT   JOIN csctoolmaster.app_assets a ON ta.assets_id = a.asset_id "
@@ -504,62 +479,18 @@ class ToolmasterRepository(IToolmasterRepository):
             "LEFT   JOIN csctoolmaster.app_sr sr ON sr.ticket_id = t.ticket_id "
             "WHERE  t.case_type_name IN ('request','service_request','sr') "
             "  AND  t.created_at >= :startd AND t.created_at <= :endd "
-            "  AND  (a.account_id = :acct OR tacc.accounts_id = :acct)"
-        )
-        sr_rows = self.session.execute(
-            q_sr, {"acct": account_id, "startd": start_date, "endd": end_date}
-        ).mappings().all()
-        sr_map: Dict[int, ServiceRequestDTO] = {}
-        for r in sr_rows:
-            sid = r["sr_id"]
-            if not sid:
-                continue
-            if sid not in sr_map:
-                sr_map[sid] = ServiceRequestDTO(
-                    sr_id=r["sr_id"],
-                    ticket_id=r["ticket_id"],
-                    sf_sr_id=r["sf_sr_id"],
-                    sr_number=r["sr_number"],
-                    status=r["status"],
-                    sr_type=r["sr_type"],
-                    source=r["source"],
-                    symptom=r["symptom"],
-                    solution=r["solution"],
-                    created_at=r["sr_created"],
-                    updated_at=r["sr_updated"],
-                    resolved_at=r["resolved_at"],
-                    closed_at=r["closed_at"],
-                    sr_category=r["sr_category"],
-                    sr_type_actions=r["sr_type_actions"],
-                    priority=r["priority"],
-                    asset=None,
-                    asset_location=None,
-                    asset_type=None,
-                    assets=[],
-                )
-            if r["asset_id"]:
-                sr_map[sid].asset = r["circuit_id"]
-                sr_map[sid].asset_location = r["location"]
-                sr_map[sid].asset_type = r["product_category"]
-                sr_map[sid].assets.append(
-                    AssetDTO(
-                        asset_id=r["asset_id"],
-                        sf_asset_id=r["asset_sfid"],
-                        circuit_id=r["circuit_id"],
-                        product_family=r["product_family"],
-                        product_category=r["product_category"],
-                        location=r["location"],
-                    )
-                )
-        q_ch = text(
+            "  AND  (a.account_id IN :accts OR tacc.accounts_id IN :accts)"
+        ).bindparams(bindparam("accts", expanding=True)),
+        "changes": text(
             "SELECT c.change_id, c.ticket_id, c.sf_change_id, c.change_number, c.status, "
             "       c.urgency, c.impact, c.type_change, c.subject, c.description, "
             "       c.risk_level, c.failure_probability, c.change_downtime, "
             "       c.created_at AS chg_created, c.updated_at AS chg_updated, "
             "       c.start_at_activity, c.end_at_activity, c.bussines_reason, "
-            "       c.result, c.type_of_action, "
+            "       c.result, c.type_of_action, t.created_at AS ticket_created, "
             "       a.asset_id, a.sf_asset_id AS asset_sfid, a.circuit_id, "
-            "       a.product_family, a.product_category, a.location "
+            "       a.product_family, a.product_category, a.location, "
+            "       a.account_id AS asset_account_id, tacc.accounts_id AS ticket_account_id "
             "FROM   csctoolmaster.app_ticket t "
             "LEFT   JOIN csctoolmaster.app_ticket_assets ta ON t.ticket_id = ta.ticket_id "
             "LEFT   JOIN csctoolmaster.app_assets a ON ta.assets_id = a.asset_id "
@@ -567,98 +498,486 @@ class ToolmasterRepository(IToolmasterRepository):
             "LEFT   JOIN csctoolmaster.app_changes c ON c.ticket_id = t.ticket_id "
             "WHERE  t.case_type_name = 'Change_Request' "
             "  AND  t.created_at >= :startd AND t.created_at <= :endd "
-            "  AND  (a.account_id = :acct OR tacc.accounts_id = :acct)"
-        )
-        ch_rows = self.session.execute(
-            q_ch, {"acct": account_id, "startd": start_date, "endd": end_date}
-        ).mappings().all()
-        ch_map: Dict[int, ChangeDTO] = {}
-        for r in ch_rows:
-            cid = r["change_id"]
-            if not cid:
-                continue
-            if cid not in ch_map:
-                ch_map[cid] = ChangeDTO(
-                    change_id=r["change_id"],
-                    ticket_id=r["ticket_id"],
-                    sf_change_id=r["sf_change_id"],
-                    change_number=r["change_number"],
-                    status=r["status"],
-                    type_change=r["type_change"],
-                    description=r["description"],
-                    created_at=r["chg_created"],
-                    updated_at=r["chg_updated"],
-                    result=r["result"],
-                    type_of_action=r["type_of_action"],
-                    bussines_reason=r["bussines_reason"],
-                    urgency=r["urgency"],
-                    impact=r["impact"],
-                    subject=r["subject"],
-                    risk_level=r["risk_level"],
-                    failure_probability=r["failure_probability"],
-                    change_downtime=r["change_downtime"],
-                    start_at_activity=r["start_at_activity"],
-                    end_at_activity=r["end_at_activity"],
-                    priority=(r["urgency"] or r["impact"]),
-                    asset=None,
-                    asset_location=None,
-                    asset_type=None,
-                    assets=[],
-                )
-            if r["asset_id"]:
-                ch_map[cid].asset = r["circuit_id"]
-                ch_map[cid].asset_location = r["location"]
-                ch_map[cid].asset_type = r["product_category"]
-                ch_map[cid].assets.append(
-                    AssetDTO(
-                        asset_id=r["asset_id"],
-                        sf_asset_id=r["asset_sfid"],
-                        circuit_id=r["circuit_id"],
-                        product_family=r["product_family"],
-                        product_category=r["product_category"],
-                        location=r["location"],
-                    )
-                )
-        q_wl = text(
+            "  AND  (a.account_id IN :accts OR tacc.accounts_id IN :accts)"
+        ).bindparams(bindparam("accts", expanding=True)),
+        "worklogs": text(
             "SELECT w.worklog_id, w.sf_worklog_id, w.created_by_name, w.type_worklog, "
-            "       w.created_at, w.ticket_id, w.description, w.ticket_number, w.worklog_number "
+            "       w.created_at, w.ticket_id, w.description, w.ticket_number, w.worklog_number, "
+            "       t.created_at AS ticket_created, "
+            "       a.account_id AS asset_account_id, tacc.accounts_id AS ticket_account_id "
             "FROM   csctoolmaster.app_worklogs w "
             "JOIN   csctoolmaster.app_ticket t ON w.ticket_id = t.ticket_id "
             "LEFT   JOIN csctoolmaster.app_ticket_accounts tacc ON t.ticket_id = tacc.ticket_id "
             "LEFT   JOIN csctoolmaster.app_ticket_assets ta ON t.ticket_id = ta.ticket_id "
             "LEFT   JOIN csctoolmaster.app_assets a ON ta.assets_id = a.asset_id "
-            "WHERE  (a.account_id = :acct OR tacc.accounts_id = :acct) "
+            "WHERE  (a.account_id IN :accts OR tacc.accounts_id IN :accts) "
             "  AND  t.created_at >= :startd AND t.created_at <= :endd"
-        )
-        wl_rows = self.session.execute(
-            q_wl, {"acct": account_id, "startd": start_date, "endd": end_date}
-        ).fetchall()
-        worklogs = [
-            WorklogDTO(
-                worklog_id=r[0],
-                sf_worklog_id=r[1],
-                created_by_name=r[2],
-                type_worklog=r[3],
-                created_at=r[4],
-                ticket_id=r[5],
-                description=r[6],
-                ticket_number=r[7],
-                worklog_number=r[8],
+        ).bindparams(bindparam("accts", expanding=True)),
+    }
+
+    @handle_database_error
+    def fetch_ticket_rows(self, kind: str, account_ids: List[int], start_date: datetime, end_date: datetime) -> List[RowMapping]:
+        """Filas de `kind` de las cuentas en el rango, siempre desde MySQL."""
+        return self.session.execute(
+            self._TICKET_ROW_QUERIES[kind],
+            {"accts": list(account_ids), "startd": start_date, "endd": end_date},
+        ).mappings().all()
+
+    @handle_database_error
+    def fetch_ticket_rows_by_account(
+        self,
+        kind: str,
+        account_ids: List[int],
+        start_date: datetime,
+        end_date: datetime,
+    ) -> Dict[int, List[RowMapping]]:
+        """fetch_ticket_rows repartido por cuenta; una fila puede quedar en dos cuentas."""
+        requested = set(account_ids)
+        by_account: Dict[int, List[RowMapping]] = {account_id: [] for account_id in account_ids}
+        for r in self.fetch_ticket_rows(kind, account_ids, start_date, end_date):
+            for account_id in _row_accounts(r, requested):
+                by_account[account_id].append(r)
+        return by_account
+
+    def _ticket_rows(
+        self,
+        kind: str,
+        account_ids: List[int],
+        start_date: datetime,
+        end_date: datetime,
+    ) -> Iterator[Tuple[Set[int], Mapping[str, Any]]]:
+        """
+        (cuentas pedidas de la fila, fila). Los meses cerrados con snapshot se
+        leen del disco, archivo por cuenta; el resto del rango (el mes en curso,
+        meses aun sin snapshot o uno cuya version desaparecio mientras se
+        leia) se consulta en MySQL en tramos contiguos.
+        """
+        requested = set(account_ids)
+        db_ranges: List[List[datetime]] = []
+        open_month = month_start(datetime.now())
+        for month, seg_start, seg_end in month_segments(start_date, end_date):
+            snapshot = self.snapshots.open_month(month) if self.snapshots is not None and month < open_month else None
+            if snapshot is not None:
+                try:
+                    # El mes completo antes de entregar nada: si falla, se lee todo de MySQL.
+                    month_rows = [
+                        ({account_id}, r)
+                        for account_id in account_ids
+                        for r in snapshot.read(account_id, kind, seg_start, seg_end)
+                    ]
+                except SnapshotUnavailableError as e:
+                    log(f"Ticket snapshots: {e}; se lee de MySQL")
+                else:
+                    yield from month_rows
+                    continue
+            if db_ranges and db_ranges[-1][1] >= seg_start - timedelta(seconds=1):
+                db_ranges[-1][1] = seg_end
+            else:
+                db_ranges.append([seg_start, seg_end])
+        for seg_start, seg_end in db_ranges:
+            for r in self.fetch_ticket_rows(kind, account_ids, seg_start, seg_end):
+                yield _row_accounts(r, requested), r
+
+    @handle_database_error
+    def get_customers_info(
+        self,
+        sf_account_ids: List[str],
+        start_date: datetime,
+        end_date: datetime,
+    ) -> Dict[str, CustomerDTO]:
+        """
+        Version por lotes de get_customer_info: las mismas consultas con IN (...)
+        en lugar de una ronda de consultas por cuenta. Cada fila de tickets se
+        asigna a las cuentas pedidas que coinciden con a.account_id o
+        tacc.accounts_id, igual que el filtro de la consulta individual.
+        Los meses cerrados salen del TicketSnapshotStore si esta configurado.
+        """
+        if not sf_account_ids:
+            return {}
+        q_acc = text(
+            "SELECT a.account_id, a.sf_account_id, a.name, "
+            "       a.sccd_id, COALESCE(a.sf_category, a.category) AS category, "
+            "       c.name AS country_name "
+            "FROM   csctoolmaster.app_accounts a "
+            "LEFT   JOIN csctoolmaster.app_countries c ON c.country_id = a.country_id "
+            "WHERE  a.sf_account_id IN :sfids"
+        ).bindparams(bindparam("sfids", expanding=True))
+        accounts: Dict[int, tuple] = {}
+        seen_sfids: Set[str] = set()
+        for row in self.session.execute(q_acc, {"sfids": list(sf_account_ids)}).fetchall():
+            # Una fila por sf_account_id, como el LIMIT 1 de la consulta individual.
+            if row[1] in seen_sfids:
+                continue
+            seen_sfids.add(row[1])
+            accounts[row[0]] = tuple(row)
+        if not accounts:
+            return {}
+        acct_ids = list(accounts)
+        by_acct = {"accts": acct_ids}
+
+        q_assets = text(
+            "SELECT asset_id, sf_asset_id, circuit_id, product_family, product_category, "
+            "       product_name, status, location, account_id "
+            "FROM   csctoolmaster.app_assets "
+            "WHERE  account_id IN :accts"
+        ).bindparams(bindparam("accts", expanding=True))
+        assets: Dict[int, List[AssetDTO]] = {a: [] for a in acct_ids}
+        for r in self.session.execute(q_assets, by_acct).fetchall():
+            assets[r[8]].append(
+                AssetDTO(
+                    asset_id=r[0],
+                    sf_asset_id=r[1],
+                    circuit_id=r[2],
+                    product_family=r[3],
+                    product_category=r[4],
+                    product_name=r[5],
+                    status=r[6],
+                    location=r[7],
+                )
             )
-            for r in wl_rows
-            if r[0]
-        ]
-        return CustomerDTO(
-            account_id=account_id,
-            sf_account_id=sfid,
-            name=name,
-            sccd_id=sccd_id,
-            country=country_name,
-            category=category,
-            assets=assets,
-            contacts=contacts,
-            incidents=list(inc_map.values()),
-            service_requests=list(sr_map.values()),
-            changes=list(ch_map.values()),
-            worklogs=worklogs,
-        )
\ No newline at end of file
+
+        q_contacts = text(
+            "SELECT contact_id, sf_contact_id, name, contact_type, email, phone, mobile_phone, "
+            "       account_id "
+            "FROM   csctoolmaster.app_contact "
+            "WHERE  account_id IN :accts"
+        ).bindparams(bindparam("accts", expanding=True))
+        contacts: Dict[int, List[ContactDTO]] = {a: [] for a in acct_ids}
+        for r in self.session.execute(q_contacts, by_acct).fetchall():
+            contacts[r[7]].append(
+                ContactDTO(
+                    contact_id=r[0],
+                    sf_contact_id=r[1],
+                    name=r[2],
+                    contact_type=r[3],
+                    email=r[4],
+                    phone=r[5],
+                    account_id=r[7],
+                )
+            )
+
+        inc_maps: Dict[int, Dict[int, IncidentDTO]] = {a: {} for a in acct_ids}
+        for row_accounts, r in self._ticket_rows("incidents", acct_ids, start_date, end_date):
+            iid = r["incident_id"]
+            if not iid:
+                continue
+            for acct in row_accounts:
+                inc_map = inc_maps[acct]
+                if iid not in inc_map:
+                    inc_map[iid] = IncidentDTO(
+                        incident_id=r["incident_id"],
+                        ticket_id=r["ticket_id"],
+                        sf_incident_id=r["sf_incident_id"],
+                        incident_number=r["incident_number"],
+                        subject=r["subject"],
+                        source_incident=r["source_incident"],
+                        reported_at=r["reported_at"],
+                        affected_at=r["affected_at"],
+                        resolution_at=r["resolution_at"],
+                        status=r["status"],
+                        priority=r["priority"],
+                        created_at=r["incident_created"],
+                        updated_at=r["incident_updated"],
+                        start_at_dw=r["start_at_dw"],
+                        end_at_dw=r["end_at_dw"],
+                        downtime=r["downtime"],
+                        is_major=r["inc_is_major"],
+                        symptom=r["symptom"],
+                        cause=r["cause"],
+                        resolution_summary=r["resolution_summary"],
+                        description=r["description"],
+                        attributed_to=r["attributed_to"],
+                        reason=r["reason"],
+                        type_incident=r["type_incident"],
+                        stop_dw=r["stop_dw"],
+                        assets=[],
+                    )
+                if r["asset_id"]:
+                    inc_map[iid].assets.append(_ticket_asset(r))
+
+        sr_maps: Dict[int, Dict[int, ServiceRequestDTO]] = {a: {} for a in acct_ids}
+        for row_accounts, r in self._ticket_rows("service_requests", acct_ids, start_date, end_date):
+            sid = r["sr_id"]
+            if not sid:
+                continue
+            for acct in row_accounts:
+                sr_map = sr_maps[acct]
+                if sid not in sr_map:
+                    sr_map[sid] = ServiceRequestDTO(
+                        sr_id=r["sr_id"],
+                        ticket_id=r["ticket_id"],
+                        sf_sr_id=r["sf_sr_id"],
+                        sr_number=r["sr_number"],
+                        status=r["status"],
+                        sr_type=r["sr_type"],
+                        source=r["source"],
+                        symptom=r["symptom"],
+                        solution=r["solution"],
+                        created_at=r["sr_created"],
+                        updated_at=r["sr_updated"],
+                        resolved_at=r["resolved_at"],
+                        closed_at=r["closed_at"],
+                        sr_category=r["sr_category"],
+                        sr_type_actions=r["sr_type_actions"],
+                        priority=r["priority"],
+                        asset=None,
+                        asset_location=None,
+                        asset_type=None,
+                        assets=[],
+                    )
+                if r["asset_id"]:
+                    sr_map[sid].asset = r["circuit_id"]
+                    sr_map[sid].asset_location = r["location"]
+                    sr_map[sid].asset_type = r["product_category"]
+                    sr_map[sid].assets.append(_ticket_asset(r))
+
+        ch_maps: Dict[int, Dict[int, ChangeDTO]] = {a: {} for a in acct_ids}
+        for row_accounts, r in self._ticket_rows("changes", acct_ids, start_date, end_date):
+            cid = r["change_id"]
+            if not cid:
+                continue
+            for acct in row_accounts:
+                ch_map = ch_maps[acct]
+                if cid not in ch_map:
+                    ch_map[cid] = ChangeDTO(
+                        change_id=r["change_id"],
+                        ticket_id=r["ticket_id"],
+                        sf_change_id=r["sf_change_id"],
+                        change_number=r["change_number"],
+                        status=r["status"],
+                        type_change=r["type_change"],
+                        description=r["description"],
+                        created_at=r["chg_created"],
+                        updated_at=r["chg_updated"],
+                        result=r["result"],
+                        type_of_action=r["type_of_action"],
+                        bussines_reason=r["bussines_reason"],
+                        urgency=r["urgency"],
+                        impact=r["impact"],
+                        subject=r["subject"],
+                        risk_level=r["risk_level"],
+                        failure_probability=r["failure_probability"],
+                        change_downtime=r["change_downtime"],
+                        start_at_activity=r["start_at_activity"],
+                        end_at_activity=r["end_at_activity"],
+                        priority=(r["urgency"] or r["impact"]),
+                        asset=None,
+                        asset_location=None,
+                        asset_type=None,
+                        assets=[],
+                    )
+                if r["asset_id"]:
+                    ch_map[cid].asset = r["circuit_id"]
+                    ch_map[cid].asset_location = r["location"]
+                    ch_map[cid].asset_type = r["product_category"]
+                    ch_map[cid].assets.append(_ticket_asset(r))
+
+        worklogs: Dict[int, List[WorklogDTO]] = {a: [] for a in acct_ids}
+        for row_accounts, r in self._ticket_rows("worklogs", acct_ids, start_date, end_date):
+            if not r["worklog_id"]:
+                continue
+            for acct in row_accounts:
+                worklogs[acct].append(
+                    WorklogDTO(
+                        worklog_id=r["worklog_id"],
+                        sf_worklog_id=r["sf_worklog_id"],
+                        created_by_name=r["created_by_name"],
+                        type_worklog=r["type_worklog"],
+                        created_at=r["created_at"],
+                        ticket_id=r["ticket_id"],
+                        description=r["description"],
+                        ticket_number=r["ticket_number"],
+                        worklog_number=r["worklog_number"],
+                    )
+                )
+
+        customers: Dict[str, CustomerDTO] = {}
+        for account_id, (_, sfid, name, sccd_id, category, country_name) in accounts.items():
+            customers[sfid] = CustomerDTO(
+                account_id=account_id,
+                sf_account_id=sfid,
+                name=name,
+                sccd_id=sccd_id,
+                country=country_name,
+                category=category,
+                assets=assets[account_id],
+                contacts=contacts[account_id],
+                incidents=list(inc_maps[account_id].values()),
+                service_requests=list(sr_maps[account_id].values()),
+                changes=list(ch_maps[account_id].values()),
+                worklogs=worklogs[account_id],
+            )
+        return customers
+
+    @handle_database_error
+    def get_customer_data_version(self, sf_account_id: str, start_date: datetime, end_date: datetime) -> Optional[str]:
+        """
+        Huella barata de los datos que usa get_customer_info: conteos, max(updated_at)
+        y checksums de la cuenta, sus assets/contactos y los tickets del rango.
+        Cambia cuando cambia cualquier dato que termina en un reporte.
+        """
+        q_acc = text(
+            "SELECT a.account_id, "
+            "       CRC32(CONCAT_WS('|', a.name, a.sccd_id, a.sf_category, a.category, c.name)) "
+            "FROM   csctoolmaster.app_accounts a "
+            "LEFT   JOIN csctoolmaster.app_countries c ON c.country_id = a.country_id "
+            "WHERE  a.sf_account_id = :sfid "
+            "LIMIT  1"
+        )
+        acc_row = self.session.execute(q_acc, {"sfid": sf_account_id}).fetchone()
+        if not acc_row:
+            return None
+        account_id = acc_row[0]
+
+        q_assets = text(
+            "SELECT COUNT(*), SUM(CRC32(CONCAT_WS('|', asset_id, sf_asset_id, circuit_id, product_family, "
+            "       product_category, product_name, status, location))) "
+            "FROM   csctoolmaster.app_assets "
+            "WHERE  account_id = :acct"
+        )
+        q_contacts = text(
+            "SELECT COUNT(*), SUM(CRC32(CONCAT_WS('|', contact_id, sf_contact_id, name, contact_type, "
+            "       email, phone, mobile_phone))) "
+            "FROM   csctoolmaster.app_contact "
+            "WHERE  account_id = :acct"
+        )
+        # Tickets de la cuenta en el rango (por cuenta o por alguno de sus assets),
+        # calculados una vez; cada tabla de tickets se resume aparte contra ese
+        # conjunto, sin el producto de joins de la consulta completa.
+        q_tickets = text(
+            "WITH scope AS ( "
+            "  SELECT t.ticket_id FROM csctoolmaster.app_ticket t "
+            "  JOIN   csctoolmaster.app_ticket_accounts tacc ON t.ticket_id = tacc.ticket_id "
+            "  WHERE  tacc.accounts_id = :acct AND t.created_at >= :startd AND t.created_at <= :endd "
+            "  UNION "
+            "  SELECT t.ticket_id FROM csctoolmaster.app_ticket t "
+            "  JOIN   csctoolmaster.app_ticket_assets ta ON t.ticket_id = ta.ticket_id "
+            "  JOIN   csctoolmaster.app_assets a ON ta.assets_id = a.asset_id "
+            "  WHERE  a.account_id = :acct AND t.created_at >= :startd AND t.created_at <= :endd "
+            ") "
+            "SELECT tk.n, ta.n, ta.crc, i.n, i.last, sr.n, sr.last, c.n, c.last, w.n, w.last_id, w.last "
+            "FROM   (SELECT COUNT(*) AS n FROM scope) tk, "
+            "       (SELECT COUNT(*) AS n, SUM(CRC32(CONCAT_WS('|', ticket_id, assets_id))) AS crc "
+            "        FROM csctoolmaster.app_ticket_assets WHERE ticket_id IN (SELECT ticket_id FROM scope)) ta, "
+            "       (SELECT COUNT(*) AS n, MAX(updated_at) AS last "
+            "        FROM csctoolmaster.app_incident WHERE ticket_id IN (SELECT ticket_id FROM scope)) i, "
+            "       (SELECT COUNT(*) AS n, MAX(updated_at) AS last "
+            "        FROM csctoolmaster.app_sr WHERE ticket_id IN (SELECT ticket_id FROM scope)) sr, "
+            "       (SELECT COUNT(*) AS n, MAX(updated_at) AS last "
+            "        FROM csctoolmaster.app_changes WHERE ticket_id IN (SELECT ticket_id FROM scope)) c, "
+            "       (SELECT COUNT(*) AS n, MAX(worklog_id) AS last_id, MAX(created_at) AS last "
+            "        FROM csctoolmaster.app_worklogs WHERE ticket_id IN (SELECT ticket_id FROM scope)) w"
+        )
+        params = {"acct": account_id, "startd": start_date, "endd": end_date}
+        parts = [tuple(acc_row)]
+        for query in (q_assets, q_contacts, q_tickets):
+            parts.append(tuple(self.session.execute(query, params).fetchone()))
+        return hashlib.sha256(repr(parts).encode()).hexdigest()
+
+    # Tickets de la cuenta en el rango: por sus activos o por app_ticket_accounts,
+    # el mismo criterio que get_customers_info.
+    _ACCOUNT_TICKETS = (
+        "t.created_at >= :startd AND t.created_at <= :endd "
+        "AND t.ticket_id IN ( "
+        "   SELECT ta.ticket_id "
+        "   FROM   csctoolmaster.app_ticket_assets ta "
+        "   JOIN   csctoolmaster.app_assets a ON a.asset_id = ta.assets_id "
+        "   WHERE  a.account_id = :acct "
+        "   UNION "
+        "   SELECT tacc.ticket_id "
+        "   FROM   csctoolmaster.app_ticket_accounts tacc "
+        "   WHERE  tacc.accounts_id = :acct "
+        ") "
+    )
+    _TICKET_CIRCUITS = (
+        "(SELECT GROUP_CONCAT(a.circuit_id) "
+        " FROM   csctoolmaster.app_ticket_assets ta "
+        " JOIN   csctoolmaster.app_assets a ON a.asset_id = ta.assets_id "
+        " WHERE  ta.ticket_id = t.ticket_id) AS circuit_ids "
+    )
+    _EXPORT_QUERIES = {
+        "incidents": text(
+            "SELECT i.incident_id, t.ticket_id, i.sf_incident_id, i.incident_number, i.subject, "
+            "       i.priority, i.source_incident, i.status, i.reported_at, i.affected_at, "
+            "       i.resolution_at, i.created_at, i.updated_at, i.start_at_dw, i.end_at_dw, "
+            "       i.downtime, i.stop_dw, i.is_major, i.symptom, i.cause, i.resolution_summary, "
+            "       i.description, i.attributed_to, i.reason, i.type_incident, "
+            + _TICKET_CIRCUITS +
+            "FROM   csctoolmaster.app_incident i "
+            "JOIN   csctoolmaster.app_ticket t ON t.ticket_id = i.ticket_id "
+            "WHERE  t.case_type_name = 'incident' AND " + _ACCOUNT_TICKETS +
+            "ORDER  BY t.created_at, i.incident_id"
+        ),
+        "service_requests": text(
+            "SELECT sr.sr_id, t.ticket_id, sr.sf_sr_id, sr.sr_number, sr.priority, sr.status, "
+            "       sr.sr_type, sr.source, sr.symptom, sr.resolution_summary AS solution, "
+            "       sr.created_at, sr.updated_at, sr.resolved_at, sr.closed_at, sr.sr_category, "
+            "       sr.sr_type_actions, "
+            + _TICKET_CIRCUITS +
+            "FROM   csctoolmaster.app_sr sr "
+            "JOIN   csctoolmaster.app_ticket t ON t.ticket_id = sr.ticket_id "
+            "WHERE  t.case_type_name IN ('request','service_request','sr') AND " + _ACCOUNT_TICKETS +
+            "ORDER  BY t.created_at, sr.sr_id"
+        ),
+        "changes": text(
+            "SELECT c.change_id, t.ticket_id, c.sf_change_id, c.change_number, c.subject, c.status, "
+            "       c.urgency, c.impact, c.type_change, c.description, c.risk_level, "
+            "       c.failure_probability, c.change_downtime, c.created_at, c.updated_at, "
+            "       c.start_at_activity, c.end_at_activity, c.bussines_reason, c.result, "
+            "       c.type_of_action, "
+            + _TICKET_CIRCUITS +
+            "FROM   csctoolmaster.app_changes c "
+            "JOIN   csctoolmaster.app_ticket t ON t.ticket_id = c.ticket_id "
+            "WHERE  t.case_type_name = 'Change_Request' AND " + _ACCOUNT_TICKETS +
+            "ORDER  BY t.created_at, c.change_id"
+        ),
+        "worklogs": text(
+            "SELECT w.worklog_id, w.ticket_id, w.sf_worklog_id, w.worklog_number, w.ticket_number, "
+            "       w.created_by_name, w.type_worklog, w.created_at, w.description "
+            "FROM   csctoolmaster.app_worklogs w "
+            "JOIN   csctoolmaster.app_ticket t ON t.ticket_id = w.ticket_id "
+            "WHERE  " + _ACCOUNT_TICKETS +
+            "ORDER  BY w.created_at, w.worklog_id"
+        ),
+        "assets": text(
+            "SELECT asset_id, sf_asset_id, circuit_id, product_family, product_category, "
+            "       product_name, status, location "
+            "FROM   csctoolmaster.app_assets "
+            "WHERE  account_id = :acct "
+            "ORDER  BY asset_id"
+        ),
+    }
+    EXPORT_DATASETS = tuple(_EXPORT_QUERIES)
+
+    @handle_database_error
+    def get_account_id(self, sf_account_id: str) -> Optional[int]:
+        q = text(
+            "SELECT account_id "
+            "FROM   csctoolmaster.app_accounts "
+            "WHERE  sf_account_id = :sfid "
+            "LIMIT  1"
+        )
+        row = self.session.execute(q, {"sfid": sf_account_id}).fetchone()
+        return row[0] if row else None
+
+    @handle_database_error
+    def iter_export_rows(
+        self,
+        dataset: str,
+        account_id: int,
+        start_date: datetime,
+        end_date: datetime,
+        batch_size: int = 5000,
+    ) -> Tuple[List[str], Iterator[List[tuple]]]:
+        """
+        Filas crudas de un dataset de exportacion, por lotes y con cursor del
+        lado del servidor (stream_results): la memoria no depende del total de
+        filas. Devuelve las columnas y el iterador de lotes; la sesion debe
+        seguir abierta mientras se consume.
+        """
+        result = self.session.execute(
+            self._EXPORT_QUERIES[dataset],
+            {"acct": account_id, "startd": start_date, "endd": end_date},
+            execution_options={"stream_results": True, "yield_per": batch_size},
+        )
+        return list(result.keys()), (list(batch) for batch in result.partitions(batch_size))
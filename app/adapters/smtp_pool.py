@@ -0,0 +1,261 @@
+import asyncio
+import os
+import re
+import smtplib
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from email.message import Message
+from typing import Callable, Deque, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from app.infrastructure.dto.mail_schema import OutgoingMail
+from app.utils.logger import log
+
+# Errores SMTP que dejan la conexion inservible (igual que un OSError); cualquier
+# otra respuesta de error del servidor (un destinatario rechazado, por ejemplo)
+# la devuelve al pool despues de un RSET.
+CONNECTION_ERRORS = (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError)
+
+RecipientReplies = Dict[str, Tuple[int, str]]
+BatchResult = Tuple[Optional[RecipientReplies], Optional[Exception]]
+
+
+def envelope_options(conn: smtplib.SMTP, from_addr: str, to_addrs: Sequence[str]) -> List[str]:
+    """
+    Opciones de MAIL FROM para el sobre: SMTPUTF8 si alguna direccion no es
+    ASCII y el relay lo anuncia; si no lo anuncia, SMTPNotSupportedError
+    antes de enviar nada, como send_message.
+    """
+    conn.ehlo_or_helo_if_needed()
+    if all(addr.isascii() for addr in (from_addr, *to_addrs)):
+        return []
+    if not conn.has_extn("smtputf8"):
+        raise smtplib.SMTPNotSupportedError(
+            "One or more source or delivery addresses require internationalized email support, "
+            "but the server does not advertise the required SMTPUTF8 capability"
+        )
+    return ["SMTPUTF8"]
+
+
+def sendmail_envelope(conn: smtplib.SMTP, from_addr: str, to_addrs: Sequence[str], payload: bytes) -> dict:
+    """conn.sendmail con las opciones de `envelope_options`; devuelve los destinatarios rechazados."""
+    return conn.sendmail(from_addr, list(to_addrs), payload, envelope_options(conn, from_addr, to_addrs))
+
+
+def pipelined_send(conn: smtplib.SMTP, mail: OutgoingMail) -> RecipientReplies:
+    """
+    Envia un mensaje con PIPELINING (RFC 2920) si el relay lo anuncia: MAIL,
+    todos los RCPT y DATA salen en una sola escritura y las respuestas se
+    leen despues, asi que un mensaje cuesta dos idas y vueltas en lugar de
+    3 + destinatarios. Devuelve la respuesta de cada destinatario y falla
+    como sendmail (SMTPSenderRefused, SMTPRecipientsRefused, SMTPDataError).
+    Direcciones no ASCII: ver `envelope_options`.
+    """
+    mail_options = envelope_options(conn, mail.from_addr, mail.to_addrs)
+    if not conn.has_extn("pipelining"):
+        refused = conn.sendmail(mail.from_addr, list(mail.to_addrs), mail.payload, mail_options)
+        return {
+            addr: (refused[addr][0], refused[addr][1].decode(errors="replace")) if addr in refused else (250, "OK")
+            for addr in mail.to_addrs
+        }
+    commands = [f"MAIL FROM:{smtplib.quoteaddr(mail.from_addr)}{''.join(' ' + o for o in mail_options)}"]
+    commands += [f"RCPT TO:{smtplib.quoteaddr(addr)}" for addr in mail.to_addrs]
+    commands.append("DATA")
+    conn.send("".join(f"{c}\r\n" for c in commands).encode("utf-8" if mail_options else "ascii"))
+    mail_code, mail_resp = conn.getreply()
+    replies = [(addr, conn.getreply()) for addr in mail.to_addrs]
+    data_code, data_resp = conn.getreply()
+    if data_code == 354 and (mail_code != 250 or all(code not in (250, 251) for _, (code, _) in replies)):
+        # No hay forma de abortar un DATA aceptado sin entregar algo: se corta la sesion.
+        conn.close()
+    if mail_code != 250:
+        raise smtplib.SMTPSenderRefused(mail_code, mail_resp, mail.from_addr)
+    refused = {addr: (code, resp) for addr, (code, resp) in replies if code not in (250, 251)}
+    if len(refused) == len(replies):
+        raise smtplib.SMTPRecipientsRefused(refused)
+    if data_code != 354:
+        raise smtplib.SMTPDataError(data_code, data_resp)
+    payload = re.sub(rb"(?m)^\.", b"..", mail.payload)
+    if not payload.endswith(b"\r\n"):
+        payload += b"\r\n"
+    conn.send(payload + b".\r\n")
+    code, resp = conn.getreply()
+    if code != 250:
+        raise smtplib.SMTPDataError(code, resp)
+    return {addr: (code, resp.decode(errors="replace")) for addr, (code, resp) in replies}
+
+
+class SmtpConnectionPool:
+    """
+    SMTP connections kept open per worker process and reused across messages.
+
+    At most `max_size` connections exist at once; callers beyond that wait
+    up to `timeout` seconds. An idle connection is checked with NOOP before
+    reuse if it sat longer than `check_after` seconds, and dropped once it
+    passes `idle_timeout` (relays close idle sessions on their own).
+    A message whose session is dropped by the server is retried once on
+    another connection.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int = 25,
+        max_size: int = 4,
+        timeout: float = 30,
+        idle_timeout: float = 60,
+        check_after: float = 5,
+    ):
+        self.host = host
+        self.port = port
+        self.max_size = max(1, max_size)
+        self.timeout = timeout
+        self.idle_timeout = idle_timeout
+        self.check_after = check_after
+        self._idle: Deque[Tuple[smtplib.SMTP, float]] = deque()
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(self.max_size)
+        self._pid = os.getpid()
+        self._async_slots: Optional[asyncio.Semaphore] = None
+        self.connects = 0
+        self.reuses = 0
+
+    def _connect(self) -> smtplib.SMTP:
+        conn = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        conn.ehlo_or_helo_if_needed()
+        self.connects += 1
+        return conn
+
+    @staticmethod
+    def _close(conn: smtplib.SMTP):
+        try:
+            conn.quit()
+        except Exception:
+            conn.close()
+
+    def _check_fork(self):
+        # A pool created before gunicorn forks must not share sockets with the parent.
+        if os.getpid() != self._pid:
+            self._pid = os.getpid()
+            self._idle.clear()
+            self._lock = threading.Lock()
+            self._slots = threading.BoundedSemaphore(self.max_size)
+
+    def _take_idle(self) -> Optional[smtplib.SMTP]:
+        now = time.monotonic()
+        while True:
+            with self._lock:
+                if not self._idle:
+                    return None
+                conn, since = self._idle.pop()
+            idle_for = now - since
+            if idle_for > self.idle_timeout:
+                self._close(conn)
+                continue
+            if idle_for > self.check_after:
+                try:
+                    if conn.noop()[0] != 250:
+                        raise smtplib.SMTPServerDisconnected("NOOP rechazado")
+                except OSError:
+                    conn.close()
+                    continue
+            return conn
+
+    @contextmanager
+    def connection(self) -> Iterator[smtplib.SMTP]:
+        """Conexion abierta y lista para enviar; vuelve al pool al salir si sigue sana."""
+        self._check_fork()
+        if not self._slots.acquire(timeout=self.timeout):
+            raise smtplib.SMTPConnectError(421, f"Pool SMTP agotado ({self.max_size} conexiones)")
+        conn = None
+        try:
+            conn = self._take_idle()
+            if conn is None:
+                conn = self._connect()
+            else:
+                self.reuses += 1
+            yield conn
+        except OSError as e:
+            # SMTPException hereda de OSError: un rechazo del servidor deja la sesion usable.
+            if conn is not None:
+                if isinstance(e, smtplib.SMTPException) and not isinstance(e, CONNECTION_ERRORS):
+                    try:
+                        conn.rset()
+                    except Exception:
+                        conn.close()
+                        conn = None
+                else:
+                    conn.close()
+                    conn = None
+            raise
+        finally:
+            if conn is not None and conn.sock is not None:
+                with self._lock:
+                    self._idle.append((conn, time.monotonic()))
+            self._slots.release()
+
+    def _with_retry(self, send: Callable[[smtplib.SMTP], dict]) -> dict:
+        try:
+            with self.connection() as conn:
+                return send(conn)
+        except smtplib.SMTPServerDisconnected as e:
+            # Tipicamente una conexion reusada que el relay cerro entre el NOOP y el envio.
+            log(f"SMTP pool: {self.host} cerro la conexion ({e}), reintentando con una nueva")
+        with self.connection() as conn:
+            return send(conn)
+
+    def send(self, msg: Message, from_addr: Optional[str] = None, to_addrs: Optional[Sequence[str]] = None) -> dict:
+        """send_message sobre una conexion del pool; devuelve los destinatarios rechazados."""
+        return self._with_retry(lambda conn: conn.send_message(msg, from_addr=from_addr, to_addrs=to_addrs))
+
+    def sendmail(self, from_addr: str, to_addrs: Sequence[str], payload: bytes) -> dict:
+        """Como `send`, con el sobre ya resuelto (ver OutgoingMail)."""
+        return self._with_retry(lambda conn: sendmail_envelope(conn, from_addr, to_addrs, payload))
+
+    def send_batch(self, mails: Sequence[OutgoingMail], max_reconnects: int = 2) -> List[BatchResult]:
+        """
+        Varios mensajes por una misma sesion (con pipelined_send). Un rechazo
+        afecta solo a su mensaje; si la sesion se cae se sigue en otra, y tras
+        `max_reconnects` caidas el resto queda con el error de conexion.
+        """
+        results: List[BatchResult] = [(None, None)] * len(mails)
+        i = 0
+        reconnects = 0
+        while i < len(mails):
+            try:
+                with self.connection() as conn:
+                    while i < len(mails):
+                        try:
+                            results[i] = (pipelined_send(conn, mails[i]), None)
+                            i += 1
+                        except smtplib.SMTPException as e:
+                            if isinstance(e, CONNECTION_ERRORS):
+                                raise
+                            results[i] = (None, e)
+                            i += 1
+                            if conn.sock is None:
+                                # pipelined_send corto la sesion tras un DATA sin destinatarios.
+                                break
+                            conn.rset()
+            except OSError as e:
+                reconnects += 1
+                if reconnects > max_reconnects:
+                    for j in range(i, len(mails)):
+                        results[j] = (None, e)
+                    break
+        return results
+
+    async def send_async(self, msg: Message, from_addr: Optional[str] = None, to_addrs: Optional[Sequence[str]] = None) -> dict:
+        """Version asyncio de `send`: el dialogo SMTP corre en un hilo, sin bloquear el event loop."""
+        if self._async_slots is None:
+            self._async_slots = asyncio.Semaphore(self.max_size)
+        async with self._async_slots:
+            return await asyncio.to_thread(self.send, msg, from_addr, to_addrs)
+
+    def close(self):
+        with self._lock:
+            idle: List[smtplib.SMTP] = [conn for conn, _ in self._idle]
+            self._idle.clear()
+        for conn in idle:
+            self._close(conn)
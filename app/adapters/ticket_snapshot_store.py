@@ -0,0 +1,228 @@
+import json
+import os
+import shutil
+import tempfile
+import uuid
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Set, Tuple
+
+from app.conf.config import get_app_settings
+from app.utils.logger import log
+
+SNAPSHOT_KINDS = ("incidents", "service_requests", "changes", "worklogs")
+MONTH_FORMAT = "%Y-%m"
+TICKET_CREATED = "ticket_created"
+
+
+def month_start(value: datetime) -> datetime:
+    return value.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def next_month(month: datetime) -> datetime:
+    return (month + timedelta(days=32)).replace(day=1)
+
+
+def month_segments(start_date: datetime, end_date: datetime) -> Iterator[Tuple[datetime, datetime, datetime]]:
+    """Parte [start_date, end_date] en tramos por mes calendario: (mes, inicio, fin) con fin inclusivo."""
+    month = month_start(start_date)
+    while month <= end_date:
+        following = next_month(month)
+        yield month, max(start_date, month), min(end_date, following - timedelta(microseconds=1))
+        month = following
+
+
+class SnapshotUnavailableError(Exception):
+    """La version del mes que se estaba leyendo ya no esta en disco (el caller vuelve a MySQL)."""
+
+
+def _timestamp(value):
+    # SQLite (stand-in local) devuelve las fechas como texto.
+    return datetime.fromisoformat(value) if isinstance(value, str) else value
+
+
+class SnapshotMonthWriter:
+    """Escribe una version nueva de un mes en su propio directorio; `commit` la publica de una vez."""
+
+    def __init__(self, store: "TicketSnapshotStore", month: datetime):
+        import pyarrow as pa
+
+        self._pa = pa
+        self.store = store
+        self.month = month
+        self.rows = {kind: 0 for kind in SNAPSHOT_KINDS}
+        self.accounts = set()
+        self.path = tempfile.mkdtemp(dir=store.root, prefix=store.version_prefix(month))
+
+    def write(self, account_id: int, kind: str, rows: List[Mapping[str, Any]]):
+        """Filas de get_customers_info (una por ticket x activo) de una cuenta; sin filas no hay archivo."""
+        if not rows:
+            return
+        records = [dict(r) for r in rows]
+        for record in records:
+            record[TICKET_CREATED] = _timestamp(record[TICKET_CREATED])
+        table = self._pa.Table.from_pylist(records)
+        account_dir = os.path.join(self.path, str(account_id))
+        os.makedirs(account_dir, exist_ok=True)
+        # Arrow IPC sin comprimir: se lee con memory map y sin copias.
+        with self._pa.OSFile(os.path.join(account_dir, f"{kind}.arrow"), "wb") as sink:
+            with self._pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        self.rows[kind] += len(records)
+        self.accounts.add(account_id)
+
+    def commit(self):
+        with open(os.path.join(self.path, "manifest.json"), "w") as f:
+            json.dump({
+                "month": f"{self.month:{MONTH_FORMAT}}",
+                "generated_at": datetime.now().isoformat(timespec="seconds"),
+                "accounts": len(self.accounts),
+                "rows": self.rows,
+            }, f)
+        self.store.publish(self.month, os.path.basename(self.path))
+
+    def abort(self):
+        shutil.rmtree(self.path, ignore_errors=True)
+
+
+class SnapshotMonth:
+    """Una version publicada de un mes; todas las lecturas de un reporte van contra la misma."""
+
+    def __init__(self, path: str, month: datetime):
+        self.path = path
+        self.month = month
+
+    def read(self, account_id: int, kind: str, start_date: datetime, end_date: datetime) -> List[Dict[str, Any]]:
+        """Filas de la cuenta con el ticket creado en [start_date, end_date] (dentro del mes)."""
+        import pyarrow as pa
+        import pyarrow.compute as pc
+
+        path = os.path.join(self.path, str(account_id), f"{kind}.arrow")
+        try:
+            source = pa.memory_map(path, "r")
+        except FileNotFoundError:
+            if not os.path.exists(os.path.join(self.path, "manifest.json")):
+                raise SnapshotUnavailableError(f"{self.month:{MONTH_FORMAT}}: la version {self.path} ya no existe")
+            return []  # la cuenta no tuvo tickets de este tipo en el mes
+        with source:
+            table = pa.ipc.open_file(source).read_all()
+            if start_date > self.month or end_date < next_month(self.month) - timedelta(microseconds=1):
+                created = table.column(TICKET_CREATED)
+                mask = pc.and_(
+                    pc.greater_equal(created, pa.scalar(start_date, type=created.type)),
+                    pc.less_equal(created, pa.scalar(end_date, type=created.type)),
+                )
+                table = table.filter(mask)
+            # Se materializa antes de cerrar el mapa: la tabla apunta a sus paginas.
+            return table.to_pylist()
+
+
+class TicketSnapshotStore:
+    """
+    Fotos de los meses cerrados en disco, para que get_customers_info no
+    vuelva a unir app_ticket, app_incident, app_sr, app_changes, app_assets y
+    app_accounts en MySQL por meses que ya no cambian.
+
+    <root>/.<YYYY-MM>-<id>/<account_id>/<tipo>.arrow guarda, en Arrow IPC,
+    las mismas filas que devuelven las consultas de get_customers_info para
+    esa cuenta y mes. <root>/<YYYY-MM> es un symlink a la version publicada:
+    el job escribe una version nueva y cambia el symlink con un rename, asi
+    que un lector ve el mes viejo o el nuevo completo, nunca un hueco. La
+    version anterior se borra recien en la publicacion siguiente, para no
+    quitarsela a un reporte que la este leyendo. Un mes existe solo si su
+    version tiene manifest.json; las cuentas sin archivo no tuvieron tickets
+    ese mes. Las lecturas usan memory map y filtran por fecha de creacion del
+    ticket en Arrow, sin pasar fila a fila por Python.
+    """
+
+    def __init__(self, root: str):
+        import pyarrow  # noqa: F401  (falla al configurar, no en cada lectura)
+
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def month_path(self, month: datetime) -> str:
+        return os.path.join(self.root, f"{month:{MONTH_FORMAT}}")
+
+    @staticmethod
+    def version_prefix(month: datetime) -> str:
+        return f".{month:{MONTH_FORMAT}}-"
+
+    def open_month(self, month: datetime) -> Optional[SnapshotMonth]:
+        """Version publicada del mes, resuelta una vez; None si el mes no tiene snapshot."""
+        path = self.month_path(month)
+        try:
+            path = os.path.join(self.root, os.readlink(path))
+        except FileNotFoundError:
+            return None
+        except OSError:
+            pass  # directorio real, del formato anterior al symlink
+        if not os.path.exists(os.path.join(path, "manifest.json")):
+            return None
+        return SnapshotMonth(path, month)
+
+    def has_month(self, month: datetime) -> bool:
+        return self.open_month(month) is not None
+
+    def publish(self, month: datetime, version: str):
+        """Apunta el mes a `version` (un directorio de root) con un rename atomico del symlink."""
+        target = self.month_path(month)
+        keep = {version}
+        if os.path.islink(target):
+            keep.add(os.readlink(target))
+        elif os.path.isdir(target):
+            # Formato anterior: el mes era un directorio real; pasa a ser una version mas.
+            legacy = tempfile.mkdtemp(dir=self.root, prefix=self.version_prefix(month))
+            os.replace(target, legacy)
+            keep.add(os.path.basename(legacy))
+        link = os.path.join(self.root, f".link-{uuid.uuid4().hex}")
+        os.symlink(version, link)
+        os.replace(link, target)
+        self._remove_versions(month, keep)
+
+    def _remove_versions(self, month: datetime, keep: Set[str]):
+        # Versiones mas viejas que la anterior y restos de jobs interrumpidos.
+        prefix = self.version_prefix(month)
+        for name in os.listdir(self.root):
+            if name.startswith(prefix) and name not in keep:
+                shutil.rmtree(os.path.join(self.root, name), ignore_errors=True)
+
+    def months(self) -> List[datetime]:
+        found = []
+        for name in os.listdir(self.root):
+            try:
+                month = datetime.strptime(name, MONTH_FORMAT)
+            except ValueError:
+                continue
+            if self.has_month(month):
+                found.append(month)
+        return sorted(found)
+
+    def begin_month(self, month: datetime) -> SnapshotMonthWriter:
+        return SnapshotMonthWriter(self, month)
+
+    def drop_before(self, month: datetime) -> int:
+        dropped = 0
+        for existing in self.months():
+            if existing < month:
+                path = self.month_path(existing)
+                if os.path.islink(path):
+                    os.remove(path)
+                else:
+                    shutil.rmtree(path, ignore_errors=True)
+                self._remove_versions(existing, set())
+                dropped += 1
+        return dropped
+
+
+@lru_cache
+def configured_snapshot_store() -> Optional[TicketSnapshotStore]:
+    """Store de TICKET_SNAPSHOT_DIR; None si no esta configurado o falta pyarrow."""
+    root = get_app_settings().ticket_snapshot_dir
+    if not root:
+        return None
+    try:
+        return TicketSnapshotStore(root)
+    except ImportError:
+        log("Ticket snapshots: falta pyarrow, los meses cerrados se leen de MySQL")
+        return None
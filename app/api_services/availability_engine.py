@@ -0,0 +1,202 @@
+# app/api_services/availability_engine.py
+
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+NS_PER_MINUTE = 60 * 10 ** 9
+
+
+def incident_windows(df: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Ventana de caida de cada fila en ns (int64, NaT -> sin ventana): start_at_dw /
+    end_at_dw; sin fin se usa start + downtime y sin inicio created_at + downtime.
+    """
+    downtime = pd.to_timedelta(df["downtime"].to_numpy(dtype=float), unit="m")
+    start = pd.to_datetime(df["start_at_dw"])
+    end = pd.to_datetime(df["end_at_dw"])
+    has_downtime = df["downtime"].to_numpy(dtype=float) > 0
+    start = start.where(start.notna() | ~has_downtime, pd.to_datetime(df["created_at"]))
+    end = end.where(end.notna() | ~has_downtime, start + downtime)
+    return (
+        start.to_numpy(dtype="datetime64[ns]").astype(np.int64),
+        end.to_numpy(dtype="datetime64[ns]").astype(np.int64),
+    )
+
+
+def merge_intervals(keys: np.ndarray, starts: np.ndarray, ends: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Une los intervalos que se solapan (o se tocan) dentro de cada llave con un
+    barrido ordenado: un intervalo abre segmento nuevo si empieza despues del
+    maximo fin acumulado de los anteriores de su llave.
+    """
+    if not len(keys):
+        return keys, starts, ends
+    order = np.lexsort((starts, keys))
+    keys, starts, ends = keys[order], starts[order], ends[order]
+    reach = pd.Series(ends).groupby(keys).cummax().to_numpy()
+    opens = np.ones(len(keys), dtype=bool)
+    opens[1:] = (keys[1:] != keys[:-1]) | (starts[1:] > reach[:-1])
+    first = np.flatnonzero(opens)
+    return keys[first], starts[first], np.maximum.reduceat(ends, first)
+
+
+def _month_floor(ns: np.ndarray) -> np.ndarray:
+    return ns.astype("datetime64[ns]").astype("datetime64[M]")
+
+
+def split_by_month(keys: np.ndarray, starts: np.ndarray, ends: np.ndarray) -> pd.DataFrame:
+    """Parte cada intervalo [start, end) en los meses calendario que cruza: llave, mes y minutos."""
+    first = _month_floor(starts)
+    last = _month_floor(ends - 1)
+    spans = (last - first).astype(np.int64) + 1
+    idx = np.repeat(np.arange(len(keys)), spans)
+    offset = np.arange(len(idx)) - np.repeat(np.cumsum(spans) - spans, spans)
+    month = first[idx] + offset.astype("timedelta64[M]")
+    month_start = month.astype("datetime64[ns]").astype(np.int64)
+    month_end = (month + 1).astype("datetime64[ns]").astype(np.int64)
+    minutes = (np.minimum(ends[idx], month_end) - np.maximum(starts[idx], month_start)) / NS_PER_MINUTE
+    return pd.DataFrame({"key": keys[idx], "month": month, "minutes": minutes})
+
+
+def _month_start(ns: int, months_after: int = 0) -> int:
+    month = np.datetime64(int(ns), "ns").astype("datetime64[M]") + months_after
+    return int(month.astype("datetime64[ns]").astype(np.int64))
+
+
+def _join_per_group(codes: np.ndarray, values: np.ndarray, groups: int) -> List[str]:
+    """
+    Une los valores de cada grupo en el orden original; un incidente con
+    varios activos del mismo grupo aparece una sola vez.
+    """
+    order = np.argsort(codes, kind="stable")
+    bounds = np.cumsum(np.bincount(codes, minlength=groups))[:-1]
+    return [", ".join(dict.fromkeys(chunk)) for chunk in np.split(values[order], bounds)]
+
+
+def _bound(value: Optional[datetime], inclusive: bool = False) -> Optional[int]:
+    if value is None:
+        return None
+    ns = int(np.datetime64(value.replace(tzinfo=None), "ns").astype(np.int64))
+    # end_date llega como 23:59:59: el periodo incluye ese ultimo segundo completo.
+    return ns - ns % 10 ** 9 + 10 ** 9 if inclusive else ns
+
+
+class AvailabilityEngine:
+    """
+    Minutos de caida reales por circuito a partir de las ventanas start_at_dw /
+    end_at_dw: los solapes de un mismo circuito cuentan una sola vez, las
+    ventanas se recortan al periodo del reporte y se reparten entre los meses
+    que cruzan, y la disponibilidad se calcula sobre los minutos exactos de
+    cada mes (o del tramo del mes que cae dentro del periodo).
+
+    `frame` es ReportDataset.availability_frame: una fila por (incidente, activo).
+    Las filas sin circuito no se unen entre si, porque no se sabe si
+    comparten servicio.
+
+    Diferencias con la tabla anterior (todo al mes de created_at):
+    - case_related lista cada incidente una vez por grupo y mes, aunque
+      tenga varios activos con el mismo circuito/servicio/direccion.
+    - Un incidente con ventana aparece en cada mes que cruza; uno sin
+      ventana (sin downtime) sigue en el mes de su created_at, con 0 minutos.
+    """
+
+    def __init__(
+        self,
+        frame: pd.DataFrame,
+        keys: List[str],
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+    ):
+        self.frame = frame
+        self.keys = keys
+        self.lo = _bound(start_date)
+        self.hi = _bound(end_date, inclusive=True)
+
+    def by_month(self) -> pd.DataFrame:
+        """Una fila por (mes, grupo de `keys`) con downtime (min), period_minutes y case_related."""
+        return self._aggregate(monthly=True)
+
+    def total(self) -> pd.DataFrame:
+        """Una fila por grupo de `keys` con los minutos de todo el periodo."""
+        return self._aggregate(monthly=False)
+
+    def _aggregate(self, monthly: bool) -> pd.DataFrame:
+        df = self.frame
+        groups = df.groupby(self.keys, dropna=False, sort=True)
+        group_keys = groups.size().reset_index()[self.keys]
+        display = groups.ngroup().to_numpy()
+
+        starts, ends = incident_windows(df)
+        has_window = (starts != np.iinfo(np.int64).min) & (ends != np.iinfo(np.int64).min)
+        if self.lo is not None:
+            starts = np.where(has_window, np.maximum(starts, self.lo), starts)
+        if self.hi is not None:
+            ends = np.where(has_window, np.minimum(ends, self.hi), ends)
+        has_window &= ends > starts
+
+        # Llave de union: el grupo del circuito, o una propia por fila si no hay circuito.
+        merge_key = np.where(
+            df["circuit_id"].notna().to_numpy(),
+            display,
+            len(group_keys) + np.arange(len(df)),
+        )
+        display_of_key = np.concatenate([np.arange(len(group_keys)), display])
+        m_keys, m_starts, m_ends = merge_intervals(merge_key[has_window], starts[has_window], ends[has_window])
+
+        # Meses de cada caso: los de su ventana o, sin ventana, el de creacion.
+        created = pd.to_datetime(df["created_at"]).to_numpy(dtype="datetime64[ns]").astype(np.int64)
+        no_window = ~has_window & (created != np.iinfo(np.int64).min)
+        if self.lo is not None:
+            no_window &= created >= self.lo
+        if self.hi is not None:
+            no_window &= created < self.hi
+        rows = np.concatenate([np.flatnonzero(has_window), np.flatnonzero(no_window)])
+        case_starts = np.concatenate([starts[has_window], created[no_window]])
+        case_ends = np.concatenate([ends[has_window], created[no_window] + 1])
+        cases = split_by_month(rows, case_starts, case_ends) if monthly else pd.DataFrame({"key": rows})
+        cases = cases.assign(group=display[cases["key"].to_numpy()])
+        cases = cases.sort_values("key", kind="stable")
+
+        parts = split_by_month(m_keys, m_starts, m_ends) if monthly else pd.DataFrame(
+            {"key": m_keys, "minutes": (m_ends - m_starts) / NS_PER_MINUTE}
+        )
+        parts = parts.assign(group=display_of_key[parts["key"].to_numpy()])
+
+        by = ["month", "group"] if monthly else ["group"]
+        case_groups = cases.groupby(by, sort=True)
+        out = case_groups.size().reset_index()[by]
+        out["case_related"] = _join_per_group(
+            case_groups.ngroup().to_numpy(),
+            df["incident_number"].to_numpy(dtype=object)[cases["key"].to_numpy()],
+            len(out),
+        )
+        minutes = parts.groupby(by)["minutes"].sum()
+        out = out.merge(minutes.reset_index(), on=by, how="left")
+        out["downtime"] = out["minutes"].fillna(0).round(2)
+        out["period_minutes"] = self._period_minutes(out["month"].to_numpy() if monthly else None, m_starts, m_ends)
+        out = pd.concat([out.reset_index(drop=True), group_keys.iloc[out["group"].to_numpy()].reset_index(drop=True)], axis=1)
+        if monthly:
+            out["year"] = out["month"].dt.year
+            out["month"] = out["month"].dt.month
+        return out.drop(columns=["minutes", "group"])
+
+    def _period_minutes(self, months: Optional[np.ndarray], m_starts: np.ndarray, m_ends: np.ndarray):
+        """Minutos de cada mes calendario (o del periodo completo) recortados a [start_date, end_date]."""
+        if months is None:
+            # Sin periodo explicito: los meses completos que tocan las ventanas.
+            lo, hi = self.lo, self.hi
+            if lo is None:
+                lo = _month_start(m_starts.min()) if len(m_starts) else 0
+            if hi is None:
+                hi = _month_start(m_ends.max() - 1, 1) if len(m_ends) else 0
+            return max(hi - lo, 0) / NS_PER_MINUTE
+        lo = months.astype("datetime64[M]").astype("datetime64[ns]").astype(np.int64)
+        hi = (months.astype("datetime64[M]") + 1).astype("datetime64[ns]").astype(np.int64)
+        if self.lo is not None:
+            lo = np.maximum(lo, self.lo)
+        if self.hi is not None:
+            hi = np.minimum(hi, self.hi)
+        return np.maximum(hi - lo, 0) / NS_PER_MINUTE
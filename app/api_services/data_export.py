@@ -0,0 +1,205 @@
+# app/api_services/data_export.py
+
+import csv
+import io
+import json
+import zlib
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Iterator, List, NamedTuple
+
+from app.adapters.db import TM_SM_FACTORY
+from app.adapters.repositories.toolmaster_repository import ToolmasterRepository
+from app.utils.errors import AppError, ErrorType
+from app.utils.logger import log
+from app.utils.spooled_output import ChunkSink
+
+EXPORT_DATASETS = ToolmasterRepository.EXPORT_DATASETS
+
+# Tipos de las columnas que no son texto, para el esquema Parquet.
+INT_COLUMNS = {"incident_id", "sr_id", "change_id", "worklog_id", "asset_id", "ticket_id"}
+FLOAT_COLUMNS = {"downtime", "stop_dw", "change_downtime"}
+BOOL_COLUMNS = {"is_major"}
+TIMESTAMP_COLUMNS = {
+    "reported_at", "affected_at", "resolution_at", "created_at", "updated_at", "start_at_dw",
+    "end_at_dw", "resolved_at", "closed_at", "start_at_activity", "end_at_activity",
+}
+
+
+class ExportFormat(NamedTuple):
+    media_type: str
+    extension: str
+
+
+EXPORT_FORMATS = {
+    "csv": ExportFormat("text/csv", "csv"),
+    "ndjson": ExportFormat("application/x-ndjson", "ndjson"),
+    "parquet": ExportFormat("application/vnd.apache.parquet", "parquet"),
+}
+GZIP_MEDIA_TYPE = "application/gzip"
+
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, bytes):
+        return value.decode("utf-8", "replace")
+    return str(value)
+
+
+def _timestamp(value):
+    # SQLite (stand-in local) devuelve las fechas como texto.
+    return datetime.fromisoformat(value) if isinstance(value, str) else value
+
+
+class _CsvEncoder:
+    def __init__(self, columns: List[str]):
+        self._text = io.StringIO()
+        self._writer = csv.writer(self._text)
+        self._writer.writerow(columns)
+
+    def _take(self) -> bytes:
+        data = self._text.getvalue().encode("utf-8")
+        self._text.seek(0)
+        self._text.truncate()
+        return data
+
+    def encode(self, rows: List[tuple]) -> bytes:
+        self._writer.writerows(rows)
+        return self._take()
+
+    def close(self) -> bytes:
+        return self._take()
+
+
+class _NdjsonEncoder:
+    def __init__(self, columns: List[str]):
+        self._columns = columns
+
+    def encode(self, rows: List[tuple]) -> bytes:
+        return "".join(
+            json.dumps(dict(zip(self._columns, row)), ensure_ascii=False, default=_json_default) + "\n"
+            for row in rows
+        ).encode("utf-8")
+
+    def close(self) -> bytes:
+        return b""
+
+
+class _ParquetEncoder:
+    """Un row group por lote; pyarrow escribe sobre un sink que se vacia tras cada lote."""
+
+    def __init__(self, columns: List[str]):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        self._pa = pa
+        types = []
+        for name in columns:
+            if name in INT_COLUMNS:
+                types.append(pa.int64())
+            elif name in FLOAT_COLUMNS:
+                types.append(pa.float64())
+            elif name in BOOL_COLUMNS:
+                types.append(pa.bool_())
+            elif name in TIMESTAMP_COLUMNS:
+                types.append(pa.timestamp("s"))
+            else:
+                types.append(pa.string())
+        self._schema = pa.schema(list(zip(columns, types)))
+        self._sink = ChunkSink()
+        self._writer = pq.ParquetWriter(self._sink, self._schema, compression="zstd")
+
+    def encode(self, rows: List[tuple]) -> bytes:
+        arrays = []
+        for i, field in enumerate(self._schema):
+            values = [row[i] for row in rows]
+            if field.name in TIMESTAMP_COLUMNS:
+                values = [_timestamp(v) for v in values]
+            elif field.name in FLOAT_COLUMNS:
+                values = [float(v) if v is not None else None for v in values]
+            elif field.name in BOOL_COLUMNS:
+                values = [bool(v) if v is not None else None for v in values]
+            elif self._pa.types.is_string(field.type):
+                values = [v if v is None or isinstance(v, str) else _json_default(v) for v in values]
+            arrays.append(self._pa.array(values, type=field.type))
+        self._writer.write_table(self._pa.Table.from_arrays(arrays, schema=self._schema))
+        return self._sink.drain()
+
+    def close(self) -> bytes:
+        self._writer.close()
+        return self._sink.drain()
+
+
+_ENCODERS = {"csv": _CsvEncoder, "ndjson": _NdjsonEncoder, "parquet": _ParquetEncoder}
+
+
+class DataExporter:
+    """
+    Exporta los datos crudos de una cuenta (incidentes, SRs, cambios, worklogs,
+    activos) como CSV, NDJSON o Parquet sin pasar por los renderizadores de
+    documentos.
+
+    Las filas salen por lotes de un cursor del servidor y cada lote se
+    codifica y (en CSV/NDJSON) se comprime con gzip incremental apenas llega,
+    asi que la memoria es la de un lote sin importar el tamaño de la
+    exportacion. Parquet usa su propia compresion (zstd) por row group.
+    """
+
+    def __init__(self, batch_size: int = 5000, gzip_level: int = 6):
+        self.batch_size = batch_size
+        self.gzip_level = gzip_level
+
+    def media_type(self, fmt: str, compress: bool) -> str:
+        return GZIP_MEDIA_TYPE if compress and fmt != "parquet" else EXPORT_FORMATS[fmt].media_type
+
+    def extension(self, fmt: str, compress: bool) -> str:
+        ext = EXPORT_FORMATS[fmt].extension
+        return f"{ext}.gz" if compress and fmt != "parquet" else ext
+
+    def check_format(self, fmt: str):
+        """Falla antes de empezar la respuesta si el formato no se puede generar."""
+        if fmt == "parquet":
+            try:
+                import pyarrow.parquet  # noqa: F401
+            except ImportError:
+                raise AppError(ErrorType.BAD_REQUEST, "Exportacion Parquet no disponible: falta pyarrow en el servidor")
+
+    def stream(
+        self,
+        dataset: str,
+        fmt: str,
+        account_id: int,
+        start_date: datetime,
+        end_date: datetime,
+        compress: bool = True,
+    ) -> Iterator[bytes]:
+        # Sesion propia: la del request se cierra antes de que corra el cuerpo del StreamingResponse.
+        session = TM_SM_FACTORY()
+        rows_out = 0
+        try:
+            columns, batches = ToolmasterRepository(session=session).iter_export_rows(
+                dataset, account_id, start_date, end_date, batch_size=self.batch_size
+            )
+            encoder = _ENCODERS[fmt](columns)
+            gzip = zlib.compressobj(self.gzip_level, zlib.DEFLATED, 31) if compress and fmt != "parquet" else None
+            for batch in batches:
+                rows_out += len(batch)
+                data = encoder.encode(batch)
+                if gzip is not None:
+                    data = gzip.compress(data)
+                if data:
+                    yield data
+            tail = encoder.close()
+            if gzip is not None:
+                tail = gzip.compress(tail) + gzip.flush()
+            if tail:
+                yield tail
+        except Exception as e:
+            # Con la respuesta ya iniciada solo queda cortarla; el cliente ve un archivo truncado.
+            log(f"Data export: {dataset} cuenta {account_id} fallo tras {rows_out} filas: {e}")
+            raise
+        finally:
+            session.close()
@@ -1,151 +1,136 @@
 # app/api_services/graph_reports_use_case_impl.py
 
-import plotly.express as px
-import plotly.graph_objects as go
-import pandas as pd
 from io import BytesIO
-from typing import List, Optional
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+from app.adapters.charts.native_chart_renderer import NativeChartRenderer
+from app.api_services.report_dataset import ATTRIB_MAP, ReportDataset
+from app.domain.ports.out_port.IChartRenderer import IChartRenderer
+from app.infrastructure.dto.chart_schema import BarChartDTO, BarSeriesDTO
+
+def proactivity_color(tipo: str) -> str:
+    if str(tipo) == "Proactive":
+        return "#ff6000"
+    elif str(tipo) == "Reactive":
+        return "#4D4D4D"
+    else:
+        return "#4B2C9F"
+
+
+def attribution_color(cat: str) -> str:
+    lower = str(cat).lower()
+    if "liberty" in lower:
+        return "#ff6000"
+    elif "cliente" in lower:
+        return "#4D4D4D"
+    else:
+        return "#4B2C9F"
 
-from app.infrastructure.dto.reports_schema import IncidentDTO, ServiceRequestDTO, ChangeDTO
 
 class GraphReportsUseCaseImpl:
-    def generate_proactivity_graph(
+    def __init__(self, renderer: Optional[IChartRenderer] = None):
+        self.renderer = renderer or NativeChartRenderer()
+
+    def render(self, chart: Optional[BarChartDTO]) -> Optional[BytesIO]:
+        if chart is None:
+            return None
+        stream = BytesIO(self.renderer.render(chart))
+        stream.seek(0)
+        return stream
+
+    def build_proactivity_chart(
         self,
-        incidentes: List[IncidentDTO],
-        service_requests: List[ServiceRequestDTO],
-        cambios: List[ChangeDTO]
-    ) -> Optional[BytesIO]:
-        data = []
-        for inc in incidentes:
-            if inc.status and inc.status.lower() == "canceled":
-                continue
-            if inc.type_incident:
-                data.append({"class": "INC", "tipo": inc.type_incident})
-        for sr in service_requests:
-            if sr.status and sr.status.lower() == "canceled":
-                continue
-            if sr.sr_type_actions:
-                data.append({"class": "SR", "tipo": sr.sr_type_actions})
-        for chg in cambios:
-            if chg.status and chg.status.lower() == "canceled":
-                continue
-            if chg.type_of_action:
-                data.append({"class": "CHG", "tipo": chg.type_of_action})
-        df = pd.DataFrame(data)
-        if df.empty:
+        dataset: ReportDataset,
+        incidents_only: bool = False
+    ) -> Optional[BarChartDTO]:
+        data: List[Tuple[str, str]] = [
+            ("INC", inc.type_incident) for inc in dataset.closed_incidents if inc.type_incident
+        ]
+        if not incidents_only:
+            data.extend(("SR", sr.sr_type_actions) for sr in dataset.closed_srs if sr.sr_type_actions)
+            data.extend(("CHG", chg.type_of_action) for chg in dataset.closed_changes if chg.type_of_action)
+        if not data:
             return None
-        def custom_color(x):
-            if str(x) == "Proactive":
-                return "#ff6000"
-            elif str(x) == "Reactive":
-                return "#4D4D4D"
-            else:
-                return "#4B2C9F"
-        fig = px.histogram(df, x="class", color="tipo", barmode="group")
-        fig.update_layout(
+        counts = Counter(data)
+        # Classes and types keep their order of first appearance, as px.histogram did.
+        classes = list(dict.fromkeys(cls for cls, _ in data))
+        tipos = list(dict.fromkeys(tipo for _, tipo in data))
+        series = []
+        for tipo in tipos:
+            cats = [cls for cls in classes if (cls, tipo) in counts]
+            series.append(BarSeriesDTO(
+                name=tipo,
+                color=proactivity_color(tipo),
+                categories=cats,
+                values=[counts[(cls, tipo)] for cls in cats],
+            ))
+        return BarChartDTO(
+            chart_type="proactivity",
             title="Casos Proactivos vs Reactivos",
-            xaxis_title="Clase de Caso",
-            yaxis_title="Cantidad",
+            x_title="Clase de Caso",
+            y_title="Cantidad",
             legend_title="Tipo",
-            template="simple_white"
+            categories=classes,
+            series=series,
         )
-        fig.update_yaxes(dtick=1)
-        for dtrace in fig.data:
-            dtrace.marker.color = custom_color(dtrace.name)
-            dtrace.texttemplate = "%{y}"
-            dtrace.textposition = "outside"
-        img_bytes = fig.to_image(format="png")
-        stream = BytesIO(img_bytes)
-        stream.seek(0)
-        return stream
 
-    def generate_top_sedes_graph(self, incidentes: List[IncidentDTO]) -> Optional[BytesIO]:
-        if not incidentes:
-            return None
-        items = []
-        for inc in incidentes:
-            if inc.status and inc.status.lower() == "canceled":
-                continue
-            if inc.assets:
-                for asset in inc.assets:
-                    if asset.circuit_id:
-                        items.append({"circuit_id": asset.circuit_id, "ticket_id": inc.ticket_id})
-        df = pd.DataFrame(items)
-        if df.empty:
+    def build_top_sedes_chart(self, dataset: ReportDataset) -> Optional[BarChartDTO]:
+        if not dataset.circuit_index:
             return None
-        df_count = df.groupby("circuit_id")["ticket_id"].nunique().reset_index(name="count")
-        df_count = df_count.sort_values("count", ascending=False)
-        df_top3 = df_count.head(3)
-        if df_top3.empty:
-            return None
-        fig = px.bar(df_top3, x="count", y="circuit_id", orientation='h')
-        fig.update_traces(marker_color="#4D4D4D", texttemplate="%{x}", textposition="outside")
-        fig.update_layout(
+        ticket_counts: Dict[str, int] = {
+            circuit_id: len({inc.ticket_id for inc in incs if inc.ticket_id is not None})
+            for circuit_id, incs in sorted(dataset.circuit_index.items())
+        }
+        top3 = sorted(ticket_counts.items(), key=lambda item: item[1], reverse=True)[:3]
+        # Ascending totals from the bottom up, like categoryorder='total ascending'.
+        top3.reverse()
+        return BarChartDTO(
+            chart_type="top_sedes",
             title="Top 3 Circuit IDs con mayor número de tickets (Incidentes)",
-            xaxis_title="Cantidad de Tickets",
-            yaxis_title="Circuit ID",
-            template="simple_white"
+            x_title="Cantidad de Tickets",
+            y_title="Circuit ID",
+            show_legend=False,
+            orientation="h",
+            categories=[cid for cid, _ in top3],
+            series=[BarSeriesDTO(
+                name="count",
+                color="#4D4D4D",
+                categories=[cid for cid, _ in top3],
+                values=[cnt for _, cnt in top3],
+            )],
         )
-        fig.update_yaxes(categoryorder='total ascending')
-        fig.update_xaxes(dtick=1)
-        img_bytes = fig.to_image(format="png")
-        stream = BytesIO(img_bytes)
-        stream.seek(0)
-        return stream
 
-    def generate_attributions_graph(self, incidentes: List[IncidentDTO]) -> Optional[BytesIO]:
-        if not incidentes:
+    def build_attributions_chart(self, dataset: ReportDataset) -> Optional[BarChartDTO]:
+        counts = Counter()
+        for attributed_to, incs in dataset.attribution_buckets.items():
+            if attributed_to:
+                counts[ATTRIB_MAP.get(attributed_to, "Otros")] += len(incs)
+        if not counts:
             return None
-        data = []
-        for inc in incidentes:
-            if inc.status and inc.status.lower() == "canceled":
-                continue
-            if inc.attributed_to:
-                data.append({"attributed_to": inc.attributed_to})
-        df = pd.DataFrame(data)
-        if df.empty:
-            return None
-        map_attrib = {
-            "C&W": "Liberty Networks",
-            "C&W Human Error": "Liberty Networks",
-            "C&W Implementation": "Liberty Networks",
-            "C&W Inside Plant": "Liberty Networks",
-            "C&W Maintenance Window": "Liberty Networks",
-            "C&W Outside Plant": "Liberty Networks",
-            "Carrier": "Liberty Networks",
-            "Provider": "Liberty Networks",
-            "Tier 1 Support": "Liberty Networks",
-            "Tier 2 Support": "Liberty Networks",
-            "Tier 3 Support": "Liberty Networks",
-            "Customer": "Cliente",
-            "Force Majeure": "Fuerza Mayor"
-        }
-        df["categoria"] = df["attributed_to"].apply(lambda x: map_attrib.get(x, "Otros"))
-        df_count = df.groupby("categoria").size().reset_index(name="count")
-        def custom_color(cat):
-            lower = str(cat).lower()
-            if "liberty" in lower:
-                return "#ff6000"
-            elif "cliente" in lower:
-                return "#4D4D4D"
-            else:
-                return "#4B2C9F"
-        bars = []
-        for _, row in df_count.iterrows():
-            cat = row["categoria"]
-            cnt = row["count"]
-            bars.append(go.Bar(x=[cat], y=[cnt], marker_color=custom_color(cat), name=str(cat),
-                               text=[cnt], texttemplate="%{text}", textposition="outside"))
-        fig = go.Figure(data=bars)
-        fig.update_layout(
+        categories = sorted(counts)
+        return BarChartDTO(
+            chart_type="attributions",
             title="Atribución de Incidentes",
-            xaxis_title="Categoría de Atribución",
-            yaxis_title="Cantidad",
-            template="simple_white",
-            barmode="group"
+            x_title="Categoría de Atribución",
+            y_title="Cantidad",
+            show_legend=len(categories) > 1,
+            categories=categories,
+            series=[
+                BarSeriesDTO(name=cat, color=attribution_color(cat), categories=[cat], values=[counts[cat]])
+                for cat in categories
+            ],
         )
-        fig.update_yaxes(dtick=1)
-        img_bytes = fig.to_image(format="png")
-        stream = BytesIO(img_bytes)
-        stream.seek(0)
-        return stream
+
+    def generate_proactivity_graph(
+        self,
+        dataset: ReportDataset,
+        incidents_only: bool = False
+    ) -> Optional[BytesIO]:
+        return self.render(self.build_proactivity_chart(dataset, incidents_only))
+
+    def generate_top_sedes_graph(self, dataset: ReportDataset) -> Optional[BytesIO]:
+        return self.render(self.build_top_sedes_chart(dataset))
+
+    def generate_attributions_graph(self, dataset: ReportDataset) -> Optional[BytesIO]:
+        return self.render(self.build_attributions_chart(dataset))
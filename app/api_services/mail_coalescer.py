@@ -0,0 +1,310 @@
+# app/api_services/mail_coalescer.py
+
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+from app.infrastructure.dto.mail_schema import (
+    MailBaseDTO,
+    MailCoalescedDTO,
+    MailCoalesceStatsDTO,
+    MailCoalesceWindowDTO,
+)
+from app.utils.logger import log
+
+TOP_WINDOWS = 20
+
+
+class CoalescedWindow(NamedTuple):
+    """Una ventana de un ticket: el aviso que se envio y los repetidos que se suprimieron."""
+
+    key: str
+    dto_json: str  # ultimo MailBaseDTO recibido
+    window_start: float
+    window_end: float
+    suppressed: int
+    first_duplicate_at: Optional[float]
+    last_duplicate_at: Optional[float]
+
+    @property
+    def dto(self) -> MailBaseDTO:
+        return MailBaseDTO.model_validate_json(self.dto_json)
+
+    def to_dto(self) -> MailCoalesceWindowDTO:
+        dto = self.dto
+        return MailCoalesceWindowDTO(
+            ticket_id=dto.ticket_id,
+            cid_mgt=dto.cid_mgt,
+            to_mails=dto.to_mails,
+            suppressed=self.suppressed,
+            window_started_at=datetime.fromtimestamp(self.window_start),
+            window_ends_at=datetime.fromtimestamp(self.window_end),
+            first_duplicate_at=_fromtimestamp(self.first_duplicate_at),
+            last_duplicate_at=_fromtimestamp(self.last_duplicate_at),
+        )
+
+
+def _fromtimestamp(value: Optional[float]) -> Optional[datetime]:
+    return datetime.fromtimestamp(value) if value is not None else None
+
+
+def _recipients(to_mails: str) -> List[str]:
+    return sorted({addr.strip().lower() for addr in re.split(r"[,;]", to_mails) if addr.strip()})
+
+
+class _MemoryBackend:
+    """Ventanas del proceso: con varios workers cada uno coalesce lo que recibe."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._windows: Dict[str, CoalescedWindow] = {}
+        self._closed: List[CoalescedWindow] = []
+        self._totals = {"suppressed": 0, "digests": 0}
+
+    def admit(self, key: str, dto_json: str, now: float, window: float) -> CoalescedWindow:
+        with self._lock:
+            current = self._windows.get(key)
+            if current is not None and current.window_end > now:
+                current = current._replace(
+                    dto_json=dto_json,
+                    suppressed=current.suppressed + 1,
+                    first_duplicate_at=current.first_duplicate_at or now,
+                    last_duplicate_at=now,
+                )
+                self._totals["suppressed"] += 1
+            else:
+                if current is not None:
+                    self._closed.append(current)
+                current = CoalescedWindow(key, dto_json, now, now + window, 0, None, None)
+            self._windows[key] = current
+            return current
+
+    def release(self, key: str, now: float):
+        with self._lock:
+            current = self._windows.get(key)
+            if current is not None and current.window_end > now:
+                del self._windows[key]
+
+    def close_expired(self, now: float) -> List[CoalescedWindow]:
+        with self._lock:
+            expired = [w for w in self._windows.values() if w.window_end <= now]
+            for w in expired:
+                del self._windows[w.key]
+            closed, self._closed = self._closed + expired, []
+            return closed
+
+    def active(self, now: float) -> List[CoalescedWindow]:
+        with self._lock:
+            return [w for w in self._windows.values() if w.window_end > now]
+
+    def add_total(self, name: str, n: int):
+        with self._lock:
+            self._totals[name] += n
+
+    def totals(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._totals)
+
+
+class _SqliteBackend:
+    """Ventanas en un archivo SQLite: las comparten los workers del host."""
+
+    _SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS mail_coalesce ("
+        "  key TEXT NOT NULL, dto TEXT NOT NULL, window_start REAL NOT NULL, window_end REAL NOT NULL, "
+        "  suppressed INTEGER NOT NULL DEFAULT 0, first_duplicate_at REAL, last_duplicate_at REAL, "
+        "  PRIMARY KEY (key, window_start))",
+        "CREATE INDEX IF NOT EXISTS mail_coalesce_end ON mail_coalesce (window_end)",
+        "CREATE TABLE IF NOT EXISTS mail_coalesce_totals (name TEXT PRIMARY KEY, value INTEGER NOT NULL)",
+    )
+    _COLUMNS = "key, dto, window_start, window_end, suppressed, first_duplicate_at, last_duplicate_at"
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._conn() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            for stmt in self._SCHEMA:
+                conn.execute(stmt)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    def _add_total(self, conn: sqlite3.Connection, name: str, n: int):
+        conn.execute(
+            "INSERT INTO mail_coalesce_totals (name, value) VALUES (?, ?) "
+            "ON CONFLICT (name) DO UPDATE SET value = value + excluded.value",
+            (name, n),
+        )
+
+    def admit(self, key: str, dto_json: str, now: float, window: float) -> CoalescedWindow:
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                f"SELECT {self._COLUMNS} FROM mail_coalesce WHERE key = ? AND window_end > ?", (key, now)
+            ).fetchone()
+            if row is not None:
+                conn.execute(
+                    "UPDATE mail_coalesce SET dto = ?, suppressed = suppressed + 1, "
+                    "       first_duplicate_at = COALESCE(first_duplicate_at, ?), last_duplicate_at = ? "
+                    "WHERE  key = ? AND window_start = ?",
+                    (dto_json, now, now, key, row[2]),
+                )
+                self._add_total(conn, "suppressed", 1)
+                current = CoalescedWindow(key, dto_json, row[2], row[3], row[4] + 1, row[5] or now, now)
+            else:
+                conn.execute(
+                    "INSERT INTO mail_coalesce (key, dto, window_start, window_end) VALUES (?, ?, ?, ?)",
+                    (key, dto_json, now, now + window),
+                )
+                current = CoalescedWindow(key, dto_json, now, now + window, 0, None, None)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return current
+
+    def release(self, key: str, now: float):
+        self._conn().execute("DELETE FROM mail_coalesce WHERE key = ? AND window_end > ?", (key, now))
+
+    def close_expired(self, now: float) -> List[CoalescedWindow]:
+        # Select y delete en la misma transaccion: cada ventana la cierra un solo worker.
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            rows = conn.execute(
+                f"SELECT {self._COLUMNS} FROM mail_coalesce WHERE window_end <= ?", (now,)
+            ).fetchall()
+            conn.execute("DELETE FROM mail_coalesce WHERE window_end <= ?", (now,))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return [CoalescedWindow(*r) for r in rows]
+
+    def active(self, now: float) -> List[CoalescedWindow]:
+        rows = self._conn().execute(
+            f"SELECT {self._COLUMNS} FROM mail_coalesce WHERE window_end > ?", (now,)
+        ).fetchall()
+        return [CoalescedWindow(*r) for r in rows]
+
+    def add_total(self, name: str, n: int):
+        self._add_total(self._conn(), name, n)
+
+    def totals(self) -> Dict[str, int]:
+        totals = {"suppressed": 0, "digests": 0}
+        totals.update(self._conn().execute("SELECT name, value FROM mail_coalesce_totals").fetchall())
+        return totals
+
+
+class NotificationCoalescer:
+    """
+    Agrupa los avisos de incidente repetidos (send_email_none) de un mismo
+    ticket: la clave es ticket_id + cid_mgt + destinatarios + is_major.
+
+    El primer aviso abre una ventana de `window_seconds` y se envia normal;
+    los que llegan dentro de la ventana no se renderizan ni se envian, solo
+    se cuentan. Si el envio (o el encolado) del primero falla, el caller
+    llama `release` para que su reintento no quede suprimido. Al cerrar la ventana, en modo "digest" se envia un resumen
+    con la cantidad suprimida (`on_digest`); en modo "drop" solo quedan en
+    las estadisticas. Con `db_path` las ventanas viven en SQLite y las
+    comparten los workers de gunicorn.
+    """
+
+    def __init__(
+        self,
+        window_seconds: float = 600,
+        mode: str = "digest",
+        db_path: Optional[str] = None,
+        on_digest: Optional[Callable[[MailBaseDTO, MailCoalesceWindowDTO], None]] = None,
+    ):
+        if mode not in ("digest", "drop"):
+            raise ValueError(f"Modo de coalescencia desconocido: {mode}")
+        self.window = window_seconds
+        self.mode = mode
+        self.on_digest = on_digest
+        self.backend = _SqliteBackend(db_path) if db_path else _MemoryBackend()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @staticmethod
+    def key(dto: MailBaseDTO) -> str:
+        raw = "\x1f".join([dto.ticket_id, dto.cid_mgt, ",".join(_recipients(dto.to_mails)), str(dto.is_major)])
+        return hashlib.sha1(raw.encode()).hexdigest()
+
+    def admit(self, dto: MailBaseDTO) -> Optional[MailCoalescedDTO]:
+        """None si el aviso se debe enviar; si no, el detalle de la ventana que lo absorbio."""
+        current = self.backend.admit(self.key(dto), dto.model_dump_json(), time.time(), self.window)
+        if current.suppressed == 0:
+            return None
+        return MailCoalescedDTO(
+            ticket_id=dto.ticket_id,
+            cid_mgt=dto.cid_mgt,
+            suppressed=current.suppressed,
+            window_ends_at=datetime.fromtimestamp(current.window_end),
+        )
+
+    def release(self, dto: MailBaseDTO):
+        """Descarta la ventana abierta del aviso: el primero no se pudo enviar ni encolar."""
+        self.backend.release(self.key(dto), time.time())
+
+    def flush(self, now: Optional[float] = None) -> int:
+        """Cierra las ventanas vencidas y, en modo digest, envia sus resumenes."""
+        digests = 0
+        for closed in self.backend.close_expired(now or time.time()):
+            if closed.suppressed == 0 or self.mode != "digest" or self.on_digest is None:
+                continue
+            try:
+                self.on_digest(closed.dto, closed.to_dto())
+                digests += 1
+            except Exception as e:
+                log(f"Mail coalescer: no se pudo enviar el resumen de {closed.dto.ticket_id}: {e}")
+        if digests:
+            self.backend.add_total("digests", digests)
+        return digests
+
+    def stats(self) -> MailCoalesceStatsDTO:
+        active = self.backend.active(time.time())
+        totals = self.backend.totals()
+        top = sorted(active, key=lambda w: w.suppressed, reverse=True)[:TOP_WINDOWS]
+        return MailCoalesceStatsDTO(
+            mode=self.mode,
+            window_seconds=self.window,
+            active_windows=len(active),
+            suppressed_active=sum(w.suppressed for w in active),
+            suppressed_total=totals["suppressed"],
+            digests_sent=totals["digests"],
+            windows=[w.to_dto() for w in top],
+        )
+
+    def start(self):
+        if self._thread:
+            return
+        self._thread = threading.Thread(target=self._loop, name="mail-coalescer", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 10):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=timeout)
+        # Lo que ya vencio se resume antes de salir; las ventanas abiertas en memoria se pierden.
+        self.flush()
+
+    def _loop(self):
+        interval = max(1.0, min(30.0, self.window / 4))
+        while not self._stop.wait(interval):
+            try:
+                self.flush()
+            except Exception as e:
+                log(f"Mail coalescer: error al cerrar ventanas: {e}")
@@ -0,0 +1,422 @@
+# app/api_services/mail_queue.py
+
+import json
+import os
+import smtplib
+import sqlite3
+import threading
+import time
+import uuid
+from collections import deque
+from typing import Deque, Dict, List, NamedTuple, Optional
+
+from app.adapters.smtp_pool import CONNECTION_ERRORS, SmtpConnectionPool, pipelined_send
+from app.infrastructure.dto.mail_schema import MailQueueStatsDTO, MailStatusDTO, OutgoingMail
+from app.utils.errors import AppError, ErrorType
+from app.utils.logger import log
+
+LATENCY_SAMPLES = 1000
+
+
+class QueuedMail(NamedTuple):
+    message_id: str
+    mail: OutgoingMail
+    attempts: int
+    enqueued_at: float
+
+
+def _percentile(values: List[float], q: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+
+class _MemoryBackend:
+    """
+    Cola del proceso: se pierde lo pendiente si el worker se reinicia. Como en
+    _SqliteBackend, un mensaje en "sending" se vuelve a tomar al vencer su `lease`.
+    """
+
+    def __init__(self, max_depth: int):
+        self.max_depth = max_depth
+        self._lock = threading.Lock()
+        self._records: Dict[str, dict] = {}
+        # Solo "queued" y "sending": put y claim no recorren lo ya enviado.
+        self._pending: Dict[str, dict] = {}
+        self._latencies: Deque[float] = deque(maxlen=LATENCY_SAMPLES)
+
+    def put(self, item: QueuedMail):
+        with self._lock:
+            if self.max_depth and len(self._pending) >= self.max_depth:
+                raise AppError(ErrorType.SERVICE_UNAVAILABLE, "Cola de correo llena, reintente mas tarde")
+            record = {
+                "item": item, "status": "queued", "next_attempt_at": item.enqueued_at,
+                "claimed_at": None, "sent_at": None, "last_error": None,
+            }
+            self._records[item.message_id] = self._pending[item.message_id] = record
+
+    @staticmethod
+    def _finished(item: QueuedMail) -> QueuedMail:
+        # El cuerpo ya no hace falta; solo queda el estado para consultas.
+        return item._replace(mail=item.mail._replace(payload=b""), attempts=item.attempts + 1)
+
+    def claim(self, limit: int, now: float, lease: float) -> List[QueuedMail]:
+        with self._lock:
+            due = [
+                r for r in self._pending.values()
+                if (r["status"] == "queued" and r["next_attempt_at"] <= now)
+                or (r["status"] == "sending" and r["claimed_at"] < now - lease)
+            ]
+            due.sort(key=lambda r: r["next_attempt_at"])
+            for r in due[:limit]:
+                r.update(status="sending", claimed_at=now)
+            return [r["item"] for r in due[:limit]]
+
+    def sent(self, item: QueuedMail, now: float, error: Optional[str]):
+        with self._lock:
+            r = self._records[item.message_id]
+            r.update(status="sent", sent_at=now, last_error=error, item=self._finished(item))
+            self._pending.pop(item.message_id, None)
+            self._latencies.append(now - item.enqueued_at)
+
+    def retry(self, item: QueuedMail, next_attempt_at: float, error: str):
+        with self._lock:
+            r = self._records[item.message_id]
+            r.update(status="queued", next_attempt_at=next_attempt_at, last_error=error,
+                     item=item._replace(attempts=item.attempts + 1))
+            self._pending[item.message_id] = r
+
+    def fail(self, item: QueuedMail, now: float, error: str):
+        with self._lock:
+            r = self._records[item.message_id]
+            r.update(status="failed", sent_at=now, last_error=error, item=self._finished(item))
+            self._pending.pop(item.message_id, None)
+
+    def get(self, message_id: str) -> Optional[MailStatusDTO]:
+        with self._lock:
+            r = self._records.get(message_id)
+            if r is None:
+                return None
+            return MailStatusDTO(
+                message_id=message_id, kind=r["item"].mail.kind, status=r["status"],
+                attempts=r["item"].attempts, enqueued_at=r["item"].enqueued_at,
+                finished_at=r["sent_at"], last_error=r["last_error"],
+            )
+
+    def stats(self, now: float) -> dict:
+        with self._lock:
+            counts = {"queued": 0, "sending": 0, "sent": 0, "failed": 0}
+            oldest = None
+            for r in self._records.values():
+                counts[r["status"]] += 1
+                if r["status"] == "queued":
+                    oldest = min(oldest or now, r["item"].enqueued_at)
+            return {**counts, "oldest_enqueued_at": oldest, "latencies": list(self._latencies)}
+
+    def purge(self, before: float) -> int:
+        with self._lock:
+            old = [k for k, r in self._records.items() if r["sent_at"] is not None and r["sent_at"] < before]
+            for k in old:
+                del self._records[k]
+            return len(old)
+
+
+class _SqliteBackend:
+    """
+    Cola en un archivo SQLite: sobrevive a reinicios y la comparten los
+    workers del host. Un mensaje en "sending" cuyo worker murio se vuelve a
+    tomar cuando vence su `lease`.
+    """
+
+    _SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS mail_queue ("
+        "  message_id TEXT PRIMARY KEY, kind TEXT NOT NULL, from_addr TEXT NOT NULL, "
+        "  to_addrs TEXT NOT NULL, payload BLOB NOT NULL, status TEXT NOT NULL, "
+        "  attempts INTEGER NOT NULL DEFAULT 0, enqueued_at REAL NOT NULL, "
+        "  next_attempt_at REAL NOT NULL, claimed_at REAL, sent_at REAL, last_error TEXT)",
+        "CREATE INDEX IF NOT EXISTS mail_queue_due ON mail_queue (status, next_attempt_at)",
+    )
+
+    def __init__(self, path: str, max_depth: int):
+        self.path = path
+        self.max_depth = max_depth
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._conn() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            for stmt in self._SCHEMA:
+                conn.execute(stmt)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    def put(self, item: QueuedMail):
+        conn = self._conn()
+        if self.max_depth:
+            depth = conn.execute("SELECT COUNT(*) FROM mail_queue WHERE status IN ('queued','sending')").fetchone()[0]
+            if depth >= self.max_depth:
+                raise AppError(ErrorType.SERVICE_UNAVAILABLE, "Cola de correo llena, reintente mas tarde")
+        mail = item.mail
+        conn.execute(
+            "INSERT INTO mail_queue (message_id, kind, from_addr, to_addrs, payload, status, attempts, "
+            "                        enqueued_at, next_attempt_at) "
+            "VALUES (?, ?, ?, ?, ?, 'queued', 0, ?, ?)",
+            (item.message_id, mail.kind, mail.from_addr, json.dumps(mail.to_addrs), mail.payload,
+             item.enqueued_at, item.enqueued_at),
+        )
+
+    def claim(self, limit: int, now: float, lease: float) -> List[QueuedMail]:
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            rows = conn.execute(
+                "SELECT message_id, kind, from_addr, to_addrs, payload, attempts, enqueued_at "
+                "FROM   mail_queue "
+                "WHERE  (status = 'queued' AND next_attempt_at <= ?) "
+                "   OR  (status = 'sending' AND claimed_at < ?) "
+                "ORDER  BY next_attempt_at LIMIT ?",
+                (now, now - lease, limit),
+            ).fetchall()
+            conn.executemany(
+                "UPDATE mail_queue SET status = 'sending', claimed_at = ? WHERE message_id = ?",
+                [(now, r[0]) for r in rows],
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return [
+            QueuedMail(r[0], OutgoingMail(r[1], r[2], tuple(json.loads(r[3])), r[4]), r[5], r[6])
+            for r in rows
+        ]
+
+    def sent(self, item: QueuedMail, now: float, error: Optional[str]):
+        self._conn().execute(
+            "UPDATE mail_queue SET status = 'sent', attempts = attempts + 1, sent_at = ?, last_error = ?, "
+            "       payload = x'' "
+            "WHERE  message_id = ?",
+            (now, error, item.message_id),
+        )
+
+    def retry(self, item: QueuedMail, next_attempt_at: float, error: str):
+        self._conn().execute(
+            "UPDATE mail_queue SET status = 'queued', attempts = attempts + 1, next_attempt_at = ?, "
+            "       last_error = ? "
+            "WHERE  message_id = ?",
+            (next_attempt_at, error, item.message_id),
+        )
+
+    def fail(self, item: QueuedMail, now: float, error: str):
+        self._conn().execute(
+            "UPDATE mail_queue SET status = 'failed', attempts = attempts + 1, sent_at = ?, last_error = ? "
+            "WHERE  message_id = ?",
+            (now, error, item.message_id),
+        )
+
+    def get(self, message_id: str) -> Optional[MailStatusDTO]:
+        row = self._conn().execute(
+            "SELECT kind, status, attempts, enqueued_at, sent_at, last_error FROM mail_queue WHERE message_id = ?",
+            (message_id,),
+        ).fetchone()
+        if row is None:
+            return None
+        return MailStatusDTO(
+            message_id=message_id, kind=row[0], status=row[1], attempts=row[2],
+            enqueued_at=row[3], finished_at=row[4], last_error=row[5],
+        )
+
+    def stats(self, now: float) -> dict:
+        conn = self._conn()
+        counts = {"queued": 0, "sending": 0, "sent": 0, "failed": 0}
+        counts.update(conn.execute("SELECT status, COUNT(*) FROM mail_queue GROUP BY status").fetchall())
+        oldest = conn.execute("SELECT MIN(enqueued_at) FROM mail_queue WHERE status = 'queued'").fetchone()[0]
+        latencies = [
+            r[0] for r in conn.execute(
+                "SELECT sent_at - enqueued_at FROM mail_queue WHERE status = 'sent' "
+                "ORDER BY sent_at DESC LIMIT ?",
+                (LATENCY_SAMPLES,),
+            )
+        ]
+        return {**counts, "oldest_enqueued_at": oldest, "latencies": latencies}
+
+    def purge(self, before: float) -> int:
+        return self._conn().execute(
+            "DELETE FROM mail_queue WHERE status IN ('sent','failed') AND sent_at < ?", (before,)
+        ).rowcount
+
+
+class MailQueue:
+    """
+    Cola de salida del mailer: los endpoints encolan y responden 202 con el
+    message_id; `workers` hilos la vacian en lotes de hasta `batch_size`
+    mensajes, cada lote sobre una misma sesion del pool SMTP.
+
+    Un error de conexion o una respuesta 4xx reprograma el mensaje con
+    backoff exponencial (retry_base_seconds * 2^intentos, hasta
+    retry_max_seconds) hasta `max_attempts`; una respuesta 5xx lo deja
+    fallido de inmediato. Con `db_path` la cola vive en SQLite y la comparten
+    los workers de gunicorn; sin el, en memoria de cada proceso.
+    """
+
+    def __init__(
+        self,
+        pool: SmtpConnectionPool,
+        db_path: Optional[str] = None,
+        workers: int = 2,
+        batch_size: int = 20,
+        max_attempts: int = 6,
+        retry_base_seconds: float = 5,
+        retry_max_seconds: float = 600,
+        max_depth: int = 10000,
+        lease_seconds: float = 300,
+        keep_seconds: float = 24 * 3600,
+    ):
+        self.pool = pool
+        self.backend = _SqliteBackend(db_path, max_depth) if db_path else _MemoryBackend(max_depth)
+        self.workers = max(1, workers)
+        self.batch_size = max(1, batch_size)
+        self.max_attempts = max(1, max_attempts)
+        self.retry_base = retry_base_seconds
+        self.retry_max = retry_max_seconds
+        self.lease = lease_seconds
+        self.keep = keep_seconds
+        # Con SQLite otro worker puede encolar: se sondea aunque nadie avise aqui.
+        self.poll_seconds = 1.0 if db_path else 5.0
+        self._wake = threading.Condition()
+        self._puts = 0
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self._last_purge = 0.0
+
+    def put(self, mail: OutgoingMail) -> str:
+        item = QueuedMail(uuid.uuid4().hex, mail, 0, time.time())
+        self.backend.put(item)
+        with self._wake:
+            self._puts += 1
+            self._wake.notify()
+        return item.message_id
+
+    def get(self, message_id: str) -> Optional[MailStatusDTO]:
+        return self.backend.get(message_id)
+
+    def stats(self) -> MailQueueStatsDTO:
+        now = time.time()
+        raw = self.backend.stats(now)
+        latencies = raw.pop("latencies")
+        oldest = raw.pop("oldest_enqueued_at")
+        return MailQueueStatsDTO(
+            depth=raw["queued"] + raw["sending"],
+            oldest_queued_seconds=round(now - oldest, 3) if oldest else None,
+            latency_p50_seconds=_percentile(latencies, 0.5),
+            latency_p99_seconds=_percentile(latencies, 0.99),
+            latency_samples=len(latencies),
+            **raw,
+        )
+
+    def start(self):
+        if self._threads:
+            return
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._loop, name=f"mail-queue-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout: float = 10):
+        self._stop.set()
+        with self._wake:
+            self._wake.notify_all()
+        for thread in self._threads:
+            thread.join(timeout=timeout)
+        if isinstance(self.backend, _MemoryBackend):
+            pending = self.backend.stats(time.time())["queued"]
+            if pending:
+                log(f"Mail queue: {pending} correos pendientes se pierden al detener el worker")
+
+    def _loop(self):
+        while not self._stop.is_set():
+            with self._wake:
+                seen = self._puts
+            try:
+                # Antes del claim: con carga constante la cola nunca queda vacia.
+                self._maybe_purge()
+                batch = self.backend.claim(self.batch_size, time.time(), self.lease)
+                if batch:
+                    self._deliver(batch)
+                    continue
+            except Exception as e:
+                log(f"Mail queue: error en el worker: {e}")
+            with self._wake:
+                # Un put entre el claim vacio y este wait no debe esperar al sondeo.
+                if self._puts == seen:
+                    self._wake.wait(self.poll_seconds)
+
+    def _maybe_purge(self):
+        now = time.time()
+        if now - self._last_purge > 3600:
+            self._last_purge = now
+            self.backend.purge(now - self.keep)
+
+    def _backoff(self, attempts: int) -> float:
+        return min(self.retry_max, self.retry_base * 2 ** attempts)
+
+    def _failed(self, item: QueuedMail, error: Exception, permanent: bool):
+        message = f"{type(error).__name__}: {error}"
+        now = time.time()
+        if permanent or item.attempts + 1 >= self.max_attempts:
+            log(f"Mail queue: {item.message_id} ({item.mail.kind}) fallido tras {item.attempts + 1} intentos: {message}")
+            self.backend.fail(item, now, message)
+        else:
+            self.backend.retry(item, now + self._backoff(item.attempts), message)
+
+    def _deliver(self, batch: List[QueuedMail]):
+        """Envia el lote por una sesion; si la sesion se cae, sigue con otra."""
+        remaining: Deque[QueuedMail] = deque(batch)
+        while remaining:
+            sent_in_session = 0
+            try:
+                with self.pool.connection() as conn:
+                    while remaining:
+                        item = remaining[0]
+                        try:
+                            replies = pipelined_send(conn, item.mail)
+                        except smtplib.SMTPException as e:
+                            if isinstance(e, CONNECTION_ERRORS):
+                                raise
+                            remaining.popleft()
+                            code = getattr(e, "smtp_code", None) or max(
+                                (c for c, _ in getattr(e, "recipients", {}).values()), default=0
+                            )
+                            # Sin SMTPUTF8 en el relay el mensaje no sale nunca: no se reintenta.
+                            permanent = code >= 500 or isinstance(e, smtplib.SMTPNotSupportedError)
+                            self._failed(item, e, permanent=permanent)
+                            if conn.sock is None:
+                                break
+                            conn.rset()
+                            continue
+                        except OSError:
+                            raise
+                        except Exception as e:
+                            # Un mensaje que no se puede enviar (no un error de SMTP): no tiene
+                            # sentido reintentarlo, y la sesion queda en un estado desconocido.
+                            remaining.popleft()
+                            self._failed(item, e, permanent=True)
+                            conn.close()
+                            break
+                        remaining.popleft()
+                        sent_in_session += 1
+                        refused = [addr for addr, (code, _) in replies.items() if code not in (250, 251)]
+                        error = f"Rechazados: {', '.join(refused)}" if refused else None
+                        self.backend.sent(item, time.time(), error)
+            except OSError as e:
+                if sent_in_session == 0:
+                    # El relay no responde: todo el lote espera el backoff.
+                    log(f"Mail queue: sin conexion con {self.pool.host}: {e}")
+                    while remaining:
+                        self._failed(remaining.popleft(), e, permanent=False)
+                else:
+                    self._failed(remaining.popleft(), e, permanent=False)
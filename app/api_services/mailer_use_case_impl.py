@@ -1,35 +1,77 @@
 import smtplib
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Dict, List, Type, Optional
+from functools import lru_cache
+from typing import Dict, List, Type, Optional, Union
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 
 import jinja2
 from jinja2 import FileSystemLoader, Environment
 
+from app.adapters.smtp_pool import BatchResult, SmtpConnectionPool, sendmail_envelope
 from app.domain.ports.input_port.mailer_service import IMailerUseCase
 from app.domain.ports.out_port.IToolmasterRepository import IToolmasterRepository
-from app.infrastructure.dto.mail_schema import MailBaseDTO, MailGeneralDTO, RadarMailDTO
+from app.infrastructure.dto.mail_schema import (
+    BulkMailItemResultDTO,
+    BulkMailResultDTO,
+    MailBaseDTO,
+    MailCoalesceWindowDTO,
+    MailGeneralDTO,
+    MailRecipientResultDTO,
+    OutgoingMail,
+    RadarMailDTO,
+)
 from app.utils.logger import log
 from app.utils.variable_types import ENTITY_MODEL
 
 
+@lru_cache
+def template_environment() -> Environment:
+    """Un Environment por proceso: Jinja cachea las plantillas ya compiladas."""
+    templates_path = os.path.join("app", "utils", "templates")
+    return Environment(loader=FileSystemLoader(templates_path))
+
+
+def _bulk_item_result(index: int, mail: OutgoingMail, outcome: BatchResult) -> BulkMailItemResultDTO:
+    replies, error = outcome
+    if error is not None:
+        refused = getattr(error, "recipients", {})
+        recipients = [
+            MailRecipientResultDTO(address=addr, accepted=False, code=code, message=resp.decode(errors="replace"))
+            for addr, (code, resp) in refused.items()
+        ]
+        return BulkMailItemResultDTO(
+            index=index, kind=mail.kind, status="failed", recipients=recipients,
+            error=f"{type(error).__name__}: {error}",
+        )
+    recipients = [
+        MailRecipientResultDTO(address=addr, accepted=code in (250, 251), code=code, message=message)
+        for addr, (code, message) in replies.items()
+    ]
+    status = "sent" if all(r.accepted for r in recipients) else "partial"
+    return BulkMailItemResultDTO(index=index, kind=mail.kind, status=status, recipients=recipients)
+
+
 class MailerUseCaseImpl(IMailerUseCase):
     def __init__(
         self,
         toolmaster_repository: Optional[IToolmasterRepository],
         mail_from: str = "network-monitor@cbs-cloud.com",
         mail_reply_to: str = "csc@libertynet.com, csc-ops@cwc.com",
-        ip_smtp: str = "webmail.cbs-cloud.com"
+        ip_smtp: str = "webmail.cbs-cloud.com",
+        smtp_port: int = 25,
+        smtp_pool: Optional[SmtpConnectionPool] = None,
     ):
         self.toolmaster_repository = toolmaster_repository
         self.mail_from = mail_from
         self.mail_reply_to = mail_reply_to
         self.ip_smtp = ip_smtp
-        
-        templates_path = os.path.join("app", "utils", "templates")
-        self.env = Environment(loader=FileSystemLoader(templates_path))
+        self.smtp_port = smtp_port
+        self.smtp_pool = smtp_pool
+        self.env = template_environment()
 
     def read_template(self, template_name: str):
         """
@@ -38,11 +80,25 @@ class MailerUseCaseImpl(IMailerUseCase):
         """
         return self.env.get_template(template_name)
 
+    def deliver(self, mail: OutgoingMail) -> dict:
+        """
+        Entrega el mensaje por el pool SMTP del worker (o, sin pool, por una
+        conexion nueva). Devuelve los destinatarios rechazados.
+        """
+        if self.smtp_pool is not None:
+            return self.smtp_pool.sendmail(mail.from_addr, mail.to_addrs, mail.payload)
+        with smtplib.SMTP(self.ip_smtp, self.smtp_port) as conn:
+            return sendmail_envelope(conn, mail.from_addr, mail.to_addrs, mail.payload)
+
     def send_radar_email(self, dto: MailGeneralDTO):
         """
         Envío de correo de radar.
         Usa la plantilla 'radar_template.html' y coloca dto.body dentro.
         """
+        self.deliver(self.compose_radar_email(dto))
+        return "Correo general enviado satisfactoriamente"
+
+    def compose_radar_email(self, dto: MailGeneralDTO) -> OutgoingMail:
         mail_from = self.mail_from
         mail_to_list = dto.to_mails
         mail_subject = dto.subject
@@ -61,15 +117,16 @@ class MailerUseCaseImpl(IMailerUseCase):
 
         msg.attach(MIMEText(mail_body, 'html'))
 
-        with smtplib.SMTP(self.ip_smtp) as mail:
-            mail.send_message(msg)
-
-        return "Correo general enviado satisfactoriamente"
+        return OutgoingMail.from_message(msg, "general")
     
     def send_email_radar(self, dto: RadarMailDTO):
         """
         Envía un correo usando la plantilla 'radar_template.html'.
         """
+        self.deliver(self.compose_email_radar(dto))
+        return "Correo Radar enviado satisfactoriamente"
+
+    def compose_email_radar(self, dto: RadarMailDTO) -> OutgoingMail:
         mail_from = self.mail_from
         mail_to_list = dto.to_mails
         mail_subject = (
@@ -101,10 +158,7 @@ class MailerUseCaseImpl(IMailerUseCase):
 
         msg.attach(MIMEText(mail_body, 'html'))
 
-        with smtplib.SMTP(self.ip_smtp) as mail:
-            mail.send_message(msg)
-
-        return "Correo Radar enviado satisfactoriamente"
+        return OutgoingMail.from_message(msg, "radar")
 
     def send_email_general(self, dto: MailGeneralDTO):
         """
@@ -112,6 +166,10 @@ class MailerUseCaseImpl(IMailerUseCase):
         Usa la plantilla 'general_template.html' y coloca 'dto.body' dentro.
         Es un caso generico que colocara todo lo del body en el correo
         """
+        self.deliver(self.compose_email_general(dto))
+        return "Correo general enviado satisfactoriamente"
+
+    def compose_email_general(self, dto: MailGeneralDTO) -> OutgoingMail:
         mail_from = self.mail_from
         mail_to_list = dto.to_mails
         mail_subject = dto.subject
@@ -134,30 +192,16 @@ class MailerUseCaseImpl(IMailerUseCase):
         msg.attach(MIMEText(mail_body, 'html'))
         all_recipients = mail_to_list + (dto.copy_mails or [])
 
-        with smtplib.SMTP(self.ip_smtp) as mail:
-            mail.sendmail(
-                from_addr=mail_from,
-                to_addrs=all_recipients,  # <= cc incluido
-                msg=msg.as_string()
-            )
-
-        return "Correo general enviado satisfactoriamente"
+        return OutgoingMail.from_message(msg, "general", from_addr=mail_from, to_addrs=all_recipients)  # <= cc incluido
 
     def send_email_none(self, dto: MailBaseDTO):
         """
         Envío de correo con creacion de caso proactivo, por ahora es un template de prueba.
         """
+        self.deliver(self.compose_email_none(dto))
+        return "Correo de incidente enviado satisfactoriamente"
 
-        if dto.is_major:
-            mail_to = "santiago.alvarez@cwc.com"
-            mail_bcc = dto.to_mails 
-        else:
-            mail_to = dto.to_mails
-            mail_bcc = dto.to_mails
-
-        mail_cc = "santiago.alvarez@cwc.com"
-        mail_reply_to = "csc@libertynet.com, csc-ops@cwc.com"
-
+    def compose_email_none(self, dto: MailBaseDTO) -> OutgoingMail:
         mail_subject = (
             f"{dto.ticket_id} - P - {dto.country} - {dto.customer} - SERVICIO ALARMADO"
         )
@@ -178,13 +222,51 @@ class MailerUseCaseImpl(IMailerUseCase):
         CSC Monitoring Operator
         """
 
+        return self._incident_mail(dto, mail_subject, fault_description)
+
+    def compose_email_digest(self, dto: MailBaseDTO, window: MailCoalesceWindowDTO) -> OutgoingMail:
+        """
+        Resumen de los avisos repetidos de un ticket que el NotificationCoalescer
+        suprimio durante una ventana. Va a los mismos destinatarios que el aviso.
+        """
+        first = window.first_duplicate_at
+        last = window.last_duplicate_at
+        mail_subject = (
+            f"{dto.ticket_id} - P - {dto.country} - {dto.customer} - SERVICIO ALARMADO "
+            f"({window.suppressed} avisos repetidos)"
+        )
+
+        digest_description = f"""
+        Buen día estimado cliente.<br><br>
+        Entre las {first:%H:%M} y las {last:%H:%M} del {first:%Y-%m-%d} el servicio en la sede
+        <b>{dto.branch}</b> volvió a alarmarse <b>{window.suppressed}</b> veces.<br>
+        Para no enviar un correo por cada alarma, esos avisos se agrupan en este resumen.<br><br>
+        El caso sigue en seguimiento con el equipo de conectividad local.<br><br>
+        Quedamos atentos.<br><br>
+        CSC Monitoring Operator
+        """
+
+        return self._incident_mail(dto, mail_subject, digest_description)
+
+    def _incident_mail(self, dto: MailBaseDTO, mail_subject: str, description_html: str) -> OutgoingMail:
+
+        if dto.is_major:
+            mail_to = "santiago.alvarez@cwc.com"
+            mail_bcc = dto.to_mails 
+        else:
+            mail_to = dto.to_mails
+            mail_bcc = dto.to_mails
+
+        mail_cc = "santiago.alvarez@cwc.com"
+        mail_reply_to = "csc@libertynet.com, csc-ops@cwc.com"
+
         template = self.read_template("incident_template.html")
         context = {
             "ticket_id": dto.ticket_id,
             "branch": dto.branch,
             "country": dto.country,
             "customer": dto.customer,
-            "description_html": fault_description,
+            "description_html": description_html,
             "creation_date": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
         }
         html_rendered = template.render(**context)
@@ -200,10 +282,45 @@ class MailerUseCaseImpl(IMailerUseCase):
         part_html = MIMEText(html_rendered, 'html')
         msg.attach(part_html)
 
-        with smtplib.SMTP(self.ip_smtp) as mail:
-            mail.send_message(msg)
+        return OutgoingMail.from_message(msg, "incident")
 
-        return "Correo de incidente enviado satisfactoriamente"
+    def send_bulk(self, items: List[Union[MailBaseDTO, MailGeneralDTO]], sessions: int = 2) -> BulkMailResultDTO:
+        """
+        Envía muchos correos (incidente o general) en `sessions` sesiones SMTP
+        en paralelo, con pipelining, y devuelve el resultado por destinatario
+        de cada item. Un item que no se puede armar falla solo.
+        """
+        started = time.perf_counter()
+        results: List[Optional[BulkMailItemResultDTO]] = [None] * len(items)
+        mails: List[tuple] = []
+        for index, item in enumerate(items):
+            kind = "incident" if isinstance(item, MailBaseDTO) else "general"
+            try:
+                mail = self.compose_email_none(item) if kind == "incident" else self.compose_email_general(item)
+            except Exception as e:
+                results[index] = BulkMailItemResultDTO(index=index, kind=kind, status="failed", error=str(e))
+                continue
+            mails.append((index, mail))
+
+        sessions = max(1, min(sessions, len(mails)))
+        pool = self.smtp_pool or SmtpConnectionPool(self.ip_smtp, self.smtp_port, max_size=sessions)
+        groups = [mails[k::sessions] for k in range(sessions)]
+        try:
+            with ThreadPoolExecutor(max_workers=sessions) as executor:
+                outcomes = executor.map(lambda group: pool.send_batch([mail for _, mail in group]), groups)
+                for group, group_outcomes in zip(groups, outcomes):
+                    for (index, mail), outcome in zip(group, group_outcomes):
+                        results[index] = _bulk_item_result(index, mail, outcome)
+        finally:
+            if pool is not self.smtp_pool:
+                pool.close()
+
+        counts = {"sent": 0, "partial": 0, "failed": 0}
+        for result in results:
+            counts[result.status] += 1
+        elapsed = time.perf_counter() - started
+        log(f"Mailer bulk: {len(items)} correos en {sessions} sesiones, {counts} en {elapsed:.2f}s")
+        return BulkMailResultDTO(**counts, elapsed_seconds=round(elapsed, 3), results=results)
 
     def delete(self, id_: int, model: Type[ENTITY_MODEL]):
         pass
@@ -0,0 +1,205 @@
+# app/api_services/report_batch.py
+
+import json
+import multiprocessing
+import os
+import threading
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+from app.adapters.db import TM_ENGINE, TM_SM_FACTORY
+from app.adapters.repositories.toolmaster_repository import ToolmasterRepository
+from app.api_services.report_builder import ACCOUNT_RENDERERS
+from app.api_services.report_use_case_impl import UnifiedReportUseCaseImpl
+from app.domain.ports.out_port.IChartRenderer import IChartRenderer
+from app.infrastructure.dto.report_batch_schema import BatchReportRequestDTO
+from app.infrastructure.dto.reports_schema import CustomerDTO
+from app.utils.logger import flush_logs, log
+from app.utils.metrics import report_render
+from app.utils.spooled_output import ChunkSink
+
+_worker_use_case: Optional[UnifiedReportUseCaseImpl] = None
+
+
+def _init_worker(chart_renderer: Optional[IChartRenderer]):
+    global _worker_use_case
+    # Los workers solo renderizan; no deben tocar las conexiones heredadas.
+    TM_ENGINE.dispose(close=False)
+    _worker_use_case = UnifiedReportUseCaseImpl(chart_renderer=chart_renderer)
+
+
+def _render_account(
+    report_type: str,
+    customer: CustomerDTO,
+    start_date: datetime,
+    end_date: datetime,
+    language: str,
+) -> Tuple[str, bytes]:
+    try:
+        with report_render(report_type):
+            report = ACCOUNT_RENDERERS[report_type](_worker_use_case, customer, start_date, end_date, language)
+        with report.buffer:
+            return report.filename, report.buffer.read()
+    finally:
+        flush_logs()
+
+
+class BatchReportStreamer:
+    """
+    Genera los reportes de muchas cuentas y los entrega como un ZIP en streaming.
+
+    Los datos se consultan por lotes de `chunk_size` cuentas con
+    get_customers_info, el render corre en un pool de procesos y cada reporte
+    se agrega al ZIP apenas termina; en memoria solo hay un lote de datos y
+    los reportes en vuelo, nunca el ZIP completo. Al final se agrega
+    manifest.json con el resultado de cada cuenta (ok, not_found o failed).
+
+    El pool de `workers` procesos es uno por worker de gunicorn y lo
+    comparten los requests, asi que varios batch a la vez no multiplican los
+    procesos. Si un render muere (p. ej. el OOM killer) el pool queda roto:
+    las cuentas que faltan salen como failed, el manifest se escribe igual y
+    el siguiente request crea un pool nuevo.
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        chunk_size: int = 50,
+        chart_renderer: Optional[IChartRenderer] = None,
+    ):
+        self.workers = max(1, workers)
+        self.chunk_size = max(1, chunk_size)
+        self.chart_renderer = chart_renderer
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pool_pid: Optional[int] = None
+        self._pool_lock = threading.Lock()
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        with self._pool_lock:
+            if self._pool is None or self._pool_pid != os.getpid():
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("fork"),
+                    initializer=_init_worker,
+                    initargs=(self.chart_renderer,),
+                )
+                self._pool_pid = os.getpid()
+            return self._pool
+
+    def _discard_pool(self, pool: ProcessPoolExecutor):
+        with self._pool_lock:
+            if self._pool is pool:
+                self._pool = None
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    def stream(self, request: BatchReportRequestDTO) -> Iterator[bytes]:
+        sink = ChunkSink()
+        archive = zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_STORED)
+        names: Set[str] = set()
+        entries: Dict[str, dict] = {}
+        language = request.language.lower()
+
+        session = TM_SM_FACTORY()
+        pool = self._get_pool()
+        pending: Dict[Future, str] = {}
+
+        def add_finished(futures) -> bytes:
+            for future in futures:
+                sf_account_id = pending.pop(future)
+                try:
+                    filename, data = future.result()
+                except Exception as e:
+                    log(f"Batch report {request.report_type} {sf_account_id} failed: {e}")
+                    entries[sf_account_id] = {"status": "failed", "error": str(e)}
+                    if isinstance(e, BrokenProcessPool):
+                        self._discard_pool(pool)
+                    continue
+                name = self._unique_name(filename, sf_account_id, names)
+                archive.writestr(zipfile.ZipInfo(name, datetime.now().timetuple()[:6]), data)
+                entries[sf_account_id] = {"status": "ok", "filename": name, "size": len(data)}
+            return sink.drain()
+
+        try:
+            repo = ToolmasterRepository(session=session)
+            if request.sf_account_ids:
+                sf_account_ids = list(dict.fromkeys(request.sf_account_ids))
+            else:
+                sf_account_ids = repo.get_sf_account_ids_by_country(request.country)
+
+            try:
+                for i in range(0, len(sf_account_ids), self.chunk_size):
+                    chunk = sf_account_ids[i:i + self.chunk_size]
+                    customers = repo.get_customers_info(chunk, request.start_date, request.end_date)
+                    for sf_account_id in chunk:
+                        customer = customers.get(sf_account_id)
+                        if customer is None:
+                            entries[sf_account_id] = {"status": "not_found"}
+                            continue
+                        future = pool.submit(
+                            _render_account, request.report_type, customer,
+                            request.start_date, request.end_date, language,
+                        )
+                        pending[future] = sf_account_id
+                    # Entrega lo que ya termino y limita los renders en vuelo antes
+                    # de consultar el siguiente lote.
+                    done, _ = wait(list(pending), timeout=0)
+                    if data := add_finished(done):
+                        yield data
+                    while len(pending) > 2 * self.workers:
+                        done, _ = wait(list(pending), return_when=FIRST_COMPLETED)
+                        if data := add_finished(done):
+                            yield data
+            except Exception as e:
+                # BrokenProcessPool (un render murio) o la base: el resto del lote no se
+                # intenta, pero lo ya generado y el manifest se entregan igual.
+                log(f"Batch report {request.report_type}: lote interrumpido: {type(e).__name__}: {e}")
+                self._discard_pool(pool)
+                in_flight = set(pending.values())
+                for sf_account_id in sf_account_ids:
+                    if sf_account_id not in entries and sf_account_id not in in_flight:
+                        entries[sf_account_id] = {"status": "failed", "error": f"{type(e).__name__}: {e}"}
+            session.close()
+
+            while pending:
+                done, _ = wait(list(pending), return_when=FIRST_COMPLETED)
+                if data := add_finished(done):
+                    yield data
+
+            manifest = self._manifest(request, sf_account_ids, entries)
+            archive.writestr("manifest.json", json.dumps(manifest, ensure_ascii=False, indent=2), zipfile.ZIP_DEFLATED)
+            archive.close()
+            yield sink.drain()
+        finally:
+            # Si el cliente se desconecta no se esperan los renders pendientes (el pool es compartido).
+            for future in pending:
+                future.cancel()
+            session.close()
+
+    @staticmethod
+    def _unique_name(filename: str, sf_account_id: str, names: Set[str]) -> str:
+        name = filename
+        if name in names:
+            stem, ext = os.path.splitext(filename)
+            name = f"{stem}_{sf_account_id}{ext}"
+        names.add(name)
+        return name
+
+    @staticmethod
+    def _manifest(request: BatchReportRequestDTO, sf_account_ids: List[str], entries: Dict[str, dict]) -> dict:
+        accounts = [{"sf_account_id": sf_account_id, **entries[sf_account_id]} for sf_account_id in sf_account_ids]
+        counts = {"ok": 0, "not_found": 0, "failed": 0}
+        for entry in accounts:
+            counts[entry["status"]] += 1
+        return {
+            "report_type": request.report_type,
+            "start_date": request.start_date.isoformat(),
+            "end_date": request.end_date.isoformat(),
+            "language": request.language,
+            "country": request.country,
+            "requested": len(sf_account_ids),
+            **counts,
+            "accounts": accounts,
+        }
@@ -0,0 +1,399 @@
+# app/api_services/report_builder.py
+
+from datetime import datetime
+from typing import BinaryIO, Callable, Dict, NamedTuple, Optional, Tuple
+import os
+
+from unidecode import unidecode
+
+from app.adapters.report_artifact_store import ReportArtifactStore, StoredArtifact, artifact_key
+from app.adapters.repositories.toolmaster_repository import ToolmasterRepository
+from app.api_services.report_dataset import ReportDataset
+from app.domain.ports.input_port.report_service import IWordReportUseCase
+from app.infrastructure.dto.reports_schema import (
+    ChangeDTO,
+    CustomerDTO,
+    IncidentDTO,
+    ServiceRequestDTO,
+    WordReportDTO,
+    WorklogDTO,
+)
+from app.utils.errors import AppError, ErrorType
+from app.utils.metrics import cache_result, report_render
+from app.utils.template_cache import template_cache
+
+DOCX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+XLSX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+MONTHS_ES = [
+    "ENERO",
+    "FEBRERO",
+    "MARZO",
+    "ABRIL",
+    "MAYO",
+    "JUNIO",
+    "JULIO",
+    "AGOSTO",
+    "SEPTIEMBRE",
+    "OCTUBRE",
+    "NOVIEMBRE",
+    "DICIEMBRE",
+]
+MONTHS_EN = [
+    "JANUARY",
+    "FEBRUARY",
+    "MARCH",
+    "APRIL",
+    "MAY",
+    "JUNE",
+    "JULY",
+    "AUGUST",
+    "SEPTEMBER",
+    "OCTOBER",
+    "NOVEMBER",
+    "DECEMBER",
+]
+
+
+class ReportFile(NamedTuple):
+    buffer: BinaryIO
+    filename: str
+    media_type: str
+
+
+def _sanitize(name: str) -> str:
+    return unidecode((name or "NO_NAME").upper()).replace(" ", "_")
+
+
+def _build_filename(
+    prefix_es: str,
+    prefix_en: str,
+    client_name: str,
+    language: str,
+    start_date: datetime | None = None,
+    end_date: datetime | None = None,
+    extension: str = "docx",
+    extra_part: str | None = None,
+) -> str:
+    months = MONTHS_ES if language.lower() == "es" else MONTHS_EN
+    prefix = prefix_es if language.lower() == "es" else prefix_en
+    name = _sanitize(client_name)
+    if start_date and end_date:
+        same_month_year = (
+            start_date.year == end_date.year and start_date.month == end_date.month
+        )
+        sm = months[start_date.month - 1]
+        em = months[end_date.month - 1]
+        date_part = (
+            f"{sm}_{start_date.year}"
+            if same_month_year
+            else f"{sm}_{start_date.year}_{em}_{end_date.year}"
+        )
+    else:
+        date_part = extra_part or datetime.utcnow().strftime("%Y%m%d")
+    return f"{prefix}_{name}_{date_part}.{extension}"
+
+
+def _get_customer(repo: ToolmasterRepository, sf_account_id: str, start_date: datetime, end_date: datetime) -> CustomerDTO:
+    c_dto = repo.get_customer_info(sf_account_id, start_date, end_date)
+    if not c_dto:
+        raise AppError(ErrorType.NOT_FOUND, "No se encontró la cuenta con ese SF ID")
+    return c_dto
+
+
+def render_monthly_report(
+    use_case: IWordReportUseCase,
+    c_dto: CustomerDTO,
+    start_date: datetime,
+    end_date: datetime,
+    language: str = "es",
+) -> ReportFile:
+    dto = WordReportDTO(
+        cust=c_dto.name,
+        language=language.lower(),
+        start_date=start_date,
+        end_date=end_date,
+        incidentes=c_dto.incidents,
+        service_requests=c_dto.service_requests,
+        cambios=c_dto.changes,
+        customers=[c_dto],
+    )
+    buf = use_case.generate_monthly_report(dto, dataset=ReportDataset.from_customer(c_dto))
+    buf.seek(0)
+    filename = _build_filename(
+        "REPORTE_DISPONIBILIDAD",
+        "MONTHLY_REPORT",
+        c_dto.name,
+        language,
+        start_date,
+        end_date,
+    )
+    return ReportFile(buf, filename, DOCX_MEDIA_TYPE)
+
+
+def render_incident_report(
+    use_case: IWordReportUseCase,
+    c_dto: CustomerDTO,
+    start_date: datetime,
+    end_date: datetime,
+    language: str = "es",
+) -> ReportFile:
+    dto = WordReportDTO(
+        cust=c_dto.name,
+        language=language.lower(),
+        start_date=start_date,
+        end_date=end_date,
+        incidentes=c_dto.incidents,
+        customers=[c_dto],
+    )
+    buf = use_case.generate_incidents_report(dto, dataset=ReportDataset.from_customer(c_dto))
+    buf.seek(0)
+    filename = _build_filename(
+        "REPORTE_INCIDENCIAS",
+        "INCIDENTS_REPORT",
+        c_dto.name,
+        language,
+        start_date,
+        end_date,
+    )
+    return ReportFile(buf, filename, DOCX_MEDIA_TYPE)
+
+
+def render_saso_report(
+    use_case: IWordReportUseCase,
+    c_dto: CustomerDTO,
+    start_date: datetime,
+    end_date: datetime,
+    language: str = "en",
+) -> ReportFile:
+    # El SASO solo existe en ingles; language se acepta por uniformidad.
+    dto = WordReportDTO(
+        cust=c_dto.name,
+        start_date=start_date,
+        end_date=end_date,
+        incidentes=c_dto.incidents,
+        service_requests=c_dto.service_requests,
+        cambios=c_dto.changes,
+        customers=[c_dto],
+    )
+    result_buffer = use_case.generate_saso_excel_report(dto, dataset=ReportDataset.from_customer(c_dto))
+    result_buffer.seek(0)
+    filename = _build_filename(
+        "SERVICES_AND_SUPPORT_REPORT",
+        "SERVICES_AND_SUPPORT_REPORT",
+        c_dto.name,
+        "en",
+        start_date,
+        end_date,
+        extension="xlsx",
+    )
+    return ReportFile(result_buffer, filename, XLSX_MEDIA_TYPE)
+
+
+def build_monthly_report(
+    repo: ToolmasterRepository,
+    use_case: IWordReportUseCase,
+    sf_account_id: str,
+    start_date: datetime,
+    end_date: datetime,
+    language: str = "es",
+) -> ReportFile:
+    c_dto = _get_customer(repo, sf_account_id, start_date, end_date)
+    return render_monthly_report(use_case, c_dto, start_date, end_date, language)
+
+
+def build_incident_report(
+    repo: ToolmasterRepository,
+    use_case: IWordReportUseCase,
+    sf_account_id: str,
+    start_date: datetime,
+    end_date: datetime,
+    language: str = "es",
+) -> ReportFile:
+    c_dto = _get_customer(repo, sf_account_id, start_date, end_date)
+    return render_incident_report(use_case, c_dto, start_date, end_date, language)
+
+
+def build_saso_report(
+    repo: ToolmasterRepository,
+    use_case: IWordReportUseCase,
+    sf_account_id: str,
+    start_date: datetime,
+    end_date: datetime,
+) -> ReportFile:
+    c_dto = _get_customer(repo, sf_account_id, start_date, end_date)
+    return render_saso_report(use_case, c_dto, start_date, end_date)
+
+
+def build_case_report(
+    repo: ToolmasterRepository,
+    use_case: IWordReportUseCase,
+    case_number: str,
+    language: str = "es",
+) -> ReportFile:
+    result_case = repo.get_case_by_number(case_number)
+    if not result_case:
+        raise AppError(ErrorType.NOT_FOUND, "No se encontró el caso.")
+    row = result_case["data"]
+    tipo = result_case["type"]
+    account_name = row.get("account_name", "NO_ACCOUNT")
+    inc_list, sr_list, ch_list = [], [], []
+    if tipo == "incident":
+        inc_list = [IncidentDTO(**row)]
+    elif tipo == "sr":
+        sr_list = [ServiceRequestDTO(**row)]
+    elif tipo == "change":
+        ch_list = [ChangeDTO(**row)]
+    wl_rows = repo.get_worklogs_by_case_number(case_number)
+    w_list = [WorklogDTO(**w) for w in wl_rows]
+    cust_dto = CustomerDTO(name=account_name, worklogs=w_list)
+    dto = WordReportDTO(
+        cust=account_name,
+        incidentes=inc_list,
+        service_requests=sr_list,
+        cambios=ch_list,
+        customers=[cust_dto],
+        language=language,
+    )
+    result_buffer = use_case.generate_single_case_report(case_number, dto)
+    result_buffer.seek(0)
+    filename = _build_filename(
+        "REPORTE_DE_CASO",
+        "CASE_REPORT",
+        account_name,
+        language,
+        extra_part=case_number,
+    )
+    return ReportFile(result_buffer, filename, DOCX_MEDIA_TYPE)
+
+
+def build_rfo_report(
+    repo: ToolmasterRepository,
+    use_case: IWordReportUseCase,
+    incident_number: str,
+    language: str = "es",
+) -> ReportFile:
+    result = repo.get_case_by_number(incident_number)
+    if not result or result["type"] != "incident":
+        raise AppError(ErrorType.NOT_FOUND, "No se encontró la incidencia.")
+
+    row = result["data"]
+    inc_dto = IncidentDTO(**row)
+
+    if language.lower() == "es" and inc_dto.priority:
+        inc_dto.priority = {
+            "Planning": "Planeación",
+            "Low": "Baja",
+            "Medium": "Media",
+            "High": "Alta",
+            "Critical": "Crítica",
+        }.get(inc_dto.priority, inc_dto.priority)
+
+    cust_country = row.get("country_name") or ""
+    cust_assets = row.get("product_categories") or ""
+    subject_raw = (row.get("subject") or "").strip()
+    subject_clean = (
+        "_".join(subject_raw.split())[:60] if subject_raw else "SIN_ASUNTO"
+    )
+
+    dto = WordReportDTO(
+        cust=subject_clean,
+        cust_country=cust_country,
+        cust_assets=cust_assets,
+        incidentes=[inc_dto],
+        language=language,
+    )
+
+    template_file = (
+        "Informe_RFO.docx" if language.lower() == "es" else "RFO_Report.docx"
+    )
+    template_path = os.path.join(use_case.templates_path, template_file)
+
+    buf = use_case.generate_incident_overview_report(dto, template_path=template_path)
+    buf.seek(0)
+
+    filename = _build_filename(
+        "REPORTE_DE_RFO",
+        "RFO_REPORT",
+        subject_clean,
+        language,
+    )
+    return ReportFile(buf, filename, DOCX_MEDIA_TYPE)
+
+
+# report_type -> render(use_case, customer, start_date, end_date, language) para
+# los reportes por cuenta y rango, cuando los datos ya vienen consultados.
+ACCOUNT_RENDERERS: Dict[str, Callable[..., ReportFile]] = {
+    "monthly": render_monthly_report,
+    "incident": render_incident_report,
+    "saso": render_saso_report,
+}
+
+# report_type -> builder(repo, use_case, **params); shared by the async jobs.
+REPORT_BUILDERS: Dict[str, Callable[..., ReportFile]] = {
+    "monthly": build_monthly_report,
+    "incident": build_incident_report,
+    "saso": build_saso_report,
+    "case": build_case_report,
+    "rfo": build_rfo_report,
+}
+
+
+def build_report(
+    report_type: str,
+    repo: ToolmasterRepository,
+    use_case: IWordReportUseCase,
+    params: Optional[dict] = None,
+) -> ReportFile:
+    builder = REPORT_BUILDERS.get(report_type)
+    if builder is None:
+        raise AppError(ErrorType.BAD_REQUEST, f"Tipo de reporte no soportado: {report_type}")
+    with report_render(report_type):
+        return builder(repo, use_case, **(params or {}))
+
+
+# Reportes por cuenta y rango, cacheables por version de datos.
+CACHEABLE_REPORTS = ("monthly", "incident", "saso")
+# Subir cuando cambia como se arman los reportes cacheables (calculos,
+# tablas, graficos): los .docx/.xlsx guardados con la version anterior dejan
+# de servirse. Los cambios de plantilla ya cambian la llave solos.
+RENDERER_VERSION = "2"
+DEFAULT_TEMPLATES_PATH = "app/utils/templates"
+
+
+def get_or_build_report(
+    report_type: str,
+    repo: ToolmasterRepository,
+    use_case: IWordReportUseCase,
+    store: ReportArtifactStore,
+    sf_account_id: str,
+    start_date: datetime,
+    end_date: datetime,
+    language: str = "es",
+) -> Tuple[StoredArtifact, bool]:
+    """
+    Devuelve el reporte desde el store si los datos de la cuenta no cambiaron
+    (unas pocas consultas de agregados); si no, lo genera y lo guarda.
+    El segundo valor indica si fue un hit.
+    """
+    if report_type not in CACHEABLE_REPORTS:
+        raise AppError(ErrorType.BAD_REQUEST, f"Tipo de reporte no cacheable: {report_type}")
+    data_version = repo.get_customer_data_version(sf_account_id, start_date, end_date)
+    if data_version is None:
+        raise AppError(ErrorType.NOT_FOUND, "No se encontró la cuenta con ese SF ID")
+    params = {"sf_account_id": sf_account_id, "start_date": start_date, "end_date": end_date}
+    if report_type == "saso":
+        # El SASO siempre sale en ingles.
+        language = "en"
+    else:
+        params["language"] = language
+    templates = template_cache.fingerprint(getattr(use_case, "templates_path", DEFAULT_TEMPLATES_PATH))
+    renderer_version = f"{RENDERER_VERSION}:{templates}"
+    key = artifact_key(report_type, sf_account_id, start_date, end_date, language, data_version, renderer_version)
+    cached = store.get(key)
+    cache_result("report", bool(cached))
+    if cached:
+        return cached, True
+    report = build_report(report_type, repo, use_case, params)
+    with report.buffer:
+        return store.put(key, report.buffer, report.filename, report.media_type), False
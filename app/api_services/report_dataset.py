@@ -0,0 +1,170 @@
+# app/api_services/report_dataset.py
+
+from collections import defaultdict
+from datetime import datetime
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+from unidecode import unidecode
+
+from app.infrastructure.dto.reports_schema import (
+    ChangeDTO,
+    CustomerDTO,
+    IncidentDTO,
+    ServiceRequestDTO,
+    WordReportDTO,
+)
+
+ATTRIB_MAP = {
+    "C&W": "Liberty Networks",
+    "C&W Human Error": "Liberty Networks",
+    "C&W Implementation": "Liberty Networks",
+    "C&W Inside Plant": "Liberty Networks",
+    "C&W Maintenance Window": "Liberty Networks",
+    "C&W Outside Plant": "Liberty Networks",
+    "Carrier": "Liberty Networks",
+    "Provider": "Liberty Networks",
+    "Tier 1 Support": "Liberty Networks",
+    "Tier 2 Support": "Liberty Networks",
+    "Tier 3 Support": "Liberty Networks",
+    "Customer": "Cliente",
+    "Force Majeure": "Fuerza Mayor"
+}
+
+AVAILABILITY_KEYS = ["circuit_id", "product_family", "address"]
+
+CLOSED_TICKET_STATUSES = ("resolved", "closed")
+CLOSED_CHANGE_STATUSES = ("closed", "review", "completed")
+CANCELED_STATUS = "canceled"
+
+
+@lru_cache(maxsize=16384)
+def remove_accents(text: str) -> str:
+    # Los mismos circuitos, direcciones y valores de catalogo se repiten en
+    # miles de filas: unidecode corre una vez por texto distinto.
+    if not text:
+        return text
+    return unidecode(text)
+
+
+def strip_accents_column(column: pd.Series) -> pd.Series:
+    """Quita las tildes de una columna mapeando cada valor distinto una sola vez."""
+    mapping = {value: remove_accents(value) for value in column.dropna().unique()}
+    return column.map(mapping)
+
+
+def _naive(value: Optional[datetime]) -> Optional[datetime]:
+    return value.replace(tzinfo=None) if value is not None and value.tzinfo else value
+
+
+def _partition(items: list, closed_statuses: Tuple[str, ...]) -> Tuple[list, list]:
+    closed, opened = [], []
+    for item in items:
+        st = item.status.strip().lower() if item.status else ""
+        if st in closed_statuses:
+            closed.append(item)
+        elif st != CANCELED_STATUS:
+            opened.append(item)
+    return closed, opened
+
+
+class ReportDataset:
+    """
+    Datos de una cuenta preparados una sola vez por reporte.
+
+    Las particiones por estado, los grupos de atribucion y el indice por
+    circuito se calculan aqui y los consumen las tablas, las graficas y el
+    reporte unificado, en lugar de que cada uno vuelva a recorrer los DTOs.
+    Los textos sin tildes salen de remove_accents, con cache por valor.
+    """
+
+    def __init__(
+        self,
+        incidents: List[IncidentDTO],
+        service_requests: List[ServiceRequestDTO],
+        changes: List[ChangeDTO],
+        customer: Optional[CustomerDTO] = None,
+    ):
+        self.customer = customer
+        self.incidents = incidents
+        self.service_requests = service_requests
+        self.changes = changes
+
+        self.closed_incidents, self.open_incidents = _partition(incidents, CLOSED_TICKET_STATUSES)
+        self.closed_srs, self.open_srs = _partition(service_requests, CLOSED_TICKET_STATUSES)
+        self.closed_changes, self.open_changes = _partition(changes, CLOSED_CHANGE_STATUSES)
+
+        # attributed_to tal cual -> incidentes cerrados. Cada consumidor mapea
+        # la llave del grupo una vez y no una vez por incidente.
+        self.attribution_buckets: Dict[str, List[IncidentDTO]] = defaultdict(list)
+        # circuit_id tal cual -> incidentes cerrados que tocan ese circuito.
+        self.circuit_index: Dict[str, List[IncidentDTO]] = defaultdict(list)
+        for inc in self.closed_incidents:
+            self.attribution_buckets[inc.attributed_to or ""].append(inc)
+            for asset in inc.assets:
+                if asset.circuit_id:
+                    self.circuit_index[asset.circuit_id].append(inc)
+
+        self._availability_frame: Optional[pd.DataFrame] = None
+
+    @classmethod
+    def from_customer(cls, customer: CustomerDTO) -> "ReportDataset":
+        return cls(
+            incidents=customer.incidents,
+            service_requests=customer.service_requests,
+            changes=customer.changes,
+            customer=customer,
+        )
+
+    @classmethod
+    def from_report_dto(cls, dto: WordReportDTO) -> "ReportDataset":
+        return cls(
+            incidents=dto.incidentes,
+            service_requests=dto.service_requests,
+            changes=dto.cambios,
+            customer=dto.customers[0] if dto.customers else None,
+        )
+
+    def attribution_category(self, attributed_to: str) -> str:
+        """Categoria de atribucion usada por las tablas de disponibilidad."""
+        attrib = remove_accents(attributed_to) or ""
+        return ATTRIB_MAP.get(attrib, attrib)
+
+    @property
+    def liberty_incidents(self) -> List[IncidentDTO]:
+        keys = {
+            key for key in self.attribution_buckets
+            if self.attribution_category(key) == "Liberty Networks"
+        }
+        return [inc for inc in self.closed_incidents if (inc.attributed_to or "") in keys]
+
+    @property
+    def availability_frame(self) -> pd.DataFrame:
+        """Una fila por (incidente de Liberty Networks, activo) con su ventana de caida; se arma una vez por dataset."""
+        if self._availability_frame is None:
+            self._availability_frame = self._build_availability_frame()
+        return self._availability_frame
+
+    def _build_availability_frame(self) -> pd.DataFrame:
+        records = []
+        for inc in self.liberty_incidents:
+            window = (_naive(inc.created_at), _naive(inc.start_at_dw), _naive(inc.end_at_dw))
+            downtime_val = inc.downtime if inc.downtime else 0
+            incident_number = inc.incident_number or ""
+            if inc.assets:
+                for asset in inc.assets:
+                    records.append((
+                        *window, asset.circuit_id or None, asset.product_family or None,
+                        asset.location or "N/A", incident_number, downtime_val
+                    ))
+            else:
+                records.append((*window, None, None, "N/A", incident_number, downtime_val))
+        df = pd.DataFrame(
+            records,
+            columns=["created_at", "start_at_dw", "end_at_dw", *AVAILABILITY_KEYS, "incident_number", "downtime"]
+        )
+        for col in [*AVAILABILITY_KEYS, "incident_number"]:
+            df[col] = strip_accents_column(df[col].astype(object))
+        df["downtime"] = pd.to_numeric(df["downtime"], errors="coerce").fillna(0)
+        return df
@@ -0,0 +1,375 @@
+# app/api_services/report_job_manager.py
+
+import fcntl
+import multiprocessing
+import os
+import re
+import tempfile
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import BinaryIO, Dict, List, Optional, Set, Tuple
+
+from app.adapters.db import TM_ENGINE, TM_SM_FACTORY
+from app.adapters.repositories.toolmaster_repository import ToolmasterRepository
+from app.api_services.report_builder import build_report
+from app.api_services.report_use_case_impl import UnifiedReportUseCaseImpl
+from app.domain.ports.out_port.IChartRenderer import IChartRenderer
+from app.infrastructure.dto.report_job_schema import (
+    FINISHED_STATUSES,
+    ReportJobDTO,
+    ReportJobRequestDTO,
+)
+from app.utils.errors import AppError
+from app.utils.logger import flush_logs, log
+
+JOB_ID_RE = re.compile(r"[0-9a-f]{32}")
+
+
+def available_cores() -> int:
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+class ReportJobStore:
+    """
+    Estado de los jobs en disco: <id>.json (estado), <id>.out (archivo
+    generado) y <id>.cancel (cancelacion pedida). Al vivir en disco, cualquier
+    worker de gunicorn puede responder el estado o la descarga de un job.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def _path(self, job_id: str, suffix: str) -> str:
+        return os.path.join(self.root, f"{job_id}.{suffix}")
+
+    def artifact_path(self, job_id: str) -> str:
+        return self._path(job_id, "out")
+
+    def _write_atomic(self, path: str, data: bytes):
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def save(self, job: ReportJobDTO):
+        self._write_atomic(self._path(job.job_id, "json"), job.model_dump_json(exclude={"cancel_requested"}).encode())
+
+    def write_artifact(self, job_id: str, stream: BinaryIO) -> int:
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            while chunk := stream.read(1024 * 1024):
+                f.write(chunk)
+            size = f.tell()
+        os.replace(tmp_path, self.artifact_path(job_id))
+        return size
+
+    def create(self, request: ReportJobRequestDTO) -> ReportJobDTO:
+        job = ReportJobDTO(
+            job_id=uuid.uuid4().hex,
+            status="queued",
+            request=request,
+            submitted_at=datetime.utcnow(),
+        )
+        self.save(job)
+        return job
+
+    def get(self, job_id: str) -> Optional[ReportJobDTO]:
+        if not JOB_ID_RE.fullmatch(job_id):
+            return None
+        try:
+            with open(self._path(job_id, "json"), "rb") as f:
+                job = ReportJobDTO.model_validate_json(f.read())
+        except FileNotFoundError:
+            return None
+        job.cancel_requested = self.cancel_requested(job_id)
+        return job
+
+    def cancel_requested(self, job_id: str) -> bool:
+        return os.path.exists(self._path(job_id, "cancel"))
+
+    def request_cancel(self, job_id: str):
+        with open(self._path(job_id, "cancel"), "w"):
+            pass
+
+    def job_ids(self) -> Set[str]:
+        """Ids con estado en disco, sin leer los archivos."""
+        return {name[:-5] for name in os.listdir(self.root) if name.endswith(".json") and JOB_ID_RE.fullmatch(name[:-5])}
+
+    def saved_at(self, job_id: str) -> Optional[float]:
+        """mtime del estado: la hora del ultimo save (para un job terminado, su fin)."""
+        try:
+            return os.path.getmtime(self._path(job_id, "json"))
+        except FileNotFoundError:
+            return None
+
+    def list_jobs(self) -> List[ReportJobDTO]:
+        jobs = []
+        for job_id in self.job_ids():
+            job = self.get(job_id)
+            if job:
+                jobs.append(job)
+        jobs.sort(key=lambda j: j.submitted_at)
+        return jobs
+
+    def delete(self, job_id: str):
+        for suffix in ("out", "cancel", "json"):
+            try:
+                os.remove(self._path(job_id, suffix))
+            except FileNotFoundError:
+                pass
+
+    def remove_stale_temp_files(self, max_age_seconds: float):
+        now = time.time()
+        for name in os.listdir(self.root):
+            if name.endswith(".tmp"):
+                path = os.path.join(self.root, name)
+                try:
+                    if now - os.path.getmtime(path) > max_age_seconds:
+                        os.remove(path)
+                except FileNotFoundError:
+                    pass
+
+
+def _run_job(root: str, job_id: str, lock_fd: int, chart_renderer: Optional[IChartRenderer]):
+    """Cuerpo del proceso hijo: genera el reporte y deja el resultado en disco."""
+    # El hijo hereda el lock del dispatcher y las conexiones del pool de la
+    # BD del padre; no debe retener el primero ni reutilizar las segundas.
+    os.close(lock_fd)
+    TM_ENGINE.dispose(close=False)
+
+    store = ReportJobStore(root)
+    job = store.get(job_id)
+    session = TM_SM_FACTORY()
+    try:
+        use_case = UnifiedReportUseCaseImpl(chart_renderer=chart_renderer)
+        report = build_report(
+            job.request.report_type,
+            ToolmasterRepository(session=session),
+            use_case,
+            job.request.builder_params(),
+        )
+        with report.buffer:
+            job.size = store.write_artifact(job_id, report.buffer)
+        job.filename = report.filename
+        job.media_type = report.media_type
+        job.status = "done"
+    except AppError as app_err:
+        job.status = "failed"
+        job.error = app_err.message
+    except Exception as e:
+        log(f"Report job {job_id} failed: {e}")
+        job.status = "failed"
+        job.error = str(e)
+    finally:
+        session.close()
+    job.finished_at = datetime.utcnow()
+    try:
+        store.save(job)
+    finally:
+        flush_logs()  # el hijo sale con os._exit: sin esto se pierden sus logs
+
+
+class ReportJobManager:
+    """
+    Cola de reportes asincronos.
+
+    Todos los workers aceptan jobs (los escriben en disco como "queued"),
+    pero solo uno a la vez es el dispatcher: el que obtiene el flock de
+    dispatcher.lock. Este lanza cada job en un proceso aparte, con un maximo
+    de `workers` procesos simultaneos en el host, y aplica el timeout, las
+    cancelaciones y el TTL de los archivos generados. Si el worker dispatcher
+    muere, otro toma el lock y los jobs que quedaron corriendo se marcan como
+    fallidos.
+
+    El dispatcher lleva en memoria los ids en cola y en ejecucion: en cada
+    vuelta lista el directorio, lee solo los estados que no habia visto y
+    relee solo los de esos jobs, no todos los retenidos hasta el TTL.
+    """
+
+    def __init__(
+        self,
+        root: str,
+        workers: int = 0,
+        timeout_seconds: int = 600,
+        ttl_seconds: int = 3600,
+        chart_renderer: Optional[IChartRenderer] = None,
+        poll_interval: float = 0.5,
+    ):
+        self.store = ReportJobStore(root)
+        self.workers = workers if workers > 0 else available_cores()
+        self.timeout_seconds = timeout_seconds
+        self.ttl_seconds = ttl_seconds
+        self.chart_renderer = chart_renderer
+        self.poll_interval = poll_interval
+        self._mp = multiprocessing.get_context("fork")
+        self._running: Dict[str, Tuple[multiprocessing.Process, float]] = {}
+        self._queued: Dict[str, datetime] = {}  # job_id -> submitted_at
+        self._seen: Set[str] = set()  # ids cuyo estado ya se leyo al menos una vez
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock_fd: Optional[int] = None
+        self._last_cleanup = 0.0
+
+    # --- API usada por el router (cualquier worker) ---
+
+    def submit(self, request: ReportJobRequestDTO) -> ReportJobDTO:
+        return self.store.create(request)
+
+    def get(self, job_id: str) -> Optional[ReportJobDTO]:
+        return self.store.get(job_id)
+
+    def cancel(self, job_id: str) -> Optional[ReportJobDTO]:
+        job = self.store.get(job_id)
+        if job is None or job.status in FINISHED_STATUSES:
+            return job
+        self.store.request_cancel(job_id)
+        job.cancel_requested = True
+        return job
+
+    def artifact_path(self, job_id: str) -> str:
+        return self.store.artifact_path(job_id)
+
+    # --- Dispatcher ---
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._dispatch_loop, name="report-jobs", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        for job_id, (process, _) in list(self._running.items()):
+            self._terminate(process)
+            self._finish(job_id, "failed", "El servidor se detuvo durante la generacion")
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        if self._lock_fd is not None:
+            os.close(self._lock_fd)
+            self._lock_fd = None
+
+    def _acquire_dispatcher_lock(self) -> bool:
+        fd = os.open(os.path.join(self.store.root, "dispatcher.lock"), os.O_RDWR | os.O_CREAT, 0o644)
+        while not self._stop.is_set():
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                self._lock_fd = fd
+                return True
+            except BlockingIOError:
+                self._stop.wait(1.0)
+        os.close(fd)
+        return False
+
+    def _dispatch_loop(self):
+        if not self._acquire_dispatcher_lock():
+            return
+        log(f"Report jobs: dispatcher activo en pid {os.getpid()} con {self.workers} procesos")
+        for job in self.store.list_jobs():
+            if job.status == "running":
+                self._finish(job.job_id, "failed", "El worker que generaba el reporte se detuvo")
+        while not self._stop.is_set():
+            try:
+                self._reap()
+                self._start_queued()
+                if time.monotonic() - self._last_cleanup > 60:
+                    self._cleanup()
+                    self._last_cleanup = time.monotonic()
+            except Exception as e:
+                log(f"Report jobs: error en el dispatcher: {e}")
+            self._stop.wait(self.poll_interval)
+
+    def _discover(self):
+        """Suma al indice los jobs nuevos en disco (los encola cualquier worker)."""
+        ids = self.store.job_ids()
+        self._seen &= ids
+        for job_id in ids - self._seen:
+            self._seen.add(job_id)
+            job = self.store.get(job_id)
+            if job and job.status == "queued":
+                self._queued[job_id] = job.submitted_at
+
+    def _start_queued(self):
+        self._discover()
+        free = self.workers - len(self._running)
+        if free <= 0:
+            return
+        for job_id in sorted(self._queued, key=self._queued.__getitem__):
+            job = self.store.get(job_id)
+            if job is None or job.status != "queued":
+                del self._queued[job_id]
+                continue
+            if job.cancel_requested:
+                del self._queued[job_id]
+                self._finish(job.job_id, "canceled")
+                continue
+            if free <= 0:
+                break
+            del self._queued[job_id]
+            job.status = "running"
+            job.started_at = datetime.utcnow()
+            self.store.save(job)
+            process = self._mp.Process(
+                target=_run_job,
+                args=(self.store.root, job.job_id, self._lock_fd, self.chart_renderer),
+                name=f"report-job-{job.job_id}",
+                daemon=True,
+            )
+            process.start()
+            self._running[job.job_id] = (process, time.monotonic())
+            free -= 1
+
+    def _reap(self):
+        now = time.monotonic()
+        for job_id, (process, started) in list(self._running.items()):
+            if not process.is_alive():
+                process.join()
+                del self._running[job_id]
+                job = self.store.get(job_id)
+                if job and job.status == "running":
+                    self._finish(job_id, "failed", f"El proceso de generacion termino con codigo {process.exitcode}")
+            elif self.store.cancel_requested(job_id):
+                self._terminate(process)
+                del self._running[job_id]
+                self._finish(job_id, "canceled")
+            elif now - started > self.timeout_seconds:
+                self._terminate(process)
+                del self._running[job_id]
+                self._finish(job_id, "timed_out", f"Se supero el limite de {self.timeout_seconds}s")
+
+    def _terminate(self, process: multiprocessing.Process):
+        process.terminate()
+        process.join(5)
+        if process.is_alive():
+            process.kill()
+            process.join()
+
+    def _finish(self, job_id: str, status: str, error: Optional[str] = None):
+        # Releido despues de terminar el proceso: si el hijo alcanzo a guardar
+        # su estado final (y el artefacto), ese gana sobre canceled/timed_out.
+        job = self.store.get(job_id)
+        if job is None or job.status in FINISHED_STATUSES:
+            return
+        job.status = status
+        job.error = error
+        job.finished_at = datetime.utcnow()
+        self.store.save(job)
+
+    def _cleanup(self):
+        expire_before = datetime.utcnow() - timedelta(seconds=self.ttl_seconds)
+        saved_before = time.time() - self.ttl_seconds
+        for job_id in self.store.job_ids():
+            if job_id in self._queued or job_id in self._running:
+                continue
+            # Solo se leen los estados sin cambios desde hace mas que el TTL.
+            saved_at = self.store.saved_at(job_id)
+            if saved_at is None or saved_at >= saved_before:
+                continue
+            job = self.store.get(job_id)
+            if job and job.status in FINISHED_STATUSES and job.finished_at and job.finished_at < expire_before:
+                self.store.delete(job_id)
+        self.store.remove_stale_temp_files(self.timeout_seconds)
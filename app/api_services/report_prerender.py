@@ -0,0 +1,147 @@
+# app/api_services/report_prerender.py
+
+import multiprocessing
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from app.adapters.db import TM_ENGINE, TM_SM_FACTORY
+from app.adapters.report_artifact_store import ReportArtifactStore
+from app.adapters.repositories.toolmaster_repository import ToolmasterRepository
+from app.api_services.report_builder import get_or_build_report
+from app.api_services.report_use_case_impl import UnifiedReportUseCaseImpl
+from app.domain.ports.out_port.IChartRenderer import IChartRenderer
+from app.utils.cron import CronJob
+from app.utils.errors import AppError, ErrorType
+from app.utils.logger import flush_logs, log
+
+_worker_store: Optional[ReportArtifactStore] = None
+_worker_use_case: Optional[UnifiedReportUseCaseImpl] = None
+
+
+def previous_month_range(now: datetime) -> Tuple[datetime, datetime]:
+    """Primer y ultimo instante del mes anterior a `now` (el rango que pide el portal)."""
+    first_of_month = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    end = first_of_month - timedelta(seconds=1)
+    return end.replace(day=1, hour=0, minute=0, second=0), end
+
+
+def _init_worker(store_root: str, store_max_bytes: int, chart_renderer: Optional[IChartRenderer], nice: int):
+    global _worker_store, _worker_use_case
+    TM_ENGINE.dispose(close=False)
+    if nice:
+        os.nice(nice)
+    _worker_store = ReportArtifactStore(store_root, max_bytes=store_max_bytes)
+    _worker_use_case = UnifiedReportUseCaseImpl(chart_renderer=chart_renderer)
+
+
+def _prerender(report_type: str, sf_account_id: str, start_date: datetime, end_date: datetime, language: str) -> str:
+    session = TM_SM_FACTORY()
+    try:
+        _, hit = get_or_build_report(
+            report_type,
+            ToolmasterRepository(session=session),
+            _worker_use_case,
+            _worker_store,
+            sf_account_id,
+            start_date,
+            end_date,
+            language,
+        )
+        return "hit" if hit else "built"
+    except AppError as app_err:
+        if app_err.error_type is ErrorType.NOT_FOUND:
+            return "not_found"
+        log(f"Report prerender: {report_type} {sf_account_id}: {app_err.message}")
+        return "failed"
+    finally:
+        session.close()
+        flush_logs()
+
+
+class ReportPrerenderScheduler(CronJob):
+    """
+    Pre-genera los reportes del mes anterior para todas las cuentas activas y
+    los deja en el ReportArtifactStore, de modo que las descargas de inicio de
+    mes sean hits.
+
+    El disparo lo ejecuta un solo worker (ver CronJob, estado en
+    prerender.json del store). El pool es chico y de baja prioridad (nice)
+    para no competir con las peticiones.
+    """
+
+    label = "Report prerender"
+
+    def __init__(
+        self,
+        schedule: str,
+        store: ReportArtifactStore,
+        report_types: List[str],
+        languages: List[str],
+        workers: int = 1,
+        nice: int = 10,
+        catchup_hours: float = 12,
+        chart_renderer: Optional[IChartRenderer] = None,
+    ):
+        super().__init__(schedule, store.root, "prerender", catchup_hours)
+        self.store = store
+        self.report_types = report_types
+        self.languages = languages
+        self.workers = max(1, workers)
+        self.nice = nice
+        self.chart_renderer = chart_renderer
+
+    def run(self, now: datetime) -> Dict[str, int]:
+        """Genera (o confirma en el store) los reportes del mes anterior a `now`."""
+        start_date, end_date = previous_month_range(now)
+        session = TM_SM_FACTORY()
+        try:
+            sf_account_ids = ToolmasterRepository(session=session).get_active_sf_account_ids(start_date, end_date)
+        finally:
+            session.close()
+
+        tasks = [
+            (report_type, sf_account_id, language)
+            for sf_account_id in sf_account_ids
+            for report_type in self.report_types
+            # El SASO sale siempre en ingles: un solo render por cuenta.
+            for language in (["en"] if report_type == "saso" else self.languages)
+        ]
+        log(f"Report prerender: {len(sf_account_ids)} cuentas, {len(tasks)} reportes de {start_date:%Y-%m}")
+        counts = {"built": 0, "hit": 0, "not_found": 0, "failed": 0}
+        started = time.monotonic()
+        pool = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("fork"),
+            initializer=_init_worker,
+            initargs=(self.store.root, self.store.max_bytes, self.chart_renderer, self.nice),
+        )
+        pending: Dict[Future, Tuple[str, str, str]] = {}
+
+        def collect(futures):
+            for future in futures:
+                report_type, sf_account_id, language = pending.pop(future)
+                try:
+                    counts[future.result()] += 1
+                except Exception as e:
+                    log(f"Report prerender: {report_type} {sf_account_id} {language} fallo: {e}")
+                    counts["failed"] += 1
+
+        try:
+            for report_type, sf_account_id, language in tasks:
+                if self._stop.is_set():
+                    break
+                future = pool.submit(_prerender, report_type, sf_account_id, start_date, end_date, language)
+                pending[future] = (report_type, sf_account_id, language)
+                # Pocas tareas en cola: el pool avanza a su ritmo y un stop no
+                # deja cientos de renders pendientes.
+                while len(pending) >= 2 * self.workers:
+                    collect(wait(list(pending), return_when=FIRST_COMPLETED)[0])
+            while pending and not self._stop.is_set():
+                collect(wait(list(pending), return_when=FIRST_COMPLETED)[0])
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+        log(f"Report prerender: {counts} en {time.monotonic() - started:.1f}s")
+        return counts
@@ -0,0 +1,227 @@
+# app/api_services/saso_excel_writer.py
+
+from typing import Any, BinaryIO, Callable, Dict, Iterable, List, NamedTuple, Optional
+
+from openpyxl import Workbook
+from openpyxl.cell import Cell
+from openpyxl.utils import get_column_letter, range_boundaries
+
+from app.api_services.report_dataset import ReportDataset
+from app.utils.spooled_output import report_buffer
+from app.utils.stage_timer import stage
+
+NO_DATA = "No registra"
+DATE_FORMAT = "%Y-%m-%d %H:%M"
+TEMPLATE_ROW = 3
+
+Accessor = Callable[[Any], Any]
+
+
+def _text(attr: str) -> Accessor:
+    return lambda obj: getattr(obj, attr, None) or NO_DATA
+
+
+def _date(attr: str) -> Accessor:
+    def get(obj):
+        value = getattr(obj, attr, None)
+        return value.strftime(DATE_FORMAT) if value else NO_DATA
+    return get
+
+
+def _number(attr: str) -> Accessor:
+    return lambda obj: getattr(obj, attr, None) or 0
+
+
+def _first_asset(attr: str) -> Accessor:
+    def get(obj):
+        if not obj.assets:
+            return NO_DATA
+        return getattr(obj.assets[0], attr, None) or NO_DATA
+    return get
+
+
+def _columns(alias: str, text=(), dates=(), numbers=(), **custom: Accessor) -> Dict[str, Accessor]:
+    accessors: Dict[str, Accessor] = {}
+    for field in text:
+        accessors[field] = _text(field)
+    for field in dates:
+        accessors[field] = _date(field)
+    for field in numbers:
+        accessors[field] = _number(field)
+    accessors.update(custom)
+    return {f"{{{{ {alias}.{field} }}}}": get for field, get in accessors.items()}
+
+
+_TICKET_ASSET = {
+    "asset": _first_asset("circuit_id"),
+    "asset_location": _first_asset("location"),
+    "asset_type": _first_asset("product_category"),
+}
+
+# Placeholder de la fila plantilla -> valor de la celda para un registro.
+COLUMN_ACCESSORS: Dict[str, Accessor] = {
+    **_columns("cu", text=("sf_account_id", "name", "sccd_id", "country", "category")),
+    **_columns("a", text=(
+        "sf_asset_id", "circuit_id", "product_family", "product_category",
+        "product_name", "status", "location",
+    )),
+    **_columns(
+        "c",
+        text=("sf_contact_id", "name", "contact_type", "email", "phone"),
+        account_id=lambda c: str(c.account_id) if getattr(c, "account_id", None) else NO_DATA,
+    ),
+    **_columns(
+        "w",
+        text=("sf_worklog_id", "created_by_name", "type_worklog", "description", "ticket_number", "worklog_number"),
+        dates=("created_at",),
+    ),
+    **_columns(
+        "i",
+        text=(
+            "subject", "priority", "sf_incident_id", "incident_number", "source_incident", "status",
+            "symptom", "cause", "resolution_summary", "description", "attributed_to", "reason",
+            "type_incident",
+        ),
+        dates=("reported_at", "affected_at", "resolution_at", "created_at", "updated_at", "start_at_dw", "end_at_dw"),
+        numbers=("downtime", "stop_dw"),
+        is_major=lambda i: str(i.is_major) if getattr(i, "is_major", None) is not None else NO_DATA,
+        **_TICKET_ASSET,
+    ),
+    **_columns(
+        "s",
+        text=(
+            "subject", "priority", "sf_sr_id", "sr_number", "status", "sr_type", "source", "symptom",
+            "solution", "sr_category", "sr_type_actions",
+        ),
+        dates=("created_at", "updated_at", "resolved_at", "closed_at"),
+        **_TICKET_ASSET,
+    ),
+    **_columns(
+        "ch",
+        text=(
+            "subject", "priority", "sf_change_id", "change_number", "status", "type_change", "description",
+            "result", "type_of_action", "bussines_reason", "urgency", "impact", "risk_level",
+            "failure_probability", "bussines_justification", "service_impact", "cab_assesment",
+            "cab_closure", "category", "client_auth_decision",
+        ),
+        dates=("created_at", "updated_at", "start_at_activity", "end_at_activity", "evidence_delivery_at", "final_review_at"),
+        numbers=("change_downtime",),
+        **_TICKET_ASSET,
+    ),
+}
+
+
+class SasoSheet(NamedTuple):
+    sheet_name: str
+    table_name: str
+    records: Callable[[ReportDataset], List[Any]]
+
+
+SASO_SHEETS = [
+    SasoSheet("Customer Details", "CustomerTable", lambda d: [d.customer] if d.customer else []),
+    SasoSheet("Asset Details", "AssetTable", lambda d: d.customer.assets if d.customer else []),
+    SasoSheet("Contact Details", "ContactTable", lambda d: d.customer.contacts if d.customer else []),
+    SasoSheet("Worklog Details", "WorklogTable", lambda d: d.customer.worklogs if d.customer else []),
+    SasoSheet("Incident Details", "IncidentTable", lambda d: d.incidents),
+    SasoSheet("ServiceRequest Details", "ServiceRequestTable", lambda d: d.service_requests),
+    SasoSheet("Change Details", "ChangeTable", lambda d: d.changes),
+]
+
+# Tablas de estilos y propiedades que el libro de salida toma del template.
+_SHARED_WORKBOOK_ATTRS = (
+    "_fonts", "_fills", "_borders", "_alignments", "_protections", "_number_formats",
+    "_cell_styles", "_named_styles", "_differential_styles", "_table_styles", "_colors",
+    "_date_formats", "_timedelta_formats", "loaded_theme", "properties", "custom_doc_props",
+    "calculation", "security", "epoch", "views", "_active_sheet_index",
+)
+_SHARED_SHEET_ATTRS = (
+    "sheet_properties", "sheet_format", "views", "column_dimensions", "row_dimensions",
+    "merged_cells", "conditional_formatting", "data_validations", "page_margins",
+    "page_setup", "print_options", "HeaderFooter", "protection", "row_breaks", "col_breaks",
+)
+
+
+def _compile_row(template_cells) -> List[tuple]:
+    """Cada columna de la fila plantilla como (accessor, estilo): se resuelve una sola vez."""
+    columns = []
+    for cell in template_cells:
+        placeholder = cell.value.strip() if isinstance(cell.value, str) else None
+        get = COLUMN_ACCESSORS.get(placeholder, lambda _: NO_DATA)
+        columns.append((get, cell._style))
+    return columns
+
+
+class SasoExcelWriter:
+    """
+    Llena SASO_Report.xlsx en un libro write-only de openpyxl.
+
+    Los placeholders de la fila 3 de cada hoja se traducen una vez a
+    funciones de acceso y cada celda de datos reutiliza el estilo de su
+    columna en la fila plantilla (sin copiar fuente, borde, relleno, etc.
+    por celda). Las filas se escriben en streaming, asi que la memoria no
+    crece con las decenas de miles de worklogs. Encabezados, anchos,
+    celdas combinadas y el formato de la tabla salen del template, y el
+    ref de cada tabla se extiende hasta la ultima fila escrita.
+    """
+
+    def write(self, template, dataset: ReportDataset) -> BinaryIO:
+        out = Workbook(write_only=True)
+        for attr in _SHARED_WORKBOOK_ATTRS:
+            setattr(out, attr, getattr(template, attr))
+        filled = {sheet.sheet_name: sheet for sheet in SASO_SHEETS}
+        with stage("xlsx_render"):
+            for src in template.worksheets:
+                spec = filled.get(src.title)
+                records = spec.records(dataset) if spec else []
+                self._write_sheet(src, out.create_sheet(src.title), records, spec.table_name if spec else None)
+        buffer = report_buffer()
+        with stage("xlsx_save"):
+            out.save(buffer)
+        buffer.seek(0)
+        return buffer
+
+    def _write_sheet(self, src, dst, records: List[Any], table_name: Optional[str]):
+        for attr in _SHARED_SHEET_ATTRS:
+            setattr(dst, attr, getattr(src, attr))
+        dst.auto_filter = src.auto_filter
+
+        max_col = src.max_column
+        rows = list(src.iter_rows(min_row=1, max_row=src.max_row, max_col=max_col))
+        # Sin registros la hoja queda tal cual el template.
+        shift = len(records) - 1 if records else 0
+        for row in rows[:TEMPLATE_ROW - 1]:
+            dst.append(self._copy_row(dst, row))
+        if records:
+            columns = _compile_row(rows[TEMPLATE_ROW - 1])
+            for record in records:
+                dst.append(self._data_row(dst, columns, record))
+        elif len(rows) >= TEMPLATE_ROW:
+            dst.append(self._copy_row(dst, rows[TEMPLATE_ROW - 1]))
+        for row in rows[TEMPLATE_ROW:]:
+            dst.append(self._copy_row(dst, row))
+
+        for table in src.tables.values():
+            if table.name == table_name and records:
+                self._extend_table(table, TEMPLATE_ROW + shift)
+            # Las columnas de la tabla ya vienen del template; add_table solo
+            # advertiria que en write-only hay que definirlas a mano.
+            dst.tables.add(table)
+
+    @staticmethod
+    def _copy_row(dst, row) -> List[Optional[Cell]]:
+        return [
+            Cell(dst, 1, col, cell.value, cell._style) if cell.value is not None or cell.has_style else None
+            for col, cell in enumerate(row, start=1)
+        ]
+
+    @staticmethod
+    def _data_row(dst, columns: Iterable[tuple], record) -> List[Cell]:
+        return [Cell(dst, 1, col, get(record), style) for col, (get, style) in enumerate(columns, start=1)]
+
+    @staticmethod
+    def _extend_table(table, last_row: int):
+        min_col, min_row, max_col, max_row = range_boundaries(table.ref)
+        ref = f"{get_column_letter(min_col)}{min_row}:{get_column_letter(max_col)}{max(max_row, last_row)}"
+        table.ref = ref
+        if table.autoFilter is not None:
+            table.autoFilter.ref = ref
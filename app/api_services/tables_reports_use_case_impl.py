@@ -3,13 +3,9 @@
 from typing import List, Dict, Tuple, Optional
 from datetime import datetime
 import pandas as pd
-from unidecode import unidecode
-from app.infrastructure.dto.reports_schema import (
-    IncidentDTO,
-    ServiceRequestDTO,
-    ChangeDTO,
-    AssetDTO
-)
+from app.infrastructure.dto.reports_schema import AssetDTO
+from app.api_services.availability_engine import AvailabilityEngine
+from app.api_services.report_dataset import AVAILABILITY_KEYS, ReportDataset, remove_accents
 
 REASON_MAP = {
     "Service Down": "Servicio Caido",
@@ -18,45 +14,27 @@ REASON_MAP = {
     "Other": "Otros"
 }
 
-ATTRIB_MAP = {
-    "C&W": "Liberty Networks",
-    "C&W Human Error": "Liberty Networks",
-    "C&W Implementation": "Liberty Networks",
-    "C&W Inside Plant": "Liberty Networks",
-    "C&W Maintenance Window": "Liberty Networks",
-    "C&W Outside Plant": "Liberty Networks",
-    "Carrier": "Liberty Networks",
-    "Provider": "Liberty Networks",
-    "Tier 1 Support": "Liberty Networks",
-    "Tier 2 Support": "Liberty Networks",
-    "Tier 3 Support": "Liberty Networks",
-    "Customer": "Cliente",
-    "Force Majeure": "Fuerza Mayor"
-}
 
-def remove_accents(text: str) -> str:
-    if not text:
-        return text
-    return unidecode(text)
+def _join_circuit_ids(assets: List[AssetDTO], no_data_str: str) -> str:
+    circuit_ids = [remove_accents(a.circuit_id) for a in assets if a.circuit_id]
+    return ", ".join(circuit_ids) if circuit_ids else no_data_str
+
 
 class TablesReportsUseCaseImpl:
     def build_incident_table(
         self,
-        incidentes: List[IncidentDTO],
+        dataset: ReportDataset,
         lang: str="es",
         no_data_str: str="No registra"
     ) -> List[Dict]:
+        norm = remove_accents
         rows = []
-        for inc in incidentes:
-            if inc.status and inc.status.lower() == "canceled":
-                continue
-            reason_val = remove_accents(inc.reason) if inc.reason else None
+        for inc in dataset.closed_incidents:
+            reason_val = norm(inc.reason) if inc.reason else None
             mapped_reason = REASON_MAP.get(reason_val, "Otros") if reason_val else no_data_str
-            attrib = remove_accents(inc.attributed_to) if inc.attributed_to else ""
-            if attrib in ATTRIB_MAP:
-                attrib = ATTRIB_MAP[attrib]
-            symptom_str = remove_accents(inc.symptom) if inc.symptom else no_data_str
-            resolution_str = remove_accents(inc.resolution_summary) if inc.resolution_summary else no_data_str
+            attrib = dataset.attribution_category(inc.attributed_to)
+            symptom_str = norm(inc.symptom) if inc.symptom else no_data_str
+            resolution_str = norm(inc.resolution_summary) if inc.resolution_summary else no_data_str
             downtime_str = no_data_str
             if inc.downtime is not None:
                 if inc.downtime == 0:
@@ -66,13 +44,9 @@ class TablesReportsUseCaseImpl:
 
             closure_date = inc.resolution_at if inc.resolution_at else inc.updated_at
             closure_str = closure_date if closure_date else no_data_str
-            stype_str = remove_accents(inc.type_incident) if inc.type_incident else no_data_str
+            stype_str = norm(inc.type_incident) if inc.type_incident else no_data_str
 
-            if inc.assets:
-                circuit_ids = [remove_accents(a.circuit_id) for a in inc.assets if a.circuit_id]
-                cids_str = ", ".join(circuit_ids) if circuit_ids else no_data_str
-            else:
-                cids_str = no_data_str
+            cids_str = _join_circuit_ids(inc.assets, no_data_str) if inc.assets else no_data_str
 
             rows.append({
                 "incident_number": inc.incident_number or no_data_str,
@@ -92,14 +66,13 @@ class TablesReportsUseCaseImpl:
 
     def build_service_request_table(
         self,
-        service_requests: List[ServiceRequestDTO],
+        dataset: ReportDataset,
         lang: str="es",
         no_data_str: str="No registra"
     ) -> List[Dict]:
+        norm = remove_accents
         rows = []
-        for sr in service_requests:
-            if sr.status and sr.status.lower() == "canceled":
-                continue
+        for sr in dataset.closed_srs:
             if sr.resolved_at:
                 closure_date = sr.resolved_at
             elif sr.closed_at:
@@ -108,21 +81,17 @@ class TablesReportsUseCaseImpl:
                 closure_date = sr.updated_at
             closure_str = closure_date if closure_date else no_data_str
 
-            stype_str = remove_accents(sr.sr_type_actions) if sr.sr_type_actions else no_data_str
-            symptom_str = remove_accents(sr.symptom) if sr.symptom else no_data_str
-            solution_str = remove_accents(sr.solution) if sr.solution else no_data_str
+            stype_str = norm(sr.sr_type_actions) if sr.sr_type_actions else no_data_str
+            symptom_str = norm(sr.symptom) if sr.symptom else no_data_str
+            solution_str = norm(sr.solution) if sr.solution else no_data_str
 
-            if sr.assets:
-                circuit_ids = [remove_accents(a.circuit_id) for a in sr.assets if a.circuit_id]
-                cid_str = ", ".join(circuit_ids) if circuit_ids else no_data_str
-            else:
-                cid_str = no_data_str
+            cid_str = _join_circuit_ids(sr.assets, no_data_str) if sr.assets else no_data_str
 
             rows.append({
                 "sr_number": sr.sr_number or no_data_str,
                 "ticket_id": sr.ticket_id if sr.ticket_id else no_data_str,
                 "sr_type": stype_str,
-                "status": remove_accents(sr.status) if sr.status else no_data_str,
+                "status": norm(sr.status) if sr.status else no_data_str,
                 "created_at": sr.created_at if sr.created_at else no_data_str,
                 "resolved_at": closure_str,
                 "symptom": symptom_str,
@@ -134,27 +103,22 @@ class TablesReportsUseCaseImpl:
 
     def build_cambios_table(
         self,
-        cambios: List[ChangeDTO],
+        dataset: ReportDataset,
         lang: str="es",
         no_data_str: str="No registra"
     ) -> List[Dict]:
+        norm = remove_accents
         rows = []
-        for chg in cambios:
-            if chg.status and chg.status.lower() == "canceled":
-                continue
+        for chg in dataset.closed_changes:
             closure_date = chg.updated_at
             closure_str = closure_date if closure_date else no_data_str
-            type_of_action_str = remove_accents(chg.type_of_action) if chg.type_of_action else no_data_str
+            type_of_action_str = norm(chg.type_of_action) if chg.type_of_action else no_data_str
             service_type_str = type_of_action_str
-            desc_str = remove_accents(chg.description) if chg.description else no_data_str
-            result_str = remove_accents(chg.result) if chg.result else no_data_str
-            status_str = remove_accents(chg.status) if chg.status else no_data_str
+            desc_str = norm(chg.description) if chg.description else no_data_str
+            result_str = norm(chg.result) if chg.result else no_data_str
+            status_str = norm(chg.status) if chg.status else no_data_str
 
-            if chg.assets:
-                circuit_ids = [remove_accents(a.circuit_id) for a in chg.assets if a.circuit_id]
-                cid_str = ", ".join(circuit_ids) if circuit_ids else no_data_str
-            else:
-                cid_str = no_data_str
+            cid_str = _join_circuit_ids(chg.assets, no_data_str) if chg.assets else no_data_str
 
             rows.append({
                 "change_number": chg.change_number or no_data_str,
@@ -171,176 +135,51 @@ class TablesReportsUseCaseImpl:
         return rows
 
 
-def build_availability_table(incidentes: List[IncidentDTO]) -> List[Dict]:
-    if not incidentes:
-        return []
-    rows_items = []
-    for inc in incidentes:
-        if inc.status and inc.status.lower() == "canceled":
-            continue
-        attrib_final = remove_accents(inc.attributed_to) if inc.attributed_to else ""
-        if attrib_final in ATTRIB_MAP:
-            attrib_final = ATTRIB_MAP[attrib_final]
-        if attrib_final != "Liberty Networks":
-            continue
-        downtime_val = inc.downtime if inc.downtime else 0
-
-        if inc.assets:
-            for asset in inc.assets:
-                address_val = asset.location if asset.location else "N/A"
-                address_val = remove_accents(address_val)
-                rows_items.append({
-                    "circuit_id": remove_accents(asset.circuit_id) if asset.circuit_id else None,
-                    "product_family": remove_accents(asset.product_family) if asset.product_family else None,
-                    "address": address_val,
-                    "incident_number": remove_accents(inc.incident_number) if inc.incident_number else "",
-                    "downtime": downtime_val
-                })
-        else:
-            rows_items.append({
-                "circuit_id": None,
-                "product_family": None,
-                "address": "N/A",
-                "incident_number": remove_accents(inc.incident_number) if inc.incident_number else "",
-                "downtime": downtime_val
-            })
+def _present(column: pd.Series) -> pd.Series:
+    return column.notna() & column.astype(bool)
 
-    if not rows_items:
-        return []
-    df = pd.DataFrame(rows_items)
-    if df.empty:
-        return []
 
-    df["downtime"] = pd.to_numeric(df["downtime"], errors="coerce").fillna(0)
-    grouped = df.groupby(["circuit_id","product_family","address"], dropna=False).agg({
-        "downtime": "sum",
-        "incident_number": lambda x: list(x.dropna())
-    }).reset_index()
+def _availability_rows(grouped: pd.DataFrame) -> List[Dict]:
+    period = grouped["period_minutes"]
+    availability = (1 - grouped["downtime"] / period.where(period > 0)).fillna(1).clip(lower=0)
+    out = pd.DataFrame({
+        "cid": grouped["circuit_id"].where(_present(grouped["circuit_id"]), "No registra"),
+        "service_type": grouped["product_family"].where(_present(grouped["product_family"]), "No registra"),
+        "address": grouped["address"].where(_present(grouped["address"]), "N/A"),
+        "case_related": grouped["case_related"],
+        "downtime": grouped["downtime"].map(lambda dt: "0.0" if dt == 0 else str(dt)),
+        "disponibilidad": (availability * 100).map("{:.2f}%".format),
+        "disponibility": "99.6%",
+    })
+    return out.to_dict("records")
 
-    total_minutes_month=43200
-    final_rows=[]
-    for _, rowx in grouped.iterrows():
-        circuit_val=rowx["circuit_id"] if rowx["circuit_id"] else "No registra"
-        product_val=rowx["product_family"] if rowx["product_family"] else "No registra"
-        address_val=rowx["address"] if rowx["address"] else "N/A"
-        dt_total=rowx["downtime"]
-        availability=1-(dt_total/total_minutes_month)
-        availability_percent=f"{availability*100:.2f}%"
-        inc_list=rowx["incident_number"]
-        inc_join=", ".join(inc_list)
-        dt_str="0.0" if dt_total==0 else str(dt_total)
-        final_rows.append({
-            "cid": circuit_val,
-            "service_type": product_val,
-            "address": address_val,
-            "case_related": inc_join,
-            "downtime": dt_str,
-            "disponibilidad": availability_percent,
-            "disponibility":"99.6%"
-        })
 
-    def disp_to_float(v):
-        return float(v.replace("%","",1))
-    final_rows.sort(key=lambda r: disp_to_float(r["disponibilidad"]))
+def build_availability_table(
+    dataset: ReportDataset,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+) -> List[Dict]:
+    df = dataset.availability_frame
+    if df.empty:
+        return []
+    grouped = AvailabilityEngine(df, AVAILABILITY_KEYS, start_date, end_date).total()
+    final_rows = _availability_rows(grouped)
+    final_rows.sort(key=lambda r: float(r["disponibilidad"][:-1]))
     return final_rows
 
+
 def build_availability_table_by_month(
-    incidentes: List[IncidentDTO],
-    lang: str="es"
+    dataset: ReportDataset,
+    lang: str="es",
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
 ) -> Dict[Tuple[int,int], List[Dict]]:
-    if not incidentes:
-        return {}
-
-    rows_items=[]
-    for inc in incidentes:
-        if inc.status and inc.status.lower()=="canceled":
-            continue
-        attrib_final=remove_accents(inc.attributed_to) if inc.attributed_to else ""
-        if attrib_final in ATTRIB_MAP:
-            attrib_final=ATTRIB_MAP[attrib_final]
-        if attrib_final!="Liberty Networks":
-            continue
-        downtime_val=inc.downtime if inc.downtime else 0
-        if not inc.created_at:
-            continue
-        yy=inc.created_at.year
-        mm=inc.created_at.month
-
-        if inc.assets:
-            for asset in inc.assets:
-                address_val=asset.location if asset.location else "N/A"
-                address_val=remove_accents(address_val)
-                rows_items.append({
-                    "year": yy,
-                    "month": mm,
-                    "circuit_id": remove_accents(asset.circuit_id) if asset.circuit_id else None,
-                    "product_family": remove_accents(asset.product_family) if asset.product_family else None,
-                    "address": address_val,
-                    "incident_number": remove_accents(inc.incident_number) if inc.incident_number else "",
-                    "downtime": downtime_val
-                })
-        else:
-            rows_items.append({
-                "year": yy,
-                "month": mm,
-                "circuit_id": None,
-                "product_family": None,
-                "address": "N/A",
-                "incident_number": remove_accents(inc.incident_number) if inc.incident_number else "",
-                "downtime": downtime_val
-            })
-
-    if not rows_items:
-        return {}
-
-    df=pd.DataFrame(rows_items)
+    df = dataset.availability_frame
     if df.empty:
         return {}
-
-    df["downtime"]=pd.to_numeric(df["downtime"], errors="coerce").fillna(0)
-    grouped=df.groupby(["year","month","circuit_id","product_family","address"], dropna=False).agg({
-        "downtime":"sum",
-        "incident_number": lambda x: list(x.dropna())
-    }).reset_index()
-
-    total_minutes_month=43200
-
-    months_set=set()
-    for _, rowx in grouped.iterrows():
-        months_set.add((rowx["year"], rowx["month"]))
-
-    final_dict={}
-
-    for (yy, mm) in sorted(months_set):
-        subset=grouped[(grouped["year"]==yy)&(grouped["month"]==mm)]
-        if subset.empty:
-            final_dict[(yy, mm)] = []
-            continue
-
-        rowset=[]
-        for _, rowm in subset.iterrows():
-            circuit_val=rowm["circuit_id"] if rowm["circuit_id"] else "No registra"
-            product_val=rowm["product_family"] if rowm["product_family"] else "No registra"
-            address_val=rowm["address"] if rowm["address"] else "N/A"
-
-            dt_total=rowm["downtime"]
-            availability=1-(dt_total/total_minutes_month)
-            availability_percent=f"{availability*100:.2f}%"
-
-            inc_list=rowm["incident_number"]
-            inc_join=", ".join(inc_list)
-            dt_str="0.0" if dt_total==0 else str(dt_total)
-
-            rowdict={
-                "cid":circuit_val,
-                "service_type":product_val,
-                "address":address_val,
-                "case_related":inc_join,
-                "downtime":dt_str,
-                "disponibilidad":availability_percent,
-                "disponibility":"99.6%"
-            }
-            rowset.append(rowdict)
-        final_dict[(yy, mm)]=rowset
-
+    grouped = AvailabilityEngine(df, AVAILABILITY_KEYS, start_date, end_date).by_month()
+    rows = _availability_rows(grouped)
+    final_dict = {}
+    for yy, mm, rowdict in zip(grouped["year"].tolist(), grouped["month"].tolist(), rows):
+        final_dict.setdefault((int(yy), int(mm)), []).append(rowdict)
     return final_dict
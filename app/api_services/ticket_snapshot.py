@@ -0,0 +1,95 @@
+# app/api_services/ticket_snapshot.py
+
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+from app.adapters.db import TM_SM_FACTORY
+from app.adapters.repositories.toolmaster_repository import ToolmasterRepository
+from app.adapters.ticket_snapshot_store import SNAPSHOT_KINDS, TicketSnapshotStore, month_start, next_month
+from app.utils.cron import CronJob
+from app.utils.logger import log
+
+
+class TicketSnapshotJob(CronJob):
+    """
+    Job nocturno que escribe en el TicketSnapshotStore los meses cerrados:
+    los que faltan dentro de los ultimos `months` y, siempre, los
+    `refresh_months` mas recientes, que todavia reciben cierres y ediciones
+    tardias. Los meses fuera de la ventana se borran del disco (y esos rangos
+    vuelven a MySQL).
+
+    El disparo lo ejecuta un solo worker (ver CronJob, estado en snapshot.json
+    del store). Las consultas van por lotes de `chunk_size` cuentas, como el
+    batch de reportes.
+    """
+
+    label = "Ticket snapshot"
+
+    def __init__(
+        self,
+        schedule: str,
+        store: TicketSnapshotStore,
+        months: int = 24,
+        refresh_months: int = 2,
+        chunk_size: int = 50,
+        catchup_hours: float = 12,
+    ):
+        super().__init__(schedule, store.root, "snapshot", catchup_hours)
+        self.store = store
+        self.months = max(1, months)
+        self.refresh_months = refresh_months
+        self.chunk_size = max(1, chunk_size)
+
+    def run(self, now: datetime) -> Dict[str, int]:
+        open_month = month_start(now)
+        closed: List[datetime] = []
+        month = open_month
+        for _ in range(self.months):
+            month = month_start(month - timedelta(days=1))
+            closed.append(month)
+
+        counts = {"written": 0, "kept": 0, "dropped": 0, "failed": 0}
+        started = time.monotonic()
+        for age, month in enumerate(closed):
+            if self._stop.is_set():
+                break
+            if age >= self.refresh_months and self.store.has_month(month):
+                counts["kept"] += 1
+                continue
+            try:
+                if self.write_month(month):
+                    counts["written"] += 1
+            except Exception as e:
+                log(f"Ticket snapshot: {month:%Y-%m} fallo: {e}")
+                counts["failed"] += 1
+        counts["dropped"] = self.store.drop_before(closed[-1])
+        log(f"Ticket snapshot: {counts} en {time.monotonic() - started:.1f}s")
+        return counts
+
+    def write_month(self, month: datetime) -> bool:
+        """Foto completa de un mes: todas las cuentas con tickets creados en el. False si se interrumpio."""
+        start_date = month
+        end_date = next_month(month) - timedelta(microseconds=1)
+        writer = self.store.begin_month(month)
+        session = TM_SM_FACTORY()
+        try:
+            repo = ToolmasterRepository(session=session)
+            account_ids = repo.get_active_account_ids(start_date, end_date)
+            for i in range(0, len(account_ids), self.chunk_size):
+                if self._stop.is_set():
+                    writer.abort()
+                    return False
+                chunk = account_ids[i:i + self.chunk_size]
+                for kind in SNAPSHOT_KINDS:
+                    by_account = repo.fetch_ticket_rows_by_account(kind, chunk, start_date, end_date)
+                    for account_id, rows in by_account.items():
+                        writer.write(account_id, kind, rows)
+            writer.commit()
+        except Exception:
+            writer.abort()
+            raise
+        finally:
+            session.close()
+        log(f"Ticket snapshot: {month:%Y-%m} {len(account_ids)} cuentas, filas {writer.rows}")
+        return True
@@ -2,6 +2,7 @@ from typing import Any, Dict, List, Type
 from app.domain.ports.out_port.IToolmasterRepository import IToolmasterRepository
 from app.domain.ports.out_port.IEsbRepository import IEsbRepository
 from app.utils.logger import log
+from app.utils.stage_timer import stage
 from app.domain.ports.input_port.ticket_service import ITicketUseCase
 import json
 from datetime import datetime, timedelta, timezone
@@ -33,14 +34,17 @@ class TicketUseCaseImpl(ITicketUseCase):
         self.set_logging_headers('creation')
         self.dto = dto
         # stored in self.app_assets, AppAssets objects
-        self.get_toolmaster_app_assets() 
+        with stage("db_assets"):
+            self.get_toolmaster_app_assets() 
 
         if not dto.custom_description:
-            self.process_description()
+            with stage("description"):
+                self.process_description()
 
         # Related Entity, array of sf_asset_ids ex [01ds3323 , 1313432fdf2, etc] stored in self.dto.sf_asset_ids
         self.get_sf_asset_ids() 
-        self.set_related_party()
+        with stage("db_related_party"):
+            self.set_related_party()
         
         if self.dto.branch != '': 
             self.dto.name = self.dto.branch # Subject
@@ -53,20 +57,23 @@ class TicketUseCaseImpl(ITicketUseCase):
             # self.dto.worklog = worklog_template.format(alarm_info=self.dto.alarm_info)
             self.dto.worklog = self.dto.alarm_info
         
-        esb_payload = self.esb_repository.create_payload_to_open(self.dto)
+        with stage("payload"):
+            esb_payload = self.esb_repository.create_payload_to_open(self.dto)
 
         log(f"esb_payload: {esb_payload}")
-        response = self.esb_repository.create_ticket('CO', esb_payload)
+        with stage("esb_create"):
+            response = self.esb_repository.create_ticket('CO', esb_payload)
 
         if response['status_code'] == 201:
             sf_incident_id = json.loads(response["message"]).get("externalId")
-            worklog_response = self.worklog_update(
-                sf_incident_id, 
-                self.dto.bool_to_str(self.dto.major), 
-                self.dto.worklog, self.dto.summary, 
-                self.dto.attach_image, 
-                self.dto.attachment_content
-            )
+            with stage("esb_worklog"):
+                worklog_response = self.worklog_update(
+                    sf_incident_id, 
+                    self.dto.bool_to_str(self.dto.major), 
+                    self.dto.worklog, self.dto.summary, 
+                    self.dto.attach_image, 
+                    self.dto.attachment_content
+                )
 
             if worklog_response['status_code'] == 200:
                 inc_id = json.loads(response['message'])['id']
@@ -232,18 +239,14 @@ class TicketUseCaseImpl(ITicketUseCase):
         self.set_logging_headers('update')
         self.dto = dto
         # sf_incident_id is the ext id given in the response when creating a ticket
-        incident_details = self.esb_repository.get_incident_details_by_id('CO',self.dto.sf_incident_id) 
+        with stage("esb_details"):
+            incident_details = self.esb_repository.get_incident_details_by_sf_id('CO',self.dto.sf_incident_id) 
         data = json.loads(incident_details)
 
         if not self.dto.related_cases_ids:
             for relationship in data.get("troubleTicketRelationship", []):
                 if "id" in relationship:
                     self.dto.related_cases_ids.append(relationship["id"])
-        
-        if self.dto.owner_id == "":
-            for relationship in data.get("troubleTicketRelationship", []):
-                if "id" in relationship:
-                    self.dto.related_cases_ids.append(relationship["id"])
 
         payload_to_update = self.esb_repository.create_payload_to_update(worklog=self.dto.worklog,
                 status=self.dto.status.value,
@@ -263,7 +266,8 @@ class TicketUseCaseImpl(ITicketUseCase):
                     {"name": "ResolvedBy",                "value": self.dto.resolved}
                 ])
         
-        response = self.esb_repository.update_ticket('CO',self.dto.sf_incident_id,payload_to_update) 
+        with stage("esb_update"):
+            response = self.esb_repository.update_ticket('CO',self.dto.sf_incident_id,payload_to_update) 
         log(f"response at the use case level: {response}")
 
         # if response['status_code'] == 200:
@@ -319,9 +323,11 @@ class TicketUseCaseImpl(ITicketUseCase):
     def close_ticket(self, dto: TicketCloseDTO):
         self.set_logging_headers('close')
         self.dto = dto
-        self.get_app_incident()
+        with stage("db_incident"):
+            self.get_app_incident()
         
-        incident_details = self.get_incident_details_by_sf_id('CO', self.dto.sf_incident_id)
+        with stage("esb_details"):
+            incident_details = self.get_incident_details_by_sf_id('CO', self.dto.sf_incident_id)
         incident_details_dict = json.loads(incident_details)
 
         log(f"incident details: {incident_details_dict}")
@@ -355,14 +361,15 @@ class TicketUseCaseImpl(ITicketUseCase):
             owner = {"name": "OwnerId","value": "0054X00000F8aALQAZ"}
             trouble_ticket_characteristic.append(owner)
 
-        self.worklog_update(
-            sf_incident_id=self.dto.sf_incident_id,
-            major=major,
-            worklog=self.dto.worklog, 
-            summary=self.dto.summary,
-            attach_image=False,
-            attachment_content=self.dto.attachment_content
-        )
+        with stage("esb_worklog"):
+            self.worklog_update(
+                sf_incident_id=self.dto.sf_incident_id,
+                major=major,
+                worklog=self.dto.worklog, 
+                summary=self.dto.summary,
+                attach_image=False,
+                attachment_content=self.dto.attachment_content
+            )
 
         data = {
             'status': 'resolved', 
@@ -373,7 +380,8 @@ class TicketUseCaseImpl(ITicketUseCase):
         payload = json.dumps(data)
         log("Payload ready to close the ticket")
         log(payload)
-        response = self.esb_repository.update_ticket('CO',self.dto.sf_incident_id,payload) 
+        with stage("esb_update"):
+            response = self.esb_repository.update_ticket('CO',self.dto.sf_incident_id,payload) 
         log(f"Close response at the use case level: {response}")
         if response['status_code'] == 200:
             response['message'] = 'Incident closed successfully.'
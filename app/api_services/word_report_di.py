@@ -1,16 +1,117 @@
-from typing import Type
+from functools import lru_cache
+from typing import Optional, Type
 from fastapi import Depends
 from sqlmodel import Session
 
 from app.adapters.db import get_toolmaster_db_connection
 from app.adapters.repositories.toolmaster_repository import ToolmasterRepository
+from app.adapters.charts.cached_chart_renderer import CachedChartRenderer
+from app.adapters.charts.native_chart_renderer import NativeChartRenderer
+from app.adapters.report_artifact_store import ReportArtifactStore
+from app.adapters.ticket_snapshot_store import configured_snapshot_store
+from app.conf.config import get_app_settings
 from app.domain.ports.input_port.report_service import IWordReportUseCase
+from app.domain.ports.out_port.IChartRenderer import IChartRenderer
 from app.api_services.report_use_case_impl import UnifiedReportUseCaseImpl
+from app.api_services.data_export import DataExporter
+from app.api_services.report_batch import BatchReportStreamer
+from app.api_services.report_job_manager import ReportJobManager, available_cores
+from app.api_services.report_prerender import ReportPrerenderScheduler
+from app.api_services.ticket_snapshot import TicketSnapshotJob
+
+
+@lru_cache
+def chart_renderer() -> IChartRenderer:
+    settings = get_app_settings()
+    if settings.chart_renderer == "plotly":
+        from app.adapters.charts.plotly_chart_renderer import PlotlyChartRenderer
+        renderer = PlotlyChartRenderer()
+    else:
+        renderer = NativeChartRenderer()
+    if settings.chart_cache_max_bytes > 0:
+        renderer = CachedChartRenderer(
+            renderer,
+            max_bytes=settings.chart_cache_max_bytes,
+            disk_dir=settings.chart_cache_dir,
+            disk_max_bytes=settings.chart_cache_disk_max_bytes,
+        )
+    return renderer
+
 
 def word_report_use_case(
     session: Type[Session] = Depends(get_toolmaster_db_connection)
 ) -> IWordReportUseCase:
 
     toolmaster_repository = ToolmasterRepository(session=session)
-    use_case = UnifiedReportUseCaseImpl()
+    use_case = UnifiedReportUseCaseImpl(chart_renderer=chart_renderer())
     return use_case
+
+
+@lru_cache
+def report_artifact_store() -> Optional[ReportArtifactStore]:
+    settings = get_app_settings()
+    if settings.report_cache_max_bytes <= 0:
+        return None
+    return ReportArtifactStore(settings.report_cache_dir, max_bytes=settings.report_cache_max_bytes)
+
+
+@lru_cache
+def report_job_manager() -> ReportJobManager:
+    settings = get_app_settings()
+    return ReportJobManager(
+        root=settings.report_jobs_dir,
+        workers=settings.report_job_workers,
+        timeout_seconds=settings.report_job_timeout_seconds,
+        ttl_seconds=settings.report_job_ttl_seconds,
+        chart_renderer=chart_renderer(),
+    )
+
+
+@lru_cache
+def report_batch_streamer() -> BatchReportStreamer:
+    settings = get_app_settings()
+    return BatchReportStreamer(
+        workers=settings.report_batch_workers or available_cores(),
+        chunk_size=settings.report_batch_chunk_size,
+        chart_renderer=chart_renderer(),
+    )
+
+
+@lru_cache
+def data_exporter() -> DataExporter:
+    settings = get_app_settings()
+    return DataExporter(batch_size=settings.export_batch_size, gzip_level=settings.export_gzip_level)
+
+
+@lru_cache
+def report_prerender_scheduler() -> Optional[ReportPrerenderScheduler]:
+    settings = get_app_settings()
+    store = report_artifact_store()
+    if store is None or not settings.report_prerender_cron:
+        return None
+    return ReportPrerenderScheduler(
+        schedule=settings.report_prerender_cron,
+        store=store,
+        report_types=settings.report_prerender_report_types,
+        languages=settings.report_prerender_languages,
+        workers=settings.report_prerender_workers,
+        nice=settings.report_prerender_nice,
+        catchup_hours=settings.report_prerender_catchup_hours,
+        chart_renderer=chart_renderer(),
+    )
+
+
+@lru_cache
+def ticket_snapshot_job() -> Optional[TicketSnapshotJob]:
+    settings = get_app_settings()
+    store = configured_snapshot_store()
+    if store is None or not settings.ticket_snapshot_cron:
+        return None
+    return TicketSnapshotJob(
+        schedule=settings.ticket_snapshot_cron,
+        store=store,
+        months=settings.ticket_snapshot_months,
+        refresh_months=settings.ticket_snapshot_refresh_months,
+        chunk_size=settings.ticket_snapshot_chunk_size,
+        catchup_hours=settings.ticket_snapshot_catchup_hours,
+    )
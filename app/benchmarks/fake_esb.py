@@ -0,0 +1,441 @@
+# app/benchmarks/fake_esb.py
+"""
+ESB/Salesforce de mentira para pruebas de carga del flujo de tickets.
+
+    python -m app.benchmarks.fake_esb --port 8099 --latency lognormal:0.3,0.5 \
+        --error-rate 0.02 --rate-limit 20 --drip-rate 0.05
+
+y en el .env del servicio ESB_URL=http://127.0.0.1:8099. Implementa las
+rutas de troubleTicket que usa EsbRepository (POST, PATCH y GET por id o por
+relatedEntity.id) y responde con la misma forma que el ESB: `id`,
+`externalId`, `troubleTicketCharacteristic`, `troubleTicketRelationship`,
+`note`... Los tickets viven en memoria.
+
+Fallas configurables, en este orden por request:
+- rate_limit/burst: token bucket; sin token responde 429 con Retry-After.
+  throttle_rate agrega 429 al azar.
+- latency: distribucion por metodo (ver parse_latency).
+- error_rate: 500/502/503 al azar, sin aplicar el cambio.
+- drip_rate: la respuesta sale de a `drip_chunk` bytes cada `drip_interval`
+  segundos (un backend lento que no corta la conexion).
+
+En proceso:
+
+    with FakeEsb(latency="uniform:0.05,0.2", error_rate=0.01) as esb:
+        os.environ["ESB_URL"] = esb.url
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import random
+import socket
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Union
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+
+LatencySpec = Union[None, float, str]
+ERROR_STATUSES = (500, 502, 503)
+
+
+def parse_latency(spec: LatencySpec) -> Callable[[random.Random], float]:
+    """
+    Distribucion de latencia en segundos: un numero fijo o "tipo:parametros".
+      fixed:0.2          siempre 0.2
+      uniform:0.1,0.5    entre 0.1 y 0.5
+      normal:0.3,0.05    media y desviacion (sin negativos)
+      lognormal:0.3,0.5  mediana y sigma; cola larga como un backend real
+      exp:0.2            exponencial con media 0.2
+    """
+    if spec in (None, "", 0, 0.0):
+        return lambda rnd: 0.0
+    if isinstance(spec, (int, float)):
+        return lambda rnd: float(spec)
+    kind, _, raw = spec.partition(":")
+    if not raw:
+        kind, raw = "fixed", kind
+    params = [float(p) for p in raw.split(",")]
+    if kind == "fixed":
+        return lambda rnd: params[0]
+    if kind == "uniform":
+        return lambda rnd: rnd.uniform(params[0], params[1])
+    if kind == "normal":
+        return lambda rnd: max(0.0, rnd.gauss(params[0], params[1]))
+    if kind == "lognormal":
+        mu = math.log(params[0])
+        return lambda rnd: rnd.lognormvariate(mu, params[1])
+    if kind == "exp":
+        return lambda rnd: rnd.expovariate(1 / params[0])
+    raise ValueError(f"Distribucion de latencia desconocida: {spec}")
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.000Z")
+
+
+class _TokenBucket:
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def take(self) -> Optional[float]:
+        """None si hay token; si no, los segundos hasta el proximo."""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return None
+            return (1 - self.tokens) / self.rate
+
+
+class FakeEsb:
+    """Servidor troubleTicket en memoria con latencia y fallas (ver el docstring del modulo)."""
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: LatencySpec = None,
+        post_latency: LatencySpec = None,
+        patch_latency: LatencySpec = None,
+        get_latency: LatencySpec = None,
+        error_rate: float = 0.0,
+        throttle_rate: float = 0.0,
+        rate_limit: float = 0.0,
+        burst: int = 10,
+        drip_rate: float = 0.0,
+        drip_chunk: int = 64,
+        drip_interval: float = 0.1,
+        require_credentials: bool = True,
+        seed: Optional[int] = None,
+    ):
+        self.host = host
+        self.port = port
+        default = parse_latency(latency)
+        self.latency = {
+            "POST": parse_latency(post_latency) if post_latency else default,
+            "PATCH": parse_latency(patch_latency) if patch_latency else default,
+            "GET": parse_latency(get_latency) if get_latency else default,
+        }
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.bucket = _TokenBucket(rate_limit, burst) if rate_limit > 0 else None
+        self.drip_rate = drip_rate
+        self.drip_chunk = max(1, drip_chunk)
+        self.drip_interval = drip_interval
+        self.require_credentials = require_credentials
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.tickets: Dict[str, Dict[str, Any]] = {}
+        self._sequence = 0
+        self.requests: Counter = Counter()
+        self.app = self._build_app()
+        self._server = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        """Valor para ESB_URL."""
+        return f"http://{self.host}:{self.port}"
+
+    # -- fallas -------------------------------------------------------------
+
+    def _roll(self, rate: float) -> bool:
+        if rate <= 0:
+            return False
+        with self._lock:
+            return self._random.random() < rate
+
+    def _count(self, method: str, status: int, fault: Optional[str] = None):
+        with self._lock:
+            self.requests[f"{method} {status}"] += 1
+            if fault:
+                self.requests[fault] += 1
+
+    async def _respond(self, request: Request, handler: Callable[[], "tuple[int, Any]"]) -> Response:
+        method = request.method
+        if self.require_credentials and not (request.headers.get("client_id") and request.headers.get("client_secret")):
+            self._count(method, 401)
+            return JSONResponse({"code": "401", "reason": "Unauthorized", "message": "client_id/client_secret"}, 401)
+
+        wait = self.bucket.take() if self.bucket else None
+        if wait is not None or self._roll(self.throttle_rate):
+            self._count(method, 429, "throttled")
+            retry_after = str(max(1, math.ceil(wait or 1)))
+            return JSONResponse(
+                {"code": "429", "reason": "Too Many Requests", "message": "Rate limit exceeded"},
+                429, headers={"Retry-After": retry_after},
+            )
+
+        with self._lock:
+            delay = self.latency[method](self._random)
+        if delay:
+            await asyncio.sleep(delay)
+
+        if self._roll(self.error_rate):
+            with self._lock:
+                status = self._random.choice(ERROR_STATUSES)
+            self._count(method, status, "injected_errors")
+            return JSONResponse({"code": str(status), "reason": "Backend error", "message": "injected"}, status)
+
+        status, body = handler()
+        self._count(method, status)
+        content = json.dumps(body, ensure_ascii=False).encode()
+        if not self._roll(self.drip_rate):
+            return Response(content, status, media_type="application/json")
+
+        self._count(method, status, "dripped")
+
+        async def drip():
+            for i in range(0, len(content), self.drip_chunk):
+                yield content[i:i + self.drip_chunk]
+                await asyncio.sleep(self.drip_interval)
+
+        return StreamingResponse(drip(), status, media_type="application/json")
+
+    # -- troubleTicket ------------------------------------------------------
+
+    def _next_ids(self, business_id: str) -> "tuple[str, str]":
+        with self._lock:
+            self._sequence += 1
+            n = self._sequence
+        # Id de Case de Salesforce: 18 caracteres con prefijo 500.
+        external_id = f"5004X{n:010d}AAA"
+        return f"{business_id}-TT-{n:08d}", external_id
+
+    @staticmethod
+    def _merge_characteristics(ticket: Dict[str, Any], items: List[Dict[str, Any]]):
+        by_name = {c["name"]: c for c in ticket["troubleTicketCharacteristic"]}
+        for item in items or []:
+            if "name" in item:
+                by_name[item["name"]] = {"name": item["name"], "value": item.get("value")}
+        ticket["troubleTicketCharacteristic"] = list(by_name.values())
+
+    def create(self, business_id: str, body: Dict[str, Any]) -> "tuple[int, Any]":
+        missing = [f for f in ("description", "name", "status", "relatedEntity") if not body.get(f)]
+        if missing:
+            return 400, {"code": "400", "reason": "Bad Request", "message": f"Campos requeridos: {', '.join(missing)}"}
+        ticket_id, external_id = self._next_ids(business_id)
+        now = _now()
+        ticket = {
+            "id": ticket_id,
+            "href": f"/{business_id}/troubleTicket/{external_id}",
+            "externalId": external_id,
+            "name": body.get("name"),
+            "description": body.get("description"),
+            "ticketType": body.get("ticketType"),
+            "priority": body.get("priority"),
+            "severity": body.get("severity"),
+            "status": body.get("status"),
+            "channel": body.get("channel"),
+            "creationDate": now,
+            "lastUpdate": now,
+            "relatedParty": body.get("relatedParty", []),
+            "relatedEntity": body.get("relatedEntity", []),
+            "troubleTicketCharacteristic": [],
+            "troubleTicketRelationship": [],
+            "note": [],
+            "attachment": [],
+            "@type": "TroubleTicket",
+        }
+        self._merge_characteristics(ticket, body.get("troubleTicketCharacteristic"))
+        with self._lock:
+            self.tickets[external_id] = ticket
+        return 201, ticket
+
+    def update(self, business_id: str, external_id: str, body: Dict[str, Any]) -> "tuple[int, Any]":
+        with self._lock:
+            ticket = self.tickets.get(external_id)
+            if ticket is None:
+                return 404, {"code": "404", "reason": "Not Found", "message": f"Ticket {external_id} no existe"}
+            if body.get("status"):
+                ticket["status"] = body["status"]
+            self._merge_characteristics(ticket, body.get("troubleTicketCharacteristic"))
+            known = {r["id"] for r in ticket["troubleTicketRelationship"]}
+            for rel in body.get("TroubleTicketRelationships") or []:
+                if isinstance(rel, dict) and isinstance(rel.get("id"), str) and rel["id"] not in known:
+                    ticket["troubleTicketRelationship"].append(
+                        {"id": rel["id"], "relationshipType": rel.get("relationshipType", "Case"),
+                         "@type": "TroubleTicketRelationship"}
+                    )
+                    known.add(rel["id"])
+            for note in body.get("note") or []:
+                ticket["note"].append({"id": f"{external_id}-N{len(ticket['note']) + 1}", "date": _now(),
+                                       "text": note.get("text"), "@type": "Note"})
+            for attachment in body.get("attachment") or []:
+                # Sin el contenido: puede ser una imagen en base64.
+                ticket["attachment"].append({"name": attachment.get("name"), "mimeType": attachment.get("mimeType"),
+                                             "size": len(attachment.get("content") or ""), "@type": "Attachment"})
+            ticket["lastUpdate"] = _now()
+            return 200, ticket
+
+    def get(self, business_id: str, external_id: str) -> "tuple[int, Any]":
+        with self._lock:
+            ticket = self.tickets.get(external_id)
+        if ticket is None:
+            return 404, {"code": "404", "reason": "Not Found", "message": f"Ticket {external_id} no existe"}
+        return 200, ticket
+
+    def search(self, business_id: str, related_id: Optional[str]) -> "tuple[int, Any]":
+        with self._lock:
+            found = [
+                t for t in self.tickets.values()
+                if related_id is None or any(e.get("id") == related_id for e in t["relatedEntity"])
+            ]
+        return 200, found
+
+    def _build_app(self) -> FastAPI:
+        app = FastAPI(title="fake-esb", docs_url=None, redoc_url=None, openapi_url=None)
+
+        async def body_of(request: Request) -> Optional[Dict[str, Any]]:
+            try:
+                body = json.loads(await request.body() or b"{}")
+            except ValueError:
+                return None
+            return body if isinstance(body, dict) else None
+
+        def bad_json() -> "tuple[int, Any]":
+            return 400, {"code": "400", "reason": "Bad Request", "message": "JSON invalido"}
+
+        @app.post("/{business_id}/troubleTicket")
+        async def create_ticket(business_id: str, request: Request):
+            body = await body_of(request)
+            return await self._respond(request, lambda: self.create(business_id, body) if body is not None else bad_json())
+
+        @app.patch("/{business_id}/troubleTicket/{external_id}")
+        async def update_ticket(business_id: str, external_id: str, request: Request):
+            body = await body_of(request)
+            return await self._respond(
+                request, lambda: self.update(business_id, external_id, body) if body is not None else bad_json()
+            )
+
+        @app.get("/{business_id}/troubleTicket/{external_id}")
+        async def get_ticket(business_id: str, external_id: str, request: Request):
+            return await self._respond(request, lambda: self.get(business_id, external_id))
+
+        @app.get("/{business_id}/troubleTicket")
+        async def search_tickets(business_id: str, request: Request):
+            related_id = request.query_params.get("relatedEntity.id")
+            return await self._respond(request, lambda: self.search(business_id, related_id))
+
+        @app.get("/_fake/stats")
+        def stats():
+            return self.stats()
+
+        @app.post("/_fake/reset")
+        def reset():
+            self.reset()
+            return self.stats()
+
+        return app
+
+    # -- ciclo de vida -------------------------------------------------------
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"tickets": len(self.tickets), "requests": dict(self.requests)}
+
+    def reset(self):
+        with self._lock:
+            self.tickets.clear()
+            self.requests.clear()
+
+    def start(self) -> "FakeEsb":
+        import uvicorn
+
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind((self.host, self.port))
+        self.port = sock.getsockname()[1]
+        config = uvicorn.Config(self.app, log_level="warning", lifespan="off", access_log=False)
+        self._server = uvicorn.Server(config)
+        self._thread = threading.Thread(target=self._server.run, kwargs={"sockets": [sock]},
+                                        name="fake-esb", daemon=True)
+        self._thread.start()
+        deadline = time.monotonic() + 10
+        while not self._server.started and time.monotonic() < deadline:
+            time.sleep(0.01)
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.should_exit = True
+        if self._thread is not None:
+            self._thread.join(timeout=10)
+
+    def __enter__(self) -> "FakeEsb":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def add_esb_arguments(parser: argparse.ArgumentParser):
+    """Opciones de latencia y fallas, compartidas con los generadores de carga."""
+    parser.add_argument("--latency", type=str, default=None, help="p.ej. 0.2, uniform:0.1,0.5, lognormal:0.3,0.5")
+    parser.add_argument("--post-latency", type=str, default=None)
+    parser.add_argument("--patch-latency", type=str, default=None)
+    parser.add_argument("--get-latency", type=str, default=None)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="probabilidad de 500/502/503")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="probabilidad de 429")
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="requests/s antes de responder 429 (0 = sin limite)")
+    parser.add_argument("--burst", type=int, default=10)
+    parser.add_argument("--drip-rate", type=float, default=0.0, help="probabilidad de respuesta por goteo")
+    parser.add_argument("--drip-chunk", type=int, default=64, help="bytes por envio en el goteo")
+    parser.add_argument("--drip-interval", type=float, default=0.1, help="segundos entre envios en el goteo")
+    parser.add_argument("--seed", type=int, default=1)
+
+
+def esb_from_args(args: argparse.Namespace, host: str = "127.0.0.1", port: int = 0) -> FakeEsb:
+    return FakeEsb(
+        host=host,
+        port=port,
+        latency=args.latency,
+        post_latency=args.post_latency,
+        patch_latency=args.patch_latency,
+        get_latency=args.get_latency,
+        error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate,
+        rate_limit=args.rate_limit,
+        burst=args.burst,
+        drip_rate=args.drip_rate,
+        drip_chunk=args.drip_chunk,
+        drip_interval=args.drip_interval,
+        seed=args.seed,
+    )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="ESB troubleTicket de mentira con latencia y fallas")
+    parser.add_argument("--host", type=str, default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8099)
+    add_esb_arguments(parser)
+    args = parser.parse_args(argv)
+    esb = esb_from_args(args, args.host, args.port).start()
+    print(f"[fake-esb] escuchando en {esb.url} (ESB_URL={esb.url})", file=sys.stderr)
+    try:
+        while True:
+            time.sleep(10)
+            print(f"[fake-esb] {esb.stats()}", file=sys.stderr)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        esb.stop()
+    print(f"[fake-esb] {esb.stats()}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
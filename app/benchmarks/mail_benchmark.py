@@ -0,0 +1,307 @@
+# app/benchmarks/mail_benchmark.py
+"""
+Benchmark del mailer contra un relay SMTP local (app.benchmarks.smtp_sink).
+
+    python -m app.benchmarks.mail_benchmark --messages 500 --concurrency 8 \
+        --target use_case --target use_case_pool --target http_queue --latency 0.02
+
+Cada target envia `--messages` correos con `--concurrency` hilos y mide la
+latencia de cada llamada:
+
+    use_case       MailerUseCaseImpl.send_* con una conexion SMTP por mensaje
+    use_case_pool  lo mismo sobre un SmtpConnectionPool de `--pool-size`
+    bulk           MailerUseCaseImpl.send_bulk en lotes de `--bulk-size`
+    http           endpoints /mailer en proceso (TestClient), sin cola
+    http_queue     endpoints /mailer con MailQueue (202); ademas mide cuanto
+                   tarda la cola en vaciarse
+
+El resultado es un JSON con mensajes/s, p50/p99/max y lo que vio el relay
+(conexiones, mensajes, rechazos). Con --base-url los targets http* van contra
+un servidor ya levantado (que debe apuntar su SMTP_HOST/SMTP_PORT a un
+smtp_sink) en lugar de la app en proceso.
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+from app.adapters.smtp_pool import SmtpConnectionPool
+from app.api_services.mail_queue import MailQueue
+from app.api_services.mailer_use_case_impl import MailerUseCaseImpl
+from app.benchmarks.smtp_sink import SmtpSink, add_sink_arguments, sink_from_args
+from app.infrastructure.dto.mail_schema import MailBaseDTO, MailGeneralDTO, RadarMailDTO
+
+TARGETS = ("use_case", "use_case_pool", "bulk", "http", "http_queue")
+KINDS = ("incident", "general", "radar")
+ENDPOINTS = {"incident": "send_email", "general": "sent_email_general", "radar": "send_email_radar"}
+
+
+def _payload(kind: str, i: int) -> dict:
+    if kind == "incident":
+        return dict(to_mails="noc@example.com", ticket_id=f"INC{i:07d}", cid_mgt=f"CID{i % 97}",
+                    branch="Sede Central", country="CL", customer="ACME")
+    if kind == "general":
+        return dict(to_mails=["noc@example.com"], copy_mails=["ops@example.com"],
+                    subject=f"Aviso {i}", body="<p>Mantenimiento programado</p>" * 20)
+    return dict(to_mails=["radar@example.com"], radar_checklist_choices="Upgrade", radar_user_email="u@example.com",
+                radar_account_id=str(i), radar_country="CL", radar_creation_date="2025-01-01", radar_case="C1",
+                radar_contact_name="Ana", radar_contact_phone="+56 2 0000 0000", radar_contact_email="ana@example.com",
+                radar_area="Red", radar_type="Oportunidad", radar_details="Detalle")
+
+
+def _use_case_call(use_case: MailerUseCaseImpl, kind: str) -> Callable[[int], None]:
+    if kind == "incident":
+        return lambda i: use_case.send_email_none(MailBaseDTO(**_payload(kind, i)))
+    if kind == "general":
+        return lambda i: use_case.send_email_general(MailGeneralDTO(**_payload(kind, i)))
+    return lambda i: use_case.send_email_radar(RadarMailDTO(**_payload(kind, i)))
+
+
+def _summary(samples: List[float]) -> Dict[str, Optional[float]]:
+    if not samples:
+        return {"p50": None, "p99": None, "max": None}
+    ordered = sorted(samples)
+
+    def at(q: float) -> float:
+        return round(ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))], 5)
+
+    return {"p50": at(0.5), "p99": at(0.99), "max": round(ordered[-1], 5)}
+
+
+def run_calls(call: Callable[[int], None], messages: int, concurrency: int) -> dict:
+    """Ejecuta call(0..messages-1) con `concurrency` hilos; latencia por llamada y errores."""
+    latencies: List[float] = []
+    errors: Dict[str, int] = {}
+    lock = threading.Lock()
+
+    def one(i: int):
+        started = time.perf_counter()
+        try:
+            call(i)
+            error = None
+        except Exception as e:
+            error = type(e).__name__
+        elapsed = time.perf_counter() - started
+        with lock:
+            latencies.append(elapsed)
+            if error:
+                errors[error] = errors.get(error, 0) + 1
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(one, range(messages)))
+    elapsed = time.perf_counter() - started
+    return {
+        "calls": messages,
+        "errors": errors,
+        "elapsed_seconds": round(elapsed, 4),
+        "messages_per_second": round(messages / elapsed, 2) if elapsed else None,
+        "latency_seconds": _summary(latencies),
+    }
+
+
+class _HttpDriver:
+    """Cliente de los endpoints /mailer: la app en proceso (TestClient) o --base-url."""
+
+    def __init__(self, base_url: Optional[str], api_key: Optional[str], use_case: MailerUseCaseImpl,
+                 queue: Optional[MailQueue]):
+        if base_url:
+            import requests
+
+            from app.conf.config import get_app_settings
+
+            settings = get_app_settings()
+            self.prefix = base_url.rstrip("/") + settings.api_v1_str + "/mailer"
+            self.headers = {settings.api_key_name: api_key or settings.api_key}
+            self._local = threading.local()
+            self._session = lambda: self._local.__dict__.setdefault("session", requests.Session())
+            self._client = None
+            return
+
+        from fastapi import FastAPI
+        from fastapi.testclient import TestClient
+
+        from app.conf.settings.dependencies import validate_api_key
+        from app.container_instance.instances import mail_coalescer, mail_queue, mailer_use_case
+        from app.infrastructure.controllers.mailer_router import mailer_router
+
+        app = FastAPI()
+        app.include_router(mailer_router, prefix="/mailer")
+        app.dependency_overrides[mailer_use_case] = lambda: use_case
+        app.dependency_overrides[mail_queue] = lambda: queue
+        app.dependency_overrides[mail_coalescer] = lambda: None
+        app.dependency_overrides[validate_api_key] = lambda: "benchmark"
+        self.prefix = "/mailer"
+        self.headers = {}
+        self._client = TestClient(app).__enter__()
+        self._session = lambda: self._client
+
+    def post(self, path: str, payload: dict) -> int:
+        response = self._session().post(f"{self.prefix}/{path}", json=payload, headers=self.headers)
+        if response.status_code >= 400:
+            raise RuntimeError(f"HTTP {response.status_code}")
+        return response.status_code
+
+    def queue_stats(self) -> Optional[dict]:
+        response = self._session().get(f"{self.prefix}/queue", headers=self.headers)
+        return response.json() if response.status_code == 200 else None
+
+    def close(self):
+        if self._client is not None:
+            self._client.__exit__(None, None, None)
+
+
+def _wait_drained(driver: _HttpDriver, expected: int, timeout: float) -> Optional[dict]:
+    """Sondea GET /mailer/queue hasta que `expected` mensajes quedan enviados o fallidos."""
+    deadline = time.monotonic() + timeout
+    stats = driver.queue_stats()
+    while stats and stats["sent"] + stats["failed"] < expected and time.monotonic() < deadline:
+        time.sleep(0.05)
+        stats = driver.queue_stats()
+    return stats
+
+
+def benchmark_target(target: str, args: argparse.Namespace, sink: Optional[SmtpSink], host: str, port: int) -> dict:
+    pool = None
+    if target in ("use_case_pool", "bulk", "http", "http_queue"):
+        pool = SmtpConnectionPool(host, port, max_size=args.pool_size)
+    use_case = MailerUseCaseImpl(None, ip_smtp=host, smtp_port=port, smtp_pool=pool)
+    queue = None
+    driver = None
+    if sink is not None:
+        sink.reset()
+    result: dict = {"target": target, "kind": args.kind}
+    try:
+        if target in ("use_case", "use_case_pool"):
+            call = _use_case_call(use_case, args.kind)
+        elif target == "bulk":
+            model = MailBaseDTO if args.kind == "incident" else MailGeneralDTO
+            if args.kind == "radar":
+                raise SystemExit("bulk solo admite --kind incident o general")
+
+            def call(i: int):
+                items = [model(**_payload(args.kind, i * args.bulk_size + j)) for j in range(args.bulk_size)]
+                outcome = use_case.send_bulk(items, sessions=args.pool_size)
+                if outcome.failed:
+                    raise RuntimeError(f"{outcome.failed} fallidos")
+        else:
+            if target == "http_queue" and not args.base_url:
+                queue = MailQueue(pool, workers=args.queue_workers, batch_size=args.queue_batch_size,
+                                  retry_base_seconds=0.5, retry_max_seconds=5)
+                queue.start()
+            driver = _HttpDriver(args.base_url, args.api_key, use_case, queue)
+            endpoint = ENDPOINTS[args.kind]
+
+            def call(i: int):
+                driver.post(endpoint, _payload(args.kind, i))
+
+        calls = args.messages // args.bulk_size if target == "bulk" else args.messages
+        started = time.perf_counter()
+        result.update(run_calls(call, max(1, calls), args.concurrency))
+        if target == "bulk":
+            result["messages"] = max(1, calls) * args.bulk_size
+            result["messages_per_second"] = round(result["messages"] / result["elapsed_seconds"], 2)
+
+        if target == "http_queue":
+            stats = _wait_drained(driver, args.messages, args.drain_timeout)
+            drained = time.perf_counter() - started
+            result["queue"] = stats
+            result["drained_seconds"] = round(drained, 4)
+            result["delivered_per_second"] = round((stats or {}).get("sent", 0) / drained, 2)
+    finally:
+        if driver is not None:
+            driver.close()
+        if queue is not None:
+            queue.stop()
+        if pool is not None:
+            result["pool"] = {"connects": pool.connects, "reuses": pool.reuses}
+            pool.close()
+    if sink is not None:
+        result["sink"] = sink.stats()
+    return result
+
+
+def _parse_args(argv: Optional[List[str]]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark del mailer contra un relay SMTP local")
+    parser.add_argument("--target", action="append", choices=TARGETS,
+                        help="que medir; se puede repetir (por defecto use_case y use_case_pool)")
+    parser.add_argument("--kind", choices=KINDS, default="incident")
+    parser.add_argument("--messages", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--pool-size", type=int, default=4)
+    parser.add_argument("--bulk-size", type=int, default=50, help="correos por llamada en el target bulk")
+    parser.add_argument("--queue-workers", type=int, default=2)
+    parser.add_argument("--queue-batch-size", type=int, default=20)
+    parser.add_argument("--drain-timeout", type=float, default=120)
+    parser.add_argument("--smtp-host", type=str, default=None,
+                        help="usar un smtp_sink ya levantado en lugar de uno en proceso")
+    parser.add_argument("--smtp-port", type=int, default=2525)
+    parser.add_argument("--base-url", type=str, default=None,
+                        help="servidor ya levantado para los targets http (p.ej. http://localhost:8000)")
+    parser.add_argument("--api-key", type=str, default=None)
+    parser.add_argument("--output", type=str, default=None, help="archivo JSON de resultados (por defecto stdout)")
+    add_sink_arguments(parser)
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = _parse_args(argv)
+    args.bulk_size = max(1, args.bulk_size)
+    targets = args.target or ["use_case", "use_case_pool"]
+    started_at = datetime.now().isoformat(timespec="seconds")
+
+    sink = None
+    if args.smtp_host:
+        host, port = args.smtp_host, args.smtp_port
+    else:
+        sink = sink_from_args(args).start()
+        host, port = sink.host, sink.port
+
+    results = []
+    try:
+        for target in targets:
+            print(f"[mail-bench] {target}: {args.messages} correos, concurrencia {args.concurrency}", file=sys.stderr)
+            results.append(benchmark_target(target, args, sink, host, port))
+    finally:
+        if sink is not None:
+            sink.stop()
+
+    report = {
+        "started_at": started_at,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "messages": args.messages,
+        "concurrency": args.concurrency,
+        "smtp": {
+            "host": host, "port": port, "in_process": sink is not None,
+            "latency": args.latency, "data_latency": args.data_latency,
+            "reject_rate": args.reject_rate, "tempfail_rate": args.tempfail_rate,
+            "drop_rate": args.drop_rate, "pipelining": not args.no_pipelining,
+        },
+        "results": results,
+    }
+    payload = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(payload + "\n")
+    else:
+        print(payload)
+    for result in results:
+        print(
+            f"[mail-bench] {result['target']}: {result['messages_per_second']} msg/s, "
+            f"p50 {result['latency_seconds']['p50']}s, p99 {result['latency_seconds']['p99']}s",
+            file=sys.stderr,
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,228 @@
+# app/benchmarks/report_benchmark.py
+"""
+Benchmark del pipeline de reportes con datos sinteticos.
+
+    python -m app.benchmarks.report_benchmark --profile 100 --profile 1k --sqlite \
+        --output bench.json
+
+Por cada perfil genera un cliente (app.benchmarks.synthetic_data), opcionalmente
+lo carga en una base local (SQLite temporal o --db-uri de MySQL de prueba) y
+mide por separado get_customer_info, el filtrado (ReportDataset), las tablas,
+las graficas y el render/guardado de cada docx/xlsx. El resultado es un JSON
+con min/mediana/max por etapa; con --thresholds la mediana se compara contra
+los limites del archivo y el proceso sale con 1 si alguno se supera.
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
+from sqlmodel import Session
+
+from app.adapters.charts.native_chart_renderer import NativeChartRenderer
+from app.adapters.repositories.toolmaster_repository import ToolmasterRepository
+from app.api_services.report_dataset import ReportDataset
+from app.api_services.report_use_case_impl import UnifiedReportUseCaseImpl
+from app.benchmarks.synthetic_data import PROFILES, SyntheticProfile, generate_customer, load_customer, sqlite_engine
+from app.infrastructure.dto.reports_schema import CustomerDTO, WordReportDTO
+from app.utils.spooled_output import buffer_size
+from app.utils.stage_timer import record_stages
+
+DEFAULT_THRESHOLDS = os.path.join(os.path.dirname(__file__), "thresholds.json")
+REPORT_TYPES = ("monthly", "incidents", "saso")
+START_DATE = datetime(2025, 1, 1)
+END_DATE = datetime(2025, 1, 31, 23, 59, 59)
+
+
+def _report_dto(customer: CustomerDTO, language: str) -> WordReportDTO:
+    return WordReportDTO(
+        cust=customer.name,
+        language=language,
+        start_date=START_DATE,
+        end_date=END_DATE,
+        incidentes=customer.incidents,
+        service_requests=customer.service_requests,
+        cambios=customer.changes,
+        customers=[customer],
+    )
+
+
+def _render(use_case: UnifiedReportUseCaseImpl, report_type: str, customer: CustomerDTO, dataset: ReportDataset):
+    if report_type == "monthly":
+        return use_case.generate_monthly_report(_report_dto(customer, "es"), dataset=dataset)
+    if report_type == "incidents":
+        return use_case.generate_incidents_report(_report_dto(customer, "es"), dataset=dataset)
+    return use_case.generate_saso_excel_report(_report_dto(customer, "en"), dataset=dataset)
+
+
+def _summary(samples: List[float]) -> Dict[str, float]:
+    return {
+        "median": round(statistics.median(samples), 4),
+        "min": round(min(samples), 4),
+        "max": round(max(samples), 4),
+    }
+
+
+def benchmark_profile(
+    name: str,
+    profile: SyntheticProfile,
+    report_types: List[str],
+    repeat: int,
+    seed: int,
+    account_id: int,
+    engine: Optional[Engine] = None,
+) -> dict:
+    customer = generate_customer(profile, START_DATE, END_DATE, seed=seed, account_id=account_id)
+    result = {"profile": name, "counts": profile._asdict(), "stages": {}, "output_bytes": {}}
+    if engine is not None:
+        started = time.perf_counter()
+        load_customer(engine, customer)
+        result["load_seconds"] = round(time.perf_counter() - started, 4)
+
+    # Sin cache de graficas: cada repeticion vuelve a dibujarlas.
+    use_case = UnifiedReportUseCaseImpl(chart_renderer=NativeChartRenderer())
+    samples: Dict[str, List[float]] = defaultdict(list)
+    for _ in range(repeat):
+        if engine is not None:
+            with Session(engine) as session:
+                started = time.perf_counter()
+                customer = ToolmasterRepository(session=session).get_customer_info(
+                    customer.sf_account_id, START_DATE, END_DATE
+                )
+                samples["get_customer_info"].append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        ReportDataset.from_customer(customer)
+        samples["filtering"].append(time.perf_counter() - started)
+
+        for report_type in report_types:
+            # Dataset nuevo por reporte: el frame de disponibilidad se cachea en el.
+            dataset = ReportDataset.from_customer(customer)
+            with record_stages() as timings:
+                started = time.perf_counter()
+                buffer = _render(use_case, report_type, customer, dataset)
+                timings["total"] = time.perf_counter() - started
+            with buffer:
+                result["output_bytes"][report_type] = buffer_size(buffer)
+            for stage_name, seconds in timings.items():
+                samples[f"{report_type}.{stage_name}"].append(seconds)
+
+    result["stages"] = {stage_name: _summary(values) for stage_name, values in samples.items()}
+    return result
+
+
+def check_thresholds(results: List[dict], thresholds: Dict[str, Dict[str, float]]) -> List[dict]:
+    """Etapas cuya mediana supera el limite configurado para su perfil."""
+    regressions = []
+    for result in results:
+        limits = thresholds.get(result["profile"], {})
+        for stage_name, limit in limits.items():
+            measured = result["stages"].get(stage_name)
+            if measured and measured["median"] > limit:
+                regressions.append({
+                    "profile": result["profile"],
+                    "stage": stage_name,
+                    "median": measured["median"],
+                    "threshold": limit,
+                })
+    return regressions
+
+
+def _parse_args(argv: Optional[List[str]]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark del pipeline de reportes con datos sinteticos")
+    parser.add_argument("--profile", action="append", choices=sorted(PROFILES),
+                        help="perfil de volumen; se puede repetir (por defecto 100 y 1k)")
+    parser.add_argument("--counts", type=str, default=None,
+                        help="perfil a medida: incidentes,srs,cambios,activos,contactos,worklogs")
+    parser.add_argument("--reports", type=str, default=",".join(REPORT_TYPES),
+                        help="reportes a medir, separados por coma")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=1)
+    db = parser.add_mutually_exclusive_group()
+    db.add_argument("--sqlite", action="store_true",
+                    help="cargar los datos en un SQLite temporal y medir get_customer_info")
+    db.add_argument("--db-uri", type=str, default=None,
+                    help="base MySQL de prueba (esquema csctoolmaster) donde cargar los datos")
+    parser.add_argument("--account-id", type=int, default=101,
+                        help="primer account_id sintetico (evita choques en una base compartida)")
+    parser.add_argument("--thresholds", type=str, default=None,
+                        help=f"JSON perfil -> etapa -> segundos maximos (p.ej. {DEFAULT_THRESHOLDS})")
+    parser.add_argument("--output", type=str, default=None, help="archivo JSON de resultados (por defecto stdout)")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = _parse_args(argv)
+    profiles = {name: PROFILES[name] for name in (args.profile or ([] if args.counts else ["100", "1k"]))}
+    if args.counts:
+        profiles["custom"] = SyntheticProfile(*(int(n) for n in args.counts.split(",")))
+    report_types = [r.strip() for r in args.reports.split(",") if r.strip()]
+    unknown = set(report_types) - set(REPORT_TYPES)
+    if unknown:
+        raise SystemExit(f"Reportes desconocidos: {', '.join(sorted(unknown))}")
+
+    started_at = datetime.now().isoformat(timespec="seconds")
+    tmp_dir = None
+    engine = None
+    if args.sqlite:
+        tmp_dir = tempfile.mkdtemp(prefix="report-bench-")
+        engine = sqlite_engine(os.path.join(tmp_dir, "toolmaster.db"))
+    elif args.db_uri:
+        engine = create_engine(args.db_uri)
+
+    results = []
+    try:
+        for offset, (name, profile) in enumerate(profiles.items()):
+            print(f"[report-bench] perfil {name}: {profile}", file=sys.stderr)
+            results.append(benchmark_profile(
+                name, profile, report_types, max(1, args.repeat), args.seed, args.account_id + offset, engine
+            ))
+    finally:
+        if engine is not None:
+            engine.dispose()
+        if tmp_dir:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    regressions = []
+    if args.thresholds:
+        with open(args.thresholds, "r") as f:
+            regressions = check_thresholds(results, json.load(f))
+    report = {
+        "started_at": started_at,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "database": "sqlite" if args.sqlite else ("db-uri" if args.db_uri else None),
+        "repeat": max(1, args.repeat),
+        "seed": args.seed,
+        "results": results,
+        "regressions": regressions,
+    }
+    payload = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(payload + "\n")
+    else:
+        print(payload)
+    for reg in regressions:
+        print(
+            f"[report-bench] REGRESION {reg['profile']} {reg['stage']}: "
+            f"{reg['median']:.3f}s > {reg['threshold']:.3f}s",
+            file=sys.stderr,
+        )
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,284 @@
+# app/benchmarks/smtp_sink.py
+"""
+Relay SMTP local para medir el mailer sin tocar webmail.cbs-cloud.com.
+
+    python -m app.benchmarks.smtp_sink --port 2525 --latency 0.05 --reject-rate 0.01
+
+Acepta todo y descarta los mensajes (o los guarda con keep_messages=True).
+Se levanta en el mismo proceso para pruebas y benchmarks:
+
+    with SmtpSink(latency=0.02) as sink:
+        use_case = MailerUseCaseImpl(None, ip_smtp=sink.host, smtp_port=sink.port)
+        ...
+        sink.stats()
+
+`latency` simula la ida y vuelta con el relay: se espera una vez por cada
+tanda de comandos que llega junta (con PIPELINING, MAIL/RCPT/DATA pagan una
+sola espera). `data_latency` es lo que tarda el relay en aceptar el cuerpo.
+Las fallas se inyectan por probabilidad: destinatario rechazado (550),
+rechazo temporal del mensaje (451) y conexion cortada tras el DATA. Un
+destinatario que contiene `reject_pattern` siempre se rechaza.
+"""
+
+import argparse
+import random
+import socket
+import socketserver
+import sys
+import threading
+import time
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+
+class SinkMessage(NamedTuple):
+    from_addr: str
+    to_addrs: Tuple[str, ...]
+    data: bytes
+
+
+def _address(arg: str) -> str:
+    # "FROM:<a@b.com> SIZE=10" -> "a@b.com"
+    value = arg.split(":", 1)[1].strip() if ":" in arg else arg
+    value = value.split(" ", 1)[0] if not value.startswith("<") else value[1:value.find(">")]
+    return value
+
+
+class _SessionHandler(socketserver.BaseRequestHandler):
+    server: "_SinkServer"
+
+    def setup(self):
+        self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.sink: SmtpSink = self.server.sink
+        self.mail_from: Optional[str] = None
+        self.rcpts: List[str] = []
+        self.data: Optional[List[bytes]] = None
+
+    def handle(self):
+        self.sink._count("connections")
+        self._flush([b"220 smtp-sink ESMTP"])
+        buffer = b""
+        while True:
+            try:
+                chunk = self.request.recv(65536)
+            except OSError:
+                return
+            if not chunk:
+                return
+            buffer += chunk
+            *lines, buffer = buffer.split(b"\n")
+            replies: List[bytes] = []
+            extra_wait = 0.0
+            for line in lines:
+                reply = self._line(line + b"\n")
+                if reply is None:
+                    continue
+                if reply is _DROP:
+                    self.sink._count("dropped")
+                    return
+                if reply is _QUIT:
+                    self._flush(replies + [b"221 bye"])
+                    return
+                if reply.startswith(b"250 queued") or reply.startswith(b"451"):
+                    extra_wait += self.sink.data_latency
+                replies.extend(reply.split(b"\r\n"))
+            if replies:
+                self._flush(replies, extra_wait)
+
+    def _flush(self, replies: List[bytes], extra_wait: float = 0.0):
+        wait = self.sink.latency + extra_wait
+        if wait:
+            time.sleep(wait)
+        self.request.sendall(b"".join(r + b"\r\n" for r in replies))
+
+    def _line(self, line: bytes):
+        sink = self.sink
+        if self.data is not None:
+            if line.rstrip(b"\r\n") != b".":
+                self.data.append(line[1:] if line.startswith(b"..") else line)
+                return None
+            payload, self.data = b"".join(self.data), None
+            recipients, self.rcpts = tuple(self.rcpts), []
+            if sink._roll(sink.drop_rate):
+                return _DROP
+            if sink._roll(sink.tempfail_rate):
+                sink._count("tempfailed")
+                return b"451 4.3.0 intente mas tarde"
+            sink._accept(SinkMessage(self.mail_from or "", recipients, payload))
+            return b"250 queued"
+
+        text = line.decode("latin-1").strip()
+        verb = text[:4].upper()
+        if verb == "EHLO":
+            lines = [b"250-smtp-sink", b"250-8BITMIME"]
+            if sink.pipelining:
+                lines.append(b"250-PIPELINING")
+            lines.append(b"250 SIZE 52428800")
+            return b"\r\n".join(lines)
+        if verb == "HELO":
+            return b"250 smtp-sink"
+        if verb == "MAIL":
+            self.mail_from, self.rcpts = _address(text[4:]), []
+            return b"250 ok"
+        if verb == "RCPT":
+            if self.mail_from is None:
+                return b"503 falta MAIL"
+            address = _address(text[4:])
+            if (sink.reject_pattern and sink.reject_pattern in address.lower()) or sink._roll(sink.reject_rate):
+                sink._count("rejected")
+                return b"550 5.1.1 destinatario rechazado"
+            self.rcpts.append(address)
+            return b"250 ok"
+        if verb == "DATA":
+            if not self.rcpts:
+                # Igual que Postfix: sin destinatarios validos el DATA no se acepta.
+                return b"554 5.5.1 sin destinatarios validos"
+            self.data = []
+            return b"354 fin con <CRLF>.<CRLF>"
+        if verb == "RSET":
+            self.mail_from, self.rcpts = None, []
+            return b"250 ok"
+        if verb == "NOOP":
+            return b"250 ok"
+        if verb == "QUIT":
+            return _QUIT
+        return b"502 comando no implementado"
+
+
+_DROP = b"drop"
+_QUIT = b"quit"
+
+
+class _SinkServer(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+
+class SmtpSink:
+    """Servidor SMTP de descarte con latencia y fallas configurables (ver el docstring del modulo)."""
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: float = 0.0,
+        data_latency: float = 0.0,
+        reject_rate: float = 0.0,
+        tempfail_rate: float = 0.0,
+        drop_rate: float = 0.0,
+        reject_pattern: Optional[str] = "reject",
+        pipelining: bool = True,
+        keep_messages: bool = False,
+        seed: Optional[int] = None,
+    ):
+        self.latency = latency
+        self.data_latency = data_latency
+        self.reject_rate = reject_rate
+        self.tempfail_rate = tempfail_rate
+        self.drop_rate = drop_rate
+        self.reject_pattern = reject_pattern.lower() if reject_pattern else None
+        self.pipelining = pipelining
+        self.keep_messages = keep_messages
+        self.messages: List[SinkMessage] = []
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._counters: Dict[str, int] = {}
+        self.reset()
+        self._server = _SinkServer((host, port), _SessionHandler)
+        self._server.sink = self
+        self.host, self.port = self._server.server_address[:2]
+        self._thread: Optional[threading.Thread] = None
+
+    def _roll(self, rate: float) -> bool:
+        if rate <= 0:
+            return False
+        with self._lock:
+            return self._random.random() < rate
+
+    def _count(self, name: str, n: int = 1):
+        with self._lock:
+            self._counters[name] += n
+
+    def _accept(self, message: SinkMessage):
+        with self._lock:
+            self._counters["messages"] += 1
+            self._counters["recipients"] += len(message.to_addrs)
+            self._counters["bytes"] += len(message.data)
+            if self.keep_messages:
+                self.messages.append(message)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._counters)
+
+    def reset(self):
+        with self._lock:
+            self._counters = dict.fromkeys(
+                ("connections", "messages", "recipients", "bytes", "rejected", "tempfailed", "dropped"), 0
+            )
+            self.messages = []
+
+    def start(self) -> "SmtpSink":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="smtp-sink", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread:
+            self._thread.join()
+
+    def __enter__(self) -> "SmtpSink":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def add_sink_arguments(parser: argparse.ArgumentParser):
+    """Opciones de latencia y fallas, compartidas con mail_benchmark."""
+    parser.add_argument("--latency", type=float, default=0.0, help="segundos por ida y vuelta")
+    parser.add_argument("--data-latency", type=float, default=0.0, help="segundos extra para aceptar cada mensaje")
+    parser.add_argument("--reject-rate", type=float, default=0.0, help="probabilidad de 550 por destinatario")
+    parser.add_argument("--tempfail-rate", type=float, default=0.0, help="probabilidad de 451 por mensaje")
+    parser.add_argument("--drop-rate", type=float, default=0.0, help="probabilidad de cortar la conexion tras el DATA")
+    parser.add_argument("--no-pipelining", action="store_true", help="no anunciar PIPELINING")
+    parser.add_argument("--seed", type=int, default=1)
+
+
+def sink_from_args(args: argparse.Namespace, host: str = "127.0.0.1", port: int = 0) -> SmtpSink:
+    return SmtpSink(
+        host=host,
+        port=port,
+        latency=args.latency,
+        data_latency=args.data_latency,
+        reject_rate=args.reject_rate,
+        tempfail_rate=args.tempfail_rate,
+        drop_rate=args.drop_rate,
+        pipelining=not args.no_pipelining,
+        seed=args.seed,
+    )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Relay SMTP local de descarte")
+    parser.add_argument("--host", type=str, default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=2525)
+    add_sink_arguments(parser)
+    args = parser.parse_args(argv)
+    sink = sink_from_args(args, args.host, args.port).start()
+    print(f"[smtp-sink] escuchando en {sink.host}:{sink.port} (SMTP_HOST/SMTP_PORT)", file=sys.stderr)
+    try:
+        while True:
+            time.sleep(10)
+            print(f"[smtp-sink] {sink.stats()}", file=sys.stderr)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        sink.stop()
+    print(f"[smtp-sink] {sink.stats()}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,436 @@
+# app/benchmarks/synthetic_data.py
+
+import random
+import sqlite3
+import zlib
+from datetime import datetime, timedelta
+from typing import Dict, List, NamedTuple
+
+from sqlalchemy import (
+    Boolean,
+    Column,
+    DateTime,
+    Float,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    Text,
+    create_engine,
+    event,
+    insert,
+)
+from sqlalchemy.engine import Engine
+
+from app.api_services.report_dataset import ATTRIB_MAP
+from app.infrastructure.dto.reports_schema import (
+    AssetDTO,
+    ChangeDTO,
+    ContactDTO,
+    CustomerDTO,
+    IncidentDTO,
+    ServiceRequestDTO,
+    WorklogDTO,
+)
+
+
+class SyntheticProfile(NamedTuple):
+    incidents: int
+    service_requests: int
+    changes: int
+    assets: int
+    contacts: int
+    worklogs: int
+
+
+PROFILES: Dict[str, SyntheticProfile] = {
+    "100": SyntheticProfile(100, 100, 100, 25, 5, 100),
+    "1k": SyntheticProfile(1_000, 1_000, 1_000, 100, 10, 1_000),
+    "10k": SyntheticProfile(10_000, 10_000, 10_000, 500, 20, 10_000),
+    "50k": SyntheticProfile(50_000, 50_000, 50_000, 2_000, 50, 50_000),
+}
+
+# Valores con la forma de los de Toolmaster: estados mezclados (cerrados,
+# abiertos y cancelados), textos con tildes y circuitos repetidos.
+TICKET_STATUSES = ["Resolved", "Closed", "Closed", "Resolved", "In Progress", "Pending", "Canceled"]
+CHANGE_STATUSES = ["Closed", "Completed", "Review", "Scheduled", "Canceled"]
+ATTRIBUTIONS = list(ATTRIB_MAP) + ["Other", None]
+PRODUCT_FAMILIES = ["Internet Dedicado", "MPLS", "Wavelength", "Ethernet", "SD-WAN"]
+LOCATIONS = ["Bogotá Calle 100", "Medellín El Poblado", "Panamá Centro", "Kingston", "San José", "Cali Sur"]
+COUNTRIES = ["Colombia", "Panamá", "Jamaica", "Costa Rica"]
+ACTION_TYPES = ["Proactive", "Reactive"]
+
+
+def _at(rnd: random.Random, start: datetime, end: datetime) -> datetime:
+    span = max(int((end - start).total_seconds()), 1)
+    return (start + timedelta(seconds=rnd.randrange(span))).replace(microsecond=0)
+
+
+def _ticket_assets(rnd: random.Random, assets: List[AssetDTO]) -> List[AssetDTO]:
+    # Como en los joins del repositorio: la mayoria con un activo, algunos sin ninguno.
+    if not assets or rnd.random() < 0.1:
+        return []
+    return rnd.sample(assets, 2 if rnd.random() < 0.1 and len(assets) > 1 else 1)
+
+
+def generate_customer(
+    profile: SyntheticProfile,
+    start_date: datetime,
+    end_date: datetime,
+    seed: int = 1,
+    account_id: int = 1,
+) -> CustomerDTO:
+    """CustomerDTO sintetico y reproducible (misma semilla, mismos datos) con los volumenes de `profile`."""
+    rnd = random.Random(seed)
+    ticket_ids = iter(range(account_id * 10_000_000 + 1, (account_id + 1) * 10_000_000))
+
+    assets = [
+        AssetDTO(
+            asset_id=account_id * 100_000 + n,
+            sf_asset_id=f"02i{account_id:05d}{n:07d}",
+            circuit_id=f"CID-{account_id}-{n:05d}",
+            product_family=rnd.choice(PRODUCT_FAMILIES),
+            product_category="Connectivity",
+            product_name=f"Enlace {rnd.choice([10, 50, 100, 1000])} Mbps",
+            status="Active",
+            location=rnd.choice(LOCATIONS),
+        )
+        for n in range(1, profile.assets + 1)
+    ]
+    contacts = [
+        ContactDTO(
+            contact_id=account_id * 100_000 + n,
+            sf_contact_id=f"003{account_id:05d}{n:07d}",
+            name=f"Contacto Núñez {n}",
+            contact_type=rnd.choice(["Technical", "Commercial", "Escalation"]),
+            email=f"contacto{n}@cliente{account_id}.com",
+            phone=f"+57 1 555 {n:04d}",
+            account_id=account_id,
+        )
+        for n in range(1, profile.contacts + 1)
+    ]
+
+    incidents = []
+    for n in range(1, profile.incidents + 1):
+        created = _at(rnd, start_date, end_date)
+        dw_start = created + timedelta(minutes=rnd.randint(0, 120))
+        dw_end = dw_start + timedelta(minutes=rnd.randint(1, 2880))
+        ticket_assets = _ticket_assets(rnd, assets)
+        incidents.append(IncidentDTO(
+            incident_id=account_id * 1_000_000 + n,
+            ticket_id=next(ticket_ids),
+            sf_incident_id=f"a0I{account_id:05d}{n:07d}",
+            incident_number=f"INC-{account_id}-{n:06d}",
+            subject="Caída de servicio",
+            priority=rnd.choice(["High", "Medium", "Low"]),
+            source_incident=rnd.choice(["Monitoring", "Customer", "Email"]),
+            reported_at=created,
+            affected_at=dw_start,
+            resolution_at=dw_end,
+            status=rnd.choice(TICKET_STATUSES),
+            created_at=created,
+            updated_at=dw_end,
+            start_at_dw=dw_start,
+            end_at_dw=dw_end,
+            downtime=round((dw_end - dw_start).total_seconds() / 60, 2),
+            is_major=rnd.random() < 0.05,
+            symptom="Sin servicio",
+            cause="Fibra cortada",
+            resolution_summary="Se reemplazó el tramo de fibra afectado",
+            description="El cliente reporta pérdida total del enlace",
+            attributed_to=rnd.choice(ATTRIBUTIONS),
+            reason=rnd.choice(["Service Down", "Degradation", "Other"]),
+            type_incident=rnd.choice(ACTION_TYPES),
+            stop_dw=round(rnd.random() * 60, 2),
+            assets=ticket_assets,
+        ))
+
+    service_requests = []
+    for n in range(1, profile.service_requests + 1):
+        created = _at(rnd, start_date, end_date)
+        resolved = created + timedelta(hours=rnd.randint(1, 96))
+        ticket_assets = _ticket_assets(rnd, assets)
+        first = ticket_assets[-1] if ticket_assets else None
+        service_requests.append(ServiceRequestDTO(
+            sr_id=account_id * 1_000_000 + n,
+            ticket_id=next(ticket_ids),
+            sf_sr_id=f"a0S{account_id:05d}{n:07d}",
+            sr_number=f"SR-{account_id}-{n:06d}",
+            priority=rnd.choice(["High", "Medium", "Low"]),
+            status=rnd.choice(TICKET_STATUSES),
+            sr_type="Configuración",
+            source="Portal",
+            symptom="Solicitud de cambio de configuración",
+            solution="Configuración aplicada",
+            created_at=created,
+            updated_at=resolved,
+            resolved_at=resolved,
+            closed_at=resolved,
+            sr_category="Soporte",
+            sr_type_actions=rnd.choice(ACTION_TYPES),
+            asset=first.circuit_id if first else None,
+            asset_location=first.location if first else None,
+            asset_type=first.product_category if first else None,
+            assets=ticket_assets,
+        ))
+
+    changes = []
+    for n in range(1, profile.changes + 1):
+        created = _at(rnd, start_date, end_date)
+        activity = created + timedelta(days=rnd.randint(1, 5))
+        ticket_assets = _ticket_assets(rnd, assets)
+        first = ticket_assets[-1] if ticket_assets else None
+        urgency = rnd.choice(["High", "Medium", "Low"])
+        changes.append(ChangeDTO(
+            change_id=account_id * 1_000_000 + n,
+            ticket_id=next(ticket_ids),
+            sf_change_id=f"a0C{account_id:05d}{n:07d}",
+            change_number=f"CHG-{account_id}-{n:06d}",
+            subject="Ventana de mantenimiento",
+            priority=urgency,
+            status=rnd.choice(CHANGE_STATUSES),
+            type_change=rnd.choice(["Normal", "Standard", "Emergency"]),
+            description="Actualización de firmware programada",
+            created_at=created,
+            updated_at=activity,
+            result="Exitoso",
+            type_of_action=rnd.choice(ACTION_TYPES),
+            bussines_reason="Mantenimiento preventivo",
+            urgency=urgency,
+            impact=rnd.choice(["High", "Medium", "Low"]),
+            risk_level="Low",
+            failure_probability="Low",
+            change_downtime=float(rnd.randint(0, 120)),
+            start_at_activity=activity,
+            end_at_activity=activity + timedelta(hours=2),
+            asset=first.circuit_id if first else None,
+            asset_location=first.location if first else None,
+            asset_type=first.product_category if first else None,
+            assets=ticket_assets,
+        ))
+
+    tickets = (
+        [(i.ticket_id, i.incident_number, i.created_at) for i in incidents]
+        + [(s.ticket_id, s.sr_number, s.created_at) for s in service_requests]
+        + [(c.ticket_id, c.change_number, c.created_at) for c in changes]
+    )
+    worklogs = []
+    for n in range(1, profile.worklogs + 1 if tickets else 1):
+        ticket_id, case_number, created = rnd.choice(tickets)
+        worklogs.append(WorklogDTO(
+            worklog_id=account_id * 1_000_000 + n,
+            sf_worklog_id=f"a0W{account_id:05d}{n:07d}",
+            created_by_name=rnd.choice(["Agente NOC", "Soporte Nivel 2", "Ingeniería"]),
+            type_worklog=rnd.choice(["Note", "Customer Update", "Escalation"]),
+            created_at=created + timedelta(minutes=rnd.randint(1, 600)),
+            ticket_id=ticket_id,
+            description="Seguimiento del caso con el cliente",
+            ticket_number=case_number,
+            worklog_number=f"WL-{account_id}-{n:07d}",
+        ))
+
+    return CustomerDTO(
+        account_id=account_id,
+        sf_account_id=f"001BENCH{account_id:07d}",
+        name=f"Cliente Sintético Ñandú {account_id}",
+        sccd_id=f"SCCD{account_id}",
+        country=COUNTRIES[account_id % len(COUNTRIES)],
+        category="Gold",
+        assets=assets,
+        contacts=contacts,
+        incidents=incidents,
+        service_requests=service_requests,
+        changes=changes,
+        worklogs=worklogs,
+    )
+
+
+# Solo las columnas que leen las consultas de ToolmasterRepository.
+TOOLMASTER_METADATA = MetaData(schema="csctoolmaster")
+
+_COUNTRIES = Table(
+    "app_countries", TOOLMASTER_METADATA,
+    Column("country_id", Integer, primary_key=True),
+    Column("name", String(100)),
+)
+_ACCOUNTS = Table(
+    "app_accounts", TOOLMASTER_METADATA,
+    Column("account_id", Integer, primary_key=True),
+    Column("sf_account_id", String(32), index=True),
+    Column("name", String(255)),
+    Column("sccd_id", String(64)),
+    Column("sf_category", String(64)),
+    Column("category", String(64)),
+    Column("country_id", Integer),
+)
+_ASSETS = Table(
+    "app_assets", TOOLMASTER_METADATA,
+    Column("asset_id", Integer, primary_key=True),
+    *(Column(name, String(255)) for name in (
+        "sf_asset_id", "circuit_id", "product_family", "product_category", "product_name", "status", "location",
+    )),
+    Column("account_id", Integer, index=True),
+)
+_CONTACTS = Table(
+    "app_contact", TOOLMASTER_METADATA,
+    Column("contact_id", Integer, primary_key=True),
+    *(Column(name, String(255)) for name in (
+        "sf_contact_id", "name", "contact_type", "email", "phone", "mobile_phone",
+    )),
+    Column("account_id", Integer, index=True),
+)
+_TICKETS = Table(
+    "app_ticket", TOOLMASTER_METADATA,
+    Column("ticket_id", Integer, primary_key=True),
+    Column("case_type_name", String(32)),
+    Column("case_number", String(64), index=True),
+    Column("created_at", DateTime, index=True),
+)
+_TICKET_ASSETS = Table(
+    "app_ticket_assets", TOOLMASTER_METADATA,
+    Column("ticket_id", Integer, index=True),
+    Column("assets_id", Integer),
+)
+_TICKET_ACCOUNTS = Table(
+    "app_ticket_accounts", TOOLMASTER_METADATA,
+    Column("ticket_id", Integer, index=True),
+    Column("accounts_id", Integer, index=True),
+)
+_INCIDENTS = Table(
+    "app_incident", TOOLMASTER_METADATA,
+    Column("incident_id", Integer, primary_key=True),
+    Column("ticket_id", Integer, index=True),
+    *(Column(name, String(255)) for name in (
+        "sf_incident_id", "incident_number", "source_incident", "status", "priority", "subject",
+        "attributed_to", "reason", "type_incident",
+    )),
+    *(Column(name, Text) for name in ("symptom", "cause", "resolution_summary", "description")),
+    *(Column(name, DateTime) for name in (
+        "reported_at", "affected_at", "resolution_at", "created_at", "updated_at", "start_at_dw", "end_at_dw",
+    )),
+    Column("downtime", Float),
+    Column("stop_dw", Float),
+    Column("is_major", Boolean),
+)
+_SERVICE_REQUESTS = Table(
+    "app_sr", TOOLMASTER_METADATA,
+    Column("sr_id", Integer, primary_key=True),
+    Column("ticket_id", Integer, index=True),
+    *(Column(name, String(255)) for name in (
+        "sf_sr_id", "sr_number", "status", "priority", "sr_type", "source", "sr_category", "sr_type_actions",
+    )),
+    *(Column(name, Text) for name in ("symptom", "resolution_summary")),
+    *(Column(name, DateTime) for name in ("created_at", "updated_at", "resolved_at", "closed_at")),
+)
+_CHANGES = Table(
+    "app_changes", TOOLMASTER_METADATA,
+    Column("change_id", Integer, primary_key=True),
+    Column("ticket_id", Integer, index=True),
+    *(Column(name, String(255)) for name in (
+        "sf_change_id", "change_number", "status", "urgency", "impact", "type_change", "subject",
+        "risk_level", "failure_probability", "bussines_reason", "result", "type_of_action",
+    )),
+    Column("description", Text),
+    Column("change_downtime", Float),
+    *(Column(name, DateTime) for name in (
+        "created_at", "updated_at", "start_at_activity", "end_at_activity",
+    )),
+)
+_WORKLOGS = Table(
+    "app_worklogs", TOOLMASTER_METADATA,
+    Column("worklog_id", Integer, primary_key=True),
+    Column("ticket_id", Integer, index=True),
+    *(Column(name, String(255)) for name in (
+        "sf_worklog_id", "created_by_name", "type_worklog", "ticket_number", "worklog_number",
+    )),
+    Column("description", Text),
+    Column("created_at", DateTime),
+)
+
+_INSERT_BATCH = 5_000
+
+
+def _insert(conn, table: Table, rows: List[dict]):
+    for i in range(0, len(rows), _INSERT_BATCH):
+        conn.execute(insert(table), rows[i:i + _INSERT_BATCH])
+
+
+def _fields(dto, table: Table, **extra) -> dict:
+    row = {c.name: getattr(dto, c.name, None) for c in table.columns}
+    row.update(extra)
+    return row
+
+
+def load_customer(engine: Engine, customer: CustomerDTO):
+    """
+    Inserta un cliente sintetico en las tablas de Toolmaster de `engine`
+    (creandolas si no existen), de modo que get_customer_info lo lea con las
+    mismas consultas que en produccion. Pensado para una base local de
+    prueba: nunca apuntarlo a la base real.
+    """
+    TOOLMASTER_METADATA.create_all(engine)
+    account_id = customer.account_id
+    country_id = COUNTRIES.index(customer.country) + 1 if customer.country in COUNTRIES else None
+    tickets, ticket_assets = [], []
+    for case_type, items, number_attr in (
+        ("incident", customer.incidents, "incident_number"),
+        ("service_request", customer.service_requests, "sr_number"),
+        ("Change_Request", customer.changes, "change_number"),
+    ):
+        for item in items:
+            tickets.append({
+                "ticket_id": item.ticket_id,
+                "case_type_name": case_type,
+                "case_number": getattr(item, number_attr),
+                "created_at": item.created_at,
+            })
+            ticket_assets.extend({"ticket_id": item.ticket_id, "assets_id": a.asset_id} for a in item.assets)
+    incidents = [_fields(i, _INCIDENTS) for i in customer.incidents]
+    srs = [_fields(s, _SERVICE_REQUESTS, resolution_summary=s.solution) for s in customer.service_requests]
+    changes = [_fields(c, _CHANGES) for c in customer.changes]
+
+    with engine.begin() as conn:
+        if country_id and conn.execute(_COUNTRIES.select().where(_COUNTRIES.c.country_id == country_id)).first() is None:
+            conn.execute(insert(_COUNTRIES), [{"country_id": n, "name": name} for n, name in enumerate(COUNTRIES, 1)])
+        conn.execute(insert(_ACCOUNTS), [{
+            "account_id": account_id,
+            "sf_account_id": customer.sf_account_id,
+            "name": customer.name,
+            "sccd_id": customer.sccd_id,
+            "category": customer.category,
+            "country_id": country_id,
+        }])
+        _insert(conn, _ASSETS, [_fields(a, _ASSETS, account_id=account_id) for a in customer.assets])
+        _insert(conn, _CONTACTS, [_fields(c, _CONTACTS) for c in customer.contacts])
+        _insert(conn, _TICKETS, tickets)
+        _insert(conn, _TICKET_ASSETS, ticket_assets)
+        _insert(conn, _TICKET_ACCOUNTS, [{"ticket_id": t["ticket_id"], "accounts_id": account_id} for t in tickets])
+        _insert(conn, _INCIDENTS, incidents)
+        _insert(conn, _SERVICE_REQUESTS, srs)
+        _insert(conn, _CHANGES, changes)
+        _insert(conn, _WORKLOGS, [_fields(w, _WORKLOGS) for w in customer.worklogs])
+
+
+def _crc32(value) -> int:
+    return zlib.crc32(str(value).encode()) if value is not None else None
+
+
+def _concat_ws(sep, *values) -> str:
+    return sep.join(str(v) for v in values if v is not None)
+
+
+def sqlite_engine(path: str) -> Engine:
+    """
+    Engine SQLite que hace de base de Toolmaster: el archivo `path` se
+    adjunta como esquema csctoolmaster y se registran CRC32/CONCAT_WS, que
+    get_customer_data_version toma de MySQL.
+    """
+    engine = create_engine("sqlite://")
+
+    @event.listens_for(engine, "connect")
+    def _attach(dbapi_conn: sqlite3.Connection, _):
+        dbapi_conn.execute("ATTACH DATABASE ? AS csctoolmaster", (path,))
+        dbapi_conn.create_function("CRC32", 1, _crc32, deterministic=True)
+        dbapi_conn.create_function("CONCAT_WS", -1, _concat_ws, deterministic=True)
+
+    return engine
@@ -0,0 +1,135 @@
+# app/benchmarks/ticket_fixture.py
+"""
+Base Toolmaster minima para el flujo de tickets (create/update/close).
+
+Crea y llena las tablas que lee TicketUseCaseImpl a partir de los mismos
+modelos SQLModel (app_accounts, app_assets, app_contact, app_cities,
+app_incident y net_inventory__devices), en un archivo SQLite o en una base
+MySQL de pruebas:
+
+    fixture = seed_ticket_fixture("sqlite:////tmp/tickets-load.db", accounts=50)
+    os.environ["TM_DB_URI"] = fixture.db_uri
+
+`register_incident` hace lo que en produccion hace la sincronizacion con
+Salesforce: deja el incident_number del ticket creado en app_incident para
+que /tickets/close lo encuentre. Nunca apuntar seed_ticket_fixture a la base
+real: borra y vuelve a crear esas tablas.
+"""
+
+import random
+from typing import Dict, List, NamedTuple, Optional
+
+from sqlalchemy import event, insert, select
+from sqlalchemy.engine import Engine
+from sqlmodel import SQLModel, create_engine
+
+from app.domain.entities.app_models import AppAccounts, AppAssets, AppCities, AppContact, AppIncident
+from app.domain.entities.net_inventory_devices import NetInventoryDevices
+
+FIXTURE_TABLES = [
+    AppAccounts.__table__,
+    AppAssets.__table__,
+    AppCities.__table__,
+    AppContact.__table__,
+    AppIncident.__table__,
+    NetInventoryDevices.__table__,
+]
+CITIES = ("Bogota", "Medellin", "Cali", "Barranquilla", "Cartagena", "Bucaramanga", "Pereira", "Manizales",
+          "Cucuta", "Ibague", "Santa Marta", "Villavicencio")
+CONTACT_TYPES = ("Help Desk Contact", "Technical Contact")
+PROACTIVE_OWNER_ID = "00G4X000003ZBcbUAG"  # cola CSC PROACTIVE MONITORING, el OwnerId por defecto al crear
+
+
+def _sf_id(prefix: str, n: int) -> str:
+    # Ids de 18 caracteres con el prefijo de objeto de Salesforce (001 cuenta, 02i asset, 003 contacto).
+    return f"{prefix}4X{n:011d}AAA"
+
+
+def _engine(db_uri: str) -> Engine:
+    engine = create_engine(db_uri)
+    if engine.dialect.name == "sqlite":
+        @event.listens_for(engine, "connect")
+        def _pragmas(conn, _):
+            # El servidor lee mientras el generador registra incidentes.
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA busy_timeout=30000")
+    return engine
+
+
+class TicketFixture:
+    """CIDs sembrados, agrupados por cuenta, y acceso a app_incident."""
+
+    def __init__(self, db_uri: str, circuits_by_account: Dict[int, List[str]], engine: Optional[Engine] = None):
+        self.db_uri = db_uri
+        self.circuits_by_account = circuits_by_account
+        self.circuits = [cid for cids in circuits_by_account.values() for cid in cids]
+        self.engine = engine or _engine(db_uri)
+
+    def register_incident(self, incident_number: str, sf_incident_id: str, owner_id: str = PROACTIVE_OWNER_ID):
+        with self.engine.begin() as conn:
+            conn.execute(insert(AppIncident.__table__).values(
+                incident_number=incident_number, sf_incident_id=sf_incident_id, owner_id=owner_id,
+            ))
+
+    def close(self):
+        self.engine.dispose()
+
+
+class _Rows(NamedTuple):
+    accounts: List[dict]
+    assets: List[dict]
+    cities: List[dict]
+    contacts: List[dict]
+    devices: List[dict]
+
+
+def _rows(accounts: int, circuits_per_account: int, rnd: random.Random) -> _Rows:
+    rows = _Rows([], [], [], [], [])
+    for city_id, name in enumerate(CITIES, start=1):
+        rows.cities.append(dict(city_id=city_id, name=name, country_id=1))
+    asset = 0
+    for account_id in range(1, accounts + 1):
+        rows.accounts.append(dict(account_id=account_id, sf_account_id=_sf_id("001", account_id)))
+        for k, contact_type in enumerate(CONTACT_TYPES):
+            contact_id = account_id * len(CONTACT_TYPES) + k
+            rows.contacts.append(dict(contact_id=contact_id, sf_contact_id=_sf_id("003", contact_id),
+                                      account_id=account_id, contact_type=contact_type))
+        # Las sedes de un cliente se concentran en pocas ciudades, como en una caida masiva real.
+        home_cities = rnd.sample(range(1, len(CITIES) + 1), k=min(3, len(CITIES)))
+        for _ in range(circuits_per_account):
+            asset += 1
+            circuit_id = f"{3000000 + asset}.CO"
+            rows.assets.append(dict(asset_id=asset, sf_asset_id=_sf_id("02i", asset), circuit_id=circuit_id,
+                                    account_id=account_id, city_id=rnd.choice(home_cities)))
+            rows.devices.append(dict(id=asset, branch=f"Sede {account_id}-{asset}", cid_mgt=circuit_id))
+    return rows
+
+
+def seed_ticket_fixture(db_uri: str, accounts: int = 50, circuits_per_account: int = 20,
+                        seed: int = 1) -> TicketFixture:
+    """Borra y vuelve a crear las tablas del flujo de tickets con datos sinteticos."""
+    engine = _engine(db_uri)
+    SQLModel.metadata.drop_all(engine, tables=FIXTURE_TABLES)
+    SQLModel.metadata.create_all(engine, tables=FIXTURE_TABLES)
+    rows = _rows(accounts, circuits_per_account, random.Random(seed))
+    with engine.begin() as conn:
+        conn.execute(insert(AppCities.__table__), rows.cities)
+        conn.execute(insert(AppAccounts.__table__), rows.accounts)
+        conn.execute(insert(AppContact.__table__), rows.contacts)
+        conn.execute(insert(AppAssets.__table__), rows.assets)
+        conn.execute(insert(NetInventoryDevices.__table__), rows.devices)
+    circuits: Dict[int, List[str]] = {}
+    for row in rows.assets:
+        circuits.setdefault(row["account_id"], []).append(row["circuit_id"])
+    return TicketFixture(db_uri, circuits, engine)
+
+
+def load_ticket_fixture(db_uri: str) -> TicketFixture:
+    """Usa una base ya sembrada (o la de QA): solo lee los CIDs de app_assets."""
+    engine = _engine(db_uri)
+    circuits: Dict[int, List[str]] = {}
+    with engine.connect() as conn:
+        table = AppAssets.__table__
+        for circuit_id, account_id in conn.execute(select(table.c.circuit_id, table.c.account_id)):
+            circuits.setdefault(account_id, []).append(circuit_id)
+    return TicketFixture(db_uri, circuits, engine)
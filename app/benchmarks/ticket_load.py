@@ -0,0 +1,634 @@
+# app/benchmarks/ticket_load.py
+"""
+Prueba de carga del ciclo de vida de un ticket: create -> update -> close.
+
+Reemplaza a create_tickets_script.sh. Por defecto levanta todo en local: una
+base sembrada (app.benchmarks.ticket_fixture, SQLite en un archivo temporal),
+el ESB de mentira (app.benchmarks.fake_esb) y la API con gunicorn igual que
+en produccion, y mide contra esa pila:
+
+    python -m app.benchmarks.ticket_load --workers 1 --workers 2 --workers 4 \
+        --rate 8 --ramp-up 10 --duration 60 --concurrency 64 \
+        --duplicate-ratio 0.2 --massive-ratio 0.05 --latency lognormal:0.4,0.5
+
+Cada `--workers` se mide por separado (servidor nuevo, misma carga), asi se
+compara cuantos workers hacen falta para un ritmo dado. `--workers 0` sirve
+la app en un hilo de este mismo proceso (rapido para probar, pero comparte el
+GIL con el generador; no sirve para dimensionar).
+
+La carga es de lazo abierto: los tickets nuevos llegan segun un proceso de
+Poisson de `--rate` por segundo (rampa lineal durante `--ramp-up`), sin
+esperar a que terminen los anteriores. Cada ticket hace su create, y tras
+`--think` segundos sus `--updates` updates y el close. `--concurrency` limita
+los requests en vuelo; lo que espera por ese limite cuenta en la latencia.
+
+Por endpoint se reporta throughput, errores por causa (HTTP, status del ESB
+en el cuerpo, excepcion del cliente), las etapas del header Server-Timing
+(base, ESB create, worklog...) y dos histogramas:
+  service    desde que el request sale hasta la respuesta
+  corrected  desde el momento en que el request DEBIA salir segun el
+             calendario; no esconde la cola que se arma cuando el servidor
+             se atrasa (coordinated omission). Con --rate 0 (lazo cerrado,
+             `--concurrency` usuarios en bucle) no hay calendario y ambos
+             coinciden.
+
+Contra un servidor ya levantado: --base-url (y --db-uri de la misma base
+para registrar los incidentes que usa el close; sin ella solo create/update).
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter, deque
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Deque, Dict, Iterator, List, Optional, Tuple
+
+from app.benchmarks.fake_esb import FakeEsb, add_esb_arguments, esb_from_args
+from app.benchmarks.ticket_fixture import TicketFixture, load_ticket_fixture, seed_ticket_fixture
+
+ENDPOINTS = ("create", "update", "close")
+ROOT = Path(__file__).resolve().parents[2]
+API_KEY = "ticket-load"
+API_KEY_NAME = "csc_token"
+# Settings obligatorios que el servidor de prueba no usa.
+PLACEHOLDER_SETTINGS = ("SECRET_KEY", "TM_DB_NAME", "TM_DB_USER", "TM_DB_PASSWORD", "TM_DB_HOST",
+                        "ESB_ID", "ESB_SECRET", "ESB_ENV")
+
+
+class LatencyHistogram:
+    """
+    Histograma con buckets logaritmicos (cada uno `growth` veces el anterior,
+    ~2% de error relativo) entre 0.1 ms y lo que haga falta. Memoria
+    constante sin importar la cantidad de muestras, como HdrHistogram.
+    """
+
+    def __init__(self, growth: float = 1.04, floor: float = 1e-4):
+        self.growth = growth
+        self.floor = floor
+        self._log_growth = math.log(growth)
+        self.counts: Counter = Counter()
+        self.count = 0
+        self.total = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+
+    def _bucket(self, seconds: float) -> int:
+        return 0 if seconds <= self.floor else int(math.log(seconds / self.floor) / self._log_growth) + 1
+
+    def _upper(self, bucket: int) -> float:
+        return self.floor * self.growth ** bucket
+
+    def record(self, seconds: float):
+        seconds = max(0.0, seconds)
+        self.counts[self._bucket(seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.min = seconds if self.min is None else min(self.min, seconds)
+        self.max = seconds if self.max is None else max(self.max, seconds)
+
+    def percentile(self, q: float) -> Optional[float]:
+        if not self.count:
+            return None
+        rank = max(1, math.ceil(q * self.count))
+        seen = 0
+        for bucket in sorted(self.counts):
+            seen += self.counts[bucket]
+            if seen >= rank:
+                return min(self._upper(bucket), self.max)
+        return self.max
+
+    def summary(self) -> Dict[str, Any]:
+        def r(v: Optional[float]) -> Optional[float]:
+            return None if v is None else round(v, 5)
+
+        return {
+            "count": self.count,
+            "mean": r(self.total / self.count) if self.count else None,
+            "min": r(self.min),
+            "p50": r(self.percentile(0.50)),
+            "p95": r(self.percentile(0.95)),
+            "p99": r(self.percentile(0.99)),
+            "p999": r(self.percentile(0.999)),
+            "max": r(self.max),
+            # [limite superior en segundos, cantidad] de cada bucket no vacio
+            "buckets": [[r(self._upper(b)), self.counts[b]] for b in sorted(self.counts)],
+        }
+
+
+class EndpointStats:
+    def __init__(self):
+        self.service = LatencyHistogram()
+        self.corrected = LatencyHistogram()
+        self.dispatch_delay = LatencyHistogram()  # esperando turno por --concurrency o por el generador
+        self.ok = 0
+        self.errors: Counter = Counter()
+        self.server_stages: Dict[str, LatencyHistogram] = {}  # del header Server-Timing
+        self.first_start: Optional[float] = None
+        self.last_end: Optional[float] = None
+
+    def record(self, intended: float, sent: float, done: float, error: Optional[str],
+               server_timing: Optional[Dict[str, float]] = None):
+        for name, seconds in (server_timing or {}).items():
+            self.server_stages.setdefault(name, LatencyHistogram()).record(seconds)
+        self.service.record(done - sent)
+        self.corrected.record(done - intended)
+        self.dispatch_delay.record(sent - intended)
+        self.first_start = intended if self.first_start is None else min(self.first_start, intended)
+        self.last_end = done if self.last_end is None else max(self.last_end, done)
+        if error:
+            self.errors[error] += 1
+        else:
+            self.ok += 1
+
+    def summary(self) -> Dict[str, Any]:
+        window = (self.last_end - self.first_start) if self.first_start is not None else 0
+        return {
+            "requests": self.service.count,
+            "ok": self.ok,
+            "errors": dict(self.errors.most_common()),
+            "ok_per_second": round(self.ok / window, 3) if window > 0 else None,
+            "service_seconds": self.service.summary(),
+            "corrected_seconds": self.corrected.summary(),
+            "dispatch_delay_seconds": _without_buckets(self.dispatch_delay),
+            "server_stages_seconds": {name: _without_buckets(h) for name, h in self.server_stages.items()},
+        }
+
+
+def _without_buckets(histogram: LatencyHistogram) -> Dict[str, Any]:
+    return {k: v for k, v in histogram.summary().items() if k != "buckets"}
+
+
+def parse_server_timing(header: Optional[str]) -> Dict[str, float]:
+    """`db_assets;dur=3.2, esb_create;dur=410` -> {"db_assets": 0.0032, "esb_create": 0.41}"""
+    stages: Dict[str, float] = {}
+    for part in (header or "").split(","):
+        name, _, params = part.strip().partition(";")
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "dur" and name:
+                try:
+                    stages[name] = float(value) / 1000
+                except ValueError:
+                    pass
+    return stages
+
+
+def arrival_offsets(rate: float, duration: float, ramp_up: float, rnd: random.Random,
+                    poisson: bool = True) -> Iterator[float]:
+    """
+    Segundos (desde el inicio) de cada llegada. La intensidad sube lineal de 0
+    a `rate` durante `ramp_up` y se mantiene hasta `ramp_up + duration`:
+    se invierte la intensidad acumulada sobre llegadas de tasa 1.
+    """
+    ramp_area = rate * ramp_up / 2
+    end = ramp_up + duration
+    s = 0.0
+    while True:
+        s += rnd.expovariate(1.0) if poisson else 1.0
+        if s <= ramp_area:
+            t = math.sqrt(2 * s * ramp_up / rate)
+        else:
+            t = ramp_up + (s - ramp_area) / rate
+        if t > end:
+            return
+        yield t
+
+
+class CidMix:
+    """
+    Que CIDs lleva cada create: uno al azar, uno de un ticket reciente
+    (alarma duplicada del mismo circuito) o varios de un mismo cliente en un
+    incidente masivo (major=True).
+    """
+
+    def __init__(self, fixture: TicketFixture, duplicate_ratio: float, massive_ratio: float, massive_size: int,
+                 rnd: random.Random):
+        if not fixture.circuits:
+            raise SystemExit("La base no tiene CIDs en app_assets")
+        self.fixture = fixture
+        self.duplicate_ratio = duplicate_ratio
+        self.massive_ratio = massive_ratio
+        self.massive_size = massive_size
+        self.rnd = rnd
+        self.recent: Deque[str] = deque(maxlen=200)
+        self.accounts = [a for a, cids in fixture.circuits_by_account.items() if len(cids) >= 2]
+
+    def pick(self) -> Tuple[str, List[str], bool]:
+        roll = self.rnd.random()
+        if roll < self.massive_ratio and self.accounts:
+            cids = self.fixture.circuits_by_account[self.rnd.choice(self.accounts)]
+            return "massive", self.rnd.sample(cids, k=min(self.massive_size, len(cids))), True
+        if roll < self.massive_ratio + self.duplicate_ratio and self.recent:
+            return "duplicate", [self.rnd.choice(self.recent)], False
+        cid = self.rnd.choice(self.fixture.circuits)
+        self.recent.append(cid)
+        return "single", [cid], False
+
+
+def _classify(status: int, body: Any, expected: int) -> Optional[str]:
+    """None si salio bien; si no, la causa para el desglose de errores."""
+    if status >= 400:
+        return f"http_{status}"
+    if status != expected:
+        return f"http_{status}_unexpected"
+    # El use case devuelve el status del ESB en el cuerpo aunque la ruta conteste 2xx.
+    if isinstance(body, dict) and "status_code" in body and body["status_code"] not in (200, 201):
+        return f"esb_{body['status_code']}"
+    return None
+
+
+class LoadRun:
+    """Una corrida contra una URL: genera la carga y acumula los EndpointStats."""
+
+    def __init__(self, args: argparse.Namespace, base_url: str, fixture: Optional[TicketFixture], rnd: random.Random):
+        self.args = args
+        self.base_url = base_url.rstrip("/") + "/api/tickets"
+        self.fixture = fixture
+        self.rnd = rnd
+        self.stats = {name: EndpointStats() for name in ENDPOINTS}
+        self.lifecycles: Counter = Counter()
+        self.mix = CidMix(fixture, args.duplicate_ratio, args.massive_ratio, args.massive_size, rnd) \
+            if fixture else None
+        self.do_close = fixture is not None and not args.no_close
+
+    async def _call(self, client, limit: asyncio.Semaphore, endpoint: str, method: str, path: str,
+                    payload: dict, expected: int, intended: float) -> Tuple[Optional[str], Any]:
+        async with limit:
+            sent = time.perf_counter()
+            server_timing = None
+            try:
+                response = await client.request(method, self.base_url + path, json=payload)
+                try:
+                    body = response.json()
+                except ValueError:
+                    body = None
+                error = _classify(response.status_code, body, expected)
+                server_timing = parse_server_timing(response.headers.get("server-timing"))
+            except Exception as e:
+                body, error = None, type(e).__name__
+            done = time.perf_counter()
+        self.stats[endpoint].record(intended, sent, done, error, server_timing)
+        return error, body
+
+    async def _sleep_until(self, at: float):
+        delay = at - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    async def lifecycle(self, client, limit: asyncio.Semaphore, intended: float):
+        args = self.args
+        kind, cids, major = self.mix.pick() if self.mix else ("single", [self.rnd.choice(args.cid)], False)
+        self.lifecycles[kind] += 1
+        payload = {
+            "related_cids": cids,
+            "major": major,
+            "custom_description": args.custom_description,
+            "description": "Ticket de prueba de carga, hacer caso omiso.",
+            "summary": "Prueba de carga",
+            "worklog": "Ticket generado por app.benchmarks.ticket_load.",
+            "alarm_info": f"Alarma sintetica {kind}",
+        }
+        error, body = await self._call(client, limit, "create", "POST", "/create", payload, 201, intended)
+        if error:
+            self.lifecycles["create_failed"] += 1
+            return
+        try:
+            created = json.loads(body["message"])
+            incident_number, sf_incident_id = created["id"], created["externalId"]
+        except (KeyError, TypeError, ValueError):
+            self.stats["create"].errors["bad_body"] += 1
+            self.lifecycles["create_failed"] += 1
+            return
+
+        if self.do_close:
+            # En produccion esto lo hace la sincronizacion de Salesforce con app_incident.
+            try:
+                await asyncio.to_thread(self.fixture.register_incident, incident_number, sf_incident_id)
+            except Exception as e:
+                self.lifecycles[f"register_failed_{type(e).__name__}"] += 1
+                return
+
+        for i in range(args.updates):
+            intended = time.perf_counter() + args.think
+            await self._sleep_until(intended)
+            update = {"sf_incident_id": sf_incident_id, "status": "inProgress",
+                      "worklog": f"Seguimiento {i + 1} de la prueba de carga."}
+            await self._call(client, limit, "update", "PATCH", "/update", update, 200, intended)
+
+        if not self.do_close:
+            self.lifecycles["completed"] += 1
+            return
+        intended = time.perf_counter() + args.think
+        await self._sleep_until(intended)
+        close = {"incident_id": incident_number, "worklog": "Cierre de la prueba de carga.",
+                 "cause": "Prueba", "symptom": "Prueba", "solution": "Prueba de carga"}
+        error, _ = await self._call(client, limit, "close", "PATCH", "/close", close, 200, intended)
+        self.lifecycles["close_failed" if error else "completed"] += 1
+
+    async def run(self, api_key: str, api_key_name: str) -> float:
+        import httpx
+
+        args = self.args
+        limit = asyncio.Semaphore(args.concurrency)
+        limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+        timeout = httpx.Timeout(args.timeout, pool=None)
+        tasks: List[asyncio.Task] = []
+        async with httpx.AsyncClient(headers={api_key_name: api_key}, limits=limits, timeout=timeout) as client:
+            start = time.perf_counter()
+            if args.rate > 0:
+                for offset in arrival_offsets(args.rate, args.duration, args.ramp_up, self.rnd,
+                                              poisson=args.arrival == "poisson"):
+                    intended = start + offset
+                    await self._sleep_until(intended)
+                    tasks.append(asyncio.create_task(self.lifecycle(client, limit, intended)))
+            else:
+                end = start + args.ramp_up + args.duration
+
+                async def user(delay: float):
+                    await asyncio.sleep(delay)
+                    while time.perf_counter() < end:
+                        await self.lifecycle(client, limit, time.perf_counter())
+
+                # Lazo cerrado: los usuarios entran escalonados durante la rampa.
+                tasks = [asyncio.create_task(user(args.ramp_up * i / args.concurrency))
+                         for i in range(args.concurrency)]
+            if args.rate > 0:
+                self.lifecycles["scheduled"] = len(tasks)
+            _, pending = await asyncio.wait(tasks, timeout=args.drain_timeout) if tasks else (set(), set())
+            for task in pending:
+                task.cancel()
+            if pending:
+                self.lifecycles["unfinished"] += len(pending)
+        return time.perf_counter() - start
+
+    def summary(self, elapsed: float) -> Dict[str, Any]:
+        return {
+            "elapsed_seconds": round(elapsed, 3),
+            "lifecycles": dict(self.lifecycles),
+            "endpoints": {name: self.stats[name].summary() for name in ENDPOINTS if self.stats[name].service.count},
+        }
+
+
+# -- pila local ----------------------------------------------------------------
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _server_env(db_uri: str, esb_url: str) -> Dict[str, str]:
+    env = dict(os.environ)
+    for name in PLACEHOLDER_SETTINGS:
+        env.setdefault(name, "ticket-load")
+    env.setdefault("TM_DB_PORT", "3306")
+    env.update(
+        TM_DB_URI=db_uri,
+        ESB_URL=esb_url,
+        API_KEY=API_KEY,
+        API_KEY_NAME=API_KEY_NAME,
+        # Nada de jobs de fondo que compitan con la carga.
+        REPORT_PRERENDER_CRON="",
+        TICKET_SNAPSHOT_DIR="",
+    )
+    return env
+
+
+def _wait_healthy(url: str, timeout: float, process: Optional[subprocess.Popen] = None):
+    import requests
+
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process is not None and process.poll() is not None:
+            raise SystemExit(f"El servidor termino con codigo {process.returncode}")
+        try:
+            if requests.get(url + "/health", timeout=1).status_code == 200:
+                return
+        except requests.RequestException:
+            pass
+        time.sleep(0.2)
+    raise SystemExit(f"El servidor no respondio en {url}/health")
+
+
+class _GunicornServer:
+    """La API como en docker-compose-sf-api-prod.yml: gunicorn + UvicornWorker."""
+
+    def __init__(self, workers: int, env: Dict[str, str], startup_timeout: float):
+        port = _free_port()
+        self.url = f"http://127.0.0.1:{port}"
+        self.process = subprocess.Popen(
+            [sys.executable, "-m", "gunicorn", "main:app", "-k", "uvicorn.workers.UvicornWorker",
+             "-w", str(workers), "-b", f"127.0.0.1:{port}", "--timeout", "130", "--log-level", "warning"],
+            cwd=ROOT, env=env,
+        )
+        _wait_healthy(self.url, startup_timeout, self.process)
+
+    def stop(self):
+        self.process.terminate()
+        try:
+            self.process.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+
+
+class _InProcessServer:
+    """La app en un hilo (uvicorn) de este proceso; main se importa con el entorno ya armado."""
+
+    def __init__(self, env: Dict[str, str], startup_timeout: float):
+        import uvicorn
+
+        os.environ.update(env)
+        from main import app
+
+        port = _free_port()
+        self.url = f"http://127.0.0.1:{port}"
+        self._server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning",
+                                                     access_log=False))
+        self._thread = threading.Thread(target=self._server.run, name="ticket-api", daemon=True)
+        self._thread.start()
+        _wait_healthy(self.url, startup_timeout)
+
+    def stop(self):
+        self._server.should_exit = True
+        self._thread.join(timeout=30)
+
+
+# -- CLI -------------------------------------------------------------------------
+
+
+def _parse_args(argv: Optional[List[str]]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Prueba de carga create/update/close de tickets")
+    load = parser.add_argument_group("carga")
+    load.add_argument("--rate", type=float, default=5.0, help="tickets nuevos por segundo; 0 = lazo cerrado")
+    load.add_argument("--arrival", choices=("poisson", "uniform"), default="poisson")
+    load.add_argument("--duration", type=float, default=60, help="segundos a ritmo pleno, despues de la rampa")
+    load.add_argument("--ramp-up", type=float, default=0, help="segundos de rampa lineal hasta --rate")
+    load.add_argument("--concurrency", type=int, default=32, help="maximo de requests en vuelo")
+    load.add_argument("--updates", type=int, default=1, help="updates por ticket antes del close")
+    load.add_argument("--think", type=float, default=1.0, help="segundos entre pasos de un mismo ticket")
+    load.add_argument("--no-close", action="store_true", help="solo create y update")
+    load.add_argument("--duplicate-ratio", type=float, default=0.1,
+                      help="creates con el CID de un ticket reciente")
+    load.add_argument("--massive-ratio", type=float, default=0.02, help="creates de incidente masivo (major)")
+    load.add_argument("--massive-size", type=int, default=10, help="CIDs por incidente masivo")
+    load.add_argument("--custom-description", action="store_true",
+                      help="mandar la descripcion y saltar la busqueda de sede/ciudad en la base")
+    load.add_argument("--timeout", type=float, default=130, help="timeout por request, como gunicorn")
+    load.add_argument("--drain-timeout", type=float, default=300,
+                      help="segundos para que terminen los tickets en curso al final")
+    load.add_argument("--load-seed", type=int, default=7)
+
+    stack = parser.add_argument_group("servidor")
+    stack.add_argument("--workers", type=int, action="append",
+                       help="workers de gunicorn; se puede repetir para comparar (0 = en proceso; por defecto 1)")
+    stack.add_argument("--base-url", type=str, default=None, help="servidor ya levantado (no se levanta nada)")
+    stack.add_argument("--api-key", type=str, default=None)
+    stack.add_argument("--api-key-name", type=str, default=API_KEY_NAME)
+    stack.add_argument("--cid", action="append", default=[],
+                       help="con --base-url y sin --db-uri: CIDs a usar (se puede repetir)")
+    stack.add_argument("--startup-timeout", type=float, default=60)
+
+    data = parser.add_argument_group("base y ESB")
+    data.add_argument("--sqlite", type=str, default=None, help="archivo SQLite del fixture (por defecto temporal)")
+    data.add_argument("--db-uri", type=str, default=None, help="base de pruebas (p.ej. mysql://...) en lugar de SQLite")
+    data.add_argument("--seed-fixture", action="store_true",
+                      help="con --db-uri: borrar y sembrar las tablas (si no, se usan los CIDs que haya)")
+    data.add_argument("--accounts", type=int, default=50)
+    data.add_argument("--circuits-per-account", type=int, default=20)
+    data.add_argument("--esb-url", type=str, default=None, help="ESB ya levantado en lugar del fake en proceso")
+    add_esb_arguments(data)
+    data.add_argument("--output", type=str, default=None, help="archivo JSON de resultados (por defecto stdout)")
+    args = parser.parse_args(argv)
+    args.concurrency = max(1, args.concurrency)
+    if args.base_url and not args.db_uri and not args.cid:
+        parser.error("con --base-url hace falta --db-uri (para leer CIDs y registrar incidentes) o --cid")
+    return args
+
+
+def _fixture(args: argparse.Namespace) -> Tuple[Optional[TicketFixture], Optional[str]]:
+    if args.db_uri:
+        if args.seed_fixture:
+            return seed_ticket_fixture(args.db_uri, args.accounts, args.circuits_per_account), None
+        return load_ticket_fixture(args.db_uri), None
+    if args.base_url:
+        return None, None
+    path = args.sqlite
+    temp = None
+    if not path:
+        fd, temp = tempfile.mkstemp(prefix="ticket-load-", suffix=".db")
+        os.close(fd)
+        path = temp
+    fixture = seed_ticket_fixture(f"sqlite:///{os.path.abspath(path)}", args.accounts, args.circuits_per_account)
+    return fixture, temp
+
+
+def run_once(args: argparse.Namespace, workers: Optional[int], fixture: Optional[TicketFixture],
+             esb: Optional[FakeEsb], esb_url: Optional[str]) -> Dict[str, Any]:
+    server = None
+    if args.base_url:
+        url, api_key = args.base_url, args.api_key or API_KEY
+    else:
+        env = _server_env(fixture.db_uri, esb_url)
+        server = (_InProcessServer(env, args.startup_timeout) if workers == 0
+                  else _GunicornServer(workers, env, args.startup_timeout))
+        url, api_key = server.url, API_KEY
+    if esb is not None:
+        esb.reset()
+    run = LoadRun(args, url, fixture, random.Random(args.load_seed))
+    try:
+        elapsed = asyncio.run(run.run(api_key, args.api_key_name))
+    finally:
+        if server is not None:
+            server.stop()
+    result = {"workers": workers, "base_url": url}
+    result.update(run.summary(elapsed))
+    if esb is not None:
+        result["esb"] = esb.stats()
+    return result
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = _parse_args(argv)
+    started_at = datetime.now().isoformat(timespec="seconds")
+    worker_counts: List[Optional[int]] = [None] if args.base_url else (args.workers or [1])
+    if 0 in worker_counts and len(worker_counts) > 1:
+        # El servidor en proceso importa main una sola vez; no se puede volver a armar.
+        raise SystemExit("--workers 0 no se puede combinar con otros valores")
+
+    fixture, temp = _fixture(args)
+    esb = None
+    esb_url = args.esb_url
+    if not args.base_url and not esb_url:
+        esb = esb_from_args(args).start()
+        esb_url = esb.url
+
+    results = []
+    try:
+        for workers in worker_counts:
+            label = args.base_url or f"{workers} worker(s)"
+            pace = f"{args.rate}/s" if args.rate > 0 else f"lazo cerrado, {args.concurrency} usuarios"
+            print(f"[ticket-load] {label}: {pace} durante {args.duration}s "
+                  f"(rampa {args.ramp_up}s), concurrencia {args.concurrency}", file=sys.stderr)
+            results.append(run_once(args, workers, fixture, esb, esb_url))
+    finally:
+        if esb is not None:
+            esb.stop()
+        if fixture is not None:
+            fixture.close()
+        if temp:
+            for suffix in ("", "-wal", "-shm"):
+                if os.path.exists(temp + suffix):
+                    os.remove(temp + suffix)
+
+    report = {
+        "started_at": started_at,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "load": {
+            "rate": args.rate, "arrival": args.arrival, "duration": args.duration, "ramp_up": args.ramp_up,
+            "concurrency": args.concurrency, "updates": args.updates, "think": args.think,
+            "close": fixture is not None and not args.no_close, "duplicate_ratio": args.duplicate_ratio,
+            "massive_ratio": args.massive_ratio, "massive_size": args.massive_size,
+            "custom_description": args.custom_description,
+        },
+        "esb": {
+            "url": esb_url, "in_process": esb is not None, "latency": args.latency,
+            "error_rate": args.error_rate, "throttle_rate": args.throttle_rate, "rate_limit": args.rate_limit,
+            "drip_rate": args.drip_rate,
+        },
+        "results": results,
+    }
+    payload = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(payload + "\n")
+    else:
+        print(payload)
+    for result in results:
+        label = result["base_url"] if result["workers"] is None else f"{result['workers']} worker(s)"
+        for name, stats in result["endpoints"].items():
+            corrected = stats["corrected_seconds"]
+            print(
+                f"[ticket-load] {label} {name}: {stats['ok']}/{stats['requests']} ok, {stats['ok_per_second']}/s, "
+                f"p50 {corrected['p50']}s p95 {corrected['p95']}s p99 {corrected['p99']}s (corrected), "
+                f"errores {stats['errors'] or '-'}",
+                file=sys.stderr,
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
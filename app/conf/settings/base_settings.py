@@ -1,7 +1,8 @@
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from pydantic import SecretStr
+from app.utils.cron import CronSchedule
 from app.utils.logger import log
-from typing import Optional
+from typing import List, Literal, Optional
 from pydantic import ValidationInfo, field_validator
 import os 
 
@@ -30,6 +31,65 @@ class Settings(BaseSettings):
     esb_url: str
     api_key: str
     api_key_name: str
+    chart_renderer: str = "native"  # "native" (Pillow) or "plotly" (needs plotly + kaleido)
+    chart_cache_max_bytes: int = 32 * 1024 * 1024  # 0 disables the rendered chart cache
+    chart_cache_dir: Optional[str] = None  # optional on-disk tier shared by the workers
+    chart_cache_disk_max_bytes: int = 512 * 1024 * 1024  # cap for chart_cache_dir; least recently used PNGs go first
+    report_jobs_dir: str = "/tmp/tickets-api/report-jobs"
+    report_job_workers: int = 0  # 0 = one render process per available core
+    report_job_timeout_seconds: int = 600
+    report_job_ttl_seconds: int = 3600
+    report_cache_dir: str = "/tmp/tickets-api/report-cache"
+    report_cache_max_bytes: int = 2 * 1024 ** 3  # 0 disables the generated report cache
+    report_spool_max_memory_bytes: int = 8 * 1024 * 1024  # larger outputs spill to a temp file
+    report_spool_dir: Optional[str] = None  # None = system temp dir
+    report_batch_workers: int = 0  # 0 = one render process per available core
+    report_batch_chunk_size: int = 50  # accounts fetched per set-based query round
+    report_prerender_cron: Optional[str] = "0 2 1 * *"  # local time; None/"" disables month-end pre-rendering
+    report_prerender_report_types: List[str] = ["monthly", "saso"]
+    report_prerender_languages: List[str] = ["es"]  # SASO is always rendered in English
+    report_prerender_workers: int = 1
+    report_prerender_nice: int = 10
+    report_prerender_catchup_hours: float = 12
+    export_batch_size: int = 5000  # rows per server-side cursor fetch / Parquet row group
+    export_gzip_level: int = 6
+    smtp_host: str = "webmail.cbs-cloud.com"
+    smtp_port: int = 25
+    smtp_pool_size: int = 4  # connections kept open per worker; 0 = one connection per message
+    smtp_timeout_seconds: float = 30
+    smtp_idle_timeout_seconds: float = 60  # idle connections older than this are closed, not reused
+    mail_queue_enabled: bool = True  # /mailer endpoints enqueue and answer 202; False (or smtp_pool_size <= 0) = deliver inside the request
+    mail_queue_db: Optional[str] = None  # SQLite file shared by the workers; None = in-memory queue per worker
+    mail_queue_workers: int = 2  # delivery threads per worker process
+    mail_queue_batch_size: int = 20  # messages sent per SMTP session
+    mail_queue_max_attempts: int = 6
+    mail_queue_retry_base_seconds: float = 5  # doubles on every failed attempt
+    mail_queue_retry_max_seconds: float = 600
+    mail_queue_max_depth: int = 10000  # pending messages before enqueueing answers 503
+    mail_bulk_sessions: int = 2  # parallel SMTP sessions per /mailer/send_bulk call
+    mail_coalesce_seconds: float = 600  # repeated /mailer/send_email for the same ticket+recipients are held back; 0 disables
+    mail_coalesce_mode: Literal["digest", "drop"] = "digest"  # digest = one summary mail when the window closes
+    mail_coalesce_db: Optional[str] = None  # SQLite file shared by the workers; None = windows per worker
+    ticket_snapshot_dir: Optional[str] = None  # None disables; closed months are read from Arrow files here (needs pyarrow)
+    ticket_snapshot_cron: Optional[str] = "30 1 * * *"  # local time; nightly rewrite of the recent closed months
+    ticket_snapshot_months: int = 24  # closed months kept on disk; older ranges go to MySQL
+    ticket_snapshot_refresh_months: int = 2  # most recent closed months rewritten on every run
+    ticket_snapshot_chunk_size: int = 50  # accounts per query round while writing a month
+    ticket_snapshot_catchup_hours: float = 12  # a run missed while the service was down is replayed within this window
+    metrics_multiproc_dir: Optional[str] = "/tmp/tickets-api/metrics"  # gunicorn workers share /metrics through it; None = per worker
+    log_file: str = "logs.log"  # JSON lines; every worker appends to the same file
+    log_level: Literal["DEBUG", "INFO", "WARNING", "ERROR"] = "INFO"
+    log_max_bytes: int = 50 * 1024 * 1024  # rotate above this size; 0 disables rotation
+    log_backups: int = 5  # rotated files kept: logs.log.1 ... logs.log.N
+    log_max_field_chars: int = 2000  # longer messages/fields are cut; base64 images are always elided
+    log_queue_size: int = 10000  # pending records per worker before new ones are dropped
+
+    @field_validator("report_prerender_cron", "ticket_snapshot_cron", mode="after")
+    @classmethod
+    def check_cron(cls, v: Optional[str]) -> Optional[str]:
+        if v:
+            CronSchedule(v)
+        return v or None
 
     @field_validator("tm_db_uri", mode='after')
     @classmethod
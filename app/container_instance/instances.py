@@ -1,4 +1,5 @@
-from typing import Type
+from functools import lru_cache
+from typing import Optional, Type
 
 from fastapi import Depends
 from sqlmodel import Session
@@ -6,9 +7,15 @@ from sqlmodel import Session
 from app.adapters.db import get_toolmaster_db_connection
 from app.adapters.repositories.toolmaster_repository import ToolmasterRepository
 from app.adapters.repositories.esb_repository import EsbRepository
+from app.adapters.smtp_pool import SmtpConnectionPool
+from app.conf.config import get_app_settings
 
+from app.api_services.mail_coalescer import NotificationCoalescer
+from app.api_services.mail_queue import MailQueue
 from app.api_services.mailer_use_case_impl import MailerUseCaseImpl
 from app.api_services.ticket_usecase_impl import TicketUseCaseImpl
+from app.infrastructure.dto.mail_schema import MailBaseDTO, MailCoalesceWindowDTO
+from app.utils.logger import log
 
 def tickets_use_case(session: Type[Session] = Depends(get_toolmaster_db_connection)) -> TicketUseCaseImpl:    
     toolmaster_repository = ToolmasterRepository(session=session)
@@ -19,10 +26,75 @@ def tickets_use_case(session: Type[Session] = Depends(get_toolmaster_db_connecti
     )
     return tickets_use_case
 
+@lru_cache
+def smtp_pool() -> Optional[SmtpConnectionPool]:
+    settings = get_app_settings()
+    if settings.smtp_pool_size <= 0:
+        return None
+    return SmtpConnectionPool(
+        host=settings.smtp_host,
+        port=settings.smtp_port,
+        max_size=settings.smtp_pool_size,
+        timeout=settings.smtp_timeout_seconds,
+        idle_timeout=settings.smtp_idle_timeout_seconds,
+    )
+
+@lru_cache
+def mail_queue() -> Optional[MailQueue]:
+    settings = get_app_settings()
+    pool = smtp_pool()
+    if not settings.mail_queue_enabled:
+        return None
+    if pool is None:
+        # La cola entrega por el pool: sin pool los correos salen dentro del request.
+        log("Mail queue: desactivada porque smtp_pool_size <= 0; los correos se envian de forma sincronica", level="WARNING")
+        return None
+    return MailQueue(
+        pool=pool,
+        db_path=settings.mail_queue_db,
+        workers=settings.mail_queue_workers,
+        batch_size=settings.mail_queue_batch_size,
+        max_attempts=settings.mail_queue_max_attempts,
+        retry_base_seconds=settings.mail_queue_retry_base_seconds,
+        retry_max_seconds=settings.mail_queue_retry_max_seconds,
+        max_depth=settings.mail_queue_max_depth,
+    )
+
+def _send_digest(dto: MailBaseDTO, window: MailCoalesceWindowDTO):
+    settings = get_app_settings()
+    use_case = MailerUseCaseImpl(
+        toolmaster_repository=None,
+        ip_smtp=settings.smtp_host,
+        smtp_port=settings.smtp_port,
+        smtp_pool=smtp_pool(),
+    )
+    mail = use_case.compose_email_digest(dto, window)
+    queue = mail_queue()
+    if queue:
+        queue.put(mail)
+    else:
+        use_case.deliver(mail)
+
+@lru_cache
+def mail_coalescer() -> Optional[NotificationCoalescer]:
+    settings = get_app_settings()
+    if settings.mail_coalesce_seconds <= 0:
+        return None
+    return NotificationCoalescer(
+        window_seconds=settings.mail_coalesce_seconds,
+        mode=settings.mail_coalesce_mode,
+        db_path=settings.mail_coalesce_db,
+        on_digest=_send_digest,
+    )
+
 def mailer_use_case(session: Type[Session] = Depends(get_toolmaster_db_connection)) -> MailerUseCaseImpl:    
+    settings = get_app_settings()
     toolmaster_repository = ToolmasterRepository(session=session)
     mailer_use_case = MailerUseCaseImpl(
-        toolmaster_repository=toolmaster_repository
+        toolmaster_repository=toolmaster_repository,
+        ip_smtp=settings.smtp_host,
+        smtp_port=settings.smtp_port,
+        smtp_pool=smtp_pool(),
     )
     return mailer_use_case
 
@@ -1,5 +1,13 @@
 from abc import ABC, abstractmethod
-from app.infrastructure.dto.mail_schema import MailBaseDTO, MailGeneralDTO
+from typing import List, Union
+
+from app.infrastructure.dto.mail_schema import (
+    BulkMailResultDTO,
+    MailBaseDTO,
+    MailCoalesceWindowDTO,
+    MailGeneralDTO,
+    OutgoingMail,
+)
 
 class IMailerUseCase(ABC):
     
@@ -9,4 +17,20 @@ class IMailerUseCase(ABC):
     
     @abstractmethod
     def send_email_general(self, dto: MailGeneralDTO):
-        pass
\ No newline at end of file
+        pass
+
+    @abstractmethod
+    def compose_email_none(self, dto: MailBaseDTO) -> OutgoingMail:
+        pass
+
+    @abstractmethod
+    def compose_email_digest(self, dto: MailBaseDTO, window: MailCoalesceWindowDTO) -> OutgoingMail:
+        pass
+
+    @abstractmethod
+    def compose_email_general(self, dto: MailGeneralDTO) -> OutgoingMail:
+        pass
+
+    @abstractmethod
+    def send_bulk(self, items: List[Union[MailBaseDTO, MailGeneralDTO]], sessions: int = 2) -> BulkMailResultDTO:
+        pass
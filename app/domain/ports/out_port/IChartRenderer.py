@@ -0,0 +1,15 @@
+from abc import ABC, abstractmethod
+
+from app.infrastructure.dto.chart_schema import BarChartDTO
+"""
+IChartRenderer is the contract for turning a chart description into PNG bytes.
+The report use cases only build BarChartDTOs; the rendering backend (native
+raster or plotly + kaleido) is chosen at wiring time.
+"""
+
+
+class IChartRenderer(ABC):
+    @abstractmethod
+    def render(self, chart: BarChartDTO) -> bytes:
+        """Returns the chart rendered as PNG bytes."""
+        pass
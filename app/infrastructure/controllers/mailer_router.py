@@ -1,25 +1,67 @@
-from fastapi import APIRouter, Depends, Security, status
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Response, Security, status
 from fastapi.responses import JSONResponse
+from app.api_services.mail_coalescer import NotificationCoalescer
+from app.api_services.mail_queue import MailQueue
 from app.conf.settings.dependencies import validate_api_key
 from app.domain.ports.input_port.mailer_service import IMailerUseCase
-from app.container_instance.instances import mailer_use_case
-from app.infrastructure.dto.mail_schema import MailBaseDTO, MailGeneralDTO, RadarMailDTO
+from app.container_instance.instances import mail_coalescer, mail_queue, mailer_use_case
+from app.conf.config import get_app_settings
+from app.infrastructure.dto.mail_schema import (
+    BulkMailDTO,
+    BulkMailResultDTO,
+    MailBaseDTO,
+    MailCoalesceStatsDTO,
+    MailGeneralDTO,
+    MailQueuedDTO,
+    MailQueueStatsDTO,
+    MailStatusDTO,
+    RadarMailDTO,
+)
 from app.utils.errors import AppError
 from app.utils.logger import log
 
 mailer_router = APIRouter(dependencies=[Security(validate_api_key)],tags=["/"])
 
+
+def _queued(response: Response, queue: MailQueue, mail) -> MailQueuedDTO:
+    """Encola el correo ya armado y marca la respuesta como 202."""
+    response.status_code = status.HTTP_202_ACCEPTED
+    return MailQueuedDTO(message_id=queue.put(mail))
+
+
 @mailer_router.post(
     path="/send_email",
     status_code=status.HTTP_200_OK,
 )
 def send(
     dto: MailBaseDTO,
+    response: Response,
     use_case: IMailerUseCase = Depends(mailer_use_case),
+    queue: Optional[MailQueue] = Depends(mail_queue),
+    coalescer: Optional[NotificationCoalescer] = Depends(mail_coalescer),
 ):
+    """
+    Con la cola activa responde 202 con el message_id; el estado se consulta
+    en GET /messages/{message_id}. Un aviso repetido del mismo ticket dentro
+    de la ventana de coalescencia no se envia: responde 200 con status
+    "suppressed" y la cantidad absorbida (ver GET /coalescing).
+    """
     try:
-        data = use_case.send_email_none(dto)
-        return data
+        suppressed = coalescer.admit(dto) if coalescer else None
+        if suppressed:
+            return suppressed
+        try:
+            if queue:
+                return _queued(response, queue, use_case.compose_email_none(dto))
+            data = use_case.send_email_none(dto)
+            return data
+        except Exception:
+            if coalescer:
+                # El aviso no salio (p. ej. 503 por cola llena): el reintento no debe quedar suprimido.
+                coalescer.release(dto)
+            raise
     except AppError as app_err:
         log(f"AppError caught at the route level: {app_err}")
         return JSONResponse(
@@ -33,13 +75,17 @@ def send(
 )
 def send_general_email(
     dto: MailGeneralDTO,
+    response: Response,
     use_case: IMailerUseCase = Depends(mailer_use_case),
+    queue: Optional[MailQueue] = Depends(mail_queue),
 ):
     """
     Envía un correo basado en la plantilla general_template.html,
     usando un caso de uso general.
     """
     try:
+        if queue:
+            return _queued(response, queue, use_case.compose_email_general(dto))
         data = use_case.send_email_general(dto)
         return {"message": data}
     except AppError as app_err:
@@ -48,24 +94,65 @@ def send_general_email(
             status_code=app_err.error_type.value,
             content={"message": app_err.message, "error_type": app_err.error_type.name}
         )
-        
+
 @mailer_router.post(
     path="/send_email_radar",
     status_code=status.HTTP_200_OK,
 )
 def send_radar_email(
     dto: RadarMailDTO,
+    response: Response,
     use_case: IMailerUseCase = Depends(mailer_use_case),
+    queue: Optional[MailQueue] = Depends(mail_queue),
 ):
     """
     Envía un correo basado en la plantilla radar_template.html,
     usando los campos de RadarMailDTO.
     """
     try:
+        if queue:
+            return _queued(response, queue, use_case.compose_email_radar(dto))
         data = use_case.send_email_radar(dto)
         return {"message": data}
     except AppError as app_err:
         log(f"AppError caught at the route level: {app_err}")
         return JSONResponse(
             status_code=app_err.error_type.value,
-            content={"message": app_err.message, "error_type": app_err.error_type.name})
\ No newline at end of file
+            content={"message": app_err.message, "error_type": app_err.error_type.name})
+
+
+@mailer_router.post(path="/send_bulk", response_model=BulkMailResultDTO)
+def send_bulk_email(
+    dto: BulkMailDTO,
+    use_case: IMailerUseCase = Depends(mailer_use_case),
+):
+    """
+    Envía una lista de correos de incidente (MailBaseDTO) y/o generales
+    (MailGeneralDTO) en pocas sesiones SMTP, sin pasar por la cola, y
+    devuelve el resultado de cada destinatario.
+    """
+    return use_case.send_bulk(dto.items, sessions=get_app_settings().mail_bulk_sessions)
+
+
+@mailer_router.get(path="/queue", response_model=MailQueueStatsDTO)
+def get_mail_queue_stats(queue: Optional[MailQueue] = Depends(mail_queue)):
+    """Profundidad de la cola, entregados/fallidos y latencia de entrega (p50/p99)."""
+    if not queue:
+        raise HTTPException(status_code=404, detail="La cola de correo no está habilitada.")
+    return queue.stats()
+
+
+@mailer_router.get(path="/coalescing", response_model=MailCoalesceStatsDTO)
+def get_mail_coalescing_stats(coalescer: Optional[NotificationCoalescer] = Depends(mail_coalescer)):
+    """Ventanas abiertas por ticket, avisos suprimidos y resumenes enviados."""
+    if not coalescer:
+        raise HTTPException(status_code=404, detail="La coalescencia de avisos no está habilitada.")
+    return coalescer.stats()
+
+
+@mailer_router.get(path="/messages/{message_id}", response_model=MailStatusDTO)
+def get_mail_status(message_id: str, queue: Optional[MailQueue] = Depends(mail_queue)):
+    found = queue.get(message_id) if queue else None
+    if not found:
+        raise HTTPException(status_code=404, detail="No se encontró el mensaje.")
+    return found
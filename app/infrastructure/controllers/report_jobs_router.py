@@ -0,0 +1,63 @@
+# app/infrastructure/controllers/report_jobs_router.py
+import os
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import FileResponse
+
+from app.api_services.report_job_manager import ReportJobManager
+from app.api_services.word_report_di import report_job_manager
+from app.infrastructure.dto.report_job_schema import ReportJobDTO, ReportJobRequestDTO
+
+report_jobs_router = APIRouter()
+
+
+def _get_job(job_id: str, manager: ReportJobManager) -> ReportJobDTO:
+    job = manager.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="No se encontró el job.")
+    return job
+
+
+@report_jobs_router.post("", status_code=status.HTTP_202_ACCEPTED, response_model=ReportJobDTO)
+def submit_report_job(
+    dto: ReportJobRequestDTO,
+    manager: ReportJobManager = Depends(report_job_manager),
+):
+    """
+    Encola la generación de un reporte y devuelve el job_id.
+    El estado se consulta en GET /jobs/{job_id} y el archivo en /jobs/{job_id}/download.
+    """
+    return manager.submit(dto)
+
+
+@report_jobs_router.get("/{job_id}", response_model=ReportJobDTO)
+def get_report_job(
+    job_id: str,
+    manager: ReportJobManager = Depends(report_job_manager),
+):
+    return _get_job(job_id, manager)
+
+
+@report_jobs_router.get("/{job_id}/download")
+def download_report_job(
+    job_id: str,
+    manager: ReportJobManager = Depends(report_job_manager),
+):
+    job = _get_job(job_id, manager)
+    path = manager.artifact_path(job_id)
+    if job.status != "done" or not os.path.exists(path):
+        raise HTTPException(
+            status_code=409,
+            detail=f"El reporte no está disponible (estado: {job.status}).",
+        )
+    return FileResponse(path, media_type=job.media_type, filename=job.filename)
+
+
+@report_jobs_router.delete("/{job_id}", response_model=ReportJobDTO)
+def cancel_report_job(
+    job_id: str,
+    manager: ReportJobManager = Depends(report_job_manager),
+):
+    """Pide la cancelación; el job pasa a 'canceled' en el siguiente ciclo del dispatcher."""
+    _get_job(job_id, manager)
+    return manager.cancel(job_id)
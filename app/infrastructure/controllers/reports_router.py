@@ -1,86 +1,86 @@
 # app/infrastructure/controllers/reports_router.py
-import os
 from datetime import datetime
-from fastapi import APIRouter, Depends, HTTPException
-from fastapi.responses import StreamingResponse
+from typing import Literal, Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Response
+from fastapi.responses import FileResponse, StreamingResponse
 from sqlmodel import Session
-from unidecode import unidecode
 from app.adapters.db import get_toolmaster_db_connection
+from app.adapters.report_artifact_store import ReportArtifactStore, StoredArtifact
 from app.adapters.repositories.toolmaster_repository import ToolmasterRepository
-from app.infrastructure.dto.reports_schema import (
-    ChangeDTO,
-    CustomerDTO,
-    IncidentDTO,
-    ServiceRequestDTO,
-    WordReportDTO,
-    WorklogDTO,
+from app.api_services.data_export import DataExporter
+from app.api_services.report_batch import BatchReportStreamer
+from app.api_services.report_builder import (
+    ReportFile,
+    _build_filename,
+    build_case_report,
+    build_incident_report,
+    build_monthly_report,
+    build_rfo_report,
+    build_saso_report,
+    get_or_build_report,
+)
+from app.api_services.word_report_di import (
+    data_exporter,
+    report_artifact_store,
+    report_batch_streamer,
+    word_report_use_case,
 )
-from app.api_services.word_report_di import word_report_use_case
 from app.domain.ports.input_port.report_service import IWordReportUseCase
+from app.infrastructure.dto.report_batch_schema import BatchReportRequestDTO
+from app.utils.errors import AppError
+from app.utils.spooled_output import buffer_size, iter_chunks
 
 reports_router = APIRouter()
 
-MONTHS_ES = [
-    "ENERO",
-    "FEBRERO",
-    "MARZO",
-    "ABRIL",
-    "MAYO",
-    "JUNIO",
-    "JULIO",
-    "AGOSTO",
-    "SEPTIEMBRE",
-    "OCTUBRE",
-    "NOVIEMBRE",
-    "DICIEMBRE",
-]
-MONTHS_EN = [
-    "JANUARY",
-    "FEBRUARY",
-    "MARCH",
-    "APRIL",
-    "MAY",
-    "JUNE",
-    "JULY",
-    "AUGUST",
-    "SEPTEMBER",
-    "OCTOBER",
-    "NOVEMBER",
-    "DECEMBER",
-]
-
-
-def _sanitize(name: str) -> str:
-    return unidecode((name or "NO_NAME").upper()).replace(" ", "_")
-
 
-def _build_filename(
-    prefix_es: str,
-    prefix_en: str,
-    client_name: str,
-    language: str,
-    start_date: datetime | None = None,
-    end_date: datetime | None = None,
-    extension: str = "docx",
-    extra_part: str | None = None,
-) -> str:
-    months = MONTHS_ES if language.lower() == "es" else MONTHS_EN
-    prefix = prefix_es if language.lower() == "es" else prefix_en
-    name = _sanitize(client_name)
-    if start_date and end_date:
-        same_month_year = (
-            start_date.year == end_date.year and start_date.month == end_date.month
-        )
-        sm = months[start_date.month - 1]
-        em = months[end_date.month - 1]
-        date_part = (
-            f"{sm}_{start_date.year}"
-            if same_month_year
-            else f"{sm}_{start_date.year}_{em}_{end_date.year}"
+def _file_response(report: ReportFile) -> StreamingResponse:
+    return StreamingResponse(
+        iter_chunks(report.buffer),
+        media_type=report.media_type,
+        headers={
+            "Content-Disposition": f'attachment; filename="{report.filename}"',
+            "Content-Length": str(buffer_size(report.buffer)),
+        },
+    )
+
+
+def _artifact_response(artifact: StoredArtifact, if_none_match: Optional[str]) -> Response:
+    if if_none_match and (
+        if_none_match.strip() == "*"
+        or artifact.etag in [tag.strip() for tag in if_none_match.split(",")]
+    ):
+        return Response(status_code=304, headers={"ETag": artifact.etag})
+    return FileResponse(
+        artifact.path,
+        media_type=artifact.media_type,
+        headers={
+            "ETag": artifact.etag,
+            "Content-Disposition": f'attachment; filename="{artifact.filename}"',
+        },
+    )
+
+
+def _account_report(
+    report_type: str,
+    build,
+    repo: ToolmasterRepository,
+    use_case: IWordReportUseCase,
+    store: Optional[ReportArtifactStore],
+    if_none_match: Optional[str],
+    sf_account_id: str,
+    start_date: datetime,
+    end_date: datetime,
+    *args,
+) -> Response:
+    try:
+        if store is None:
+            return _file_response(build(repo, use_case, sf_account_id, start_date, end_date, *args))
+        artifact, _ = get_or_build_report(
+            report_type, repo, use_case, store, sf_account_id, start_date, end_date, *args
         )
-    else:
-        date_part = extra_part or datetime.utcnow().strftime("%Y%m%d")
-    return f"{prefix}_{name}_{date_part}.{extension}"
+    except AppError as app_err:
+        raise HTTPException(status_code=app_err.error_type.value, detail=app_err.message)
+    return _artifact_response(artifact, if_none_match)
 
 
 @reports_router.post("/generate-monthly-report")
@@ -91,35 +91,13 @@ def generate_monthly_report(
     language: str = "es",
     session: Session = Depends(get_toolmaster_db_connection),
     use_case: IWordReportUseCase = Depends(word_report_use_case),
+    store: Optional[ReportArtifactStore] = Depends(report_artifact_store),
+    if_none_match: Optional[str] = Header(None),
 ):
     repo = ToolmasterRepository(session=session)
-    c_dto = repo.get_customer_info(sf_account_id, start_date, end_date)
-    if not c_dto:
-        raise HTTPException(status_code=404, detail="No se encontró la cuenta con ese SF ID")
-    dto = WordReportDTO(
-        cust=c_dto.name,
-        language=language.lower(),
-        start_date=start_date,
-        end_date=end_date,
-        incidentes=c_dto.incidents,
-        service_requests=c_dto.service_requests,
-        cambios=c_dto.changes,
-        customers=[c_dto],
-    )
-    buf = use_case.generate_monthly_report(dto)
-    buf.seek(0)
-    filename = _build_filename(
-        "REPORTE_DISPONIBILIDAD",
-        "MONTHLY_REPORT",
-        c_dto.name,
-        language,
-        start_date,
-        end_date,
-    )
-    return StreamingResponse(
-        buf,
-        media_type="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    return _account_report(
+        "monthly", build_monthly_report, repo, use_case, store, if_none_match,
+        sf_account_id, start_date, end_date, language,
     )
 
 
@@ -131,33 +109,13 @@ def generate_incident_report(
     language: str = "es",
     session: Session = Depends(get_toolmaster_db_connection),
     use_case: IWordReportUseCase = Depends(word_report_use_case),
+    store: Optional[ReportArtifactStore] = Depends(report_artifact_store),
+    if_none_match: Optional[str] = Header(None),
 ):
     repo = ToolmasterRepository(session=session)
-    c_dto = repo.get_customer_info(sf_account_id, start_date, end_date)
-    if not c_dto:
-        raise HTTPException(status_code=404, detail="No se encontró la cuenta con ese SF ID")
-    dto = WordReportDTO(
-        cust=c_dto.name,
-        language=language.lower(),
-        start_date=start_date,
-        end_date=end_date,
-        incidentes=c_dto.incidents,
-        customers=[c_dto],
-    )
-    buf = use_case.generate_incidents_report(dto)
-    buf.seek(0)
-    filename = _build_filename(
-        "REPORTE_INCIDENCIAS",
-        "INCIDENTS_REPORT",
-        c_dto.name,
-        language,
-        start_date,
-        end_date,
-    )
-    return StreamingResponse(
-        buf,
-        media_type="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    return _account_report(
+        "incident", build_incident_report, repo, use_case, store, if_none_match,
+        sf_account_id, start_date, end_date, language,
     )
 
 
@@ -168,34 +126,81 @@ def generate_saso_report(
     end_date: datetime,
     session: Session = Depends(get_toolmaster_db_connection),
     use_case: IWordReportUseCase = Depends(word_report_use_case),
+    store: Optional[ReportArtifactStore] = Depends(report_artifact_store),
+    if_none_match: Optional[str] = Header(None),
 ):
     repo = ToolmasterRepository(session=session)
-    c_dto = repo.get_customer_info(sf_account_id, start_date, end_date)
-    if not c_dto:
-        raise HTTPException(status_code=404, detail="No se encontró la cuenta con ese SF ID")
-    dto = WordReportDTO(
-        cust=c_dto.name,
-        start_date=start_date,
-        end_date=end_date,
-        incidentes=c_dto.incidents,
-        service_requests=c_dto.service_requests,
-        cambios=c_dto.changes,
-        customers=[c_dto],
+    return _account_report(
+        "saso", build_saso_report, repo, use_case, store, if_none_match,
+        sf_account_id, start_date, end_date,
     )
-    result_buffer = use_case.generate_saso_excel_report(dto)
-    result_buffer.seek(0)
+
+
+@reports_router.post("/export/{dataset}")
+def export_account_data(
+    dataset: Literal["incidents", "service_requests", "changes", "worklogs", "assets"],
+    sf_account_id: str,
+    start_date: datetime,
+    end_date: datetime,
+    format: Literal["csv", "ndjson", "parquet"] = "csv",
+    compress: bool = True,
+    session: Session = Depends(get_toolmaster_db_connection),
+    exporter: DataExporter = Depends(data_exporter),
+):
+    """
+    Datos crudos de una cuenta y rango (incidentes, SRs, cambios, worklogs o
+    activos) en CSV, NDJSON o Parquet, enviados en streaming desde la base.
+    CSV y NDJSON salen con gzip salvo compress=false.
+    """
+    try:
+        exporter.check_format(format)
+        account_id = ToolmasterRepository(session=session).get_account_id(sf_account_id)
+    except AppError as app_err:
+        raise HTTPException(status_code=app_err.error_type.value, detail=app_err.message)
+    if account_id is None:
+        raise HTTPException(status_code=404, detail="No se encontró la cuenta con ese SF ID")
     filename = _build_filename(
-        "SERVICES_AND_SUPPORT_REPORT",
-        "SERVICES_AND_SUPPORT_REPORT",
-        c_dto.name,
+        dataset.upper(),
+        dataset.upper(),
+        sf_account_id,
         "en",
         start_date,
         end_date,
-        extension="xlsx",
+        extension=exporter.extension(format, compress),
+    )
+    return StreamingResponse(
+        exporter.stream(dataset, format, account_id, start_date, end_date, compress),
+        media_type=exporter.media_type(format, compress),
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@reports_router.post("/generate-batch-report")
+def generate_batch_report(
+    dto: BatchReportRequestDTO,
+    streamer: BatchReportStreamer = Depends(report_batch_streamer),
+):
+    """
+    Reportes de varias cuentas (lista de sf_account_id o todas las de un país)
+    en un ZIP que se envía a medida que se generan; manifest.json al final
+    indica el resultado de cada cuenta.
+    """
+    prefixes = {
+        "monthly": ("REPORTES_DISPONIBILIDAD", "MONTHLY_REPORTS"),
+        "incident": ("REPORTES_INCIDENCIAS", "INCIDENTS_REPORTS"),
+        "saso": ("SERVICES_AND_SUPPORT_REPORTS", "SERVICES_AND_SUPPORT_REPORTS"),
+    }[dto.report_type]
+    filename = _build_filename(
+        *prefixes,
+        dto.country or "CUENTAS",
+        dto.language,
+        dto.start_date,
+        dto.end_date,
+        extension="zip",
     )
     return StreamingResponse(
-        result_buffer,
-        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        streamer.stream(dto),
+        media_type="application/zip",
         headers={"Content-Disposition": f'attachment; filename="{filename}"'},
     )
 
@@ -208,44 +213,11 @@ def generate_case_report(
     use_case: IWordReportUseCase = Depends(word_report_use_case),
 ):
     repo = ToolmasterRepository(session=session)
-    result_case = repo.get_case_by_number(case_number)
-    if not result_case:
-        raise HTTPException(status_code=404, detail="No se encontró el caso.")
-    row = result_case["data"]
-    tipo = result_case["type"]
-    account_name = row.get("account_name", "NO_ACCOUNT")
-    inc_list, sr_list, ch_list = [], [], []
-    if tipo == "incident":
-        inc_list = [IncidentDTO(**row)]
-    elif tipo == "sr":
-        sr_list = [ServiceRequestDTO(**row)]
-    elif tipo == "change":
-        ch_list = [ChangeDTO(**row)]
-    wl_rows = repo.get_worklogs_by_case_number(case_number)
-    w_list = [WorklogDTO(**w) for w in wl_rows]
-    cust_dto = CustomerDTO(name=account_name, worklogs=w_list)
-    dto = WordReportDTO(
-        cust=account_name,
-        incidentes=inc_list,
-        service_requests=sr_list,
-        cambios=ch_list,
-        customers=[cust_dto],
-        language=language,
-    )
-    result_buffer = use_case.generate_single_case_report(case_number, dto)
-    result_buffer.seek(0)
-    filename = _build_filename(
-        "REPORTE_DE_CASO",
-        "CASE_REPORT",
-        account_name,
-        language,
-        extra_part=case_number,
-    )
-    return StreamingResponse(
-        result_buffer,
-        media_type="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
-    )
+    try:
+        report = build_case_report(repo, use_case, case_number, language)
+    except AppError as app_err:
+        raise HTTPException(status_code=app_err.error_type.value, detail=app_err.message)
+    return _file_response(report)
 
 @reports_router.post("/generate-rfo-report")
 def generate_rfo_report(
@@ -255,54 +227,8 @@ def generate_rfo_report(
     use_case: IWordReportUseCase = Depends(word_report_use_case),
 ):
     repo = ToolmasterRepository(session=session)
-    result = repo.get_case_by_number(incident_number)
-    if not result or result["type"] != "incident":
-        raise HTTPException(status_code=404, detail="No se encontró la incidencia.")
-
-    row = result["data"]
-    inc_dto = IncidentDTO(**row)
-
-    if language.lower() == "es" and inc_dto.priority:
-        inc_dto.priority = {
-            "Planning": "Planeación",
-            "Low": "Baja",
-            "Medium": "Media",
-            "High": "Alta",
-            "Critical": "Crítica",
-        }.get(inc_dto.priority, inc_dto.priority)
-
-    cust_country = row.get("country_name") or ""
-    cust_assets = row.get("product_categories") or ""
-    subject_raw = (row.get("subject") or "").strip()
-    subject_clean = (
-        "_".join(subject_raw.split())[:60] if subject_raw else "SIN_ASUNTO"
-    )
-
-    dto = WordReportDTO(
-        cust=subject_clean,
-        cust_country=cust_country,
-        cust_assets=cust_assets,
-        incidentes=[inc_dto],
-        language=language,
-    )
-
-    template_file = (
-        "Informe_RFO.docx" if language.lower() == "es" else "RFO_Report.docx"
-    )
-    template_path = os.path.join(use_case.templates_path, template_file)
-
-    buf = use_case.generate_incident_overview_report(dto, template_path=template_path)
-    buf.seek(0)
-
-    filename = _build_filename(
-        "REPORTE_DE_RFO",
-        "RFO_REPORT",
-        subject_clean,
-        language,
-    )
-
-    return StreamingResponse(
-        buf,
-        media_type="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
-    )
+    try:
+        report = build_rfo_report(repo, use_case, incident_number, language)
+    except AppError as app_err:
+        raise HTTPException(status_code=app_err.error_type.value, detail=app_err.message)
+    return _file_response(report)
@@ -1,5 +1,7 @@
-from typing import Dict, List
-from fastapi import APIRouter, Depends, HTTPException, Query, Security, status
+import os
+import time
+from typing import Any, Callable, Dict, List
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, Security, status
 from fastapi.responses import JSONResponse
 
 from app.conf.settings.dependencies import validate_api_key
@@ -10,13 +12,56 @@ from app.container_instance.instances import tickets_use_case
 from app.infrastructure.dto.ticket_schema import (
     TicketBaseDTO,
     TicketUpdateDTO,
-    TicketCloseDTO
+    TicketCloseDTO,
+    StageTimingDTO,
+    TicketTimingStatsDTO,
 )
 from app.utils.errors import AppError
 from app.utils.logger import log
+from app.utils.metrics import observe_ticket_stages
+from app.utils.stage_timer import record_stages, server_timing_header, stage_stats
 
 tickets_router = APIRouter(dependencies=[Security(validate_api_key)],tags=["/"])
 
+
+def _timed(operation: str, response: Response, call: Callable[[], Any]):
+    """
+    Corre el caso de uso midiendo sus etapas (app.utils.stage_timer): las
+    devuelve en el header Server-Timing, las suma a los histogramas del
+    proceso (GET /timings) y deja un registro ticket_timing en el log.
+    """
+    started = time.perf_counter()
+    with record_stages() as timings:
+        try:
+            result = call()
+        except AppError as app_err:
+            log(f"AppError caught at the route level: {app_err}", level="WARNING")
+            result = JSONResponse(
+                status_code=app_err.error_type.value,
+                content={"message": app_err.message, "error_type": app_err.error_type.name}
+            )
+    total = time.perf_counter() - started
+    stage_stats.observe(operation, timings, total)
+    observe_ticket_stages(operation, timings, total)
+
+    target = result if isinstance(result, Response) else response
+    target.headers["Server-Timing"] = server_timing_header(timings, total)
+    if isinstance(result, Response):
+        outcome = result.status_code
+    elif isinstance(result, dict):
+        outcome = result.get("status_code")  # status del ESB
+    else:
+        outcome = type(result).__name__ if result is not None else None
+    log(
+        "ticket_timing",
+        operation=operation,
+        outcome=outcome,
+        total_ms=round(total * 1000, 1),
+        stages_ms={name: round(seconds * 1000, 1) for name, seconds in timings.items()},
+    )
+    return result
+
+
 @tickets_router.get(
     path="/incidents_by_cid/{bussinesId}/{circuit_id}",
     status_code=status.HTTP_200_OK,
@@ -58,16 +103,9 @@ async def get_incident_details_by_sf_id(
     status_code=status.HTTP_201_CREATED,)
 async def create(
     dto: TicketBaseDTO, # controlador valida que sea de este tipo lo hace pydantic por dentro
+    response: Response,
     use_case: ITicketUseCase = Depends(tickets_use_case)):
-    try:
-        data = use_case.create_ticket(dto)
-        return data
-    except AppError as app_err:
-        log(f"AppError caught at the route level: {app_err}")
-        return JSONResponse(
-            status_code=app_err.error_type.value,
-            content={"message": app_err.message, "error_type": app_err.error_type.name}
-        )
+    return _timed("create", response, lambda: use_case.create_ticket(dto))
 
 # Update ticket
 @tickets_router.patch(
@@ -75,17 +113,9 @@ async def create(
     status_code=status.HTTP_200_OK,)
 async def update_ticket(
     updated_data: TicketUpdateDTO,
+    response: Response,
     use_case: ITicketUseCase = Depends(tickets_use_case)):
-
-    try:
-        updated_data = use_case.update_ticket(updated_data)
-        return updated_data
-    except AppError as app_err:
-        log(f"AppError caught at the route level: {app_err}")
-        return JSONResponse(
-            status_code=app_err.error_type.value,
-            content={"message": app_err.message, "error_type": app_err.error_type.name}
-        )
+    return _timed("update", response, lambda: use_case.update_ticket(updated_data))
 
 
 
@@ -94,17 +124,27 @@ async def update_ticket(
     status_code=status.HTTP_200_OK,)
 async def close_ticket(
     data: TicketCloseDTO,
+    response: Response,
     use_case: ITicketUseCase = Depends(tickets_use_case)):
-
-    try:
-        data = use_case.close_ticket(data)
-        return data
-    except AppError as app_err:
-        log(f"AppError caught at the route level: {app_err}")
-        return JSONResponse(
-            status_code=app_err.error_type.value,
-            content={"message": app_err.message, "error_type": app_err.error_type.name}
+    return _timed("close", response, lambda: use_case.close_ticket(data))
+
+
+@tickets_router.get(path="/timings", response_model=TicketTimingStatsDTO)
+def get_ticket_timings():
+    """Histogramas por etapa de create/update/close en este worker (p50/p95/p99 por bucket)."""
+    stages = [
+        StageTimingDTO(
+            operation=operation,
+            stage=stage_name,
+            count=histogram.count,
+            mean_seconds=round(histogram.sum / histogram.count, 5),
+            p50_seconds=histogram.quantile(0.50),
+            p95_seconds=histogram.quantile(0.95),
+            p99_seconds=histogram.quantile(0.99),
         )
+        for (operation, stage_name), histogram in sorted(stage_stats.snapshot().items())
+    ]
+    return TicketTimingStatsDTO(pid=os.getpid(), stages=stages)
 
 
 
@@ -0,0 +1,24 @@
+from typing import List, Literal, Optional
+from pydantic import BaseModel
+
+
+class BarSeriesDTO(BaseModel):
+    name:       str
+    color:      str
+    categories: List[str]
+    values:     List[float]
+
+
+class BarChartDTO(BaseModel):
+    chart_type:   str
+    title:        str
+    x_title:      str
+    y_title:      str
+    legend_title: Optional[str] = None
+    show_legend:  bool          = True
+    orientation:  Literal["v", "h"] = "v"
+    # Category axis order; for horizontal charts the first entry is drawn at the bottom.
+    categories:   List[str]     = []
+    series:       List[BarSeriesDTO] = []
+    width:        int           = 700
+    height:       int           = 500
@@ -1,5 +1,11 @@
-from typing import Optional
-from pydantic import BaseModel, EmailStr, field_validator
+import copy
+import io
+from datetime import datetime
+from email.generator import BytesGenerator
+from email.message import Message
+from email.utils import getaddresses
+from typing import List, Literal, NamedTuple, Optional, Sequence, Tuple, Union
+from pydantic import BaseModel, EmailStr, Field, field_validator
 
 
 class MailBaseDTO(BaseModel):
@@ -38,3 +44,123 @@ class RadarMailDTO(BaseModel):
     radar_area: str
     radar_type: str
     radar_details: str
+
+
+MailStatus = Literal["queued", "sending", "sent", "failed"]
+
+
+class MailQueuedDTO(BaseModel):
+    message_id: str
+    status: MailStatus = "queued"
+
+
+class MailStatusDTO(BaseModel):
+    message_id: str
+    kind: str
+    status: MailStatus
+    attempts: int
+    enqueued_at: datetime
+    finished_at: Optional[datetime] = None
+    last_error: Optional[str] = None
+
+
+class MailQueueStatsDTO(BaseModel):
+    depth: int  # queued + sending
+    queued: int
+    sending: int
+    sent: int
+    failed: int
+    oldest_queued_seconds: Optional[float] = None
+    latency_p50_seconds: Optional[float] = None  # enqueue -> accepted by the relay
+    latency_p99_seconds: Optional[float] = None
+    latency_samples: int = 0
+
+
+class MailCoalescedDTO(BaseModel):
+    status: Literal["suppressed"] = "suppressed"
+    ticket_id: str
+    cid_mgt: str
+    suppressed: int  # repeated notifications absorbed by the current window, this one included
+    window_ends_at: datetime
+
+
+class MailCoalesceWindowDTO(BaseModel):
+    ticket_id: str
+    cid_mgt: str
+    to_mails: str
+    suppressed: int
+    window_started_at: datetime
+    window_ends_at: datetime
+    first_duplicate_at: Optional[datetime] = None
+    last_duplicate_at: Optional[datetime] = None
+
+
+class MailCoalesceStatsDTO(BaseModel):
+    mode: Literal["digest", "drop"]
+    window_seconds: float
+    active_windows: int
+    suppressed_active: int
+    suppressed_total: int
+    digests_sent: int
+    windows: List[MailCoalesceWindowDTO]  # open windows with the most repeats first
+
+
+class BulkMailDTO(BaseModel):
+    # Cada item es un correo de incidente (MailBaseDTO) o uno general (MailGeneralDTO).
+    items: List[Union[MailBaseDTO, MailGeneralDTO]] = Field(min_length=1, max_length=1000)
+
+    class Config:
+        extra = "forbid"
+
+
+class MailRecipientResultDTO(BaseModel):
+    address: str
+    accepted: bool
+    code: Optional[int] = None
+    message: Optional[str] = None
+
+
+class BulkMailItemResultDTO(BaseModel):
+    index: int
+    kind: str
+    status: Literal["sent", "partial", "failed"]
+    recipients: List[MailRecipientResultDTO] = []
+    error: Optional[str] = None
+
+
+class BulkMailResultDTO(BaseModel):
+    sent: int
+    partial: int
+    failed: int
+    elapsed_seconds: float
+    results: List[BulkMailItemResultDTO]
+
+
+class OutgoingMail(NamedTuple):
+    """Mensaje listo para el relay: sobre (remitente y destinatarios) y bytes sin Bcc."""
+
+    kind: str
+    from_addr: str
+    to_addrs: Tuple[str, ...]
+    payload: bytes
+
+    @classmethod
+    def from_message(
+        cls,
+        msg: Message,
+        kind: str,
+        from_addr: Optional[str] = None,
+        to_addrs: Optional[Sequence[str]] = None,
+    ) -> "OutgoingMail":
+        """El mismo sobre que arma smtplib.send_message a partir de las cabeceras."""
+        if from_addr is None:
+            from_addr = getaddresses([msg["Sender"] or msg["From"]])[0][1]
+        if to_addrs is None:
+            headers = msg.get_all("To", []) + msg.get_all("Cc", []) + msg.get_all("Bcc", [])
+            to_addrs = [addr for _, addr in getaddresses(headers) if addr]
+        msg_copy = copy.copy(msg)
+        del msg_copy["Bcc"]
+        del msg_copy["Resent-Bcc"]
+        out = io.BytesIO()
+        BytesGenerator(out).flatten(msg_copy, linesep="\r\n")
+        return cls(kind, from_addr, tuple(to_addrs), out.getvalue())
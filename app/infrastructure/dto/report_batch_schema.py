@@ -0,0 +1,22 @@
+from datetime import datetime
+from typing import List, Literal, Optional
+
+from pydantic import BaseModel, model_validator
+
+
+class BatchReportRequestDTO(BaseModel):
+    sf_account_ids: Optional[List[str]] = None
+    country: Optional[str] = None
+    start_date: datetime
+    end_date: datetime
+    language: str = "es"
+    report_type: Literal["monthly", "incident", "saso"] = "monthly"
+
+    class Config:
+        extra = "forbid"
+
+    @model_validator(mode="after")
+    def check_accounts(self):
+        if bool(self.sf_account_ids) == bool(self.country):
+            raise ValueError("Indique sf_account_ids o country (solo uno de los dos)")
+        return self
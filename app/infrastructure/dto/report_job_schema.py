@@ -0,0 +1,66 @@
+from datetime import datetime
+from typing import Literal, Optional
+
+from pydantic import BaseModel, model_validator
+
+ReportType = Literal["monthly", "incident", "saso", "case", "rfo"]
+JobStatus = Literal["queued", "running", "done", "failed", "canceled", "timed_out"]
+
+FINISHED_STATUSES = ("done", "failed", "canceled", "timed_out")
+
+
+class ReportJobRequestDTO(BaseModel):
+    report_type: ReportType
+    sf_account_id: Optional[str] = None
+    start_date: Optional[datetime] = None
+    end_date: Optional[datetime] = None
+    case_number: Optional[str] = None
+    incident_number: Optional[str] = None
+    language: str = "es"
+
+    class Config:
+        extra = "forbid"
+
+    @model_validator(mode="after")
+    def check_required_fields(self):
+        if self.report_type in ("monthly", "incident", "saso"):
+            if not (self.sf_account_id and self.start_date and self.end_date):
+                raise ValueError("sf_account_id, start_date y end_date son obligatorios")
+        elif self.report_type == "case" and not self.case_number:
+            raise ValueError("case_number es obligatorio")
+        elif self.report_type == "rfo" and not self.incident_number:
+            raise ValueError("incident_number es obligatorio")
+        return self
+
+    def builder_params(self) -> dict:
+        """Argumentos del builder de report_builder para este tipo de reporte."""
+        if self.report_type in ("monthly", "incident"):
+            return {
+                "sf_account_id": self.sf_account_id,
+                "start_date": self.start_date,
+                "end_date": self.end_date,
+                "language": self.language,
+            }
+        if self.report_type == "saso":
+            return {
+                "sf_account_id": self.sf_account_id,
+                "start_date": self.start_date,
+                "end_date": self.end_date,
+            }
+        if self.report_type == "case":
+            return {"case_number": self.case_number, "language": self.language}
+        return {"incident_number": self.incident_number, "language": self.language}
+
+
+class ReportJobDTO(BaseModel):
+    job_id: str
+    status: JobStatus
+    request: ReportJobRequestDTO
+    submitted_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    filename: Optional[str] = None
+    media_type: Optional[str] = None
+    size: Optional[int] = None
+    error: Optional[str] = None
+    cancel_requested: bool = False
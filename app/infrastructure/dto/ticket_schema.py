@@ -203,3 +203,18 @@ class TicketCloseDTO(BaseModel):
         extra = "forbid" 
         populate_by_name = True  # Allows '@referredType' to be used and @type to be used as alias
         frozen = False
+
+
+class StageTimingDTO(BaseModel):
+    operation: str  # create / update / close
+    stage: str  # db_assets, esb_create, esb_worklog... y "total"
+    count: int
+    mean_seconds: float
+    p50_seconds: Optional[float] = None  # limite del bucket; None = sobre el ultimo bucket
+    p95_seconds: Optional[float] = None
+    p99_seconds: Optional[float] = None
+
+
+class TicketTimingStatsDTO(BaseModel):
+    pid: int  # cada worker de gunicorn acumula lo suyo
+    stages: List[StageTimingDTO]
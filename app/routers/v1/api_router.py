@@ -3,6 +3,7 @@ from app.conf.settings.dependencies import validate_api_key
 from app.infrastructure.controllers.mailer_router import mailer_router
 from app.infrastructure.controllers.ticket_router import tickets_router
 from app.infrastructure.controllers.reports_router import reports_router
+from app.infrastructure.controllers.report_jobs_router import report_jobs_router
 
 router = APIRouter()
 
@@ -24,3 +25,10 @@ router.include_router(
     tags=["Customer Service Center Reports"],
     dependencies=[Depends(validate_api_key)]
 )
+
+router.include_router(
+    report_jobs_router,
+    prefix="/report/jobs",
+    tags=["Customer Service Center Reports"],
+    dependencies=[Depends(validate_api_key)]
+)
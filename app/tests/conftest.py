@@ -0,0 +1,20 @@
+import os
+
+# Settings() exige estas variables; en las pruebas no se conecta a la base ni al ESB.
+_TEST_ENV = {
+    "SECRET_KEY": "test",
+    "TM_DB_NAME": "test",
+    "TM_DB_USER": "test",
+    "TM_DB_PASSWORD": "test",
+    "TM_DB_HOST": "localhost",
+    "TM_DB_PORT": "3306",
+    "ESB_ID": "test",
+    "ESB_SECRET": "test",
+    "ESB_ENV": "test",
+    "ESB_URL": "http://localhost",
+    "API_KEY": "test",
+    "API_KEY_NAME": "X-API-Key",
+}
+
+for name, value in _TEST_ENV.items():
+    os.environ.setdefault(name, value)
@@ -0,0 +1,114 @@
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from app.api_services.availability_engine import AvailabilityEngine, merge_intervals, split_by_month
+
+
+def _ns(value: str) -> int:
+    return int(np.datetime64(value, "ns").astype(np.int64))
+
+
+def _frame(rows):
+    columns = ["incident_number", "circuit_id", "created_at", "start_at_dw", "end_at_dw", "downtime"]
+    df = pd.DataFrame(rows, columns=columns)
+    for col in ("created_at", "start_at_dw", "end_at_dw"):
+        df[col] = pd.to_datetime(df[col])
+    df["downtime"] = df["downtime"].astype(float)
+    return df
+
+
+def test_merge_intervals_joins_overlapping_and_touching_per_key():
+    keys = np.array([1, 2, 1, 1])
+    starts = np.array([10, 0, 0, 5])
+    ends = np.array([12, 3, 5, 8])
+
+    m_keys, m_starts, m_ends = merge_intervals(keys, starts, ends)
+
+    assert m_keys.tolist() == [1, 1, 2]
+    assert m_starts.tolist() == [0, 10, 0]
+    assert m_ends.tolist() == [8, 12, 3]
+
+
+def test_merge_intervals_keeps_contained_interval_inside_longer_one():
+    m_keys, m_starts, m_ends = merge_intervals(np.array([1, 1, 1]), np.array([0, 2, 20]), np.array([10, 4, 30]))
+
+    assert m_keys.tolist() == [1, 1]
+    assert m_starts.tolist() == [0, 20]
+    assert m_ends.tolist() == [10, 30]
+
+
+def test_split_by_month_cuts_at_calendar_boundaries():
+    starts = np.array([_ns("2024-01-31T23:00"), _ns("2024-03-05T00:00")])
+    ends = np.array([_ns("2024-03-01T00:30"), _ns("2024-03-05T01:00")])
+
+    parts = split_by_month(np.array([7, 8]), starts, ends)
+
+    assert parts["key"].tolist() == [7, 7, 7, 8]
+    assert [str(m)[:7] for m in parts["month"]] == ["2024-01", "2024-02", "2024-03", "2024-03"]
+    assert parts["minutes"].tolist() == [60, 29 * 1440, 30, 60]
+
+
+def test_by_month_counts_overlaps_once_and_splits_across_months():
+    frame = _frame([
+        ("INC1", "C1", "2024-01-31 22:00", "2024-01-31 23:00", "2024-02-01 01:00", 120),
+        # Segundo activo del mismo incidente y circuito: case_related lo lista una vez.
+        ("INC1", "C1", "2024-01-31 22:00", "2024-01-31 23:00", "2024-02-01 01:00", 120),
+        ("INC2", "C1", "2024-02-01 00:00", "2024-02-01 00:30", "2024-02-01 02:00", 90),
+        ("INC3", "C2", "2024-02-10 08:00", "2024-02-10 08:00", "2024-02-10 08:45", 45),
+    ])
+
+    out = AvailabilityEngine(frame, ["circuit_id"]).by_month()
+    rows = {(r.month, r.circuit_id): r for r in out.itertuples()}
+
+    assert set(rows) == {(1, "C1"), (2, "C1"), (2, "C2")}
+    assert rows[(1, "C1")].downtime == 60
+    assert rows[(1, "C1")].case_related == "INC1"
+    assert rows[(1, "C1")].period_minutes == 31 * 1440
+    assert rows[(2, "C1")].downtime == 120
+    assert rows[(2, "C1")].case_related == "INC1, INC2"
+    assert rows[(2, "C2")].downtime == 45
+    assert (out["year"] == 2024).all()
+
+
+def test_by_month_without_window_falls_in_created_month():
+    frame = _frame([
+        ("INC1", "C1", "2024-03-10 12:00", None, None, 0),
+        ("INC2", "C1", "2024-04-02 10:00", "2024-04-02 10:00", "2024-04-02 10:30", 30),
+    ])
+
+    out = AvailabilityEngine(frame, ["circuit_id"]).by_month()
+
+    assert out["month"].tolist() == [3, 4]
+    assert out["case_related"].tolist() == ["INC1", "INC2"]
+    assert out["downtime"].tolist() == [0, 30]
+
+
+def test_windows_are_clipped_to_report_period():
+    frame = _frame([
+        ("INC1", "C1", "2024-01-31 20:00", "2024-01-31 23:00", "2024-02-01 01:00", 120),
+    ])
+
+    engine = AvailabilityEngine(frame, ["circuit_id"], datetime(2024, 2, 1), datetime(2024, 2, 29, 23, 59, 59))
+    monthly = engine.by_month()
+    total = engine.total()
+
+    assert monthly["month"].tolist() == [2]
+    assert monthly["downtime"].tolist() == [60]
+    assert monthly["period_minutes"].tolist() == [29 * 1440]
+    assert total["downtime"].tolist() == [60]
+    assert total["period_minutes"].tolist() == [29 * 1440]
+
+
+def test_rows_without_circuit_are_not_merged_together():
+    frame = _frame([
+        ("INC1", None, "2024-05-01 00:00", "2024-05-01 00:00", "2024-05-01 01:00", 60),
+        ("INC2", None, "2024-05-01 00:30", "2024-05-01 00:30", "2024-05-01 01:00", 30),
+    ])
+
+    out = AvailabilityEngine(frame, ["circuit_id"]).total()
+
+    assert len(out) == 1
+    assert out["downtime"].tolist() == [90]
+    assert out["case_related"].tolist() == ["INC1, INC2"]
@@ -0,0 +1,55 @@
+from datetime import datetime
+
+import pytest
+
+from app.utils.cron import CronSchedule
+
+
+def test_parses_lists_ranges_and_steps():
+    schedule = CronSchedule("*/15 1-3,22 * 1-12/6 1,5")
+
+    assert schedule.minutes == {0, 15, 30, 45}
+    assert schedule.hours == {1, 2, 3, 22}
+    assert schedule.months == {1, 7}
+    assert schedule.weekdays == {1, 5}
+
+
+def test_single_value_with_step_runs_to_field_end():
+    assert CronSchedule("50/5 * * * *").minutes == {50, 55}
+
+
+@pytest.mark.parametrize("expr", [
+    "* * * *",
+    "* * * * * *",
+    "60 * * * *",
+    "* 24 * * *",
+    "* * 0 * *",
+    "* * * 13 *",
+    "* * * * 8",
+    "5-1 * * * *",
+    "*/0 * * * *",
+    "a * * * *",
+])
+def test_invalid_expressions_raise(expr):
+    with pytest.raises(ValueError):
+        CronSchedule(expr)
+
+
+@pytest.mark.parametrize("expr, after, expected", [
+    # Estrictamente despues: a la hora exacta salta al dia siguiente.
+    ("0 6 * * *", datetime(2024, 1, 1, 6, 0), datetime(2024, 1, 2, 6, 0)),
+    ("0 6 * * *", datetime(2024, 1, 1, 5, 59, 30), datetime(2024, 1, 1, 6, 0)),
+    ("30 2 1 * *", datetime(2024, 1, 15), datetime(2024, 2, 1, 2, 30)),
+    ("0 0 * * 0", datetime(2024, 1, 1), datetime(2024, 1, 7)),
+    ("0 0 * * 7", datetime(2024, 1, 1), datetime(2024, 1, 7)),
+    # Dia del mes y de la semana restringidos: basta con uno (viernes 5 antes del 13).
+    ("0 0 13 * 5", datetime(2024, 1, 1), datetime(2024, 1, 5)),
+    ("0 0 29 2 *", datetime(2024, 3, 1), datetime(2028, 2, 29)),
+])
+def test_next_after(expr, after, expected):
+    assert CronSchedule(expr).next_after(after) == expected
+
+
+def test_impossible_date_raises():
+    with pytest.raises(ValueError):
+        CronSchedule("0 0 30 2 *").next_after(datetime(2024, 1, 1))
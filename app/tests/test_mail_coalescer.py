@@ -0,0 +1,100 @@
+import time
+
+import pytest
+
+from app.api_services.mail_coalescer import NotificationCoalescer
+from app.infrastructure.dto.mail_schema import MailBaseDTO, MailCoalesceWindowDTO
+
+
+def _dto(to_mails: str = "a@example.com, b@example.com", **kwargs) -> MailBaseDTO:
+    fields = dict(ticket_id="T1", cid_mgt="CID1", branch="Main", country="PA", customer="ACME")
+    fields.update(kwargs)
+    return MailBaseDTO(to_mails=to_mails, **fields)
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def db_path(request, tmp_path):
+    return str(tmp_path / "coalescer.db") if request.param == "sqlite" else None
+
+
+def test_first_notice_passes_and_repeats_are_suppressed(db_path):
+    coalescer = NotificationCoalescer(window_seconds=60, db_path=db_path)
+
+    assert coalescer.admit(_dto()) is None
+    # Mismos destinatarios en otro orden y mayusculas: misma ventana.
+    second = coalescer.admit(_dto("B@example.com; a@example.com"))
+    third = coalescer.admit(_dto())
+
+    assert second.suppressed == 1
+    assert third.suppressed == 2
+    assert third.ticket_id == "T1"
+
+
+def test_key_separates_tickets_and_major_flag():
+    base = NotificationCoalescer.key(_dto())
+
+    assert NotificationCoalescer.key(_dto(ticket_id="T2")) != base
+    assert NotificationCoalescer.key(_dto(is_major=True)) != base
+    assert NotificationCoalescer.key(_dto("c@example.com")) != base
+
+
+def test_release_reopens_window(db_path):
+    coalescer = NotificationCoalescer(window_seconds=60, db_path=db_path)
+    coalescer.admit(_dto())
+
+    coalescer.release(_dto())
+
+    assert coalescer.admit(_dto()) is None
+
+
+def test_flush_sends_digest_for_closed_windows(db_path):
+    sent = []
+    coalescer = NotificationCoalescer(
+        window_seconds=60, db_path=db_path, on_digest=lambda dto, window: sent.append((dto, window)),
+    )
+    coalescer.admit(_dto())
+    coalescer.admit(_dto(branch="Otra"))
+    coalescer.admit(_dto(ticket_id="T2"))
+
+    assert coalescer.flush(now=time.time()) == 0
+    assert coalescer.flush(now=time.time() + 61) == 1
+
+    dto, window = sent[0]
+    assert isinstance(window, MailCoalesceWindowDTO)
+    assert dto.branch == "Otra"
+    assert window.suppressed == 1
+    assert window.first_duplicate_at == window.last_duplicate_at
+    assert window.window_started_at < window.window_ends_at
+    assert coalescer.stats().digests_sent == 1
+    assert coalescer.stats().suppressed_total == 1
+
+
+def test_drop_mode_never_sends_digest(db_path):
+    sent = []
+    coalescer = NotificationCoalescer(
+        window_seconds=60, mode="drop", db_path=db_path, on_digest=lambda dto, window: sent.append(window),
+    )
+    coalescer.admit(_dto())
+    coalescer.admit(_dto())
+
+    assert coalescer.flush(now=time.time() + 61) == 0
+    assert sent == []
+    assert coalescer.stats().suppressed_total == 1
+
+
+def test_stats_lists_active_windows(db_path):
+    coalescer = NotificationCoalescer(window_seconds=60, db_path=db_path)
+    for _ in range(3):
+        coalescer.admit(_dto())
+    coalescer.admit(_dto(ticket_id="T2"))
+
+    stats = coalescer.stats()
+
+    assert stats.active_windows == 2
+    assert stats.suppressed_active == 2
+    assert [w.ticket_id for w in stats.windows] == ["T1", "T2"]
+
+
+def test_unknown_mode_is_rejected():
+    with pytest.raises(ValueError):
+        NotificationCoalescer(mode="batch")
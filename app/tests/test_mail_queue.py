@@ -0,0 +1,105 @@
+import time
+
+import pytest
+
+from app.api_services.mail_queue import MailQueue, QueuedMail, _MemoryBackend, _SqliteBackend
+from app.infrastructure.dto.mail_schema import OutgoingMail
+from app.utils.errors import AppError
+
+
+def _item(message_id: str, enqueued_at: float = 0.0, attempts: int = 0) -> QueuedMail:
+    mail = OutgoingMail("incident", "noc@example.com", ("a@example.com",), b"Subject: x\r\n\r\nbody")
+    return QueuedMail(message_id, mail, attempts, enqueued_at)
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def backend_factory(request, tmp_path):
+    def make(max_depth: int = 100):
+        if request.param == "memory":
+            return _MemoryBackend(max_depth)
+        return _SqliteBackend(str(tmp_path / "mail_queue.db"), max_depth)
+    return make
+
+
+def test_claim_respects_lease(backend_factory):
+    backend = backend_factory()
+    backend.put(_item("m1"))
+
+    assert [i.message_id for i in backend.claim(10, now=1, lease=30)] == ["m1"]
+    # Sigue en "sending" y el lease no vencio: nadie mas lo toma.
+    assert backend.claim(10, now=20, lease=30) == []
+    # El worker que lo tomo murio: al vencer el lease se vuelve a entregar.
+    assert [i.message_id for i in backend.claim(10, now=40, lease=30)] == ["m1"]
+
+
+def test_claim_orders_by_next_attempt_and_honors_limit(backend_factory):
+    backend = backend_factory()
+    backend.put(_item("late", enqueued_at=5))
+    backend.put(_item("early", enqueued_at=1))
+
+    assert [i.message_id for i in backend.claim(1, now=10, lease=30)] == ["early"]
+    assert [i.message_id for i in backend.claim(1, now=10, lease=30)] == ["late"]
+
+
+def test_max_depth_counts_only_pending(backend_factory):
+    backend = backend_factory(max_depth=1)
+    backend.put(_item("m1"))
+
+    with pytest.raises(AppError):
+        backend.put(_item("m2"))
+
+    backend.sent(backend.claim(1, now=1, lease=30)[0], now=2, error=None)
+    backend.put(_item("m2"))
+    assert backend.get("m1").status == "sent"
+
+
+def test_retry_waits_until_next_attempt(backend_factory):
+    backend = backend_factory()
+    backend.put(_item("m1"))
+    item = backend.claim(1, now=1, lease=30)[0]
+
+    backend.retry(item, next_attempt_at=100, error="421")
+
+    assert backend.claim(1, now=50, lease=30) == []
+    retried = backend.claim(1, now=100, lease=30)
+    assert [i.attempts for i in retried] == [1]
+    assert backend.get("m1").last_error == "421"
+
+
+def test_purge_drops_only_finished_before_cutoff(backend_factory):
+    backend = backend_factory()
+    for message_id in ("old", "new", "pending"):
+        backend.put(_item(message_id))
+    claimed = {i.message_id: i for i in backend.claim(2, now=1, lease=30)}
+    backend.sent(claimed["old"], now=10, error=None)
+    backend.fail(claimed["new"], now=50, error="550")
+
+    assert backend.purge(before=20) == 1
+    assert backend.get("old") is None
+    assert backend.get("new").status == "failed"
+    assert backend.get("pending").status == "queued"
+
+
+def test_backoff_doubles_up_to_max():
+    queue = MailQueue(pool=None, retry_base_seconds=5, retry_max_seconds=60)
+
+    assert [queue._backoff(n) for n in range(6)] == [5, 10, 20, 40, 60, 60]
+
+
+@pytest.mark.parametrize(
+    "attempts, permanent, expected",
+    [(0, False, "queued"), (0, True, "failed"), (2, False, "failed")],
+)
+def test_failed_retries_until_max_attempts(attempts, permanent, expected):
+    queue = MailQueue(pool=None, max_attempts=3, retry_base_seconds=5)
+    queue.backend.put(_item("m1", attempts=attempts))
+    item = queue.backend.claim(1, now=time.time(), lease=30)[0]
+
+    queue._failed(item, ConnectionError("reset"), permanent=permanent)
+
+    status = queue.get("m1")
+    assert status.status == expected
+    assert status.attempts == attempts + 1
+    assert status.last_error == "ConnectionError: reset"
+    # Un reintento queda programado con backoff, no disponible de inmediato.
+    assert queue.backend.claim(1, now=time.time(), lease=30) == []
@@ -0,0 +1,45 @@
+from app.api_services.report_dataset import (
+    CLOSED_CHANGE_STATUSES,
+    CLOSED_TICKET_STATUSES,
+    ReportDataset,
+    _partition,
+)
+from app.infrastructure.dto.reports_schema import AssetDTO, ChangeDTO, IncidentDTO
+
+
+def _numbers(items):
+    return [i.incident_number for i in items]
+
+
+def test_partition_normalizes_status_and_skips_canceled():
+    incidents = [
+        IncidentDTO(incident_number="1", status="Resolved"),
+        IncidentDTO(incident_number="2", status=" closed "),
+        IncidentDTO(incident_number="3", status="In Progress"),
+        IncidentDTO(incident_number="4", status="Canceled"),
+        IncidentDTO(incident_number="5", status=None),
+    ]
+
+    closed, opened = _partition(incidents, CLOSED_TICKET_STATUSES)
+
+    assert _numbers(closed) == ["1", "2"]
+    assert _numbers(opened) == ["3", "5"]
+
+
+def test_partition_uses_change_statuses():
+    changes = [ChangeDTO(change_number=n, status=s) for n, s in [("1", "Review"), ("2", "Completed"), ("3", "Resolved")]]
+
+    closed, opened = _partition(changes, CLOSED_CHANGE_STATUSES)
+
+    assert [c.change_number for c in closed] == ["1", "2"]
+    assert [c.change_number for c in opened] == ["3"]
+
+
+def test_circuit_index_only_holds_closed_incidents():
+    closed = IncidentDTO(incident_number="1", status="closed", assets=[AssetDTO(circuit_id="C1"), AssetDTO()])
+    opened = IncidentDTO(incident_number="2", status="open", assets=[AssetDTO(circuit_id="C1")])
+
+    dataset = ReportDataset([closed, opened], [], [])
+
+    assert _numbers(dataset.open_incidents) == ["2"]
+    assert {k: _numbers(v) for k, v in dataset.circuit_index.items()} == {"C1": ["1"]}
@@ -0,0 +1,62 @@
+from io import BytesIO
+
+from openpyxl import Workbook, load_workbook
+from openpyxl.worksheet.table import Table
+
+from app.api_services.report_dataset import ReportDataset
+from app.api_services.saso_excel_writer import NO_DATA, SasoExcelWriter
+from app.infrastructure.dto.reports_schema import IncidentDTO
+
+
+def _template():
+    """Libro minimo con la forma de SASO_Report.xlsx: titulo, encabezados y fila plantilla."""
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "Incident Details"
+    ws.append(["Incidentes"])
+    ws.append(["Numero", "Downtime", "Sintoma"])
+    ws.append(["{{ i.incident_number }}", "{{ i.downtime }}", "{{ i.symptom }}"])
+    ws.append(["Pie"])
+    ws.add_table(Table(displayName="IncidentTable", ref="A2:C3"))
+    buffer = BytesIO()
+    wb.save(buffer)
+    buffer.seek(0)
+    # Recargado como el template real, con las columnas de la tabla ya definidas.
+    return load_workbook(buffer)
+
+
+def _render(incidents):
+    out = SasoExcelWriter().write(_template(), ReportDataset(incidents, [], []))
+    return load_workbook(out)["Incident Details"]
+
+
+def test_table_ref_extends_to_last_written_row():
+    ws = _render([
+        IncidentDTO(incident_number="INC1", downtime=10, symptom="Caida"),
+        IncidentDTO(incident_number="INC2"),
+        IncidentDTO(incident_number="INC3", downtime=2.5),
+    ])
+
+    assert ws.tables["IncidentTable"].ref == "A2:C5"
+    assert [[c.value for c in row] for row in ws.iter_rows(min_row=3, max_row=5)] == [
+        ["INC1", 10, "Caida"],
+        ["INC2", 0, NO_DATA],
+        ["INC3", 2.5, NO_DATA],
+    ]
+    assert ws["A6"].value == "Pie"
+
+
+def test_sheet_without_records_keeps_template():
+    ws = _render([])
+
+    assert ws.tables["IncidentTable"].ref == "A2:C3"
+    assert ws["A3"].value == "{{ i.incident_number }}"
+    assert ws["A4"].value == "Pie"
+
+
+def test_extend_table_never_shrinks():
+    table = Table(displayName="IncidentTable", ref="A2:C10")
+
+    SasoExcelWriter._extend_table(table, 5)
+
+    assert table.ref == "A2:C10"
@@ -0,0 +1,152 @@
+import fcntl
+import json
+import os
+import threading
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Set
+
+from app.utils.logger import log
+
+# minute hour day-of-month month day-of-week
+_FIELDS = [(0, 59), (0, 23), (1, 31), (1, 12), (0, 7)]
+
+
+def _parse_field(expr: str, low: int, high: int) -> Set[int]:
+    values: Set[int] = set()
+    for part in expr.split(","):
+        rng, _, step = part.partition("/")
+        if rng == "*":
+            start, end = low, high
+        elif "-" in rng:
+            start, end = (int(x) for x in rng.split("-", 1))
+        else:
+            start = end = int(rng)
+            if step:
+                end = high
+        step_n = int(step) if step else 1
+        if start < low or end > high or start > end or step_n < 1:
+            raise ValueError(f"Valor fuera de rango en '{expr}' ({low}-{high})")
+        values.update(range(start, end + 1, step_n))
+    return values
+
+
+class CronSchedule:
+    """
+    Expresion cron de 5 campos (minuto hora dia mes dia_semana) con *, listas,
+    rangos y pasos. Domingo es 0 (7 tambien se acepta). Como en cron, si dia
+    del mes y dia de la semana estan restringidos basta con que coincida uno.
+    """
+
+    def __init__(self, expr: str):
+        parts = expr.split()
+        if len(parts) != 5:
+            raise ValueError(f"Expresion cron invalida '{expr}': se esperan 5 campos")
+        fields: List[Set[int]] = [
+            _parse_field(part, low, high) for part, (low, high) in zip(parts, _FIELDS)
+        ]
+        self.expr = expr
+        self.minutes, self.hours, self.days, self.months, dow = fields
+        self.weekdays = {d % 7 for d in dow}
+        self._any_day = parts[2] == "*"
+        self._any_weekday = parts[4] == "*"
+
+    def _day_matches(self, dt: datetime) -> bool:
+        if dt.month not in self.months:
+            return False
+        weekday = (dt.weekday() + 1) % 7
+        if self._any_day or self._any_weekday:
+            return dt.day in self.days and weekday in self.weekdays
+        return dt.day in self.days or weekday in self.weekdays
+
+    def next_after(self, after: datetime) -> datetime:
+        """Primer instante que cumple la expresion estrictamente despues de `after`."""
+        candidate = after.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        day = candidate.replace(hour=0, minute=0)
+        for _ in range(366 * 5):
+            if self._day_matches(day):
+                for hour in sorted(self.hours):
+                    for minute in sorted(self.minutes):
+                        fire = day.replace(hour=hour, minute=minute)
+                        if fire >= candidate:
+                            return fire
+            day += timedelta(days=1)
+        raise ValueError(f"La expresion cron '{self.expr}' no tiene proxima ejecucion")
+
+
+class CronJob(ABC):
+    """
+    Tarea periodica que corre en un hilo de cada worker de gunicorn. En cada
+    disparo solo ejecuta `run` el worker que toma el flock de <name>.lock en
+    `state_dir`; el ultimo disparo completado queda en <name>.json para que
+    los demas no lo repitan. Un disparo que cayo con el servicio abajo se
+    recupera si arranca dentro de `catchup_hours`.
+    """
+
+    label = "Cron job"
+
+    def __init__(self, schedule: str, state_dir: str, name: str, catchup_hours: float = 12):
+        self.schedule = CronSchedule(schedule)
+        self.catchup = timedelta(hours=catchup_hours)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._state_path = os.path.join(state_dir, f"{name}.json")
+        self._lock_path = os.path.join(state_dir, f"{name}.lock")
+
+    @abstractmethod
+    def run(self, now: datetime) -> Dict[str, int]:
+        """Ejecuta el disparo de `now`; los conteos devueltos quedan en <name>.json."""
+        pass
+
+    def start(self):
+        if self._thread is None:
+            name = self.label.lower().replace(" ", "-")
+            self._thread = threading.Thread(target=self._loop, name=name, daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    def _loop(self):
+        # Un disparo perdido por un reinicio reciente se ejecuta al arrancar.
+        fire_at = self.schedule.next_after(datetime.now() - self.catchup)
+        log(f"{self.label}: proxima ejecucion {fire_at.isoformat()} ({self.schedule.expr})")
+        while not self._stop.is_set():
+            delay = (fire_at - datetime.now()).total_seconds()
+            if delay > 0:
+                # Esperas cortas para seguir los cambios de hora del sistema.
+                self._stop.wait(min(delay, 60))
+                continue
+            try:
+                self._run_once(fire_at)
+            except Exception as e:
+                log(f"{self.label}: error en la ejecucion de {fire_at.isoformat()}: {e}")
+            fire_at = self.schedule.next_after(datetime.now())
+
+    def _last_fire(self) -> Optional[str]:
+        try:
+            with open(self._state_path, "r") as f:
+                return json.load(f).get("fire_at")
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def _run_once(self, fire_at: datetime):
+        fd = os.open(self._lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return
+            if self._last_fire() == fire_at.isoformat():
+                return
+            counts = self.run(fire_at)
+            if self._stop.is_set():
+                # Interrumpida: si el servicio vuelve dentro de la ventana de
+                # recuperacion, el disparo se repite.
+                return
+            with open(self._state_path, "w") as f:
+                json.dump({"fire_at": fire_at.isoformat(), "finished_at": datetime.now().isoformat(), **counts}, f)
+        finally:
+            os.close(fd)
@@ -14,6 +14,7 @@ class ErrorType(Enum):
     NOT_FOUND = status.HTTP_404_NOT_FOUND
     DATASOURCE_ERROR = status.HTTP_500_INTERNAL_SERVER_ERROR
     INTERNAL_SERVER_ERROR = status.HTTP_500_INTERNAL_SERVER_ERROR
+    SERVICE_UNAVAILABLE = status.HTTP_503_SERVICE_UNAVAILABLE
 
 
 class AppError(Exception):
@@ -1,3 +1,267 @@
-def log(message: str):
-    with open("logs.log", "a") as logfile:
-        logfile.write(f"{message}\n")
\ No newline at end of file
+"""
+Log de la API en JSON lines (logs.log por defecto).
+
+log() no escribe: deja el registro en una cola y vuelve. Un hilo por proceso
+(cada worker de gunicorn, cada proceso de render) la vacia en tandas con un
+solo write por tanda, rota el archivo por tamano y recorta lo que sea
+demasiado largo. Si la cola se llena los registros nuevos se descartan (y se
+avisa cuantos); el request nunca espera por el disco.
+
+    log("Ticket creado")
+    log("ESB sin respuesta", level="ERROR", sf_incident_id=sf_id, status=503)
+
+Cada linea lleva ts, level, pid, correlation_id (el del request, ver
+CorrelationIdMiddleware) y msg, mas los campos extra.
+
+Los procesos hijos de multiprocessing (jobs de reportes, pools de batch y
+prerender) salen con os._exit, sin atexit: por eso el hilo de cada proceso
+registra tambien un finalizer de multiprocessing que vacia la cola, y los
+puntos de entrada de esos hijos llaman flush_logs() al terminar. La configuracion
+(LOG_FILE, LOG_LEVEL, LOG_MAX_BYTES...) se lee de Settings cuando arranca el
+hilo, asi el logger se puede importar antes que la configuracion.
+"""
+
+import atexit
+import fcntl
+import json
+import multiprocessing.util
+import os
+import queue
+import re
+import threading
+import time
+import uuid
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+LEVELS = {"DEBUG": 10, "INFO": 20, "WARNING": 30, "ERROR": 40}
+CORRELATION_HEADER = "X-Correlation-ID"
+_BASE64_DATA = re.compile(r"(data:[\w/+.-]+;base64,)[A-Za-z0-9+/=]{64,}")
+
+_correlation_id: ContextVar[Optional[str]] = ContextVar("correlation_id", default=None)
+
+
+def current_correlation_id() -> Optional[str]:
+    return _correlation_id.get()
+
+
+class _Config:
+    def __init__(self):
+        self.path = "logs.log"
+        self.level = LEVELS["INFO"]
+        self.max_bytes = 50 * 1024 * 1024
+        self.backups = 5
+        self.max_field_chars = 2000
+        self.queue_size = 10000
+
+    def load(self):
+        try:
+            from app.conf.config import get_app_settings
+
+            settings = get_app_settings()
+        except Exception:
+            return  # scripts sin .env: quedan los valores por defecto
+        self.path = settings.log_file
+        self.level = LEVELS[settings.log_level]
+        self.max_bytes = settings.log_max_bytes
+        self.backups = settings.log_backups
+        self.max_field_chars = settings.log_max_field_chars
+        self.queue_size = settings.log_queue_size
+
+
+def _truncate(value: str, limit: int) -> str:
+    value = _BASE64_DATA.sub(lambda m: f"{m.group(1)}<{len(m.group(0)) - len(m.group(1))} bytes>", value)
+    if limit and len(value) > limit:
+        return f"{value[:limit]}...[+{len(value) - limit} chars]"
+    return value
+
+
+class _FileWriter:
+    """Archivo en modo append compartido por los workers; rota bajo un flock para que rote uno solo."""
+
+    def __init__(self, config: _Config):
+        self.config = config
+        self.fd: Optional[int] = None
+        self.inode: Optional[int] = None
+
+    def _open(self):
+        if self.fd is not None:
+            os.close(self.fd)
+        directory = os.path.dirname(os.path.abspath(self.config.path))
+        os.makedirs(directory, exist_ok=True)
+        self.fd = os.open(self.config.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        self.inode = os.fstat(self.fd).st_ino
+
+    def _rotate(self, incoming: int):
+        path, backups = self.config.path, self.config.backups
+        with open(path + ".lock", "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                # Otro worker pudo haber rotado mientras esperabamos el lock.
+                if os.path.getsize(path) + incoming <= self.config.max_bytes:
+                    return
+                for i in range(backups - 1, 0, -1):
+                    if os.path.exists(f"{path}.{i}"):
+                        os.replace(f"{path}.{i}", f"{path}.{i + 1}")
+                if backups > 0:
+                    os.replace(path, f"{path}.1")
+                else:
+                    os.truncate(path, 0)
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def write(self, data: bytes):
+        try:
+            stat = os.stat(self.config.path)
+            if self.fd is None or stat.st_ino != self.inode:
+                self._open()  # primera vez, o lo roto otro worker
+            elif self.config.max_bytes and stat.st_size + len(data) > self.config.max_bytes:
+                self._rotate(len(data))
+                self._open()
+        except FileNotFoundError:
+            self._open()
+        os.write(self.fd, data)
+
+
+class _QueueLogger:
+    BATCH_SIZE = 500
+
+    def __init__(self):
+        self.config = _Config()
+        self._queue: "queue.Queue[Tuple]" = queue.Queue(self.config.queue_size)
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._dropped = 0
+        self._pid = os.getpid()
+
+    def _after_fork(self):
+        # El hijo no hereda el hilo y la cola pudo quedar con un lock tomado.
+        self._queue = queue.Queue(self.config.queue_size)
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._dropped = 0
+        self._pid = os.getpid()
+
+    def _ensure_started(self):
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+                self._thread.start()
+                # Corre tambien cuando un proceso de multiprocessing sale por os._exit.
+                multiprocessing.util.Finalize(None, self.flush, exitpriority=0)
+
+    def submit(self, level: str, message: Any, fields: Dict[str, Any]):
+        if LEVELS.get(level, 20) < self.config.level:
+            return
+        self._ensure_started()
+        record = (time.time(), level, _correlation_id.get(), message, fields)
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            self._dropped += 1
+
+    def _format(self, record: Tuple) -> str:
+        ts, level, correlation_id, message, fields = record
+        limit = self.config.max_field_chars
+        line: Dict[str, Any] = {
+            "ts": datetime.fromtimestamp(ts).astimezone().isoformat(timespec="milliseconds"),
+            "level": level,
+            "pid": self._pid,
+            "correlation_id": correlation_id,
+            "msg": _truncate(message if isinstance(message, str) else str(message), limit),
+        }
+        for key, value in fields.items():
+            if isinstance(value, str):
+                value = _truncate(value, limit)
+            elif not isinstance(value, (int, float, bool, type(None))):
+                # dicts/listas chicos quedan anidados; los grandes, como texto recortado.
+                dumped = json.dumps(value, default=str, ensure_ascii=False)
+                if (limit and len(dumped) > limit) or _BASE64_DATA.search(dumped):
+                    value = _truncate(dumped, limit)
+            line[key] = value
+        return json.dumps(line, default=str, ensure_ascii=False)
+
+    def _run(self):
+        self.config.load()
+        with self._queue.mutex:
+            self._queue.maxsize = self.config.queue_size
+        writer = _FileWriter(self.config)
+        while True:
+            batch: List[Tuple] = [self._queue.get()]
+            while len(batch) < self.BATCH_SIZE:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            taken = len(batch)
+            if self._dropped:
+                dropped, self._dropped = self._dropped, 0
+                batch.append((time.time(), "WARNING", None, f"Logger: {dropped} registros descartados (cola llena)", {}))
+            lines = []
+            for record in batch:
+                try:
+                    lines.append(self._format(record))
+                except Exception as e:
+                    lines.append(json.dumps({"level": "ERROR", "pid": self._pid, "msg": f"Logger: registro invalido: {e}"}))
+            try:
+                writer.write(("\n".join(lines) + "\n").encode("utf-8"))
+            except OSError:
+                pass  # sin disco no hay donde avisar; se pierde la tanda
+            for _ in range(taken):
+                self._queue.task_done()
+
+    def flush(self, timeout: float = 5.0):
+        """Espera a que la cola se vacie (al salir y en scripts)."""
+        if self._thread is None or self._pid != os.getpid():
+            return
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+
+_logger = _QueueLogger()
+os.register_at_fork(after_in_child=_logger._after_fork)
+atexit.register(_logger.flush)
+
+
+def log(message: Any, level: str = "INFO", **fields: Any):
+    """Encola un registro; no bloquea (ver el docstring del modulo)."""
+    _logger.submit(level, message, fields)
+
+
+def flush_logs(timeout: float = 5.0):
+    _logger.flush(timeout)
+
+
+class CorrelationIdMiddleware:
+    """
+    Middleware ASGI: toma el X-Correlation-ID del request (o genera uno), lo
+    deja disponible para log() y para las llamadas al ESB, y lo devuelve en
+    la respuesta.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        header = CORRELATION_HEADER.lower().encode()
+        incoming = next((v.decode("latin-1") for k, v in scope.get("headers", []) if k == header), None)
+        correlation_id = (incoming or uuid.uuid4().hex)[:128]
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                message.setdefault("headers", [])
+                message["headers"] = list(message["headers"]) + [(header, correlation_id.encode("latin-1"))]
+            await send(message)
+
+        token = _correlation_id.set(correlation_id)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _correlation_id.reset(token)
@@ -0,0 +1,168 @@
+"""
+Metricas Prometheus de la API (GET /metrics).
+
+Con gunicorn, gunicorn.conf.py define PROMETHEUS_MULTIPROC_DIR antes de crear
+los workers: cada proceso (workers y procesos de render de reportes) escribe
+sus valores en archivos mmap de ese directorio y /metrics los suma al
+responder, atienda el scrape el worker que sea. Sin esa variable (uvicorn
+solo, scripts, benchmarks) las metricas quedan en memoria del proceso.
+"""
+
+import os
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional, Tuple
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+)
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.utils.stage_timer import STAGE_BUCKETS
+
+MULTIPROC_ENV = "PROMETHEUS_MULTIPROC_DIR"
+RENDER_BUCKETS = (0.5, 1, 2.5, 5, 10, 20, 30, 60, 120, 300, 600)
+
+HTTP_REQUESTS = Counter(
+    "tickets_api_http_requests_total", "Requests HTTP por ruta y status", ["method", "route", "status"]
+)
+HTTP_LATENCY = Histogram(
+    "tickets_api_http_request_duration_seconds", "Latencia HTTP por ruta", ["method", "route"], buckets=STAGE_BUCKETS
+)
+HTTP_IN_FLIGHT = Gauge(
+    "tickets_api_http_requests_in_flight", "Requests HTTP en curso (suma de los workers)", multiprocess_mode="livesum"
+)
+ESB_REQUESTS = Counter(
+    "tickets_api_esb_requests_total", "Llamadas al ESB por operacion y status (o excepcion)", ["operation", "status"]
+)
+ESB_LATENCY = Histogram(
+    "tickets_api_esb_request_duration_seconds", "Latencia de las llamadas al ESB", ["operation"], buckets=STAGE_BUCKETS
+)
+DB_POOL_CHECKED_OUT = Gauge(
+    "tickets_api_db_pool_checked_out", "Conexiones del pool en uso", ["pool"], multiprocess_mode="livesum"
+)
+DB_POOL_OPEN = Gauge(
+    "tickets_api_db_pool_open_connections", "Conexiones abiertas por el pool", ["pool"], multiprocess_mode="livesum"
+)
+DB_POOL_CAPACITY = Gauge(
+    "tickets_api_db_pool_capacity", "pool_size + max_overflow", ["pool"], multiprocess_mode="livesum"
+)
+DB_POOL_CONNECTS = Counter(
+    "tickets_api_db_pool_connects_total", "Conexiones nuevas abiertas por el pool", ["pool"]
+)
+CACHE_REQUESTS = Counter(
+    "tickets_api_cache_requests_total", "Consultas a los caches (chart, template, report)", ["cache", "result"]
+)
+REPORT_RENDER = Histogram(
+    "tickets_api_report_render_seconds", "Tiempo de armado de reportes", ["report_type", "outcome"],
+    buckets=RENDER_BUCKETS,
+)
+TICKET_STAGE = Histogram(
+    "tickets_api_ticket_stage_seconds", "Etapas de create/update/close (ver stage_timer)", ["operation", "stage"],
+    buckets=STAGE_BUCKETS,
+)
+
+
+def observe_esb(operation: str, status: str, seconds: float):
+    ESB_REQUESTS.labels(operation, status).inc()
+    ESB_LATENCY.labels(operation).observe(seconds)
+
+
+def cache_result(cache: str, hit: bool):
+    CACHE_REQUESTS.labels(cache, "hit" if hit else "miss").inc()
+
+
+@contextmanager
+def report_render(report_type: str) -> Iterator[None]:
+    """Mide el armado de un reporte; outcome "error" si el bloque lanza."""
+    started = time.perf_counter()
+    outcome = "error"
+    try:
+        yield
+        outcome = "ok"
+    finally:
+        REPORT_RENDER.labels(report_type, outcome).observe(time.perf_counter() - started)
+
+
+def observe_ticket_stages(operation: str, timings: Dict[str, float], total: Optional[float] = None):
+    for name, seconds in timings.items():
+        TICKET_STAGE.labels(operation, name).observe(seconds)
+    if total is not None:
+        TICKET_STAGE.labels(operation, "total").observe(total)
+
+
+def instrument_engine(engine: Engine, pool: str):
+    """Conexiones en uso y abiertas del pool de SQLAlchemy, via eventos (sirve en multiproceso)."""
+    size = getattr(engine.pool, "size", lambda: 0)()
+    overflow = getattr(engine.pool, "_max_overflow", 0)
+    DB_POOL_CAPACITY.labels(pool).set(size + max(overflow, 0))
+
+    @event.listens_for(engine, "connect")
+    def _connect(dbapi_connection, connection_record):
+        DB_POOL_OPEN.labels(pool).inc()
+        DB_POOL_CONNECTS.labels(pool).inc()
+
+    @event.listens_for(engine, "close")
+    def _close(dbapi_connection, connection_record):
+        DB_POOL_OPEN.labels(pool).dec()
+
+    @event.listens_for(engine, "checkout")
+    def _checkout(dbapi_connection, connection_record, connection_proxy):
+        DB_POOL_CHECKED_OUT.labels(pool).inc()
+
+    @event.listens_for(engine, "checkin")
+    def _checkin(dbapi_connection, connection_record):
+        DB_POOL_CHECKED_OUT.labels(pool).dec()
+
+
+class MetricsMiddleware:
+    """
+    Middleware ASGI: cuenta y mide cada request por la plantilla de la ruta
+    (/api/tickets/incident_details/{bussinesId}/{incident_id}, no el path
+    real) para no explotar la cardinalidad. No envuelve el body, asi que no
+    afecta las descargas en streaming.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        HTTP_IN_FLIGHT.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_IN_FLIGHT.dec()
+            route = scope.get("route")
+            path = getattr(route, "path", None) or "unmatched"
+            HTTP_REQUESTS.labels(scope["method"], path, str(status["code"])).inc()
+            HTTP_LATENCY.labels(scope["method"], path).observe(time.perf_counter() - started)
+
+
+def render_metrics() -> Tuple[bytes, str]:
+    """Texto de exposicion de Prometheus; con gunicorn suma los archivos de todos los procesos."""
+    if os.environ.get(MULTIPROC_ENV):
+        from prometheus_client import multiprocess
+
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
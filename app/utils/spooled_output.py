@@ -0,0 +1,65 @@
+import os
+import tempfile
+from typing import BinaryIO, Iterator, List
+
+from app.conf.config import get_app_settings
+
+CHUNK_SIZE = 64 * 1024
+
+
+def report_buffer() -> BinaryIO:
+    """
+    Buffer de salida para un reporte: queda en memoria mientras es chico y
+    pasa a un archivo temporal (report_spool_dir) al superar
+    report_spool_max_memory_bytes.
+    """
+    settings = get_app_settings()
+    return tempfile.SpooledTemporaryFile(
+        max_size=settings.report_spool_max_memory_bytes,
+        dir=settings.report_spool_dir,
+    )
+
+
+def buffer_size(buffer: BinaryIO) -> int:
+    """Tamaño desde la posicion actual hasta el final, sin mover el stream."""
+    start = buffer.tell()
+    end = buffer.seek(0, os.SEEK_END)
+    buffer.seek(start)
+    return end - start
+
+
+def iter_chunks(buffer: BinaryIO, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+    """Entrega el buffer por bloques y lo cierra al terminar (o si se corta la descarga)."""
+    try:
+        while chunk := buffer.read(chunk_size):
+            yield chunk
+    finally:
+        buffer.close()
+
+
+class ChunkSink:
+    """Destino de escritura sin seek (zipfile, pyarrow): acumula lo escrito hasta que se entrega al cliente."""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._offset = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._offset += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._offset
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
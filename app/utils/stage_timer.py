@@ -0,0 +1,107 @@
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional, Tuple
+
+_current: ContextVar[Optional[Dict[str, float]]] = ContextVar("stage_timings", default=None)
+
+# Limites (segundos) de los histogramas por etapa; el ultimo bucket es +Inf.
+STAGE_BUCKETS: Tuple[float, ...] = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+
+@contextmanager
+def record_stages() -> Iterator[Dict[str, float]]:
+    """Activa la medicion: cada `stage` dentro del bloque suma sus segundos al dict."""
+    timings: Dict[str, float] = {}
+    token = _current.set(timings)
+    try:
+        yield timings
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """
+    Mide una etapa del pipeline; sin record_stages activo no hace nada.
+    Sirve tambien como decorador: @stage("esb_create").
+    """
+    timings = _current.get()
+    if timings is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[name] = timings.get(name, 0.0) + time.perf_counter() - started
+
+
+def server_timing_header(timings: Dict[str, float], total: Optional[float] = None) -> str:
+    """Valor del header Server-Timing (milisegundos), p.ej. `db_assets;dur=3.2, esb_create;dur=410.0`."""
+    parts = [f"{name};dur={seconds * 1000:.1f}" for name, seconds in timings.items()]
+    if total is not None:
+        parts.append(f"total;dur={total * 1000:.1f}")
+    return ", ".join(parts)
+
+
+class StageHistogram:
+    def __init__(self, buckets: Tuple[float, ...] = STAGE_BUCKETS):
+        self.buckets = buckets
+        self.counts: List[int] = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, seconds: float):
+        i = 0
+        while i < len(self.buckets) and seconds > self.buckets[i]:
+            i += 1
+        self.counts[i] += 1
+        self.count += 1
+        self.sum += seconds
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Limite superior del bucket donde cae el cuantil q (None si no hay datos o cae en +Inf)."""
+        if not self.count:
+            return None
+        rank, seen = q * self.count, 0
+        for bound, n in zip(self.buckets, self.counts):
+            seen += n
+            if seen >= rank:
+                return bound
+        return None
+
+
+class StageStats:
+    """Histogramas por operacion y etapa, acumulados en el proceso (cada worker tiene los suyos)."""
+
+    def __init__(self, buckets: Tuple[float, ...] = STAGE_BUCKETS):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._histograms: Dict[Tuple[str, str], StageHistogram] = {}
+
+    def observe(self, operation: str, timings: Dict[str, float], total: Optional[float] = None):
+        items = list(timings.items()) + ([("total", total)] if total is not None else [])
+        with self._lock:
+            for name, seconds in items:
+                histogram = self._histograms.get((operation, name))
+                if histogram is None:
+                    histogram = self._histograms[(operation, name)] = StageHistogram(self.buckets)
+                histogram.observe(seconds)
+
+    def snapshot(self) -> Dict[Tuple[str, str], StageHistogram]:
+        with self._lock:
+            copies = {}
+            for key, histogram in self._histograms.items():
+                copy = StageHistogram(self.buckets)
+                copy.counts, copy.count, copy.sum = list(histogram.counts), histogram.count, histogram.sum
+                copies[key] = copy
+            return copies
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+
+
+stage_stats = StageStats()
@@ -0,0 +1,111 @@
+import copy
+import copyreg
+import hashlib
+import os
+import pickle
+import threading
+import weakref
+from typing import Any, Callable, Dict, Tuple
+
+import openpyxl
+from docx import Document
+from docxtpl import DocxTemplate
+from openpyxl.worksheet.table import TableList
+
+from app.utils.logger import log
+from app.utils.metrics import cache_result
+
+# TableList.items() devuelve (nombre, ref) en lugar de las tablas, y pickle
+# usa items() para las subclases de dict; sin esto se pierden las tablas.
+copyreg.pickle(TableList, lambda tables: (TableList, (dict(tables),)))
+
+
+# Los report jobs hacen fork con otros hilos activos: lock nuevo en el hijo.
+# Un solo hook para todas las caches, con referencias debiles.
+_instances: "weakref.WeakSet[TemplateCache]" = weakref.WeakSet()
+
+
+def _reset_locks_after_fork():
+    for cache in list(_instances):
+        cache._reset_lock()
+
+
+os.register_at_fork(after_in_child=_reset_locks_after_fork)
+
+
+class TemplateCache:
+    """
+    Parsed report templates, loaded once per worker.
+
+    Each path is parsed the first time it is requested and re-parsed only
+    when its mtime or size changes on disk. Callers always get an isolated
+    copy they can render into: a deep copy of the python-docx tree for
+    .docx templates, and an unpickled snapshot for openpyxl workbooks
+    (both several times cheaper than unzipping and parsing the file).
+    """
+
+    def __init__(self):
+        self._entries: Dict[Tuple[str, str], Tuple[Tuple[float, int], Any]] = {}
+        self._fingerprints: Dict[str, Tuple[tuple, str]] = {}
+        self._lock = threading.Lock()
+        _instances.add(self)
+
+    def _load(self, kind: str, path: str, parse: Callable[[str], Any]) -> Any:
+        stat = os.stat(path)
+        version = (stat.st_mtime, stat.st_size)
+        key = (kind, os.path.abspath(path))
+        entry = self._entries.get(key)
+        cache_result("template", entry is not None and entry[0] == version)
+        if entry is None or entry[0] != version:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is None or entry[0] != version:
+                    if entry is not None:
+                        log(f"Template cache: {path} cambio en disco, se recarga")
+                    entry = (version, parse(path))
+                    self._entries[key] = entry
+        return entry[1]
+
+    def docx_template(self, path: str) -> DocxTemplate:
+        pristine = self._load("docx", path, Document)
+        doc = DocxTemplate(path)
+        doc.docx = copy.deepcopy(pristine)
+        return doc
+
+    def workbook(self, path: str) -> openpyxl.Workbook:
+        snapshot = self._load("xlsx", path, lambda p: pickle.dumps(openpyxl.load_workbook(p)))
+        return pickle.loads(snapshot)
+
+    def fingerprint(self, directory: str) -> str:
+        """
+        Hash del contenido de las plantillas .docx/.xlsx de un directorio. Los
+        archivos se vuelven a leer solo si cambia el mtime o el tamano de alguno.
+        """
+        stats = []
+        for name in sorted(os.listdir(directory)):
+            if name.endswith((".docx", ".xlsx")):
+                stat = os.stat(os.path.join(directory, name))
+                stats.append((name, stat.st_mtime, stat.st_size))
+        stats = tuple(stats)
+        key = os.path.abspath(directory)
+        entry = self._fingerprints.get(key)
+        if entry is None or entry[0] != stats:
+            digest = hashlib.sha256()
+            for name, _, _ in stats:
+                digest.update(name.encode())
+                with open(os.path.join(directory, name), "rb") as f:
+                    digest.update(hashlib.sha256(f.read()).digest())
+            entry = (stats, digest.hexdigest()[:16])
+            self._fingerprints[key] = entry
+        return entry[1]
+
+    def _reset_lock(self):
+        self._lock = threading.Lock()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._fingerprints.clear()
+
+
+template_cache = TemplateCache()
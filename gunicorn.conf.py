@@ -0,0 +1,28 @@
+# gunicorn.conf.py
+# gunicorn lo lee solo desde el directorio de trabajo (/app en docker-compose);
+# los flags del comando (--workers, --bind, --timeout...) siguen mandando.
+import os
+import shutil
+
+from app.conf.config import get_app_settings
+
+# Tiene que quedar en el entorno antes de que los workers importen
+# prometheus_client: ahi se decide si las metricas van a archivos compartidos.
+_metrics_dir = os.environ.get("PROMETHEUS_MULTIPROC_DIR") or get_app_settings().metrics_multiproc_dir
+if _metrics_dir:
+    os.environ["PROMETHEUS_MULTIPROC_DIR"] = _metrics_dir
+
+
+def on_starting(server):
+    # Los archivos de una corrida anterior sumarian contadores de procesos que ya no existen.
+    if _metrics_dir:
+        shutil.rmtree(_metrics_dir, ignore_errors=True)
+        os.makedirs(_metrics_dir, exist_ok=True)
+
+
+def child_exit(server, worker):
+    # Saca de los gauges "livesum" (requests en vuelo, pool de la base) al worker que murio.
+    if _metrics_dir:
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(worker.pid)
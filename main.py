@@ -1,19 +1,54 @@
+from contextlib import asynccontextmanager
 from typing import Type
 
 from dotenv import load_dotenv
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.conf.config import get_app_settings
 from app.routers.v1.api_router import router as root_api_router
+from app.api_services.word_report_di import report_job_manager, report_prerender_scheduler, ticket_snapshot_job
 from app.conf.settings.dependencies import validate_api_key
+from app.container_instance.instances import mail_coalescer, mail_queue, smtp_pool
 
-from app.utils.logger import log
+from app.utils.logger import CorrelationIdMiddleware, log
+from app.utils.metrics import MetricsMiddleware, render_metrics
 load_dotenv()
 app_settings = get_app_settings()
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Every worker accepts report jobs; one of them becomes the dispatcher.
+    report_job_manager().start()
+    prerender = report_prerender_scheduler()
+    if prerender:
+        prerender.start()
+    if mail_queue():
+        mail_queue().start()
+    if mail_coalescer():
+        mail_coalescer().start()
+    snapshots = ticket_snapshot_job()
+    if snapshots:
+        snapshots.start()
+    yield
+    if snapshots:
+        snapshots.stop()
+    if prerender:
+        prerender.stop()
+    report_job_manager().stop()
+    # Antes que la cola: los resumenes pendientes todavia se encolan.
+    if mail_coalescer():
+        mail_coalescer().stop()
+    if mail_queue():
+        mail_queue().stop()
+    if smtp_pool():
+        smtp_pool().close()
+
+
 app = FastAPI(
     title=app_settings.project_name,
+    lifespan=lifespan,
 )
 
 @app.get("/health")
@@ -21,6 +56,13 @@ def health():
     return {"status": "ok"}
 
 
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """Formato de texto de Prometheus, sumado entre los workers de gunicorn (ver gunicorn.conf.py)."""
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
+
+
 # CORS Related Code
 # origins = [
 #     "http://localhost",
@@ -39,6 +81,8 @@ app.add_middleware(
     allow_headers=["*"],
     
 )
+app.add_middleware(MetricsMiddleware)
+app.add_middleware(CorrelationIdMiddleware)
 
 
 # API Related Code